@@ -14,8 +14,8 @@ import os
 import sys
 import json
 import time
-import random
 import re
+import copy
 import requests
 import httpx
 import asyncio
@@ -27,14 +27,27 @@ from pathlib import Path
 import hashlib
 import mimetypes
 import threading
+import functools
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 import queue
+import shutil
+import sqlite3
 
 # 导入两个基础爬虫
 from enhanced_crawler import EnhancedIFixitCrawler
 from tree_crawler import TreeCrawler
+from rate_controller import AdaptiveRateController, RateLimitedAdapter
+from concurrency_autotuner import ConcurrencyAutotuner
+from response_archive import ResponseArchive, ArchivingAdapter, canonical_url
+from extraction_pool import ExtractionPool, default_parse_workers
+from parser_backend import make_soup, make_link_soup, set_parser, get_parser, available_parsers, DEFAULT_PARSER
+from embedded_props import decode_props
+from proxy_health import ProxyHealthTracker
+from traffic_meter import TrafficMeter, parse_byte_size, format_bytes, DIRECT
+from single_flight import SingleFlight
+from page_cache import PageCache
 
 
 def safe_str(obj):
@@ -88,9 +101,39 @@ def safe_json_dump(data, file_handle, **kwargs):
             json.dump(error_data, file_handle, **kwargs)
 
 
+def atomic_json_write(path, data, **kwargs):
+    """原子写入JSON文件：先写同目录临时文件再替换，读取方不会看到写了一半的文件"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            safe_json_dump(data, f, **kwargs)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def open_sqlite_wal(db_path):
+    """打开WAL模式的SQLite连接（自动提交、跨线程共用，调用方自行加锁），多个爬虫进程可共享同一数据目录"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
 class TunnelProxyManager:
     """隧道代理管理器 - 使用HTTP隧道代理池，支持多代理并发"""
 
+    # 由隧道代理本身返回的错误状态（代理认证失败、网关错误/超时），计为代理失败
+    PROXY_FAILURE_STATUS = {407, 502, 504}
+
     def __init__(self, tunnel_host="b353.kdltpspro.com", tunnel_port=15818,
                  username="t15237111788411", password="htjqu9dr", max_reset_cycles=3,
                  pool_size=10):
@@ -112,17 +155,18 @@ class TunnelProxyManager:
         self.pool_size = pool_size
 
         self.proxy_pool = []  # 代理池
-        self.current_index = 0  # 当前代理索引
         self.proxy_switch_count = 0  # 请求计数器
         self.proxy_lock = threading.Lock()
 
         # 添加重置循环限制
         self.max_reset_cycles = max_reset_cycles
         self.reset_cycle_count = 0
-        self.failed_count = 0  # 失败计数
+        self.unattributed_failures = 0  # 无法归属到具体代理的失败次数
 
         # 初始化代理池
         self._init_proxy_pool()
+        # 每个代理的成功率/延迟/流量评分，选择和隔离都基于该评分
+        self.health = ProxyHealthTracker([p['id'] for p in self.proxy_pool])
 
     def _init_proxy_pool(self):
         """初始化代理池 - 创建多个独立的代理连接"""
@@ -135,9 +179,7 @@ class TunnelProxyManager:
                 proxy_config = {
                     'http': base_proxy_url,
                     'https': base_proxy_url,
-                    'id': i,
-                    'active': True,
-                    'failed_count': 0
+                    'id': i
                 }
                 self.proxy_pool.append(proxy_config)
 
@@ -159,100 +201,102 @@ class TunnelProxyManager:
             self.proxy_pool = []
 
     def get_proxy(self, thread_id=None):
-        """获取代理配置 - 智能代理选择，优先使用稳定代理"""
-        with self.proxy_lock:
-            if not self.proxy_pool:
-                print("❌ 代理池未初始化")
-                return None
+        """获取代理配置 - 线程优先使用固定代理，该代理被隔离时按健康度评分加权选择"""
+        if not self.proxy_pool:
+            print("❌ 代理池未初始化")
+            return None
 
-            # 如果指定了线程ID，尝试为该线程分配固定代理
-            if thread_id is not None:
-                proxy_index = thread_id % len(self.proxy_pool)
-                proxy = self.proxy_pool[proxy_index]
-                if proxy['active']:
-                    return {
-                        'http': proxy['http'],
-                        'https': proxy['https'],
-                        'proxy_id': proxy['id']
-                    }
+        # 如果指定了线程ID，尝试为该线程分配固定代理（复用该线程会话的连接）
+        proxy = None
+        if thread_id is not None:
+            proxy = self.proxy_pool[thread_id % len(self.proxy_pool)]
+            if not self.health.is_available(proxy['id']):
+                proxy = None
 
-            # 智能选择代理：优先选择失败次数最少的活跃代理
-            active_proxies = [p for p in self.proxy_pool if p['active']]
-            if not active_proxies:
+        if proxy is None:
+            proxy_id = self.health.select()
+            if proxy_id is None:
                 print("❌ 没有可用的代理")
                 return None
+            proxy = self.proxy_pool[proxy_id]
 
-            # 按失败次数排序，优先使用最稳定的代理
-            active_proxies.sort(key=lambda x: x['failed_count'])
-
-            # 选择失败次数最少的代理
-            proxy = active_proxies[0]
+        return {
+            'http': proxy['http'],
+            'https': proxy['https'],
+            'proxy_id': proxy['id']
+        }
 
-            # 如果最好的代理失败次数也很高，轮询使用
-            if proxy['failed_count'] > 3:
-                proxy = active_proxies[self.current_index % len(active_proxies)]
-                self.current_index = (self.current_index + 1) % len(active_proxies)
+    def _resolve_proxy_id(self, proxy):
+        """接受get_proxy返回的配置或代理ID"""
+        if isinstance(proxy, dict):
+            proxy = proxy.get('proxy_id')
+        if isinstance(proxy, int) and 0 <= proxy < len(self.proxy_pool):
+            return proxy
+        return None
 
-            return {
-                'http': proxy['http'],
-                'https': proxy['https'],
-                'proxy_id': proxy['id']
-            }
+    def record_result(self, proxy, success, latency=None):
+        """记录一次经由该代理的请求结果（成功/失败、延迟）"""
+        proxy_id = self._resolve_proxy_id(proxy)
+        if proxy_id is not None:
+            self.health.record(proxy_id, success, latency=latency)
+
+    def record_bytes(self, proxy, bytes_count):
+        """记录经由该代理实际传输的字节数（由流量计量在响应体读完后回调）"""
+        proxy_id = self._resolve_proxy_id(proxy)
+        if proxy_id is not None:
+            self.health.add_bytes(proxy_id, bytes_count)
+
+    def observe_request(self, proxy_id, request, response=None, error=None, latency=None):
+        """会话适配器的结果回调：把每个请求的结果记到该线程会话绑定的代理上"""
+        if error is not None:
+            self.record_result(proxy_id, False, latency=latency)
+            return
+        success = response.status_code not in self.PROXY_FAILURE_STATUS
+        self.record_result(proxy_id, success, latency=latency)
 
     def mark_proxy_failed(self, proxy, reason=""):
-        """标记代理失败"""
-        with self.proxy_lock:
-            if proxy and 'proxy_id' in proxy:
-                proxy_id = proxy['proxy_id']
-                if proxy_id < len(self.proxy_pool):
-                    self.proxy_pool[proxy_id]['failed_count'] += 1
-                    failed_count = self.proxy_pool[proxy_id]['failed_count']
-
-                    # 提高失败阈值，减少频繁切换
-                    if failed_count >= 5:  # 提高失败阈值到5次
-                        self.proxy_pool[proxy_id]['active'] = False
-
-                        # 检查是否还有可用代理
-                        active_count = sum(1 for p in self.proxy_pool if p['active'])
-                        if active_count <= 2:  # 保留至少2个代理可用
-                            # 重新激活失败次数最少的代理
-                            min_failed = min(p['failed_count'] for p in self.proxy_pool)
-                            for p in self.proxy_pool:
-                                if p['failed_count'] == min_failed:
-                                    p['active'] = True
-                                    p['failed_count'] = max(0, p['failed_count'] - 2)  # 减少失败计数
-            else:
-                self.failed_count += 1
-                # 静默处理失败，减少日志输出
+        """标记代理失败；无法确定是哪个代理时（如未绑定代理的异步客户端）只计入未归属失败数"""
+        proxy_id = self._resolve_proxy_id(proxy)
+        if proxy_id is None:
+            with self.proxy_lock:
+                self.unattributed_failures += 1
+            return
+        self.record_result(proxy_id, False)
 
     def get_stats(self):
-        """获取代理池统计信息"""
-        active_count = sum(1 for p in self.proxy_pool if p['active'])
-        total_failed = sum(p['failed_count'] for p in self.proxy_pool)
-
+        """获取代理池统计信息（含每个代理的健康度评分）"""
+        scores = self.health.snapshot()
+        details = []
+        for p in self.proxy_pool:
+            detail = {'id': p['id'], 'active': not scores[p['id']]['quarantined'],
+                      'failed_count': scores[p['id']]['failures']}
+            detail.update(scores[p['id']])
+            details.append(detail)
+
+        total_requests = sum(d['requests'] for d in details)
+        latencies = [d['latency_ewma'] for d in details if d['latency_ewma'] is not None]
         return {
             'tunnel_host': self.tunnel_host,
             'tunnel_port': self.tunnel_port,
             'username': self.username,
             'pool_size': self.pool_size,
-            'active_proxies': active_count,
-            'total_failed': total_failed,
-            'proxy_details': [
-                {
-                    'id': p['id'],
-                    'active': p['active'],
-                    'failed_count': p['failed_count']
-                } for p in self.proxy_pool
-            ]
+            'active_proxies': sum(1 for d in details if d['active']),
+            'quarantined_proxies': sum(1 for d in details if not d['active']),
+            'quarantines': self.health.quarantines,
+            'total_failed': sum(d['failures'] for d in details),
+            'unattributed_failures': self.unattributed_failures,
+            'total_requests': total_requests,
+            'total_bytes': sum(d['bytes'] for d in details),
+            'success_rate': (sum(d['successes'] for d in details) / total_requests) if total_requests else None,
+            'avg_latency': (sum(latencies) / len(latencies)) if latencies else None,
+            'proxy_details': details
         }
 
     def reset_stats(self):
         """重置统计信息"""
+        self.health.reset()
         with self.proxy_lock:
-            for proxy in self.proxy_pool:
-                proxy['failed_count'] = 0
-                proxy['active'] = True
-            self.failed_count = 0
+            self.unattributed_failures = 0
 
     async def test_proxy_speed(self, proxy_url, test_url="https://httpbin.org/ip"):
         """测试单个代理的响应速度"""
@@ -287,12 +331,13 @@ class TunnelProxyManager:
             if tasks:
                 results = await asyncio.gather(*tasks, return_exceptions=True)
 
-                # 标记不可用的代理
+                # 把测试结果记入对应代理的健康度
                 for i, result in enumerate(results):
-                    if isinstance(result, Exception) or result == float('inf'):
-                        if i < len(self.proxy_pool):
-                            self.proxy_pool[i]['active'] = False
-                            self.proxy_pool[i]['failed_count'] += 1
+                    if i < len(self.proxy_pool):
+                        if isinstance(result, Exception) or result == float('inf'):
+                            self.record_result(i, False)
+                        else:
+                            self.record_result(i, True, latency=result)
 
                 print(f"🔥 代理预热完成，测试了 {len(tasks)} 个代理")
 
@@ -301,11 +346,191 @@ class TunnelProxyManager:
             pass
 
 
+class ThreadSessionManager:
+    """线程级持久会话管理器 - 每个工作线程复用一个带连接池的requests.Session"""
+
+    def __init__(self, thread_local, pool_connections=10, pool_maxsize=10, rate_limiter=None, archive=None,
+                 proxy_manager=None, traffic_meter=None):
+        """
+        初始化会话管理器
+
+        Args:
+            thread_local: 爬虫的线程本地存储，会话保存在其中
+            pool_connections: 每个会话缓存的主机连接池数量
+            pool_maxsize: 每个主机连接池保持的最大连接数
+            rate_limiter: 自适应限速控制器，设置后会话的每个请求都先申请许可
+            archive: 原始响应归档，录制时保存页面响应，回放时直接从归档返回
+            proxy_manager: 代理管理器，设置后每个请求的结果记到会话绑定的代理上
+            traffic_meter: 流量计量，设置后每个响应的实际传输字节数按内容类别和代理累计
+        """
+        self.thread_local = thread_local
+        self.rate_limiter = rate_limiter
+        self.archive = archive
+        self.proxy_manager = proxy_manager
+        self.traffic_meter = traffic_meter
+        self.pool_connections = max(1, pool_connections)
+        self.pool_maxsize = max(1, pool_maxsize)
+
+        self._lock = threading.Lock()
+        self._sessions = []  # 当前活跃的会话，用于统计和清理
+        self._retired_requests = 0  # 已关闭会话累计的请求数
+        self._retired_connections = 0  # 已关闭会话累计新建的连接数
+        self.sessions_created = 0
+        self.sessions_rebuilt = 0
+
+    def _build_session(self, proxies):
+        """创建带连接池的会话，并绑定该线程分配到的代理"""
+        session = requests.Session()
+        retry_strategy = Retry(
+            total=0,  # 完全禁用urllib3的重试，由上层处理
+            backoff_factor=0,
+            status_forcelist=[],
+            raise_on_status=False
+        )
+        adapter_kwargs = dict(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry_strategy
+        )
+        proxy_id = proxies.get('proxy_id') if proxies else None
+        callbacks = []
+        if self.proxy_manager and proxy_id is not None:
+            callbacks.append(functools.partial(self.proxy_manager.observe_request, proxy_id))
+        if self.traffic_meter:
+            callbacks.append(functools.partial(self.traffic_meter.observe_request, proxy_id))
+        if callbacks and self.rate_limiter:
+            adapter_kwargs['result_callback'] = functools.partial(self._dispatch_result, callbacks)
+        if self.archive:
+            adapter = ArchivingAdapter(self.rate_limiter, self.archive, **adapter_kwargs)
+        elif self.rate_limiter:
+            adapter = RateLimitedAdapter(self.rate_limiter, **adapter_kwargs)
+        else:
+            adapter = HTTPAdapter(**adapter_kwargs)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if proxies:
+            session.proxies.update({
+                'http': proxies.get('http'),
+                'https': proxies.get('https')
+            })
+        return session
+
+    @staticmethod
+    def _dispatch_result(callbacks, request, **kwargs):
+        """把适配器的逐请求结果分发给代理健康度和流量计量"""
+        for callback in callbacks:
+            callback(request, **kwargs)
+
+    def get_session(self, proxy_factory=None):
+        """获取当前线程的会话，不存在时按分配到的代理创建"""
+        session = getattr(self.thread_local, 'session', None)
+        if session is not None:
+            return session
+
+        proxies = proxy_factory() if proxy_factory else None
+        session = self._build_session(proxies)
+        self.thread_local.session = session
+        self.thread_local.session_proxy_id = proxies.get('proxy_id') if proxies else None
+
+        with self._lock:
+            self._sessions.append(session)
+            self.sessions_created += 1
+        return session
+
+    def get_proxy_id(self):
+        """获取当前线程会话绑定的代理ID"""
+        return getattr(self.thread_local, 'session_proxy_id', None)
+
+    def invalidate(self):
+        """代理轮换时丢弃当前线程的会话，下次请求按新代理重建"""
+        session = getattr(self.thread_local, 'session', None)
+        if session is None:
+            return
+
+        self.thread_local.session = None
+        self.thread_local.session_proxy_id = None
+        self._retire(session)
+        with self._lock:
+            self.sessions_rebuilt += 1
+
+    def _retire(self, session):
+        """关闭会话并保留其连接统计"""
+        requests_count, connections_count = self._collect_pool_counters(session)
+        with self._lock:
+            self._retired_requests += requests_count
+            self._retired_connections += connections_count
+            if session in self._sessions:
+                self._sessions.remove(session)
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    def _collect_pool_counters(self, session):
+        """汇总会话内所有urllib3连接池的请求数和新建连接数"""
+        total_requests = 0
+        total_connections = 0
+        seen_adapters = set()
+
+        try:
+            for adapter in list(session.adapters.values()):
+                if id(adapter) in seen_adapters:
+                    continue
+                seen_adapters.add(id(adapter))
+
+                managers = [adapter.poolmanager] + list(getattr(adapter, 'proxy_manager', {}).values())
+                for manager in managers:
+                    if manager is None:
+                        continue
+                    for key in list(manager.pools.keys()):
+                        pool = manager.pools.get(key)
+                        if pool is None:
+                            continue
+                        total_requests += getattr(pool, 'num_requests', 0)
+                        total_connections += getattr(pool, 'num_connections', 0)
+        except Exception:
+            pass  # 统计失败不影响请求
+
+        return total_requests, total_connections
+
+    def get_stats(self):
+        """获取连接复用统计信息"""
+        with self._lock:
+            sessions = list(self._sessions)
+            total_requests = self._retired_requests
+            total_connections = self._retired_connections
+
+        for session in sessions:
+            requests_count, connections_count = self._collect_pool_counters(session)
+            total_requests += requests_count
+            total_connections += connections_count
+
+        reused = max(0, total_requests - total_connections)
+        return {
+            'active_sessions': len(sessions),
+            'sessions_created': self.sessions_created,
+            'sessions_rebuilt': self.sessions_rebuilt,
+            'requests': total_requests,
+            'new_connections': total_connections,
+            'reused_connections': reused,
+            'reuse_rate': (reused / total_requests * 100) if total_requests > 0 else 0.0
+        }
+
+    def close_all(self):
+        """关闭所有会话"""
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            self._retire(session)
+
+
 class AsyncHttpClientManager:
     """异步HTTP客户端管理器 - 基于httpx的高性能异步请求"""
 
     def __init__(self, proxy_manager=None, max_connections=150, max_keepalive_connections=50,
-                 timeout=3.0, max_retries=2):
+                 timeout=3.0, max_retries=2, rate_limiter=None, inflight_limit=None, archive=None,
+                 traffic_meter=None):
         """
         初始化异步HTTP客户端管理器（优化版本，平衡速度与稳定性）
 
@@ -315,8 +540,16 @@ class AsyncHttpClientManager:
             max_keepalive_connections: 最大保持连接数（优化到50）
             timeout: 请求超时时间
             max_retries: 最大重试次数
+            rate_limiter: 自适应限速控制器，每个请求发出前申请许可并反馈结果
+            inflight_limit: 可动态调整的在途请求闸门（由并发自动调优器控制），max_connections只作为硬上限
+            archive: 原始响应归档，录制时保存页面响应，回放时直接从归档返回
+            traffic_meter: 流量计量，每个响应的实际传输字节数计入（客户端不经过代理池，记为直连）
         """
         self.proxy_manager = proxy_manager
+        self.rate_limiter = rate_limiter
+        self.inflight_limit = inflight_limit
+        self.archive = archive
+        self.traffic_meter = traffic_meter
         self.max_connections = max_connections
         self.max_keepalive_connections = max_keepalive_connections
         self.timeout = timeout
@@ -436,8 +669,19 @@ class AsyncHttpClientManager:
             await self._client.aclose()
             self._client = None
 
+    def _replay_response(self, url):
+        """回放模式：把归档记录构造成httpx响应，未归档时返回None"""
+        record = self.archive.lookup(url)
+        if record is None:
+            return None
+        return httpx.Response(record['status'], headers=dict(record['headers']), content=record['body'],
+                              request=httpx.Request('GET', url))
+
     async def get(self, url, headers=None, **kwargs):
         """异步GET请求 - 改进错误处理"""
+        if self.archive and self.archive.replay:
+            return await asyncio.to_thread(self._replay_response, url)
+
         try:
             # 检查事件循环状态
             try:
@@ -454,13 +698,37 @@ class AsyncHttpClientManager:
             if not self._client or not self._semaphore:
                 return None
 
-            async with self._semaphore:
-                request_headers = self.headers.copy()
-                if headers:
-                    request_headers.update(headers)
+            # 先排队获取限速许可，再占用连接信号量，等待期间不占连接
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(url)
 
-                return await self._client.get(url, headers=request_headers, **kwargs)
+            if self.inflight_limit:
+                await self.inflight_limit.acquire_async()
+            start_time = time.monotonic()
+            try:
+                async with self._semaphore:
+                    request_headers = self.headers.copy()
+                    if headers:
+                        request_headers.update(headers)
+
+                    response = await self._client.get(url, headers=request_headers, **kwargs)
+            finally:
+                if self.inflight_limit:
+                    self.inflight_limit.release()
+            if self.rate_limiter:
+                self.rate_limiter.record(url, response.status_code,
+                                         retry_after=response.headers.get('Retry-After'),
+                                         latency=time.monotonic() - start_time)
+            if self.traffic_meter:
+                self.traffic_meter.observe_httpx(url, response)
+            if self.archive and self.archive.should_archive(response.status_code, response.headers.get('Content-Type')):
+                await asyncio.to_thread(self.archive.store, url, response.status_code, response.headers, response.content)
+            return response
         except Exception as e:
+            # 超时和连接错误反馈给限速控制器（代理故障不影响站点速率）
+            if self.rate_limiter and isinstance(e, (httpx.TimeoutException, httpx.ConnectError)):
+                self.rate_limiter.record(url, error=e)
+
             # 改进的错误消息处理
             error_msg = self._format_error_message(e, url)
 
@@ -647,14 +915,1023 @@ class AsyncHttpClientManager:
         return success_count, len(tasks)
 
 
+class MediaDownloadLoop:
+    """媒体下载后台线程 - 整个运行期间持有一个事件循环，调用方通过run_coroutine_threadsafe提交任务"""
+
+    def __init__(self, name="media-downloader"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动后台线程（已启动时直接返回）"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return True
+
+            self._started.clear()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+        return self._started.wait(timeout=5)
+
+    def _run(self):
+        """后台线程主函数：运行事件循环直到被停止"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            try:
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            except Exception:
+                pass
+            self._loop.close()
+
+    def is_running(self):
+        """后台事件循环是否在运行"""
+        return bool(self._thread and self._thread.is_alive() and self._loop and self._loop.is_running())
+
+    def is_loop_thread(self):
+        """当前线程是否为后台事件循环线程"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """提交协程到后台事件循环，返回concurrent.futures.Future"""
+        if not self.start():
+            coro.close()
+            raise RuntimeError("媒体下载事件循环启动失败")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self, shutdown_coro=None, timeout=10):
+        """停止后台事件循环，shutdown_coro会在停止前于该循环上执行"""
+        if not self.is_running():
+            if shutdown_coro is not None:
+                shutdown_coro.close()
+            return
+
+        if shutdown_coro is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown_coro, self._loop).result(timeout=timeout)
+            except Exception:
+                pass  # 静默处理关闭错误
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+
+class MediaDownloadQueue:
+    """有界媒体下载队列 - 保存阶段入队，独立的下载工作线程池消费，队列积压时对页面阶段施加背压"""
+
+    def __init__(self, handler, max_size=64, workers=4, logger=None):
+        """
+        初始化媒体下载队列
+
+        Args:
+            handler: 处理单个任务的可调用对象（下载媒体并回写JSON）
+            max_size: 队列最大长度，队列满时入队方阻塞
+            workers: 下载工作线程数
+            logger: 日志记录器
+        """
+        self.handler = handler
+        self.max_size = max(1, max_size)
+        self.workers = max(1, workers)
+        self.logger = logger or logging.getLogger(__name__)
+
+        # 积压超过高水位时页面阶段暂停，降到低水位后恢复
+        self.high_watermark = max(1, int(self.max_size * 0.8))
+        self.low_watermark = max(0, self.max_size // 2)
+
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'completed': 0,
+            'failed': 0,
+            'peak_depth': 0,
+            'backpressure_waits': 0,
+            'backpressure_seconds': 0.0
+        }
+
+    def start(self):
+        """启动下载工作线程（已启动时直接返回）"""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"media-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def put(self, job):
+        """提交任务，队列已满时阻塞直到有空位"""
+        self.start()
+        self._queue.put(job)
+        with self._lock:
+            self.stats['enqueued'] += 1
+            self.stats['peak_depth'] = max(self.stats['peak_depth'], self._queue.qsize())
+
+    def depth(self):
+        """当前队列积压的任务数"""
+        return self._queue.qsize()
+
+    def wait_for_capacity(self, poll_interval=0.2):
+        """背压：积压达到高水位时阻塞调用方，直到降到低水位"""
+        if self.depth() < self.high_watermark:
+            return
+
+        start_time = time.time()
+        while self.depth() > self.low_watermark:
+            time.sleep(poll_interval)
+
+        with self._lock:
+            self.stats['backpressure_waits'] += 1
+            self.stats['backpressure_seconds'] += time.time() - start_time
+
+    def _worker(self):
+        """工作线程：持续消费队列中的任务"""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self.handler(job)
+                with self._lock:
+                    self.stats['completed'] += 1
+            except Exception as e:
+                with self._lock:
+                    self.stats['failed'] += 1
+                self.logger.error(f"媒体下载任务失败: {safe_str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """等待队列中所有任务处理完成"""
+        if self._threads:
+            self._queue.join()
+
+    def stop(self):
+        """处理完剩余任务后停止所有工作线程"""
+        with self._lock:
+            threads = list(self._threads)
+            self._threads = []
+        if not threads:
+            return
+
+        self._queue.join()
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def get_stats(self):
+        """获取队列统计信息（含当前深度）"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['depth'] = self.depth()
+        stats['max_size'] = self.max_size
+        return stats
+
+
+class MediaStore:
+    """内容寻址媒体存储 - URL→sha256→blob 索引保存在SQLite（WAL模式），每次登记只写入单条记录，替代遍历目录的去重查找"""
+
+    def __init__(self, storage_root, logger=None, blob_folder="media_blobs", media_folder="media"):
+        self.storage_root = Path(storage_root)
+        self.logger = logger or logging.getLogger(__name__)
+        self.index_file = self.storage_root / "media_index.json"  # 旧版JSON索引，仅用于一次性迁移
+        self.db_path = self.storage_root / "media_index.db"
+        self.blob_root = self.storage_root / blob_folder
+        self.media_folder = media_folder
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'blobs_stored': 0,
+            'duplicates_merged': 0,
+            'copy_fallbacks': 0,
+            'imported_files': 0
+        }
+        self._conn = open_sqlite_wal(self.db_path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS urls (url_hash TEXT PRIMARY KEY, sha256 TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, path TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.load_index()
+
+    def load_index(self):
+        """首次使用时导入旧版media_index.json和数据目录中已有的媒体文件"""
+        try:
+            self._migrate_json_index()
+            self._import_dataset_media()
+            counts = self._counts()
+            self.logger.info(f"已加载媒体索引，包含 {counts[0]} 个URL、{counts[1]} 个文件")
+        except Exception as e:
+            self.logger.error(f"加载媒体索引失败: {e}")
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _counts(self):
+        with self._lock:
+            urls = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            blobs = self._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        return urls, blobs
+
+    def _write_many(self, url_rows, blob_rows):
+        """在一个事务中批量写入索引（用于迁移和导入）"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO urls (url_hash, sha256) VALUES (?, ?)", url_rows)
+                self._conn.executemany("INSERT OR IGNORE INTO blobs (sha256, path) VALUES (?, ?)", blob_rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _migrate_json_index(self):
+        """把旧版JSON索引一次性导入SQLite，导入后将JSON重命名为 .migrated"""
+        if self._get_meta('json_migrated') or not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            urls = data.get('urls', {})
+            blobs = data.get('blobs', {})
+            self._write_many(list(urls.items()), list(blobs.items()))
+            self._set_meta('json_migrated', datetime.now(timezone.utc).isoformat())
+            os.replace(self.index_file, self.index_file.with_name("media_index.json.migrated"))
+            self.logger.info(f"已将 {len(urls)} 个媒体URL从media_index.json迁移到SQLite索引")
+        except Exception as e:
+            self.logger.error(f"迁移JSON媒体索引失败: {e}")
+
+    def _import_dataset_media(self):
+        """首次运行时把数据目录各media文件夹中已下载的文件按内容登记为blob（相同内容合并为硬链接）
+
+        旧文件名只含URL哈希的前8位，无法还原URL，因此只建立 sha256→blob 记录：之后下载到相同内容时直接合并到已有blob
+        """
+        if self._get_meta('dataset_imported'):
+            return
+        blob_rows = []
+        known = {}
+        if self.storage_root.exists():
+            for media_dir in self.storage_root.rglob(self.media_folder):
+                if not media_dir.is_dir() or self.blob_root in media_dir.parents:
+                    continue
+                for file_path in media_dir.iterdir():
+                    if not file_path.is_file() or file_path.name.startswith('.'):
+                        continue
+                    try:
+                        sha256 = self._file_sha256(file_path)
+                        known_blob = known.get(sha256) or self._blob_rel(sha256)
+                        if known_blob and (self.storage_root / known_blob).is_file():
+                            if not os.path.samefile(self.storage_root / known_blob, file_path):
+                                self._link(self.storage_root / known_blob, file_path)
+                                self.stats['duplicates_merged'] += 1
+                        else:
+                            blob_path = self._blob_path(sha256, file_path.suffix.lower())
+                            self._link(file_path, blob_path)
+                            known_blob = str(blob_path.relative_to(self.storage_root))
+                            blob_rows.append((sha256, known_blob))
+                        known[sha256] = known_blob
+                        self.stats['imported_files'] += 1
+                    except Exception as e:
+                        self.logger.warning(f"导入已有媒体文件失败 {file_path}: {e}")
+        self._write_many([], blob_rows)
+        self._set_meta('dataset_imported', datetime.now(timezone.utc).isoformat())
+        if self.stats['imported_files']:
+            self.logger.info(f"已将数据目录中 {self.stats['imported_files']} 个媒体文件导入媒体存储（{len(blob_rows)} 个不同内容）")
+
+    def _blob_rel(self, sha256):
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def save_index(self, force=False):
+        """索引在每次登记时已提交，这里只做WAL检查点"""
+        try:
+            with self._lock:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except Exception as e:
+            self.logger.error(f"保存媒体索引失败: {e}")
+
+    @staticmethod
+    def url_key(url):
+        """生成URL的索引键"""
+        return hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _file_sha256(path):
+        """计算文件内容的sha256"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _blob_path(self, sha256, ext):
+        """按sha256前两位分桶的blob路径"""
+        return self.blob_root / sha256[:2] / f"{sha256}{ext}"
+
+    def _link(self, source, dest):
+        """将source硬链接到dest（原子替换），不支持硬链接时回退为复制"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+            with self._lock:
+                self.stats['copy_fallbacks'] += 1
+        try:
+            os.replace(tmp_path, dest)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+
+    def lookup(self, url):
+        """查找URL对应的已存储blob，返回Path或None（O(1)索引查找）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blobs.path FROM urls JOIN blobs ON blobs.sha256 = urls.sha256 WHERE urls.url_hash = ?",
+                (self.url_key(url),)).fetchone()
+        blob_rel = row[0] if row else None
+        if blob_rel:
+            blob_path = self.storage_root / blob_rel
+            if blob_path.is_file():
+                with self._lock:
+                    self.stats['hits'] += 1
+                return blob_path
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def link_existing(self, url, dest):
+        """如果URL已在索引中，把对应blob链接到dest并返回True"""
+        blob_path = self.lookup(url)
+        if not blob_path:
+            return False
+        try:
+            if not dest.exists():
+                self._link(blob_path, dest)
+            return True
+        except Exception as e:
+            self.logger.warning(f"链接已存储媒体文件失败 {dest}: {e}")
+            return False
+
+    def ingest(self, url, file_path):
+        """登记刚下载的文件：相同内容只保留一份blob，file_path 替换为指向blob的硬链接"""
+        try:
+            file_path = Path(file_path)
+            sha256 = self._file_sha256(file_path)
+            blob_path = self._blob_path(sha256, file_path.suffix.lower())
+            known_blob = self._blob_rel(sha256)
+            if known_blob and (self.storage_root / known_blob).is_file():
+                # 不同URL下的相同内容，让当前文件指向已有blob
+                self._link(self.storage_root / known_blob, file_path)
+                with self._lock:
+                    self.stats['duplicates_merged'] += 1
+            else:
+                self._link(file_path, blob_path)
+                known_blob = str(blob_path.relative_to(self.storage_root))
+                with self._lock:
+                    self.stats['blobs_stored'] += 1
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO blobs (sha256, path) VALUES (?, ?)", (sha256, known_blob))
+                self._conn.execute("INSERT OR REPLACE INTO urls (url_hash, sha256) VALUES (?, ?)",
+                                   (self.url_key(url), sha256))
+        except Exception as e:
+            self.logger.warning(f"登记媒体文件到索引失败 {file_path}: {e}")
+
+    def get_stats(self):
+        """获取媒体存储统计信息"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['indexed_urls'], stats['stored_blobs'] = self._counts()
+        return stats
+
+
+class GuideStore:
+    """全局指南存储 - 同一个指南（按URL中的数字ID）只提取和保存一份规范副本，
+    各设备目录下的 guides/guide_N/guide.json 硬链接到该副本，索引记录所有链接位置以便副本更新后重新链接"""
+
+    GUIDE_ID_PATTERN = re.compile(r'/(?:Guide|Teardown)/(?:[^/?#]+/)?(\d+)(?=[/?#]|$)', re.IGNORECASE)
+
+    def __init__(self, storage_root, logger=None, store_folder="guide_store", force_refresh=False, save_interval=20):
+        self.storage_root = Path(storage_root)
+        self.logger = logger or logging.getLogger(__name__)
+        self.store_root = self.storage_root / store_folder
+        self.index_file = self.store_root / "index.json"
+        self.force_refresh = force_refresh
+        self.save_interval = save_interval
+        self.entries = {}          # 指南ID -> {url, title, path, complete, links, updated}
+        self._memory = {}          # 本次运行已提取的指南数据
+        self._saved_this_run = set()
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.stats = {
+            'memory_hits': 0,      # 本次运行其他设备已提取，直接复用
+            'store_hits': 0,       # 之前运行已完整保存，直接读取规范副本
+            'stored': 0,
+            'linked': 0,
+            'copy_fallbacks': 0
+        }
+        self.load_index()
+
+    @classmethod
+    def guide_id_from_url(cls, url):
+        """从指南URL中提取数字ID，不是指南URL时返回None"""
+        match = cls.GUIDE_ID_PATTERN.search(url or '')
+        return match.group(1) if match else None
+
+    def load_index(self):
+        """加载指南索引文件"""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('guides', {})
+                self.logger.info(f"已加载指南索引，包含 {len(self.entries)} 个指南")
+        except Exception as e:
+            self.logger.error(f"加载指南索引失败: {e}")
+            self.entries = {}
+
+    def save_index(self, force=False):
+        """保存指南索引文件（未达到保存间隔时跳过，force=True 时立即保存）"""
+        with self._lock:
+            if not self._dirty or (not force and self._dirty < self.save_interval):
+                return
+            index_data = {
+                'version': '1.0',
+                'last_updated': datetime.now(timezone.utc).isoformat(),
+                'guides': {guide_id: dict(entry, links=list(entry['links'])) for guide_id, entry in self.entries.items()}
+            }
+            self._dirty = 0
+        try:
+            self.store_root.mkdir(parents=True, exist_ok=True)
+            atomic_json_write(self.index_file, index_data, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"保存指南索引失败: {e}")
+
+    def guide_dir(self, guide_id):
+        """指南规范副本所在目录（媒体文件保存在其下的media目录）"""
+        return self.store_root / str(guide_id)
+
+    def _canonical_file(self, guide_id):
+        return self.guide_dir(guide_id) / "guide.json"
+
+    def _has_complete_copy(self, guide_id):
+        """之前运行是否已完整保存（调用方持有锁）"""
+        entry = self.entries.get(guide_id)
+        return bool(entry and entry.get('complete') and not self.force_refresh and
+                    self._canonical_file(guide_id).is_file())
+
+    def remember(self, guide_id, data):
+        """记录本次运行提取到的指南数据，供其他设备直接复用"""
+        if guide_id and data:
+            with self._lock:
+                self._memory[guide_id] = copy.deepcopy(data)
+
+    def get(self, guide_id):
+        """返回指南数据的副本：优先本次运行已提取的数据，其次之前运行完整保存的规范副本，都没有时返回None"""
+        with self._lock:
+            data = self._memory.get(guide_id)
+            if data is not None:
+                self.stats['memory_hits'] += 1
+                return copy.deepcopy(data)
+            if not self._has_complete_copy(guide_id):
+                return None
+        try:
+            with open(self._canonical_file(guide_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(data, dict) or not data.get('title'):
+            return None
+        with self._lock:
+            self._memory.setdefault(guide_id, data)
+            self.stats['store_hits'] += 1
+        return copy.deepcopy(data)
+
+    def save(self, guide_id, data, dest):
+        """
+        保存指南并把dest链接到规范副本
+        本次运行首次保存（且没有完整的旧副本）时写入规范副本并返回其路径（调用方负责下载媒体后调用complete），
+        否则只链接已有副本并返回None
+        """
+        dest = Path(dest)
+        canonical_file = self._canonical_file(guide_id)
+        with self._lock:
+            write = guide_id not in self._saved_this_run and not self._has_complete_copy(guide_id)
+            if write:
+                canonical_file.parent.mkdir(parents=True, exist_ok=True)
+                # 在锁内写入，其他设备链接时规范副本一定已存在
+                atomic_json_write(canonical_file, data, ensure_ascii=False, indent=2)
+            self._saved_this_run.add(guide_id)
+            entry = self.entries.setdefault(guide_id, {'links': []})
+            if write:
+                entry.update({
+                    'url': data.get('url', ''),
+                    'title': data.get('title', ''),
+                    'path': str(canonical_file.relative_to(self.storage_root)),
+                    'complete': False,
+                    'updated': datetime.now(timezone.utc).isoformat()
+                })
+                self.stats['stored'] += 1
+            try:
+                link = str(dest.relative_to(self.storage_root))
+            except ValueError:
+                link = str(dest)
+            if link not in entry['links']:
+                entry['links'].append(link)
+            self._dirty += 1
+        self._link(canonical_file, dest)
+        self.save_index()
+        return canonical_file if write else None
+
+    def complete(self, guide_id):
+        """规范副本（含媒体路径）写入完成：标记为完整，并重新链接所有设备目录下的guide.json
+        （媒体任务原子重写规范副本后，先前的硬链接仍指向旧文件），返回重新链接的路径列表"""
+        canonical_file = self._canonical_file(guide_id)
+        relinked = []
+        with self._lock:
+            entry = self.entries.get(guide_id)
+            if entry is None:
+                return relinked
+            entry['complete'] = True
+            entry['updated'] = datetime.now(timezone.utc).isoformat()
+            links = list(entry['links'])
+            self._dirty += 1
+        for link in links:
+            dest = Path(link) if Path(link).is_absolute() else self.storage_root / link
+            if not dest.parent.exists():
+                continue  # 设备目录已被删除
+            try:
+                self._link(canonical_file, dest)
+                relinked.append(dest)
+            except Exception as e:
+                self.logger.warning(f"重新链接指南副本失败 {dest}: {e}")
+        self.save_index()
+        return relinked
+
+    def _link(self, source, dest):
+        """将source硬链接到dest（原子替换），不支持硬链接时回退为复制"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() and os.path.samefile(source, dest):
+            return
+        tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+            with self._lock:
+                self.stats['copy_fallbacks'] += 1
+        try:
+            os.replace(tmp_path, dest)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self.stats['linked'] += 1
+
+    def get_stats(self):
+        """获取指南存储统计信息"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['indexed_guides'] = len(self.entries)
+            stats['complete_guides'] = sum(1 for entry in self.entries.values() if entry.get('complete'))
+            stats['saved_this_run'] = len(self._saved_this_run)
+        return stats
+
+
+class TroubleshootingStore:
+    """全局故障排除存储 - 每个故障排除页面按ID只保存一份规范数据，另有设备→故障排除ID的反向索引，
+    替代各设备目录下重复的 troubleshooting_cache.json；子型号引用父类别已抓过的页面时直接复用，不再重复抓取"""
+
+    TS_ID_PATTERN = re.compile(r'/Troubleshooting/(?:[^?#]+/)?(\d+)(?=[/?#]|$)', re.IGNORECASE)
+
+    def __init__(self, storage_root, logger=None, store_folder="troubleshooting_store", force_refresh=False,
+                 save_interval=20):
+        self.storage_root = Path(storage_root)
+        self.logger = logger or logging.getLogger(__name__)
+        self.store_root = self.storage_root / store_folder
+        self.index_file = self.store_root / "index.json"
+        self.force_refresh = force_refresh
+        self.save_interval = save_interval
+        self.items = {}            # 故障排除ID -> {url, title, path, updated}
+        self.devices = {}          # 规范化设备URL -> [故障排除ID]
+        self._memory = {}          # 本次运行已提取或已读取的故障排除数据
+        self._saved_this_run = set()
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.stats = {
+            'memory_hits': 0,      # 本次运行其他设备已提取，直接复用
+            'store_hits': 0,       # 之前运行已保存，直接读取
+            'stored': 0,
+            'device_lookups': 0,
+            'device_hits': 0
+        }
+        if self.index_file.exists():
+            self.load_index()
+        else:
+            self._migrate_device_caches()
+
+    @classmethod
+    def ts_id_from_url(cls, url):
+        """故障排除页面ID：URL末尾的数字ID，没有时使用规范化URL的哈希"""
+        match = cls.TS_ID_PATTERN.search(url or '')
+        if match:
+            return match.group(1)
+        return hashlib.md5(canonical_url(url or '').encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def device_key(device_url):
+        return canonical_url(device_url or '')
+
+    def load_index(self):
+        """加载故障排除索引文件"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.items = data.get('items', {})
+            self.devices = data.get('devices', {})
+            self.logger.info(f"已加载故障排除索引，包含 {len(self.items)} 个页面、{len(self.devices)} 个设备")
+        except Exception as e:
+            self.logger.error(f"加载故障排除索引失败: {e}")
+            self.items = {}
+            self.devices = {}
+
+    def save_index(self, force=False):
+        """保存故障排除索引文件（未达到保存间隔时跳过，force=True 时立即保存）"""
+        with self._lock:
+            if not self._dirty or (not force and self._dirty < self.save_interval):
+                return
+            index_data = {
+                'version': '1.0',
+                'last_updated': datetime.now(timezone.utc).isoformat(),
+                'items': {ts_id: dict(entry) for ts_id, entry in self.items.items()},
+                'devices': {key: list(ids) for key, ids in self.devices.items()}
+            }
+            self._dirty = 0
+        try:
+            self.store_root.mkdir(parents=True, exist_ok=True)
+            atomic_json_write(self.index_file, index_data, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"保存故障排除索引失败: {e}")
+
+    def _migrate_device_caches(self):
+        """首次运行时把旧版各设备目录下的 troubleshooting_cache.json 导入存储（设备URL取自同目录的info.json），导入后删除
+
+        扫描后无论是否导入了旧缓存都写出索引文件，索引存在即表示迁移已完成，之后启动不再遍历设备目录
+        """
+        device_root = self.storage_root / "Device"
+        migrated = 0
+        if device_root.exists():
+            for cache_file in device_root.rglob("troubleshooting_cache.json"):
+                try:
+                    with open(cache_file, 'r', encoding='utf-8') as f:
+                        cached_data = json.load(f)
+                    with open(cache_file.parent / "info.json", 'r', encoding='utf-8') as f:
+                        device_url = json.load(f).get('url', '')
+                    if not device_url or not isinstance(cached_data, list) or not cached_data:
+                        continue
+                    self.set_device(device_url, cached_data)
+                    cache_file.unlink()
+                    migrated += 1
+                except Exception as e:
+                    self.logger.warning(f"迁移故障排除缓存失败 {cache_file}: {e}")
+        with self._lock:
+            self._dirty += 1
+        self.save_index(force=True)
+        if migrated:
+            self.logger.info(f"已将 {migrated} 个设备的troubleshooting_cache.json迁移到故障排除存储")
+
+    def _item_file(self, ts_id):
+        return self.store_root / f"{ts_id}.json"
+
+    def get(self, ts_url):
+        """返回故障排除页面数据的副本：优先本次运行已有的数据，其次之前运行保存的数据（强制刷新时不读取），都没有时返回None"""
+        ts_id = self.ts_id_from_url(ts_url)
+        return self._get_by_id(ts_id, allow_disk=not self.force_refresh)
+
+    def _get_by_id(self, ts_id, allow_disk=True):
+        with self._lock:
+            data = self._memory.get(ts_id)
+            if data is not None:
+                self.stats['memory_hits'] += 1
+                return copy.deepcopy(data)
+            if not allow_disk or ts_id not in self.items:
+                return None
+        try:
+            with open(self._item_file(ts_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(data, dict) or not data.get('title'):
+            return None
+        with self._lock:
+            self._memory.setdefault(ts_id, data)
+            self.stats['store_hits'] += 1
+        return copy.deepcopy(data)
+
+    def put(self, ts_url, data):
+        """保存故障排除页面数据（每个页面每次运行只写入一次），返回故障排除ID"""
+        ts_id = self.ts_id_from_url(ts_url)
+        if not data:
+            return ts_id
+        with self._lock:
+            self._memory[ts_id] = copy.deepcopy(data)
+            if ts_id in self._saved_this_run:
+                return ts_id
+            item_file = self._item_file(ts_id)
+            if ts_id in self.items and not self.force_refresh and item_file.is_file():
+                self._saved_this_run.add(ts_id)
+                return ts_id
+        try:
+            self.store_root.mkdir(parents=True, exist_ok=True)
+            atomic_json_write(item_file, data, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.warning(f"保存故障排除数据失败 {ts_url}: {e}")
+            return ts_id
+        with self._lock:
+            self._saved_this_run.add(ts_id)
+            self.items[ts_id] = {
+                'url': data.get('url', ts_url),
+                'title': data.get('title', ''),
+                'path': str(item_file.relative_to(self.storage_root)),
+                'updated': datetime.now(timezone.utc).isoformat()
+            }
+            self.stats['stored'] += 1
+            self._dirty += 1
+        return ts_id
+
+    def set_device(self, device_url, troubleshooting_data):
+        """保存设备页面上的故障排除列表：各页面数据写入存储，设备只记录故障排除ID"""
+        ts_ids = [self.put(item.get('url', ''), item) for item in troubleshooting_data
+                  if isinstance(item, dict) and item.get('title') and item.get('url')]
+        if not ts_ids:
+            return
+        with self._lock:
+            self.devices[self.device_key(device_url)] = list(dict.fromkeys(ts_ids))
+            self._dirty += 1
+        self.save_index()
+
+    def device_items(self, device_url):
+        """设备的故障排除ID列表（反向索引查找），未记录时返回空列表"""
+        with self._lock:
+            return list(self.devices.get(self.device_key(device_url), []))
+
+    def has_device(self, device_url):
+        """设备的故障排除列表是否已保存（单次索引查找）"""
+        with self._lock:
+            self.stats['device_lookups'] += 1
+            found = bool(self.devices.get(self.device_key(device_url)))
+            if found:
+                self.stats['device_hits'] += 1
+        return found
+
+    def load_device(self, device_url):
+        """读取设备的完整故障排除列表，任一页面数据缺失时返回None"""
+        ts_ids = self.device_items(device_url)
+        if not ts_ids:
+            return None
+        items = []
+        for ts_id in ts_ids:
+            data = self._get_by_id(ts_id)
+            if data is None:
+                return None
+            items.append(data)
+        return items
+
+    def get_stats(self):
+        """获取故障排除存储统计信息"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['stored_items'] = len(self.items)
+            stats['indexed_devices'] = len(self.devices)
+            stats['device_references'] = sum(len(ids) for ids in self.devices.values())
+        return stats
+
+
+class SQLiteCacheIndex:
+    """缓存索引的SQLite存储（WAL模式），按条目增删改，支持多个爬虫进程共享数据目录
+
+    对外提供与dict一致的常用接口（in / [] / del / items / get / len），
+    每次写入都是单条目的事务，不再整体重写索引文件。
+    """
+
+    def __init__(self, db_path, logger=None):
+        self.db_path = Path(db_path)
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._conn = open_sqlite_wal(self.db_path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT,
+                local_path TEXT,
+                processed_time TEXT,
+                status TEXT,
+                guides_count INTEGER DEFAULT 0,
+                media_count INTEGER DEFAULT 0,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        # 页面的HTTP验证器（ETag/Last-Modified/内容哈希），用于TTL过期后的条件请求
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_time REAL
+            )
+        """)
+
+    @staticmethod
+    def _row_values(url_hash, entry):
+        """把缓存条目拆成可聚合的列和完整JSON"""
+        structure = entry.get('structure') or {}
+        return (
+            url_hash,
+            entry.get('url', ''),
+            entry.get('local_path', ''),
+            entry.get('processed_time', ''),
+            entry.get('status', ''),
+            int(structure.get('guides_count', 0) or 0),
+            int(structure.get('media_count', 0) or 0),
+            json.dumps(entry, ensure_ascii=False)
+        )
+
+    def __contains__(self, url_hash):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM entries WHERE url_hash = ?", (url_hash,)).fetchone()
+        return row is not None
+
+    def __getitem__(self, url_hash):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM entries WHERE url_hash = ?", (url_hash,)).fetchone()
+        if row is None:
+            raise KeyError(url_hash)
+        return json.loads(row[0])
+
+    def __setitem__(self, url_hash, entry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url_hash, url, local_path, processed_time, status, "
+                "guides_count, media_count, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row_values(url_hash, entry))
+
+    def __delitem__(self, url_hash):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM entries WHERE url_hash = ?", (url_hash,))
+        if cursor.rowcount == 0:
+            raise KeyError(url_hash)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, url_hash, default=None):
+        try:
+            return self[url_hash]
+        except KeyError:
+            return default
+
+    def items(self):
+        """返回所有条目的快照列表（遍历时可以安全删除）"""
+        with self._lock:
+            rows = self._conn.execute("SELECT url_hash, data FROM entries").fetchall()
+        return [(url_hash, json.loads(data)) for url_hash, data in rows]
+
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT url_hash FROM entries")]
+
+    def upsert_many(self, entries):
+        """在一个事务中批量写入条目（用于迁移）"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (url_hash, url, local_path, processed_time, status, "
+                    "guides_count, media_count, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._row_values(url_hash, entry) for url_hash, entry in entries.items()
+                     if isinstance(entry, dict)])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_many(self, url_hashes):
+        """在一个事务中批量删除条目"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM entries WHERE url_hash = ?",
+                                       [(url_hash,) for url_hash in url_hashes])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_validators(self, url_hash):
+        """获取页面的验证器，不存在时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, checked_time FROM validators WHERE url_hash = ?",
+                (url_hash,)).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2], 'checked_time': row[3] or 0.0}
+
+    def set_validators(self, url_hash, url, etag, last_modified, content_hash, checked_time):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators (url_hash, url, etag, last_modified, content_hash, checked_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url_hash, url, etag, last_modified, content_hash, checked_time))
+
+    def touch_validators(self, url_hash, checked_time):
+        """页面未变化时只刷新校验时间"""
+        with self._lock:
+            self._conn.execute("UPDATE validators SET checked_time = ? WHERE url_hash = ?", (checked_time, url_hash))
+
+    def aggregate_stats(self):
+        """用SQL聚合统计缓存索引内容"""
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT COUNT(*),
+                       SUM(CASE WHEN status = 'complete' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN guides_count > 0 THEN 1 ELSE 0 END),
+                       COALESCE(SUM(guides_count), 0),
+                       SUM(CASE WHEN media_count > 0 THEN 1 ELSE 0 END),
+                       COALESCE(SUM(media_count), 0),
+                       MAX(processed_time)
+                FROM entries
+            """).fetchone()
+        return {
+            'entries': row[0] or 0,
+            'complete_entries': row[1] or 0,
+            'entries_with_guides': row[2] or 0,
+            'indexed_guides': row[3] or 0,
+            'entries_with_media': row[4] or 0,
+            'indexed_media': row[5] or 0,
+            'last_processed': row[6] or ''
+        }
+
+    def checkpoint(self):
+        """把WAL内容合并回主数据库文件"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
 class CacheManager:
     """智能缓存管理器 - 优化爬虫重复执行效率"""
 
-    def __init__(self, storage_root, logger=None, force_refresh=False):
+    MANIFEST_NAME = ".manifest.json"
+
+    def __init__(self, storage_root, logger=None, force_refresh=False, verify_deep=False, cache_ttl=24):
         self.storage_root = Path(storage_root)
+        self.cache_ttl = cache_ttl  # 小时，超过后用条件请求重新校验页面；0表示永不过期
         self.logger = logger or logging.getLogger(__name__)
-        self.cache_index_file = self.storage_root / "cache_index.json"
-        self.cache_index = {}
+        self.verify_deep = verify_deep  # True时跳过清单快速校验，总是解析全部JSON
+        self.cache_index_file = self.storage_root / "cache_index.json"  # 旧版JSON索引，仅用于一次性迁移
+        self.cache_db_file = self.storage_root / "cache_index.db"
+        self.cache_index = None
         self.force_refresh = force_refresh  # 添加强制刷新标志
         self.stats = {
             'total_urls': 0,
@@ -662,36 +1939,47 @@ class CacheManager:
             'new_urls': 0,
             'invalid_cache': 0,
             'cache_hits': 0,
-            'cache_misses': 0
+            'cache_misses': 0,
+            'manifest_hits': 0,
+            'deep_validations': 0,
+            'revalidations': 0,
+            'not_modified': 0,
+            'unchanged_hash': 0,
+            'changed': 0
         }
         self.load_cache_index()
+        # 故障排除数据按页面ID只保存一份，设备只在反向索引中记录故障排除ID
+        self.troubleshooting_store = TroubleshootingStore(self.storage_root, self.logger, force_refresh=force_refresh)
 
     def load_cache_index(self):
-        """加载缓存索引文件"""
+        """打开SQLite缓存索引，首次使用时导入旧版cache_index.json"""
         try:
-            if self.cache_index_file.exists():
-                with open(self.cache_index_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.cache_index = data.get('entries', {})
-                    self.logger.info(f"已加载缓存索引，包含 {len(self.cache_index)} 个条目")
-            else:
-                self.cache_index = {}
-                self.logger.info("缓存索引文件不存在，创建新的索引")
+            self.cache_index = SQLiteCacheIndex(self.cache_db_file, self.logger)
+            self._migrate_json_index()
+            self.logger.info(f"已加载缓存索引，包含 {len(self.cache_index)} 个条目")
         except Exception as e:
             self.logger.error(f"加载缓存索引失败: {e}")
             self.cache_index = {}
 
+    def _migrate_json_index(self):
+        """把旧版JSON索引一次性导入SQLite，导入后将JSON重命名为 .migrated"""
+        if self.cache_index.get_meta('json_migrated') or not self.cache_index_file.exists():
+            return
+        try:
+            with open(self.cache_index_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('entries', {})
+            self.cache_index.upsert_many(entries)
+            self.cache_index.set_meta('json_migrated', datetime.now(timezone.utc).isoformat())
+            os.replace(self.cache_index_file, self.cache_index_file.with_name("cache_index.json.migrated"))
+            self.logger.info(f"已将 {len(entries)} 个缓存条目从cache_index.json迁移到SQLite索引")
+        except Exception as e:
+            self.logger.error(f"迁移JSON缓存索引失败: {e}")
+
     def save_cache_index(self):
-        """保存缓存索引文件"""
+        """保存缓存索引（条目写入时已提交，这里只做WAL检查点）"""
         try:
-            self.storage_root.mkdir(parents=True, exist_ok=True)
-            cache_data = {
-                'version': '1.0',
-                'last_updated': datetime.now(timezone.utc).isoformat(),
-                'entries': self.cache_index
-            }
-            with open(self.cache_index_file, 'w', encoding='utf-8') as f:
-                safe_json_dump(cache_data, f, ensure_ascii=False, indent=2)
+            if isinstance(self.cache_index, SQLiteCacheIndex):
+                self.cache_index.checkpoint()
             self.logger.info(f"缓存索引已保存，包含 {len(self.cache_index)} 个条目")
         except Exception as e:
             self.logger.error(f"保存缓存索引失败: {e}")
@@ -740,6 +2028,79 @@ class CacheManager:
         self.stats['cache_hits'] += 1
         return True
 
+    def _validator_key(self, url):
+        """验证器按标准化URL存储，抓取时带的lang参数等不影响匹配"""
+        return self.get_url_hash(canonical_url(url))
+
+    @staticmethod
+    def _same_validators(validators, etag, last_modified, content_hash):
+        return bool(validators) and (validators['etag'], validators['last_modified'],
+                                     validators['content_hash']) == (etag, last_modified, content_hash)
+
+    def record_validators(self, url, headers, body):
+        """抓取页面后保存ETag、Last-Modified和内容哈希（与已保存的相同时不写入）"""
+        if not isinstance(self.cache_index, SQLiteCacheIndex) or body is None:
+            return
+        try:
+            key = self._validator_key(url)
+            etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+            content_hash = hashlib.sha256(body).hexdigest()
+            if self._same_validators(self.cache_index.get_validators(key), etag, last_modified, content_hash):
+                return
+            self.cache_index.set_validators(key, canonical_url(url), etag, last_modified, content_hash, time.time())
+        except Exception as e:
+            self.logger.debug(f"保存页面验证器失败 {url}: {e}")
+
+    def needs_revalidation(self, url):
+        """缓存条目是否已超过TTL，需要向站点确认页面是否变化"""
+        if not self.cache_ttl or self.cache_ttl <= 0 or not isinstance(self.cache_index, SQLiteCacheIndex):
+            return False
+        validators = self.cache_index.get_validators(self._validator_key(url))
+        if not validators:
+            # 没有验证器的旧条目无法判断是否变化，视为过期，重新获取一次并建立基线
+            return True
+        return time.time() - validators['checked_time'] > self.cache_ttl * 3600
+
+    def conditional_headers(self, url):
+        """构建条件请求头（If-None-Match / If-Modified-Since）"""
+        headers = {}
+        validators = self.cache_index.get_validators(self._validator_key(url)) \
+            if isinstance(self.cache_index, SQLiteCacheIndex) else None
+        if validators:
+            if validators['etag']:
+                headers['If-None-Match'] = validators['etag']
+            if validators['last_modified']:
+                headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def apply_revalidation(self, url, status_code, headers, body):
+        """处理条件请求的结果，返回True表示页面未变化（304或内容哈希相同）
+
+        没有任何验证器的旧条目发出的是无条件GET，本次响应作为新基线，节点视为已变化重新提取一次
+        """
+        self.stats['revalidations'] += 1
+        key = self._validator_key(url)
+        validators = self.cache_index.get_validators(key)
+        now = time.time()
+
+        if status_code == 304 and validators:
+            self.cache_index.touch_validators(key, now)
+            self.stats['not_modified'] += 1
+            return True
+
+        content_hash = hashlib.sha256(body or b'').hexdigest()
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        unchanged = validators is not None and validators['content_hash'] == content_hash
+        if self._same_validators(validators, etag, last_modified, content_hash):
+            self.cache_index.touch_validators(key, now)
+        else:
+            self.cache_index.set_validators(key, canonical_url(url), etag, last_modified, content_hash, now)
+        if unchanged:
+            self.stats['unchanged_hash'] += 1
+        else:
+            self.stats['changed'] += 1
+        return unchanged
+
     def _remove_invalid_cache_entry(self, url_hash, reason):
         """移除无效的缓存条目并保存索引"""
         try:
@@ -748,12 +2109,9 @@ class CacheManager:
                 url = cache_entry.get('url', 'unknown')
                 self.logger.info(f"   🗑️ 清理无效缓存条目: {url} (原因: {reason})")
 
-                # 从缓存索引中移除
+                # 从缓存索引中移除（单条目删除，立即持久化）
                 del self.cache_index[url_hash]
 
-                # 立即保存更新后的缓存索引
-                self.save_cache_index()
-
                 self.logger.info(f"   ✅ 无效缓存条目已清理并保存")
             else:
                 self.logger.warning(f"   ⚠️ 尝试清理不存在的缓存条目: {url_hash}")
@@ -828,11 +2186,8 @@ class CacheManager:
 
                 for url_hash, url, reason in invalid_entries:
                     self.logger.info(f"   清理: {url} (原因: {reason})")
-                    if url_hash in self.cache_index:
-                        del self.cache_index[url_hash]
+                self._delete_cache_entries([url_hash for url_hash, _, _ in invalid_entries])
 
-                # 保存更新后的缓存索引
-                self.save_cache_index()
                 self.logger.info(f"✅ 已清理 {len(invalid_entries)} 个无效缓存条目")
                 return len(invalid_entries)
             else:
@@ -843,8 +2198,103 @@ class CacheManager:
             self.logger.error(f"清理无效缓存条目失败: {e}")
             return 0
 
+    def _list_manifest_files(self, local_path):
+        """列出节点清单需要覆盖的数据文件（新旧两种目录格式）"""
+        files = [local_path / "info.json"]
+
+        for dir_name, prefix, file_name in (("guides", "guide_", "guide.json"),
+                                            ("troubleshooting", "troubleshooting_", "troubleshooting.json")):
+            section_dir = local_path / dir_name
+            if not section_dir.is_dir():
+                continue
+            section_files = [d / file_name for d in section_dir.glob(f"{prefix}*") if (d / file_name).is_file()]
+            if not section_files:
+                section_files = list(section_dir.glob("*.json"))
+            files.extend(section_files)
+        return files
+
+    def write_manifest(self, local_path, url=''):
+        """保存节点时写入清单：记录每个数据文件的大小、mtime和内容哈希"""
+        try:
+            local_path = Path(local_path)
+            info_file = local_path / "info.json"
+            if not info_file.exists():
+                return False
+
+            # 不完整的info.json不写清单，下次运行仍走完整校验并重新爬取
+            with open(info_file, 'r', encoding='utf-8') as f:
+                info_data = json.load(f)
+            if self._is_info_json_incomplete(info_data, url):
+                return False
+
+            files = {}
+            for file_path in self._list_manifest_files(local_path):
+                stat = file_path.stat()
+                with open(file_path, 'rb') as f:
+                    content_hash = hashlib.md5(f.read()).hexdigest()
+                files[str(file_path.relative_to(local_path))] = [stat.st_size, stat.st_mtime_ns, content_hash]
+
+            manifest = {
+                'version': '1.0',
+                'url': url,
+                'created': datetime.now(timezone.utc).isoformat(),
+                'files': files
+            }
+            atomic_json_write(local_path / self.MANIFEST_NAME, manifest, ensure_ascii=False)
+            return True
+        except Exception as e:
+            self.logger.warning(f"写入节点清单失败 {local_path}: {e}")
+            return False
+
+    def refresh_manifest(self, local_path):
+        """媒体任务回写JSON或指南副本重新链接后刷新节点已有的清单，没有清单（尚未登记）时跳过"""
+        local_path = Path(local_path)
+        try:
+            with open(local_path / self.MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                url = json.load(f).get('url', '')
+        except Exception:
+            return False
+        return self.write_manifest(local_path, url)
+
+    def _troubleshooting_index_complete(self, url, troubleshooting_count):
+        """故障排除存储的设备反向索引是否记录了节点保存的全部故障排除（快速校验和完整校验共用）"""
+        if not url or troubleshooting_count <= 0:
+            return True
+        indexed_count = len(self.troubleshooting_store.device_items(url))
+        if indexed_count != troubleshooting_count:
+            self.logger.info(f"   ❌ 故障排除索引不完整: 期望 {troubleshooting_count} 项，实际 {indexed_count} 项")
+            return False
+        return True
+
+    def _manifest_matches(self, local_path, url=''):
+        """快速校验：只用os.stat比较清单中记录的文件大小和mtime，不解析JSON；同时检查故障排除索引"""
+        manifest_file = local_path / self.MANIFEST_NAME
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        except Exception:
+            return False
+        if "info.json" not in files:
+            return False
+
+        for rel_path, (size, mtime_ns, _) in files.items():
+            try:
+                stat = os.stat(local_path / rel_path)
+            except OSError:
+                return False
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                return False
+        troubleshooting_count = sum(1 for rel_path in files if Path(rel_path).parts[0] == "troubleshooting")
+        return self._troubleshooting_index_complete(url, troubleshooting_count)
+
     def _validate_cached_data(self, local_path, cache_entry):
-        """验证缓存数据的完整性 - 智能适配不同的文件结构，增强实际内容检查"""
+        """验证缓存数据的完整性 - 先用节点清单做stat快速校验，不通过或--verify-deep时完整解析校验"""
+        if not self.verify_deep and self._manifest_matches(local_path, cache_entry.get('url', '')):
+            self.logger.info("   ✅ 节点清单校验通过（未解析JSON）")
+            self.stats['manifest_hits'] += 1
+            return True
+
+        self.stats['deep_validations'] += 1
         try:
             self.logger.info(f"   🔍 验证数据完整性...")
 
@@ -977,26 +2427,14 @@ class CacheManager:
                     self.logger.info(f"   ❌ 故障排除文件数量不匹配: 期望 {expected_count}, 实际 {valid_troubleshooting}")
                     return False
 
-                # 🔍 新增：检查troubleshooting_cache.json文件
-                ts_cache_file = local_path / "troubleshooting_cache.json"
-                if expected_count > 0 and not ts_cache_file.exists():
-                    self.logger.info(f"   ❌ troubleshooting_cache.json文件缺失")
-                    return False
-
-                # 验证troubleshooting_cache.json的完整性
-                if ts_cache_file.exists():
-                    try:
-                        with open(ts_cache_file, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-                            if not isinstance(cache_data, list) or len(cache_data) != expected_count:
-                                self.logger.info(f"   ❌ troubleshooting_cache.json内容不完整: 期望 {expected_count} 项，实际 {len(cache_data) if isinstance(cache_data, list) else 0} 项")
-                                return False
-                    except Exception as e:
-                        self.logger.info(f"   ❌ troubleshooting_cache.json文件损坏: {e}")
-                        return False
-
                 self.logger.info(f"   ✅ 故障排除文件验证通过: {valid_troubleshooting} 个")
 
+            # 与快速校验相同：故障排除存储中须记录该设备已保存的全部故障排除ID
+            troubleshooting_count = sum(1 for file_path in self._list_manifest_files(local_path)
+                                        if file_path.relative_to(local_path).parts[0] == "troubleshooting")
+            if not self._troubleshooting_index_complete(url, troubleshooting_count):
+                return False
+
             # 验证媒体文件
             if structure.get('has_media', False):
                 media_dir = local_path / "media"
@@ -1009,6 +2447,9 @@ class CacheManager:
                         self.logger.info(f"   ✅ 媒体文件验证通过: {len(media_files)} 个")
 
             self.logger.info(f"   ✅ 数据完整性验证通过")
+
+            # 完整校验通过后刷新清单（如媒体下载后JSON被改写），下次可走快速校验
+            self.write_manifest(local_path, cache_entry.get('url', ''))
             return True
 
         except Exception as e:
@@ -1089,6 +2530,7 @@ class CacheManager:
         }
 
         self.cache_index[url_hash] = cache_entry
+        self.write_manifest(local_path, url)
         self.logger.info(f"已添加到缓存: {url}")
 
     def _analyze_local_structure(self, local_path, guides_count=0, troubleshooting_count=0, media_count=0):
@@ -1111,7 +2553,7 @@ class CacheManager:
                 structure['has_guides'] = True
                 structure['guides_count'] = guides_count
 
-            # troubleshooting信息不再记录在cache_index中，由troubleshooting_cache.json独立管理
+            # troubleshooting信息不再记录在cache_index中，由全局故障排除存储的设备反向索引管理
 
             # 检查media目录
             media_dir = local_path / "media"
@@ -1282,16 +2724,6 @@ class CacheManager:
                             self.logger.info(f"找到名称匹配路径: {path}")
                             return path
 
-                    # 检查是否有troubleshooting_cache.json文件
-                    ts_cache_file = path / "troubleshooting_cache.json"
-                    if ts_cache_file.exists():
-                        # 验证这是否是正确的设备目录
-                        path_str = str(path)
-                        for variant in name_variants:
-                            if variant in path_str:
-                                self.logger.info(f"通过troubleshooting_cache.json找到匹配路径: {path}")
-                                return path
-
             self.logger.warning(f"未找到设备路径，搜索的变体: {name_variants}")
             return None
 
@@ -1311,92 +2743,34 @@ class CacheManager:
             self.logger.error(f"生成内容哈希时出错: {e}")
         return ""
 
+    def _delete_cache_entries(self, url_hashes):
+        """批量删除缓存条目"""
+        if isinstance(self.cache_index, SQLiteCacheIndex):
+            self.cache_index.delete_many(url_hashes)
+        else:
+            for url_hash in url_hashes:
+                self.cache_index.pop(url_hash, None)
+
     def get_cache_stats(self):
-        """获取缓存统计信息"""
-        return self.stats.copy()
+        """获取缓存统计信息（本次运行的命中统计 + 索引内容的SQL聚合）"""
+        stats = self.stats.copy()
+        try:
+            if isinstance(self.cache_index, SQLiteCacheIndex):
+                stats.update(self.cache_index.aggregate_stats())
+            else:
+                stats['entries'] = len(self.cache_index)
+        except Exception as e:
+            self.logger.error(f"统计缓存索引失败: {e}")
+        return stats
 
     def is_troubleshooting_section_cached(self, cache_key, device_url):
-        """检查troubleshooting部分是否已缓存"""
+        """检查troubleshooting部分是否已缓存（设备→故障排除ID反向索引的单次查找）"""
         try:
-            # 使用与save_troubleshooting_cache相同的路径逻辑
-            local_path = self._get_troubleshooting_cache_path(cache_key, device_url)
-            ts_cache_file = local_path / "troubleshooting_cache.json"
-
-            if not ts_cache_file.exists():
-                self.logger.info(f"🔍 Troubleshooting缓存文件不存在: {ts_cache_file}")
-                return False
-
-            # 验证缓存数据的完整性
-            try:
-                with open(ts_cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-
-                # 检查缓存数据是否有效
-                if not isinstance(cached_data, list):
-                    self.logger.info(f"🔍 Troubleshooting缓存数据格式无效")
-                    return False
-
-                # 检查缓存文件是否为空或损坏
-                if len(cached_data) == 0:
-                    self.logger.info(f"🔍 Troubleshooting缓存文件为空")
-                    return False
-
-                # 验证缓存数据结构的基本完整性
-                for item in cached_data[:3]:  # 只检查前3个项目以提高性能
-                    if not isinstance(item, dict) or 'title' not in item:
-                        self.logger.info(f"🔍 Troubleshooting缓存数据结构无效")
-                        return False
-
-                self.logger.info(f"✅ Troubleshooting部分缓存有效: {len(cached_data)} 个项目")
-                return True
-
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                self.logger.warning(f"🔍 Troubleshooting缓存文件损坏，将重新生成: {e}")
-                # 删除损坏的缓存文件
-                try:
-                    ts_cache_file.unlink()
-                except:
-                    pass
-                return False
-
+            return self.troubleshooting_store.has_device(device_url)
         except Exception as e:
             self.logger.error(f"检查troubleshooting缓存失败: {e}")
             return False
 
-    def _get_troubleshooting_cache_path(self, cache_key, device_url):
-        """获取troubleshooting缓存的路径 - 与Troubleshooting文件夹在同一层级"""
-        try:
-            # troubleshooting_cache.json应该与troubleshooting文件夹在同一层级
-            if '/Device/' in device_url:
-                # 首先尝试查找实际存在troubleshooting文件夹的路径
-                actual_path = self._find_troubleshooting_directory_path(device_url)
-                if actual_path:
-                    self.logger.info(f"✅ 找到设备目录用于troubleshooting缓存: {actual_path}")
-                    return actual_path
-
-                # 如果没找到实际的troubleshooting目录，预测将来的设备目录路径
-                predicted_path = self._predict_device_directory_path(device_url)
-                if predicted_path:
-                    self.logger.info(f"🔮 预测设备目录用于troubleshooting缓存: {predicted_path}")
-                    return predicted_path
-
-                # 最后的回退方案：使用哈希路径
-                self.logger.info(f"🔍 无法预测设备目录，使用哈希路径")
-                url_hash = self.get_url_hash(device_url)
-                fallback_path = Path(self.storage_root) / "cache" / url_hash[:8]
-                return fallback_path
-            else:
-                # 非设备URL使用哈希路径
-                url_hash = self.get_url_hash(device_url)
-                fallback_path = Path(self.storage_root) / "cache" / url_hash[:8]
-                return fallback_path
-        except Exception as e:
-            self.logger.error(f"获取troubleshooting缓存路径失败: {e}")
-            # 确保总是返回一个有效路径
-            url_hash = self.get_url_hash(device_url)
-            fallback_path = Path(self.storage_root) / "cache" / url_hash[:8]
-            return fallback_path
-
     def _clean_directory_name(self, name):
         """清理目录名，移除非法字符"""
         if not name:
@@ -1459,299 +2833,37 @@ class CacheManager:
             
             return result_path
 
-    def _find_troubleshooting_directory_path(self, device_url):
-        """查找实际存在troubleshooting文件夹的路径"""
-        try:
-            # 从device_url提取设备路径信息
-            device_path = device_url.split('/Device/')[-1]
-            if '?' in device_path:
-                device_path = device_path.split('?')[0]
-            device_path = device_path.rstrip('/')
-
-            from urllib.parse import unquote
-            device_path = unquote(device_path)
-
-            # 在Device目录下递归搜索包含troubleshooting文件夹的目录
-            device_root = self.storage_root / "Device"
-            if not device_root.exists():
-                return None
-
-            device_name = device_path.split('/')[-1]
-            self.logger.info(f"搜索troubleshooting文件夹，设备名称: {device_name}")
-
-            # 首先尝试直接构建路径
-            direct_path = self.storage_root / "Device" / device_path
-            if direct_path.exists():
-                self.logger.info(f"直接找到设备目录: {direct_path}")
-                # 即使troubleshooting目录不存在，也返回设备目录，以便后续创建cache文件
-                return direct_path
-
-            # 递归搜索troubleshooting文件夹
-            for path in device_root.rglob("troubleshooting"):
-                if path.is_dir():
-                    parent_path = path.parent
-
-                    # 检查父目录名是否匹配设备名称
-                    if parent_path.name.lower() == device_name.lower():
-                        self.logger.info(f"通过设备名称匹配找到troubleshooting目录: {parent_path}")
-                        return parent_path
-
-                    # 检查URL编码的版本
-                    if device_name.replace('"', '%22') == parent_path.name or device_name.replace('%22', '"') == parent_path.name:
-                        self.logger.info(f"通过URL编码匹配找到troubleshooting目录: {parent_path}")
-                        return parent_path
-
-                    # 检查路径层级是否匹配设备路径结构
-                    relative_path = parent_path.relative_to(device_root)
-                    relative_path_str = str(relative_path)
-
-                    # 检查设备路径是否包含在相对路径中（更严格的匹配）
-                    if device_path.lower() == relative_path_str.lower():
-                        self.logger.info(f"通过完整路径匹配找到troubleshooting目录: {parent_path}")
-                        return parent_path
-
-                    # 检查相对路径是否以设备名称结尾
-                    if relative_path_str.lower().endswith(device_name.lower()):
-                        self.logger.info(f"通过路径结尾匹配找到troubleshooting目录: {parent_path}")
-                        return parent_path
-
-            # 如果没有找到troubleshooting目录，尝试查找设备目录
-            for path in device_root.rglob("*"):
-                if path.is_dir() and path.name.lower() == device_name.lower():
-                    self.logger.info(f"找到设备目录: {path}")
-                    return path
-
-            self.logger.info(f"未找到troubleshooting文件夹，设备路径: {device_path}")
-            return None
-
-        except Exception as e:
-            self.logger.error(f"查找troubleshooting目录失败: {e}")
-            return None
-
-    def _predict_device_directory_path(self, device_url):
-        """预测设备目录的路径，基于URL结构和现有的目录模式"""
-        try:
-            # 从device_url提取设备路径信息
-            device_path = device_url.split('/Device/')[-1]
-            if '?' in device_path:
-                device_path = device_path.split('?')[0]
-            device_path = device_path.rstrip('/')
-
-            from urllib.parse import unquote
-            device_path = unquote(device_path)
-            device_name = device_path.split('/')[-1]  # 获取设备名称
-
-            # 构建预期的设备目录路径
-            device_root = self.storage_root / "Device"
-
-            # 方法1: 查找现有的设备目录（最准确的方法）
-            if device_root.exists():
-                # 递归搜索匹配的设备目录
-                for existing_path in device_root.rglob("*"):
-                    if existing_path.is_dir() and existing_path.name == device_name:
-                        self.logger.info(f"找到现有设备目录: {existing_path}")
-                        return existing_path
-
-                # 搜索包含设备名称的目录（处理编码问题）
-                for existing_path in device_root.rglob("*"):
-                    if existing_path.is_dir():
-                        # 检查目录名是否与设备名称匹配（考虑URL编码）
-                        if (existing_path.name.lower() == device_name.lower() or
-                            existing_path.name.replace('_', ' ').lower() == device_name.replace('_', ' ').lower() or
-                            existing_path.name.replace('%22', '"').lower() == device_name.replace('%22', '"').lower()):
-                            self.logger.info(f"找到匹配的设备目录: {existing_path}")
-                            return existing_path
-
-            # 方法2: 基于现有目录结构预测路径
-            if device_root.exists():
-                # 查找相似的目录结构模式
-                for existing_path in device_root.rglob("*"):
-                    if existing_path.is_dir():
-                        relative_path = existing_path.relative_to(device_root)
-                        path_parts = str(relative_path).split('/')
-
-                        # 如果找到深度相似的目录结构，尝试构建相似路径
-                        if len(path_parts) >= 3:  # 至少有3层深度的目录
-                            # 尝试基于现有结构构建路径
-                            # 例如：Mac/Mac_Laptop/MacBook_Pro/MacBook_Pro_16/device_name
-                            parent_structure = '/'.join(path_parts[:-1])
-                            predicted_path = device_root / parent_structure / device_name
-
-                            # 检查父目录是否存在
-                            if predicted_path.parent.exists():
-                                self.logger.info(f"预测路径基于现有结构: {predicted_path}")
-                                return predicted_path
-
-            # 方法3: 直接使用URL路径结构
-            predicted_path = device_root / device_path
-            if predicted_path.parent.exists():  # 如果父目录存在，说明路径结构合理
-                self.logger.info(f"预测路径基于URL结构: {predicted_path}")
-                return predicted_path
-
-            # 方法4: 使用简单的设备名称路径（最后的回退方案）
-            simple_path = device_root / device_name
-            self.logger.info(f"预测路径使用简单结构: {simple_path}")
-            return simple_path
-
-        except Exception as e:
-            self.logger.error(f"预测设备目录路径失败: {e}")
-            return None
-
     def load_troubleshooting_cache(self, cache_key, device_url):
-        """加载缓存的troubleshooting数据 - 增强错误处理"""
+        """加载缓存的troubleshooting数据（按设备的故障排除ID从全局存储读取）"""
         try:
-            # 使用统一的路径获取方法
-            local_path = self._get_troubleshooting_cache_path(cache_key, device_url)
-            if local_path is None:
-                self.logger.info(f"无法确定troubleshooting缓存路径")
+            cached_data = self.troubleshooting_store.load_device(device_url)
+            if not cached_data:
+                self.logger.info(f"troubleshooting缓存不存在或不完整: {device_url}")
                 return None
 
-            ts_cache_file = local_path / "troubleshooting_cache.json"
-
-            if not ts_cache_file.exists():
-                self.logger.info(f"troubleshooting缓存文件不存在: {ts_cache_file}")
-                return None
-
-            try:
-                with open(ts_cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-
-                # 验证缓存数据的基本结构
-                if not isinstance(cached_data, list):
-                    self.logger.warning(f"troubleshooting缓存数据格式无效，删除缓存文件")
-                    ts_cache_file.unlink()
-                    return None
-
-                if len(cached_data) == 0:
-                    self.logger.info(f"troubleshooting缓存文件为空")
-                    return None
-
-                self.logger.info(f"📋 成功加载troubleshooting缓存: {len(cached_data)} 个项目")
-                self.stats['cache_hits'] += 1
-                return cached_data
-
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                self.logger.warning(f"troubleshooting缓存文件损坏，删除并重新生成: {e}")
-                try:
-                    ts_cache_file.unlink()
-                except:
-                    pass
-                return None
+            self.logger.info(f"📋 成功加载troubleshooting缓存: {len(cached_data)} 个项目")
+            self.stats['cache_hits'] += 1
+            return cached_data
 
         except Exception as e:
             self.logger.warning(f"加载troubleshooting缓存失败，降级到正常爬取模式: {e}")
             return None
 
     def save_troubleshooting_cache(self, cache_key, device_url, troubleshooting_data):
-        """保存troubleshooting数据到缓存 - 增强错误处理"""
+        """保存troubleshooting数据到全局存储，并记录设备→故障排除ID"""
         try:
-            if not troubleshooting_data:
+            if not troubleshooting_data or not device_url:
                 self.logger.info(f"跳过保存空的troubleshooting缓存")
                 return
 
-            # 使用统一的路径获取方法
-            local_path = self._get_troubleshooting_cache_path(cache_key, device_url)
-
-            # 现在_get_troubleshooting_cache_path总是返回一个路径，不会返回None
-            if local_path is None:
-                self.logger.warning(f"❌ 无法确定troubleshooting缓存路径，跳过缓存保存")
-                return
-
-            # 确保目录存在
-            try:
-                local_path.mkdir(parents=True, exist_ok=True)
-            except Exception as e:
-                self.logger.warning(f"创建缓存目录失败，跳过缓存保存: {e}")
-                return
-
-            ts_cache_file = local_path / "troubleshooting_cache.json"
-
-            # 缓存保护机制：如果不是强制刷新且缓存文件已存在，先检查是否需要更新
-            if not self.force_refresh and ts_cache_file.exists():
-                try:
-                    with open(ts_cache_file, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-
-                    # 如果现有数据不为空且数据量相当，则跳过保存
-                    if existing_data and len(existing_data) >= len(troubleshooting_data):
-                        self.logger.info(f"🔒 保护现有troubleshooting缓存: {len(existing_data)} 个项目 (跳过覆盖)")
-                        return
-                    else:
-                        self.logger.info(f"🔄 更新troubleshooting缓存: {len(existing_data) if existing_data else 0} -> {len(troubleshooting_data)} 个项目")
-                except Exception as e:
-                    self.logger.warning(f"读取现有troubleshooting缓存失败，将保存新数据: {e}")
-
-            # 保存troubleshooting数据
-            try:
-                with open(ts_cache_file, 'w', encoding='utf-8') as f:
-                    safe_json_dump(troubleshooting_data, f, ensure_ascii=False, indent=2)
-
-                self.logger.info(f"💾 成功保存troubleshooting缓存: {ts_cache_file} ({len(troubleshooting_data)} 个项目)")
-                print(f"    💾 已保存troubleshooting缓存: {len(troubleshooting_data)} 个项目")
-            except Exception as e:
-                self.logger.error(f"写入troubleshooting缓存文件失败: {e}")
+            self.troubleshooting_store.set_device(device_url, troubleshooting_data)
+            self.logger.info(f"💾 成功保存troubleshooting缓存: {device_url} ({len(troubleshooting_data)} 个项目)")
 
         except Exception as e:
             # 缓存保存失败不应该影响正常的爬取流程
             self.logger.warning(f"保存troubleshooting缓存失败，但不影响正常流程: {e}")
             print(f"    ⚠️  缓存保存失败，但数据已正常处理")
 
-    def save_troubleshooting_cache_after_directory_creation(self, cache_key, device_url, troubleshooting_data, ts_dir):
-        """在Troubleshooting目录创建后立即保存cache文件 - 增强错误处理"""
-        try:
-            if not troubleshooting_data or not ts_dir:
-                self.logger.info(f"跳过保存troubleshooting缓存: 数据为空或目录无效")
-                return
-
-            # 验证ts_dir是否存在
-            if not ts_dir.exists():
-                self.logger.warning(f"Troubleshooting目录不存在，跳过缓存保存: {ts_dir}")
-                return
-
-            # 获取Troubleshooting目录的父目录（与Troubleshooting文件夹同层）
-            cache_dir = ts_dir.parent
-            ts_cache_file = cache_dir / "troubleshooting_cache.json"
-
-            self.logger.info(f"🔍 准备保存troubleshooting缓存到: {ts_cache_file}")
-
-            # 简化缓存保护机制：检查现有文件
-            if not self.force_refresh and ts_cache_file.exists():
-                try:
-                    with open(ts_cache_file, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-
-                    # 只有在现有数据明显更多时才跳过
-                    if existing_data and len(existing_data) > len(troubleshooting_data) * 1.2:
-                        self.logger.info(f"🔒 保护现有troubleshooting缓存: {len(existing_data)} 个项目 (跳过覆盖)")
-                        return
-                    else:
-                        self.logger.info(f"🔄 更新troubleshooting缓存: {len(existing_data) if existing_data else 0} -> {len(troubleshooting_data)} 个项目")
-                except Exception as e:
-                    self.logger.warning(f"读取现有troubleshooting缓存失败，将保存新数据: {e}")
-
-            # 确保目录存在
-            try:
-                cache_dir.mkdir(parents=True, exist_ok=True)
-            except Exception as e:
-                self.logger.warning(f"创建缓存目录失败，跳过缓存保存: {e}")
-                return
-
-            # 保存troubleshooting数据
-            try:
-                with open(ts_cache_file, 'w', encoding='utf-8') as f:
-                    safe_json_dump(troubleshooting_data, f, ensure_ascii=False, indent=2)
-
-                self.logger.info(f"💾 成功保存troubleshooting缓存: {ts_cache_file} ({len(troubleshooting_data)} 个项目)")
-                print(f"   💾 已生成troubleshooting_cache.json: {ts_cache_file}")
-            except Exception as e:
-                self.logger.error(f"写入troubleshooting缓存文件失败: {e}")
-                print(f"   ⚠️  缓存文件写入失败，但不影响正常流程")
-
-        except Exception as e:
-            # 缓存保存失败不应该影响正常的文件保存流程
-            self.logger.warning(f"在目录创建后保存troubleshooting缓存失败，但不影响正常流程: {e}")
-            print(f"   ⚠️  troubleshooting缓存保存失败，但文件已正常保存")
-
     def _generate_content_hash_for_data(self, data):
         """为数据生成内容哈希值"""
         try:
@@ -1763,16 +2875,29 @@ class CacheManager:
 
     def display_cache_report(self):
         """显示缓存报告"""
+        stats = self.get_cache_stats()
         print("\n" + "="*60)
         print("📊 智能缓存报告")
         print("="*60)
-        print(f"总URL数量: {self.stats['total_urls']}")
-        print(f"缓存命中: {self.stats['cached_urls']} (跳过处理)")
-        print(f"需要处理: {self.stats['new_urls']} (新增或更新)")
-        print(f"无效缓存: {self.stats['invalid_cache']} (需要重新处理)")
-
-        if self.stats['total_urls'] > 0:
-            hit_rate = (self.stats['cached_urls'] / self.stats['total_urls']) * 100
+        print(f"总URL数量: {stats['total_urls']}")
+        print(f"缓存命中: {stats['cached_urls']} (跳过处理)")
+        print(f"需要处理: {stats['new_urls']} (新增或更新)")
+        print(f"无效缓存: {stats['invalid_cache']} (需要重新处理)")
+        print(f"清单快速校验: {stats['manifest_hits']} 次，完整校验: {stats['deep_validations']} 次")
+        if stats['revalidations']:
+            print(f"过期重新校验: {stats['revalidations']} 次 (304: {stats['not_modified']}，"
+                  f"内容未变: {stats['unchanged_hash']}，已变化: {stats['changed']})")
+
+        if stats['total_urls'] > 0:
+            hit_rate = (stats['cached_urls'] / stats['total_urls']) * 100
+            print(f"缓存命中率: {hit_rate:.1f}%")
+
+        if 'indexed_guides' in stats:
+            print(f"索引条目: {stats['entries']} (完整 {stats['complete_entries']})")
+            print(f"含指南节点: {stats['entries_with_guides']} (指南共 {stats['indexed_guides']} 个)")
+            print(f"含媒体节点: {stats['entries_with_media']} (媒体共 {stats['indexed_media']} 个)")
+            if stats['last_processed']:
+                print(f"最近更新: {stats['last_processed']}")
 
         print("="*60)
 
@@ -1785,12 +2910,9 @@ class CacheManager:
             if not local_path.exists() or not self._validate_cached_data(local_path, cache_entry):
                 invalid_keys.append(url_hash)
 
-        for key in invalid_keys:
-            del self.cache_index[key]
-
         if invalid_keys:
+            self._delete_cache_entries(invalid_keys)
             self.logger.info(f"已清理 {len(invalid_keys)} 个无效缓存条目")
-            self.save_cache_index()
 
         return len(invalid_keys)
 
@@ -1802,7 +2924,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                  timeout=3, request_delay=0.01, proxy_switch_freq=1, cache_ttl=24,
                  custom_user_agent=None, burst_mode=False, conservative_mode=False,
                  skip_images=False, debug_mode=False, show_stats=False, enable_resume=True,
-                 command_arg=None):
+                 command_arg=None, engine="threads", verify_deep=False, tree_workers=4,
+                 autotune=True, target_error_rate=0.02, archive=False, replay=False, parse_workers=None,
+                 parser=None, traffic_budget=None, page_cache_mb=64):
         super().__init__(base_url, verbose)
 
         # 立即初始化日志系统，确保logger可用
@@ -1811,7 +2935,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.enable_resume = enable_resume
         self.command_arg = command_arg  # 保存命令行参数
         # 将命令行参数传递给TreeCrawler，用于生成友好的缓存文件名
-        self.tree_crawler = TreeCrawler(base_url, enable_resume=enable_resume, logger=self.logger, verbose=verbose)
+        # 阶段1树构建：tree_workers个分类页并发抓取
+        self.tree_crawler = TreeCrawler(base_url, enable_resume=enable_resume, logger=self.logger, verbose=verbose,
+                                        tree_workers=tree_workers)
         self.processed_nodes = set()
         self.target_url = None
 
@@ -1826,6 +2952,33 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.max_connections = max_connections or (max_workers * 10)
         self.timeout = timeout
         self.request_delay = request_delay
+        # 全局自适应限速：request_delay只决定页面主机的起始速率，之后按响应健康度自动加减速
+        initial_rate = min(10.0, 1.0 / request_delay) if request_delay and request_delay > 0 else 2.0
+        self.rate_limiter = AdaptiveRateController(initial_rate=initial_rate, logger=self.logger)
+        self.tree_crawler.rate_limiter = self.rate_limiter
+        # 并发自动调优：max_workers/max_connections只是上限，运行时按吞吐、p95延迟和错误率调整
+        self.autotuner = ConcurrencyAutotuner(
+            max_workers=max_workers,
+            max_inflight=self.max_connections,
+            max_media=max(2, min(max_workers, 8)) * 5,
+            target_error_rate=target_error_rate,
+            enabled=autotune and not replay,  # 回放不访问网络，并发直接使用上限
+            start_fraction=1.0 if burst_mode else (0.25 if conservative_mode else 0.5),
+            logger=self.logger
+        )
+        self.rate_limiter.add_observer(self.autotuner.observe)
+
+        # 原始响应归档：archive录制页面/API响应，replay完全离线地从归档重新提取
+        self.replay = replay
+        if archive or replay:
+            self.response_archive = ResponseArchive(Path(self.storage_root) / "archive", replay=replay, logger=self.logger)
+            self.tree_crawler.response_archive = self.response_archive
+        if replay:
+            # 回放不访问网络：关闭代理和媒体下载，并重新提取所有节点
+            use_proxy = False
+            skip_images = True
+            download_videos = False
+            force_refresh = True
         self.proxy_switch_freq = proxy_switch_freq
         self.cache_ttl = cache_ttl
         self.custom_user_agent = custom_user_agent
@@ -1835,10 +2988,17 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.debug_mode = debug_mode
         self.show_stats = show_stats
 
+        # 抓取引擎：threads为线程池+requests，async为全程asyncio+httpx
+        if engine not in ('threads', 'async'):
+            self.logger.warning(f"未知的抓取引擎 {engine}，使用默认的threads引擎")
+            engine = 'threads'
+        self.engine = engine
+
         # 缓存配置
         self.use_cache = use_cache
         self.force_refresh = force_refresh
-        self.cache_manager = CacheManager(self.storage_root, self.logger, force_refresh) if use_cache else None
+        self.cache_manager = CacheManager(self.storage_root, self.logger, force_refresh, verify_deep,
+                                          cache_ttl) if use_cache else None
 
         # 代理池配置
         self.use_proxy = use_proxy
@@ -1847,9 +3007,35 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.proxy_manager = TunnelProxyManager(pool_size=proxy_pool_size) if use_proxy else None
         self.failed_urls = set()  # 添加失败URL集合
 
+        # 流量计量：按内容类别和代理累计实际传输字节数；设置预算后接近用尽时先限制再停止媒体下载
+        self.traffic_meter = TrafficMeter(
+            budget_bytes=traffic_budget,
+            on_phase_change=self._on_traffic_phase,
+            on_proxy_bytes=self.proxy_manager.record_bytes if self.proxy_manager else None,
+            logger=self.logger
+        )
+        self.tree_crawler.traffic_meter = self.traffic_meter
+
+        # 并发请求合并：不同设备的任务同时抓取同一页面、下载同一媒体或提取同一指南时只执行一次
+        self.page_flights = SingleFlight()
+        self.media_flights = SingleFlight()
+        self.guide_flights = SingleFlight()
+
         # 异步HTTP客户端管理器
         self.async_http_manager = None
 
+        # 媒体下载后台线程：整个运行期间持有一个事件循环和一个httpx客户端
+        self.media_loop = MediaDownloadLoop()
+        self.media_http_manager = None
+
+        # 媒体下载队列：JSON先以远程URL写入，下载完成后原子回写本地路径
+        self.media_queue = MediaDownloadQueue(
+            self._run_media_job,
+            max_size=max(32, max_workers * 8),
+            workers=max(2, min(max_workers, 8)),
+            logger=self.logger
+        )
+
         # 视频处理配置
         self.download_videos = download_videos
         self.max_video_size_mb = max_video_size_mb
@@ -1875,16 +3061,58 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.max_retries = max_retries
         self.thread_local = threading.local()
 
+        # 每个工作线程一个持久会话，连接池大小按max_connections分摊到各线程
+        self.session_manager = ThreadSessionManager(
+            self.thread_local,
+            pool_maxsize=max(2, self.max_connections // max(1, max_workers)),
+            rate_limiter=self.rate_limiter,
+            archive=self.response_archive,
+            proxy_manager=self.proxy_manager,
+            traffic_meter=self.traffic_meter
+        )
+
+        # 阶段2内容线程池（threads引擎处理树时创建）
+        self.content_executor = None
+
+        # 各节点目录待完成的媒体任务数，全部完成后刷新节点清单
+        self._node_media_pending = {}
+        self._node_media_lock = threading.Lock()
+
         # 错误处理配置
         self.failed_log_file = "failed_urls.log"
 
         # Troubleshooting处理状态跟踪
-        self.processed_troubleshooting_paths = set()  # 跟踪已处理troubleshooting的路径
         self._troubleshooting_from_cache = False  # 标记troubleshooting数据是否来自缓存
 
-        # 媒体文件存在性检查缓存（优化性能）
-        self._file_exists_cache = {}  # 缓存文件存在性检查结果
-        self._cache_max_size = 1000   # 缓存最大大小
+        # 运行期页面缓存：刚抓过的页面（含条件请求发现已变化的页面）按压缩后大小做LRU，与树构建共用
+        self.page_cache = PageCache(max_mb=page_cache_mb, logger=self.logger)
+        self.tree_crawler.page_cache = self.page_cache
+
+        # 内容寻址媒体存储：持久化URL索引实现O(1)跨页面去重，相同内容只存一份
+        self.media_store = MediaStore(self.storage_root, self.logger, media_folder=self.media_folder)
+
+        # 全局指南存储：多个设备共享的指南只提取、下载一次，设备目录下硬链接到规范副本
+        self.guide_store = GuideStore(self.storage_root, self.logger,
+                                      force_refresh=self.force_refresh or not self.use_cache)
+
+        # 全局故障排除存储：启用缓存时与缓存管理器共用，子型号引用已抓过的故障排除页面时直接复用
+        self.troubleshooting_store = (self.cache_manager.troubleshooting_store if self.cache_manager else
+                                      TroubleshootingStore(self.storage_root, self.logger, force_refresh=True))
+        self.troubleshooting_flights = SingleFlight()
+
+        # HTML解析后端：所有抓取路径都通过 make_soup 按该后端建树
+        if parser:
+            set_parser(parser, self.logger)
+
+        # 解析/提取进程池：抓取线程只做I/O，CPU密集的解析和提取在独立进程中完成
+        # 工作进程不访问网络，提取中需要的API查询和页面渲染回到主进程，经过统一的限速、代理、流量计量和归档
+        if parse_workers is None:
+            parse_workers = default_parse_workers()
+        self.extraction_pool = ExtractionPool(parse_workers, {
+            'base_url': base_url,
+            'verbose': verbose,
+            'parser': get_parser()
+        }, logger=self.logger) if parse_workers > 0 else None
 
         # 打印视频处理配置
         if self.download_videos:
@@ -1892,6 +3120,21 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         else:
             self.logger.info("⚠️ 视频下载已禁用，将保留原始URL")
 
+    @classmethod
+    def for_extraction(cls, base_url="https://www.ifixit.com", verbose=False, parser=None):
+        """创建只做页面提取的轻量实例（解析进程池的工作进程使用）
+
+        不创建会话、代理、限速、流量计量和各类存储；提取中需要联网的补充查询记入deferred_lookups，
+        由主进程的 _complete_deferred_lookups 完成
+        """
+        crawler = cls.__new__(cls)
+        EnhancedIFixitCrawler.__init__(crawler, base_url, verbose)
+        crawler.logger = logging.getLogger(__name__)
+        crawler.offline_extraction = True
+        if parser:
+            set_parser(parser, crawler.logger)
+        return crawler
+
     def __del__(self):
         """析构函数，确保资源被正确清理"""
         try:
@@ -1902,6 +3145,38 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
     def cleanup(self):
         """清理所有资源"""
         try:
+            if hasattr(self, 'autotuner'):
+                self.autotuner.stop()
+
+            # 先让媒体队列处理完剩余任务，再停止媒体下载后台线程
+            if hasattr(self, 'media_queue'):
+                self.media_queue.stop()
+
+            # 停止媒体下载后台线程，先在其事件循环上关闭HTTP客户端
+            if hasattr(self, 'media_loop'):
+                self.media_loop.stop(self._close_media_http_manager())
+
+            # 关闭线程持久会话
+            if hasattr(self, 'session_manager'):
+                self.session_manager.close_all()
+
+            # 媒体下载全部结束后合并媒体索引的WAL
+            if hasattr(self, 'media_store'):
+                self.media_store.save_index(force=True)
+            if hasattr(self, 'guide_store'):
+                self.guide_store.save_index(force=True)
+            if hasattr(self, 'troubleshooting_store'):
+                self.troubleshooting_store.save_index(force=True)
+
+            if self.response_archive:
+                self.response_archive.close()
+
+            if getattr(self, 'extraction_pool', None):
+                self.extraction_pool.shutdown()
+
+            if getattr(self, 'browser_pool', None):
+                self.browser_pool.close()
+
             # 清理异步HTTP管理器
             if self.async_http_manager:
                 try:
@@ -1970,6 +3245,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         if self.cache_manager:
             is_valid = self.cache_manager.is_url_cached_and_valid(url, local_path)
 
+            # 超过TTL的有效缓存：用条件请求确认页面是否变化，变化时整个节点重新提取
+            if is_valid and self.cache_manager.needs_revalidation(url):
+                return self._revalidate_cached_page(url)
+
             # 如果缓存无效，检查是否可以部分修复
             if not is_valid:
                 repair_info = self._analyze_partial_repair_needs(url, local_path)
@@ -2043,7 +3322,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
             # 检查troubleshooting目录和内容
             ts_dir = local_path / "troubleshooting"
-            ts_cache_file = local_path / "troubleshooting_cache.json"
 
             if 'troubleshooting' in info_data and info_data['troubleshooting']:
                 # 预期应该有troubleshooting内容
@@ -2068,10 +3346,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                         repair_info['issues'].append(f"troubleshooting内容不完整: 期望{expected_ts_count}个，实际{actual_ts_count}个")
                         repair_info['missing_components'].append('troubleshooting_partial')
 
-            # 检查troubleshooting_cache.json
-            if ts_dir.exists() and not ts_cache_file.exists():
+            # 检查故障排除存储中是否记录了该设备
+            if ts_dir.exists() and not self.troubleshooting_store.has_device(url):
                 repair_info['can_partial_repair'] = True
-                repair_info['issues'].append("缺少troubleshooting_cache.json文件")
+                repair_info['issues'].append("故障排除索引中缺少该设备")
                 repair_info['missing_components'].append('troubleshooting_cache')
 
             # 检查媒体文件
@@ -2147,8 +3425,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if self.verbose:
                 print(f"   🔍 开始重新爬取guides内容: {url}")
 
-            # 获取页面内容
-            soup = self.get_soup(url)
+            # 获取页面内容（只需要链接）
+            soup = self.get_link_soup(url)
             if not soup:
                 return False
 
@@ -2219,8 +3497,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if self.verbose:
                 print(f"   🔍 开始重新爬取troubleshooting内容: {url}")
 
-            # 获取页面内容
-            soup = self.get_soup(url)
+            # 获取页面内容（只需要链接）
+            soup = self.get_link_soup(url)
             if not soup:
                 return False
 
@@ -2259,11 +3537,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                         with open(ts_file_path, 'w', encoding='utf-8') as f:
                             safe_json_dump(ts_content, f, ensure_ascii=False, indent=2)
 
-            # 生成troubleshooting_cache.json
+            # 记录到故障排除存储
             if troubleshooting_data:
-                ts_cache_file = local_path / "troubleshooting_cache.json"
-                with open(ts_cache_file, 'w', encoding='utf-8') as f:
-                    safe_json_dump(troubleshooting_data, f, ensure_ascii=False, indent=2)
+                self.troubleshooting_store.set_device(url, troubleshooting_data)
 
             # 更新info.json中的troubleshooting信息
             info_file = local_path / "info.json"
@@ -2292,7 +3568,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             return False
 
     def _repair_troubleshooting_cache(self, url, local_path):
-        """修复troubleshooting缓存文件"""
+        """用设备目录下已保存的troubleshooting文件补全故障排除存储"""
         try:
             ts_dir = local_path / "troubleshooting"
             if not ts_dir.exists():
@@ -2314,14 +3590,12 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                             if self.verbose:
                                 print(f"   ⚠️ 读取troubleshooting文件失败: {ts_file} - {e}")
 
-            # 生成troubleshooting_cache.json
+            # 记录到故障排除存储
             if troubleshooting_data:
-                ts_cache_file = local_path / "troubleshooting_cache.json"
-                with open(ts_cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(troubleshooting_data, f, ensure_ascii=False, indent=2)
+                self.troubleshooting_store.set_device(url, troubleshooting_data)
 
                 if self.verbose:
-                    print(f"   ✅ 成功修复troubleshooting_cache.json: {len(troubleshooting_data)} 项")
+                    print(f"   ✅ 成功补全故障排除索引: {len(troubleshooting_data)} 项")
 
                 return True
 
@@ -2406,17 +3680,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
                     # 如果文件不存在，下载它
                     if not local_file_path.exists():
-                        # 使用requests创建临时session
-                        import requests
-                        session = requests.Session()
-
-                        # 设置代理（如果有的话）
-                        if hasattr(self, 'proxy_manager') and self.proxy_manager:
-                            proxy_config = self.proxy_manager.get_proxy()
-                            if proxy_config:
-                                session.proxies = proxy_config
-
-                        response = session.get(media_url, timeout=30)
+                        # 复用当前线程的持久会话（已绑定代理并接入限速控制）
+                        response = self._get_thread_session().get(media_url, timeout=30)
                         if response.status_code == 200:
                             with open(local_file_path, 'wb') as f:
                                 f.write(response.content)
@@ -2424,8 +3689,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                             if self.verbose:
                                 print(f"   📥 下载媒体文件: {filename}")
 
-                        session.close()
-
                 except Exception as e:
                     if self.verbose:
                         print(f"   ⚠️ 下载媒体文件失败 {media_url}: {e}")
@@ -2650,8 +3913,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         if not self.use_proxy or not self.proxy_manager:
             return False
 
-        # 对于多代理池，标记失败但不需要切换（每个线程有独立代理）
-        self.proxy_manager.mark_proxy_failed(None, reason)
+        # 失败请求已由会话适配器记到当前线程绑定的代理上，健康度评分据此决定是否隔离该代理
+
+        # 丢弃当前线程绑定旧代理的会话，下次请求按新代理重建
+        self.session_manager.invalidate()
 
         # 获取新代理
         new_proxy = self.proxy_manager.get_proxy()
@@ -2663,16 +3928,17 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         """初始化异步HTTP客户端管理器"""
         try:
             if not self.async_http_manager:
-                # 优化：平衡连接池大小，避免PoolTimeout错误
-                max_connections = min(self.max_workers * 8, 120)   # 适度降低连接池大小
-                max_keepalive = min(self.max_workers * 2, 40)      # 适度降低保持连接数
-
+                # 连接池按上限创建，实际在途请求数由自动调优器的闸门控制
                 self.async_http_manager = AsyncHttpClientManager(
                     proxy_manager=self.proxy_manager,
-                    max_connections=max_connections,
-                    max_keepalive_connections=max_keepalive,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=max(1, self.max_connections // 2),
                     timeout=8.0,  # 增加超时时间，给请求更多时间
-                    max_retries=2  # 适度重试，平衡速度与成功率
+                    max_retries=2,  # 适度重试，平衡速度与成功率
+                    rate_limiter=self.rate_limiter,
+                    inflight_limit=self.autotuner.inflight,
+                    archive=self.response_archive,
+                    traffic_meter=self.traffic_meter
                 )
                 
                 # 确保初始化成功
@@ -2700,46 +3966,88 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             await self.async_http_manager._close_client()
             self.async_http_manager = None
 
-    async def get_soup_async(self, url, use_playwright=False):
-        """异步版本的get_soup方法"""
-        if not url:
-            return None
+    async def _get_media_http_manager(self):
+        """获取当前事件循环对应的HTTP客户端
 
-        if url in self.failed_urls:
-            self.logger.warning(f"跳过已知失败URL: {url}")
+        后台媒体下载线程使用自己持有的持久客户端（整个运行期间复用长连接），
+        其他事件循环（如异步引擎）继续使用async_http_manager
+        """
+        if not self.media_loop.is_loop_thread():
+            if await self._init_async_http_manager():
+                return self.async_http_manager
             return None
 
-        # 强制使用英文版本
-        if 'zh.ifixit.com' in url:
-            url = url.replace('zh.ifixit.com', 'www.ifixit.com')
-
-        # 确保使用www.ifixit.com而不是其他子域名
-        if 'ifixit.com' in url and not url.startswith('https://www.ifixit.com'):
-            url = url.replace('https://', 'https://www.').replace('http://', 'https://www.')
-            if not url.startswith('https://www.ifixit.com'):
-                url = url.replace('ifixit.com', 'www.ifixit.com')
-
-        # 添加强制英文参数
-        if '?' in url:
-            if 'lang=' not in url:
-                url += '&lang=en'
-            else:
-                # 替换现有的lang参数
-                import re
-                url = re.sub(r'lang=[^&]*', 'lang=en', url)
-        else:
-            url += '?lang=en'
+        if not self.media_http_manager:
+            manager = AsyncHttpClientManager(
+                proxy_manager=self.proxy_manager,
+                max_connections=self.max_connections,
+                max_keepalive_connections=max(1, self.max_connections // 2),
+                timeout=8.0,
+                max_retries=2,
+                rate_limiter=self.rate_limiter,
+                inflight_limit=self.autotuner.inflight,
+                archive=self.response_archive,
+                traffic_meter=self.traffic_meter
+            )
+            if not await manager._init_client():
+                self.logger.error("媒体下载HTTP客户端初始化失败")
+                return None
+            self.media_http_manager = manager
+        return self.media_http_manager
 
-        self.stats["total_requests"] += 1
+    async def _close_media_http_manager(self):
+        """在媒体下载事件循环上关闭其持有的HTTP客户端"""
+        if self.media_http_manager:
+            await self.media_http_manager._close_client()
+            self.media_http_manager = None
 
+    async def get_soup_async(self, url, use_playwright=False):
+        """异步版本的get_soup方法"""
         # 如果需要JavaScript渲染，使用Playwright
         if use_playwright:
+            url = self._begin_fetch(url)
+            if not url:
+                return None
+            self._count_fetch(url)
             return await self._get_soup_with_playwright_async(url)
 
-        # 否则使用异步httpx方法
-        return await self._get_soup_httpx_async(url)
+        # 否则使用异步httpx方法，在工作线程中解析，避免阻塞事件循环
+        html = await self.get_page_html_async(url)
+        if not html:
+            return None
+        return await asyncio.to_thread(make_soup, html)
+
+    async def get_link_soup_async(self, url):
+        """异步版本的get_link_soup"""
+        html = await self.get_page_html_async(url)
+        if not html:
+            return None
+        return await asyncio.to_thread(make_link_soup, html)
+
+    async def get_page_html_async(self, url):
+        """异步获取页面原始HTML（bytes），可直接交给提取进程池"""
+        url = self._begin_fetch(url)
+        if not url:
+            return None
+
+        # 本次运行已抓过（或条件请求时已取回）的页面直接从页面缓存返回
+        cached = self.page_cache.get(url)
+        if cached is not None:
+            return cached
+
+        # 其他任务正在抓取同一页面时等待并共享其结果
+        html, _ = await self.page_flights.do_async(canonical_url(url), self._fetch_page_html_async, url)
+        return html
+
+    async def _fetch_page_html_async(self, url):
+        self._count_fetch(url)
+        html = await self._fetch_html_httpx_async(url)
+        if html:
+            self.page_cache.put(url, html)
+            self.autotuner.record_page()
+        return html
 
-    async def _get_soup_httpx_async(self, url):
+    async def _fetch_html_httpx_async(self, url):
         """使用httpx异步获取页面内容"""
         # 初始化异步HTTP管理器
         init_success = await self._init_async_http_manager()
@@ -2769,8 +4077,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 self.failed_urls.add(url)
                 raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
 
-            from bs4 import BeautifulSoup
-            return BeautifulSoup(response.content, 'html.parser')
+            await asyncio.to_thread(self._record_page_validators, url, response.headers, response.content)
+            return response.content
 
         except httpx.HTTPStatusError:
             # 直接向上传递HTTP状态错误，让上层处理
@@ -2782,127 +4090,73 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
     async def _get_soup_with_playwright_async(self, url):
         """异步版本的Playwright页面获取"""
-        try:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-
-                # 设置请求头 - 强制英文版本
-                await page.set_extra_http_headers({
-                    'Accept-Language': 'en-US,en;q=1.0',  # 强制英文，提高优先级
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Cookie': 'locale=en'  # 添加英文locale cookie
-                })
-
-                # 导航到页面并等待加载
-                await page.goto(url, wait_until='networkidle')
-
-                # 强制设置英文语言
-                await page.evaluate("""
-                    // 设置localStorage中的语言偏好
-                    localStorage.setItem('locale', 'en');
-                    localStorage.setItem('language', 'en');
-                    localStorage.setItem('lang', 'en');
-
-                    // 设置cookie
-                    document.cookie = 'locale=en; path=/; domain=.ifixit.com';
-                    document.cookie = 'language=en; path=/; domain=.ifixit.com';
-                """)
-
-                # 等待一下让设置生效
-                await page.wait_for_timeout(1000)
+        if self._is_replaying():
+            content = await asyncio.to_thread(self._load_rendered_html, url)
+            if content is None:
+                self.failed_urls.add(url)
+                return None
+            return make_soup(content)
 
-                # 获取页面内容
-                content = await page.content()
-                await browser.close()
+        try:
+            # 浏览器池中的上下文已预置英文locale，拦截图片/字体/统计脚本后等待networkidle即可
+            await self.rate_limiter.acquire_async(url)
+            status, content = await self._get_browser_pool().render_async(url)
+            self.rate_limiter.record(url, status)
+            await asyncio.to_thread(self._archive_rendered_html, url, status, content)
 
-                from bs4 import BeautifulSoup
-                return BeautifulSoup(content, 'html.parser')
+            return make_soup(content)
 
         except Exception as e:
             self.logger.error(f"Playwright异步获取页面失败 {url}: {e}")
             self.failed_urls.add(url)
             return None
 
-    async def _process_tasks_async(self, tasks, guides_data, troubleshooting_data):
-        """异步并发处理任务列表"""
-        # 创建并发控制信号量
-        semaphore = asyncio.Semaphore(self.max_workers)
-
-        async def process_single_task(task_type, url):
-            """处理单个任务的异步包装器"""
-            async with semaphore:
-                try:
-                    if task_type == 'guide':
-                        return await self._process_guide_task_async(url)
-                    else:  # troubleshooting
-                        return await self._process_troubleshooting_task_async(url)
-                except Exception as e:
-                    self.logger.error(f"异步任务失败 {task_type} {url}: {e}")
-                    return None
-
-        # 创建所有任务
-        async_tasks = [process_single_task(task_type, url) for task_type, url in tasks]
-
-        # 并发执行所有任务
-        results = await asyncio.gather(*async_tasks, return_exceptions=True)
-
-        # 处理结果
-        completed_count = 0
-        total_tasks = len(tasks)
-
-        for i, (result, (task_type, url)) in enumerate(zip(results, tasks)):
-            completed_count += 1
-
-            if isinstance(result, Exception):
-                print(f"    ❌ [{completed_count}/{total_tasks}] {task_type} 任务异常: {str(result)[:50]}...")
-                continue
-
-            if result:
-                if task_type == 'guide':
-                    guides_data.append(result)
-                    title = result.get('title', '') if isinstance(result, dict) else '未知标题'
-                    print(f"    ✅ [{completed_count}/{total_tasks}] 指南: {title}")
-                else:
-                    troubleshooting_data.append(result)
-                    title = result.get('title', '') if isinstance(result, dict) else '未知标题'
-                    print(f"    ✅ [{completed_count}/{total_tasks}] 故障排除: {title}")
-            else:
-                print(f"    ⚠️  [{completed_count}/{total_tasks}] {task_type} 处理失败")
-
-        return guides_data, troubleshooting_data
-
     async def _process_guide_task_async(self, url):
-        """异步处理指南任务"""
+        """异步处理指南任务（页面在事件循环上获取，内容提取交给解析进程池）"""
         try:
-            soup = await self.get_soup_async(url)
-            if soup:
-                return self.extract_guide_content(url)
+            stored = await asyncio.to_thread(self._stored_guide, url)
+            if stored is not None:
+                return stored
+            guide, shared = await self.guide_flights.do_async(self._guide_flight_key(url), self._crawl_guide_async, url)
+            return copy.deepcopy(guide) if shared and guide else guide
         except Exception as e:
             self.logger.error(f"异步处理指南失败 {url}: {e}")
         return None
 
+    async def _crawl_guide_async(self, url):
+        if not self.is_allowed_by_robots(url) or self.is_guide_processed(url):
+            return None
+        html = await self.get_page_html_async(url)
+        if not html:
+            return None
+        guide = await self._run_extraction_async('guide', url, html)
+        self.guide_store.remember(GuideStore.guide_id_from_url(url), guide)
+        return guide
+
     async def _process_troubleshooting_task_async(self, url):
-        """异步处理故障排除任务"""
+        """异步处理故障排除任务（页面在事件循环上获取，内容提取交给解析进程池）"""
         try:
-            soup = await self.get_soup_async(url)
-            if soup:
-                return self.extract_troubleshooting_content(url)
+            stored = await asyncio.to_thread(self.troubleshooting_store.get, url)
+            if stored is not None:
+                return stored
+            ts_content, shared = await self.troubleshooting_flights.do_async(
+                TroubleshootingStore.ts_id_from_url(url), self._crawl_troubleshooting_async, url)
+            return copy.deepcopy(ts_content) if shared and ts_content else ts_content
         except Exception as e:
             self.logger.error(f"异步处理故障排除失败 {url}: {e}")
         return None
 
-    def get_soup(self, url, use_playwright=False):
-        """重写get_soup方法，支持代理池、重试机制和Playwright渲染"""
-        if not url:
-            return None
-
-        if url in self.failed_urls:
-            self.logger.warning(f"跳过已知失败URL: {url}")
+    async def _crawl_troubleshooting_async(self, url):
+        html = await self.get_page_html_async(url)
+        if not html:
             return None
+        ts_content = await self._run_extraction_async('troubleshooting', url, html)
+        if ts_content:
+            await asyncio.to_thread(self.troubleshooting_store.put, url, ts_content)
+        return ts_content
 
+    def _normalize_fetch_url(self, url):
+        """统一为www.ifixit.com英文版本并附加lang=en参数"""
         # 强制使用英文版本
         if 'zh.ifixit.com' in url:
             url = url.replace('zh.ifixit.com', 'www.ifixit.com')
@@ -2919,47 +4173,133 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 url += '&lang=en'
             else:
                 # 替换现有的lang参数
-                import re
                 url = re.sub(r'lang=[^&]*', 'lang=en', url)
         else:
             url += '?lang=en'
+        return url
 
-        self.stats["total_requests"] += 1
+    def _record_page_validators(self, url, headers, body):
+        """保存页面的ETag/Last-Modified/内容哈希，供TTL过期后的条件请求使用"""
+        if self.cache_manager:
+            self.cache_manager.record_validators(url, headers, body)
+
+    def _revalidate_cached_page(self, url):
+        """缓存超过TTL时发送条件请求，页面未变化（304或内容哈希相同）则继续使用缓存"""
+        if self._is_replaying():
+            return True
+
+        fetch_url = self._normalize_fetch_url(url)
+        headers = dict(self.headers)
+        headers.update(self.cache_manager.conditional_headers(url))
+        try:
+            self._record_fetch(fetch_url)
+            response = self._get_thread_session().get(fetch_url, headers=headers, timeout=(5, 10))
+        except Exception as e:
+            # 网络异常时不让整个节点重新爬取，下次运行再校验
+            self.logger.warning(f"条件请求失败，继续使用缓存 {url}: {e}")
+            return True
 
+        if response.status_code not in (200, 304):
+            self.logger.warning(f"条件请求返回 {response.status_code}，继续使用缓存 {url}")
+            return True
+
+        unchanged = self.cache_manager.apply_revalidation(url, response.status_code, response.headers, response.content)
+        if unchanged:
+            reason = "304 Not Modified" if response.status_code == 304 else "内容哈希相同"
+            print(f"   ♻️ 页面未变化（{reason}），继续使用缓存: {url}")
+        else:
+            print(f"   🔄 页面已变化，重新提取: {url}")
+            self.page_cache.put(url, response.content)
+        return unchanged
+
+    def get_soup(self, url, use_playwright=False):
+        """重写get_soup方法，支持代理池、重试机制和Playwright渲染"""
         # 如果需要JavaScript渲染，使用Playwright
         if use_playwright:
+            url = self._begin_fetch(url)
+            if not url:
+                return None
+            self._count_fetch(url)
             return self._retry_with_backoff(self._get_soup_with_playwright, url)
 
         # 否则使用传统的requests方法
-        return self._retry_with_backoff(self._get_soup_requests, url)
+        html = self.get_page_html(url)
+        if not html:
+            return None
+        return make_soup(html)
 
-    def _get_soup_requests(self, url):
-        """使用requests获取页面内容，支持智能代理切换"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=0,  # 完全禁用urllib3的重试，由上层处理
-            backoff_factor=0,  # 无退避延迟
-            status_forcelist=[],  # 不重试任何状态码
-            raise_on_status=False  # 不在状态码错误时立即抛出异常
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+    def get_link_soup(self, url):
+        """
+        链接扫描模式获取页面：只为链接、标题、面包屑和类别区块建树
+        设备页上只需要指南/故障排除链接时使用，所有<a>元素都完整保留，链接提取结果与完整解析相同
+        """
+        html = self.get_page_html(url)
+        return make_link_soup(html) if html else None
+
+    def get_page_html(self, url):
+        """获取页面原始HTML（bytes），可直接交给提取进程池"""
+        url = self._begin_fetch(url)
+        if not url:
+            return None
+
+        # 本次运行已抓过（或条件请求时已取回）的页面直接从页面缓存返回
+        cached = self.page_cache.get(url)
+        if cached is not None:
+            return cached
+
+        # 其他线程正在抓取同一页面时等待并共享其结果
+        html, _ = self.page_flights.do(canonical_url(url), self._fetch_page_html, url)
+        return html
+
+    def _fetch_page_html(self, url):
+        self._count_fetch(url)
+        html = self._retry_with_backoff(self._fetch_html_requests, url)
+        if html:
+            self.page_cache.put(url, html)
+            self.autotuner.record_page()
+        return html
+
+    def _begin_fetch(self, url):
+        """抓取前的公共处理：跳过已知失败URL并统一为英文URL，返回要请求的URL"""
+        if not url:
+            return None
+
+        if url in self.failed_urls:
+            self.logger.warning(f"跳过已知失败URL: {url}")
+            return None
+
+        if not self.traffic_meter.allow_page():
+            return None
+
+        return self._normalize_fetch_url(url)
+
+    def _count_fetch(self, url):
+        self.stats["total_requests"] += 1
+        self._record_fetch(url)
 
-        # 获取代理
-        proxies = self._get_next_proxy() if self.use_proxy else None
+    def _get_thread_session(self):
+        """获取当前线程的持久会话（首次使用时按线程分配的代理创建）"""
+        return self.session_manager.get_session(self._get_next_proxy if self.use_proxy else None)
+
+    def _get_session(self):
+        """基类的会话入口（指南API等）也使用会话管理器的会话，与页面抓取共用同一个线程本地槽位，
+        避免先创建的无代理会话被页面抓取复用"""
+        return self._get_thread_session()
+
+    def _fetch_html_requests(self, url):
+        """使用requests获取页面内容，支持智能代理切换"""
+        # 复用当前线程的持久会话，代理已绑定在会话上
+        session = self._get_thread_session()
 
         try:
             response = session.get(
                 url,
                 headers=self.headers,
-                timeout=(5, 10),  # 连接超时5秒，读取超时10秒
-                proxies=proxies
+                timeout=(5, 10)  # 连接超时5秒，读取超时10秒
             )
             response.raise_for_status()
-
-            from bs4 import BeautifulSoup
-            return BeautifulSoup(response.content, 'html.parser')
+            self._record_page_validators(url, response.headers, response.content)
+            return response.content
 
         except (requests.exceptions.ProxyError,
                 requests.exceptions.ConnectTimeout,
@@ -2971,18 +4311,16 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 # 静默切换代理并重试一次
                 if self._switch_proxy(f"网络错误: {str(e)[:50]}"):
                     try:
-                        # 使用新代理快速重试一次
-                        new_proxies = self._get_next_proxy()
+                        # 切换代理后会话已重建，使用新代理快速重试一次
+                        session = self._get_thread_session()
                         response = session.get(
                             url,
                             headers=self.headers,
-                            timeout=(3, 8),  # 连接超时3秒，读取超时8秒
-                            proxies=new_proxies
+                            timeout=(3, 8)  # 连接超时3秒，读取超时8秒
                         )
                         response.raise_for_status()
-
-                        from bs4 import BeautifulSoup
-                        return BeautifulSoup(response.content, 'html.parser')
+                        self._record_page_validators(url, response.headers, response.content)
+                        return response.content
                     except Exception:
                         # 静默失败，返回None让上层处理
                         return None
@@ -2991,44 +4329,21 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
     def _get_soup_with_playwright(self, url):
         """使用Playwright获取JavaScript渲染后的页面内容"""
-        try:
-            from playwright.sync_api import sync_playwright
-
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-
-                # 设置请求头 - 强制英文版本
-                page.set_extra_http_headers({
-                    'Accept-Language': 'en-US,en;q=1.0',  # 强制英文，提高优先级
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Cookie': 'locale=en'  # 添加英文locale cookie
-                })
-
-                # 导航到页面并等待加载
-                page.goto(url, wait_until='networkidle')
-
-                # 强制设置英文语言
-                page.evaluate("""
-                    // 设置localStorage中的语言偏好
-                    localStorage.setItem('locale', 'en');
-                    localStorage.setItem('language', 'en');
-                    localStorage.setItem('lang', 'en');
-
-                    // 设置cookie
-                    document.cookie = 'locale=en; path=/; domain=.ifixit.com';
-                    document.cookie = 'language=en; path=/; domain=.ifixit.com';
-                """)
-
-                # 等待一下让设置生效
-                page.wait_for_timeout(1000)
+        if self._is_replaying():
+            content = self._load_rendered_html(url)
+            if content is None:
+                self.failed_urls.add(url)
+                return None
+            return make_soup(content)
 
-                # 获取页面内容
-                content = page.content()
-                browser.close()
+        try:
+            # 浏览器池中的上下文已预置英文locale，拦截图片/字体/统计脚本后等待networkidle即可
+            self.rate_limiter.acquire(url)
+            status, content = self._get_browser_pool().render(url)
+            self.rate_limiter.record(url, status)
+            self._archive_rendered_html(url, status, content)
 
-                from bs4 import BeautifulSoup
-                return BeautifulSoup(content, 'html.parser')
+            return make_soup(content)
 
         except Exception as e:
             # 安全的错误消息处理
@@ -3065,8 +4380,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 "Pragma": "no-cache"
             }
 
-            proxies = self._get_next_proxy() if self.use_proxy else None
-            response = requests.head(url, headers=media_headers, timeout=3, proxies=proxies)
+            response = self._get_thread_session().head(url, headers=media_headers, timeout=3)
             if response and response.status_code == 200:
                 content_length = response.headers.get('content-length')
                 if content_length:
@@ -3077,6 +4391,21 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             self.logger.warning(f"无法获取文件大小 {url}: {e}")
         return None
 
+    def _on_traffic_phase(self, phase):
+        """流量预算阶段变化：先把媒体并发压到1（页面抓取不受影响），之后的阶段由下载前的预算检查跳过媒体"""
+        if phase in (TrafficMeter.THROTTLE, TrafficMeter.MEDIA_STOPPED):
+            self.autotuner.media.cap(1)
+        print(f"📶 流量预算已用 {format_bytes(self.traffic_meter.total_bytes)}/{format_bytes(self.traffic_meter.budget_bytes)}"
+              f"，进入{TrafficMeter.PHASE_LABELS[phase]}阶段")
+
+    def _media_allowed_by_budget(self, url):
+        """流量预算是否允许下载该媒体；不允许时JSON中保留远程URL"""
+        if self.traffic_meter.allow_media(self._is_video_file(url)):
+            return True
+        if self.verbose:
+            self.logger.info(f"流量预算限制，跳过媒体下载: {url}")
+        return False
+
     def _is_video_file(self, url):
         """检查URL是否为视频文件"""
         if not url:
@@ -3104,18 +4433,15 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         # 确保媒体文件夹在当前节点的目录下，而不是在根目录
         local_path = local_dir / self.media_folder / filename
 
-        # 检查是否是troubleshooting目录，如果是则不使用跨页面去重
         is_troubleshooting = "troubleshooting" in str(local_dir)
 
-        if not is_troubleshooting:
-            # 检查文件是否已存在（支持跨页面去重）
-            existing_file_path = self._find_existing_media_file(url, filename)
-            if existing_file_path:
-                # 文件已存在于其他位置，返回相对于当前目录的路径
-                if self.verbose:
-                    self.logger.info(f"媒体文件已存在，跳过下载: {filename}")
-                self.stats["media_downloaded"] += 1
-                return existing_file_path
+        # 检查媒体索引（支持跨页面去重，已存储的文件会链接到当前目录）
+        existing_file_path = self._find_existing_media_file(url, local_dir, filename)
+        if existing_file_path:
+            if self.verbose:
+                self.logger.info(f"媒体文件已存在，跳过下载: {filename}")
+            self.stats["media_downloaded"] += 1
+            return existing_file_path
 
         # 如果文件在当前目录已存在，直接返回路径
         if local_path.exists():
@@ -3133,6 +4459,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     # 如果不在storage_root下，返回相对于local_dir的路径
                     return str(local_path.relative_to(local_dir))
 
+        if not self._media_allowed_by_budget(url):
+            return url
+
         # 检查是否为视频文件
         if self._is_video_file(url):
             if not self.download_videos:
@@ -3152,7 +4481,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.logger.info(f"准备下载视频文件 ({size_info}): {url}")
 
         try:
-            result = await self._download_media_file_impl_async(url, local_dir, filename)
+            result = await self._download_media_coalesced(self._download_media_file_impl_async, url, local_dir, filename)
             if self._is_video_file(url) and result != url:
                 self.stats["videos_downloaded"] += 1
             return result
@@ -3175,9 +4504,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if '.thumbnail.medium' in url:
                 url = url.replace('.thumbnail.medium', '.medium')
 
-            # 确保异步HTTP管理器已初始化
-            init_success = await self._init_async_http_manager()
-            if not init_success or not self.async_http_manager:
+            # 获取当前事件循环对应的HTTP客户端
+            http_manager = await self._get_media_http_manager()
+            if not http_manager:
                 self.logger.error("异步HTTP管理器初始化失败，无法获取文件大小")
                 return None
 
@@ -3188,7 +4517,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 "Accept-Encoding": "gzip, deflate, br"
             })
             
-            response = await self.async_http_manager.get(url, headers=headers)
+            response = await http_manager.get(url, headers=headers)
             if response and response.status_code == 200:
                 content_length = response.headers.get('content-length')
                 if content_length:
@@ -3224,15 +4553,15 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if self.verbose:
                 self.logger.info(f"URL格式修复: .thumbnail.medium -> .medium")
 
-        # 确保异步HTTP管理器已初始化
-        init_success = await self._init_async_http_manager()
-        if not init_success or not self.async_http_manager:
+        # 获取当前事件循环对应的HTTP客户端
+        http_manager = await self._get_media_http_manager()
+        if not http_manager:
             self.logger.error("异步HTTP管理器初始化失败，无法下载媒体文件")
             return None
 
         try:
             # 使用异步HTTP客户端下载文件
-            if self.async_http_manager:
+            if http_manager:
                 # 确保目录存在
                 local_path.parent.mkdir(parents=True, exist_ok=True)
                 
@@ -3244,7 +4573,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     'Accept-Language': 'en-US,en;q=0.9',
                     'Referer': 'https://www.ifixit.com/'
                 }
-                response = await self.async_http_manager.get_with_retry(url, headers=media_headers)
+                response = await http_manager.get_with_retry(url, headers=media_headers)
                 if response is None:
                     return None
 
@@ -3258,7 +4587,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                         error_msg = str(e) if e is not None else "Unknown error"
                         self.logger.error(f"异步写入文件失败 {url}: {error_msg}")
                         raise
-                        
+
+                # 登记到内容寻址存储，合并等待的调用者和后续页面直接链接该文件（sha256在线程中计算）
+                await asyncio.to_thread(self.media_store.ingest, url, local_path)
+
                 self.stats["media_downloaded"] += 1
                 if self.verbose:
                     self.logger.info(f"媒体文件下载成功: {filename}")
@@ -3309,11 +4641,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         # 确保媒体文件夹在当前节点的目录下，而不是在根目录
         local_path = local_dir / self.media_folder / filename
 
-        # 检查是否是troubleshooting目录，如果是则不使用跨页面去重
+        # troubleshooting目录的媒体路径相对于troubleshooting目录，且不做视频大小检查
         is_troubleshooting = "troubleshooting" in str(local_dir)
 
-        # 优化：使用缓存的文件存在性检查，避免重复的文件系统操作
-        if self._check_file_exists_cached(local_path):
+        if local_path.exists():
             if self.verbose:
                 self.logger.info(f"媒体文件已存在于当前目录: {filename}")
             self.stats["media_downloaded"] += 1
@@ -3328,16 +4659,18 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     # 如果不在storage_root下，返回相对于local_dir的路径
                     return str(local_path.relative_to(local_dir))
 
-        if not is_troubleshooting:
-            # 检查文件是否已存在（支持跨页面去重）
-            existing_file_path = self._find_existing_media_file(url, filename)
-            if existing_file_path:
-                # 文件已存在于其他位置，返回相对于当前目录的路径
-                if self.verbose:
-                    self.logger.info(f"媒体文件已存在，跳过下载: {filename}")
-                self.stats["media_downloaded"] += 1
-                return existing_file_path
+        # 检查媒体索引（支持跨页面去重，已存储的文件会链接到当前目录）
+        existing_file_path = self._find_existing_media_file(url, local_dir, filename)
+        if existing_file_path:
+            if self.verbose:
+                self.logger.info(f"媒体文件已存在，跳过下载: {filename}")
+            self.stats["media_downloaded"] += 1
+            return existing_file_path
 
+        if not self._media_allowed_by_budget(url):
+            return url
+
+        if not is_troubleshooting:
             # 检查是否为视频文件
             if self._is_video_file(url):
                 if not self.download_videos:
@@ -3358,7 +4691,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
         try:
             # 使用异步实现
-            result = await self._download_media_file_impl(url, local_dir, filename)
+            result = await self._download_media_coalesced(self._download_media_file_impl, url, local_dir, filename)
             if self._is_video_file(url) and result != url:
                 self.stats["videos_downloaded"] += 1
             return result
@@ -3374,71 +4707,40 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             self._log_failed_media(url, error_msg)
             return url
 
-    def _find_existing_media_file(self, url, filename):
-        """查找是否已存在相同的媒体文件（跨页面去重，带缓存优化）"""
-        try:
-            # 基于URL的MD5哈希来查找文件
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-
-            # 检查缓存
-            cache_key = f"media_{url_hash}"
-            if cache_key in self._file_exists_cache:
-                return self._file_exists_cache[cache_key]
+    async def _download_media_coalesced(self, impl, url, local_dir, filename):
+        """同一媒体URL并发下载时只请求一次，其余调用者把首个下载者登记到媒体索引的文件链接到自己的目录"""
+        fetch_url = url.replace('.thumbnail.medium', '.medium')
+        result, shared = await self.media_flights.do_async(fetch_url, impl, url, local_dir, filename)
+        if not shared or not result:
+            return result
+        local_path = local_dir / self.media_folder / filename
+        if self.media_store.link_existing(fetch_url, local_path):
+            return self._media_relative_path(local_path, local_dir)
+        # 首个下载者的文件未能登记到索引时自行下载
+        return await impl(url, local_dir, filename)
 
-            # 在整个storage_root目录下搜索具有相同哈希的文件
-            storage_path = Path(self.storage_root)
-            if not storage_path.exists():
-                self._file_exists_cache[cache_key] = None
+    def _find_existing_media_file(self, url, local_dir, filename):
+        """通过持久化媒体索引查找已下载过的相同媒体（跨页面去重），并链接到当前节点的media目录"""
+        try:
+            local_path = local_dir / self.media_folder / filename
+            if not self.media_store.link_existing(url, local_path):
                 return None
-
-            # 搜索所有media目录下的文件
-            for media_dir in storage_path.rglob("media"):
-                if media_dir.is_dir():
-                    # 查找具有相同哈希前缀的文件
-                    for existing_file in media_dir.glob(f"{url_hash}.*"):
-                        if existing_file.is_file():
-                            try:
-                                # 尝试返回相对于storage_root的路径
-                                result = str(existing_file.relative_to(storage_path))
-                                # 缓存结果
-                                self._cache_file_exists_result(cache_key, result)
-                                return result
-                            except ValueError:
-                                # 如果不能相对于storage_root，则返回绝对路径
-                                result = str(existing_file)
-                                self._cache_file_exists_result(cache_key, result)
-                                return result
-
-            # 缓存未找到的结果
-            self._cache_file_exists_result(cache_key, None)
-            return None
-
+            return self._media_relative_path(local_path, local_dir)
         except Exception as e:
             if self.verbose:
                 self.logger.warning(f"查找已存在媒体文件时出错: {e}")
             return None
 
-    def _cache_file_exists_result(self, cache_key, result):
-        """缓存文件存在性检查结果"""
-        # 如果缓存过大，清理一半
-        if len(self._file_exists_cache) >= self._cache_max_size:
-            # 清理缓存的前一半
-            keys_to_remove = list(self._file_exists_cache.keys())[:self._cache_max_size // 2]
-            for key in keys_to_remove:
-                del self._file_exists_cache[key]
-
-        self._file_exists_cache[cache_key] = result
-
-    def _check_file_exists_cached(self, file_path):
-        """带缓存的文件存在性检查"""
-        cache_key = f"exists_{str(file_path)}"
-
-        if cache_key in self._file_exists_cache:
-            return self._file_exists_cache[cache_key]
-
-        exists = file_path.exists()
-        self._cache_file_exists_result(cache_key, exists)
-        return exists
+    def _media_relative_path(self, local_path, local_dir):
+        """计算写入JSON的媒体相对路径"""
+        # 对于troubleshooting目录，返回相对于troubleshooting目录的路径
+        if "troubleshooting" in str(local_dir):
+            return str(local_path.relative_to(local_dir))
+        try:
+            return str(local_path.relative_to(Path(self.storage_root)))
+        except ValueError:
+            # 如果不在storage_root下，返回相对于local_dir的路径
+            return str(local_path.relative_to(local_dir))
 
     async def _download_media_file_impl(self, url, local_dir, filename):
         """媒体文件下载的具体实现（异步优化版本）"""
@@ -3452,13 +4754,12 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if self.verbose:
                 self.logger.info(f"URL格式修复: .thumbnail.medium -> .medium")
 
-        # 确保异步HTTP管理器已初始化
-        if not self.async_http_manager:
-            await self._init_async_http_manager()
+        # 获取当前事件循环对应的HTTP客户端
+        http_manager = await self._get_media_http_manager()
 
         try:
             # 使用异步HTTP客户端下载文件
-            if self.async_http_manager:
+            if http_manager:
                 # 设置媒体下载的请求头
                 media_headers = {
                     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -3468,7 +4769,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 }
                 
                 # 使用异步HTTP客户端下载文件
-                response = await self.async_http_manager.get_with_retry(url, headers=media_headers)
+                response = await http_manager.get_with_retry(url, headers=media_headers)
                 if response is None:
                     return None
                 
@@ -3483,115 +4784,29 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                         self.logger.error(f"异步写入文件失败 {url}: {error_msg}")
                         raise
 
-                # 计算正确的相对路径
-                is_troubleshooting = "troubleshooting" in str(local_dir)
-                if is_troubleshooting:
-                    return str(local_path.relative_to(local_dir))
-                else:
-                    # 计算相对路径，如果local_dir不是storage_root的子目录，则使用local_dir作为基准
-                    try:
-                        return str(local_path.relative_to(Path(self.storage_root)))
-                    except ValueError:
-                        # 如果不在storage_root下，返回相对于local_dir的路径
-                        return str(local_path.relative_to(local_dir))
-            else:
-                safe_url = safe_str(url) if url is not None else "Unknown URL"
-                self.logger.error(f"异步HTTP客户端未初始化，无法下载媒体文件: {safe_url}")
-                return None
-        except Exception as e:
-            # 安全的错误消息处理
-            error_msg = safe_str(e)
-            safe_url = safe_str(url) if url is not None else "Unknown URL"
-            self.logger.error(f"媒体文件下载失败: {safe_url}, 错误: {error_msg}")
-            return None
-
-    async def _process_media_urls_async(self, data, local_dir):
-        """异步递归处理数据中的媒体URL，下载并替换为本地路径"""
-        media_tasks = []
-
-        def collect_media_urls(obj, path=""):
-            """收集所有需要下载的媒体URL"""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{path}.{key}" if path else key
-                    if key in ['image', 'video', 'thumbnail', 'photo'] and isinstance(value, str) and value.startswith('http'):
-                        media_tasks.append((current_path, value, obj, key))
-                    elif key == 'images' and isinstance(value, list):
-                        for i, img_item in enumerate(value):
-                            if isinstance(img_item, str) and img_item.startswith('http'):
-                                media_tasks.append((f"{current_path}[{i}]", img_item, value, i))
-                            elif isinstance(img_item, dict) and 'url' in img_item:
-                                img_url = img_item['url']
-                                if isinstance(img_url, str) and img_url.startswith('http'):
-                                    media_tasks.append((f"{current_path}[{i}].url", img_url, img_item, 'url'))
-                    elif key == 'videos' and isinstance(value, list):
-                        for i, video_item in enumerate(value):
-                            if isinstance(video_item, str) and video_item.startswith('http'):
-                                if self.download_videos:
-                                    media_tasks.append((f"{current_path}[{i}]", video_item, value, i))
-                            elif isinstance(video_item, dict) and 'url' in video_item:
-                                video_url = video_item['url']
-                                if isinstance(video_url, str) and video_url.startswith('http'):
-                                    if self.download_videos:
-                                        media_tasks.append((f"{current_path}[{i}].url", video_url, video_item, 'url'))
-                    elif isinstance(value, (dict, list)):
-                        collect_media_urls(value, current_path)
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    collect_media_urls(item, f"{path}[{i}]" if path else f"[{i}]")
-
-        # 收集所有媒体URL
-        collect_media_urls(data)
-
-        if not media_tasks:
-            return
-
-        # 创建并发下载任务 - 优化并发数以提升性能
-        max_concurrent_downloads = min(20, max(self.max_workers * 2, 10))  # 增加媒体下载并发数
-        semaphore = asyncio.Semaphore(max_concurrent_downloads)
+                # 登记到内容寻址存储（计算sha256在线程中执行，不阻塞事件循环）
+                await asyncio.to_thread(self.media_store.ingest, url, local_path)
 
-        async def download_single_media(path, url, container, key):
-            async with semaphore:
-                try:
-                    # 检查事件循环状态
-                    try:
-                        loop = asyncio.get_running_loop()
-                        if loop.is_closed():
-                            return False
-                    except RuntimeError:
-                        return False
-
-                    local_path = await self._download_media_file(url, local_dir)
-                    if local_path and local_path != url:
-                        container[key] = local_path
-                    return True
-                except Exception as e:
-                    # 安全的错误消息处理
-                    error_msg = safe_str(e)
-                    # 特殊处理事件循环关闭的情况
-                    if "Event loop is closed" in error_msg:
-                        return False
-                    safe_url = safe_str(url) if url is not None else "Unknown URL"
-                    self.logger.error(f"异步媒体下载失败 {safe_url}: {error_msg}")
-                    self.stats["media_failed"] += 1
-                    return False
+                return self._media_relative_path(local_path, local_dir)
+            else:
+                safe_url = safe_str(url) if url is not None else "Unknown URL"
+                self.logger.error(f"异步HTTP客户端未初始化，无法下载媒体文件: {safe_url}")
+                return None
+        except Exception as e:
+            # 安全的错误消息处理
+            error_msg = safe_str(e)
+            safe_url = safe_str(url) if url is not None else "Unknown URL"
+            self.logger.error(f"媒体文件下载失败: {safe_url}, 错误: {error_msg}")
+            return None
 
-        # 并发下载所有媒体文件
-        download_tasks = [download_single_media(path, url, container, key)
-                         for path, url, container, key in media_tasks]
+    async def _process_media_urls_async(self, data, local_dir):
+        """在当前事件循环上处理数据中的媒体URL，下载并替换为本地路径"""
+        media_urls = self._collect_media_urls(data)
+        if media_urls:
+            await self._process_collected_media_urls_async(media_urls, local_dir)
 
-        if download_tasks:
-            print(f"      📥 开始高并发异步下载 {len(download_tasks)} 个媒体文件（并发数: {max_concurrent_downloads}）...")
-            start_time = time.time()
-            results = await asyncio.gather(*download_tasks, return_exceptions=True)
-            end_time = time.time()
-            success_count = sum(1 for r in results if r is True)
-            download_time = end_time - start_time
-            print(f"      ✅ 异步下载完成: {success_count}/{len(download_tasks)} 成功，耗时 {download_time:.2f}秒")
-
-    def _process_media_urls(self, data, local_dir):
-        """递归处理数据中的媒体URL，优先使用异步下载并替换为本地路径"""
-        # 收集所有需要下载的媒体URL
+    def _collect_media_urls(self, data):
+        """收集数据中所有需要下载的媒体URL，返回(container, key, url)列表"""
         media_urls = []
 
         def collect_urls(obj, path=""):
@@ -3624,43 +4839,115 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     collect_urls(item)
 
         collect_urls(data)
+        return media_urls
 
-        # 如果有媒体URL需要下载，优先使用同步方式避免事件循环问题
-        if media_urls:
-            try:
-                # 检测是否在异步环境中
-                loop = asyncio.get_running_loop()
-                if loop and not loop.is_closed():
-                    # 如果已经在异步环境中，使用同步回退方案避免嵌套事件循环问题
-                    if self.verbose:
-                        self.logger.info("检测到活跃异步环境，使用同步回退方案处理媒体文件")
-                    self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
-                else:
-                    # 事件循环已关闭，使用同步处理
-                    if self.verbose:
-                        self.logger.info("事件循环已关闭，使用同步处理媒体文件")
-                    self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
-            except RuntimeError:
-                # 没有运行中的事件循环，可以尝试创建新的事件循环
-                try:
-                    if self.verbose:
-                        self.logger.info("创建新事件循环进行异步媒体处理")
-                    # 使用新的事件循环处理
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        loop.run_until_complete(self._process_collected_media_urls_async(media_urls, local_dir))
-                    finally:
-                        loop.close()
-                        asyncio.set_event_loop(None)
-                except Exception as e:
-                    # 如果异步处理失败，回退到同步处理
-                    self.logger.warning(f"异步媒体处理失败，回退到同步处理: {safe_str(e)}")
-                    self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
-            except Exception as e:
-                # 其他异常，直接使用同步处理
-                self.logger.warning(f"事件循环检测失败，使用同步处理: {safe_str(e)}")
-                self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
+    def _process_media_urls(self, data, local_dir, wait=True):
+        """递归处理数据中的媒体URL，提交到后台媒体下载线程并替换为本地路径
+
+        返回concurrent.futures.Future（无媒体或已同步处理时返回None）。
+        wait=False时调用方可先提交多个节点的媒体，再统一等待。
+        """
+        # 收集所有需要下载的媒体URL
+        media_urls = self._collect_media_urls(data)
+        if not media_urls:
+            return None
+
+        # 已在后台媒体线程内时不能再等待自身，直接同步处理
+        if self.media_loop.is_loop_thread():
+            self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
+            return None
+
+        try:
+            future = self.media_loop.submit(self._process_collected_media_urls_async(media_urls, local_dir))
+        except Exception as e:
+            # 后台线程不可用时回退到同步处理
+            self.logger.warning(f"提交媒体下载任务失败，回退到同步处理: {safe_str(e)}")
+            self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
+            return None
+
+        if wait:
+            self._wait_media_future(future)
+        return future
+
+    def _wait_media_future(self, future, timeout=330):
+        """等待后台媒体下载任务完成（单批次内部已有300秒超时）"""
+        if future is None:
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            self.logger.warning(f"媒体下载任务未正常完成: {safe_str(e)}")
+
+    def _save_item_with_media(self, data, item_dir, file_name):
+        """先以远程URL写入JSON，再把媒体下载放入队列，完成后原子回写本地路径"""
+        item_file = item_dir / file_name
+        self.traffic_meter.count_item(file_name.rsplit('.', 1)[0])
+        guide_id = GuideStore.guide_id_from_url(data.get('url')) if file_name == "guide.json" else None
+        if guide_id:
+            self._save_guide_to_store(guide_id, data, item_file)
+            return item_file
+
+        atomic_json_write(item_file, data, ensure_ascii=False, indent=2)
+        if self._collect_media_urls(data):
+            # 节点目录为 item_dir 的上两级（guides/guide_N、troubleshooting/troubleshooting_N）
+            node_dir = item_dir.parent.parent
+            self._track_node_media_job(node_dir)
+            self.media_queue.put((data, item_dir, item_file,
+                                  functools.partial(self._finish_node_media_job, node_dir)))
+        return item_file
+
+    def _save_guide_to_store(self, guide_id, data, item_file):
+        """指南只在全局指南存储中保存一份（媒体下载到存储目录），设备目录下的guide.json硬链接到该副本"""
+        store_file = self.guide_store.save(guide_id, data, item_file)
+        if store_file is None:
+            return
+        if self._collect_media_urls(data):
+            self.media_queue.put((data, store_file.parent, store_file,
+                                  functools.partial(self._complete_stored_guide, guide_id)))
+        else:
+            self._complete_stored_guide(guide_id)
+
+    def _complete_stored_guide(self, guide_id):
+        """标记规范副本完成；重新链接改变了设备目录下guide.json的stat，刷新这些节点的清单"""
+        for dest in self.guide_store.complete(guide_id):
+            # 设备目录为 guides/guide_N/guide.json 的上三级
+            self._refresh_node_manifest(dest.parent.parent.parent)
+
+    def _track_node_media_job(self, node_dir):
+        """登记节点的一个待完成媒体任务"""
+        with self._node_media_lock:
+            self._node_media_pending[node_dir] = self._node_media_pending.get(node_dir, 0) + 1
+
+    def _finish_node_media_job(self, node_dir):
+        """节点的一个媒体任务已回写JSON；该节点的媒体任务全部完成后刷新清单
+        （失败的任务不会调用，清单保持旧状态，下次运行走完整校验）"""
+        with self._node_media_lock:
+            remaining = self._node_media_pending.get(node_dir, 1) - 1
+            if remaining > 0:
+                self._node_media_pending[node_dir] = remaining
+                return
+            self._node_media_pending.pop(node_dir, None)
+        self._refresh_node_manifest(node_dir)
+
+    def _refresh_node_manifest(self, node_dir):
+        if self.cache_manager:
+            self.cache_manager.refresh_manifest(node_dir)
+
+    def _run_media_job(self, job):
+        """媒体队列工作线程：下载媒体并用本地路径原子回写JSON，之后执行可选的完成回调"""
+        data, item_dir, item_file, *on_done = job
+        future = self._process_media_urls(data, item_dir, wait=False)
+        self._wait_media_future(future)
+        atomic_json_write(item_file, data, ensure_ascii=False, indent=2)
+        for callback in on_done:
+            callback()
+
+    def wait_for_media_downloads(self):
+        """等待媒体队列清空"""
+        depth = self.media_queue.depth()
+        if depth > 0:
+            print(f"⏳ 等待媒体下载队列完成 (积压 {depth} 个任务)...")
+        self.media_queue.join()
 
     async def _process_collected_media_urls_async(self, media_urls, local_dir):
         """异步处理收集到的媒体URL - 修复事件循环关闭问题"""
@@ -3674,9 +4961,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             self.logger.warning("无法获取事件循环，回退到同步处理")
             return self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
 
-        # 确保异步HTTP管理器已初始化
-        init_success = await self._init_async_http_manager()
-        if not init_success:
+        # 确保当前事件循环对应的HTTP客户端已初始化
+        if not await self._get_media_http_manager():
             self.logger.warning("异步HTTP管理器初始化失败，回退到同步处理")
             return self._process_media_urls_sync_fallback_from_urls(media_urls, local_dir)
 
@@ -3721,11 +5007,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 return False
 
         if media_urls:
-            # 限制并发数，特别针对图片服务器优化
-            semaphore = asyncio.Semaphore(min(5, len(media_urls)))  # 进一步降低图片下载并发数
-
+            # 媒体并发由自动调优器统一控制（所有节点共用一个可调闸门）
             async def limited_download(container, key, url):
-                async with semaphore:
+                async with self.autotuner.media:
                     try:
                         # 检查事件循环状态
                         loop = asyncio.get_running_loop()
@@ -3782,7 +5066,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
     def _download_media_file_sync(self, url, local_dir):
         """同步下载媒体文件的回退方法"""
         try:
-            import requests
             from urllib.parse import urlparse
             import os
 
@@ -3808,18 +5091,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 'Referer': 'https://www.ifixit.com/'
             }
 
-            # 获取代理
-            proxies = None
-            if self.proxy_manager:
-                proxy_config = self.proxy_manager.get_proxy()
-                if proxy_config:
-                    proxies = {
-                        'http': proxy_config['http'],
-                        'https': proxy_config['https']
-                    }
-
-            # 下载文件
-            response = requests.get(url, headers=headers, proxies=proxies, timeout=(5, 15), stream=True)
+            # 下载文件（复用当前线程的持久会话及其代理）
+            response = self._get_thread_session().get(url, headers=headers, timeout=(5, 15), stream=True)
             response.raise_for_status()
 
             # 写入文件
@@ -3867,6 +5140,14 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         if local_path.exists():
             return str(local_path.relative_to(local_dir))
 
+        # 已在媒体索引中的文件直接链接到当前目录
+        if self.media_store.link_existing(url, local_path):
+            self.stats["media_downloaded"] += 1
+            return str(local_path.relative_to(local_dir))
+
+        if not self._media_allowed_by_budget(url):
+            return url
+
         # 修复URL格式
         if '.thumbnail.medium' in url:
             url = url.replace('.thumbnail.medium', '.medium')
@@ -3875,27 +5156,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             # 创建目录
             local_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 使用requests同步下载
-            media_headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Referer": "https://www.ifixit.com/",
-                "Origin": "https://www.ifixit.com",
-                "Sec-Fetch-Dest": "image",
-                "Sec-Fetch-Mode": "no-cors",
-                "Sec-Fetch-Site": "same-site",
-                "Cache-Control": "no-cache",
-                "Pragma": "no-cache"
-            }
-            proxies = self._get_next_proxy() if self.use_proxy else None
-            response = requests.get(url, headers=media_headers, timeout=5, proxies=proxies, verify=False)
-            response.raise_for_status()
-
-            # 保存文件
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
+            # 其他线程正在下载同一媒体时等待其完成，再把登记到媒体索引的文件链接到当前目录
+            _, shared = self.media_flights.do(url, self._fetch_media_file_sync, url, local_path)
+            if shared and not self.media_store.link_existing(url, local_path):
+                self._fetch_media_file_sync(url, local_path)
 
             self.stats["media_downloaded"] += 1
             return str(local_path.relative_to(local_dir))
@@ -3908,6 +5172,30 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             self.stats["media_failed"] += 1
             return url
 
+    def _fetch_media_file_sync(self, url, local_path):
+        """用requests下载媒体到local_path并登记到媒体索引"""
+        media_headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept": "image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Referer": "https://www.ifixit.com/",
+            "Origin": "https://www.ifixit.com",
+            "Sec-Fetch-Dest": "image",
+            "Sec-Fetch-Mode": "no-cors",
+            "Sec-Fetch-Site": "same-site",
+            "Cache-Control": "no-cache",
+            "Pragma": "no-cache"
+        }
+        response = self._get_thread_session().get(url, headers=media_headers, timeout=5, verify=False)
+        response.raise_for_status()
+
+        # 保存文件
+        with open(local_path, 'wb') as f:
+            f.write(response.content)
+        self.media_store.ingest(url, local_path)
+        return True
+
     def _process_media_urls_sync_fallback(self, data, local_dir):
         """同步处理媒体URL的回退方案"""
         if isinstance(data, dict):
@@ -4253,90 +5541,79 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
         return node
 
+    def _what_you_need_from_rendered_page(self, guide_url):
+        """静态页面中没有What You Need数据时渲染页面，并按多种方法提取（父类只读取React props）"""
+        return self.extract_what_you_need_enhanced(guide_url)
+
     def extract_what_you_need_enhanced(self, guide_url):
         """
         增强版"What You Need"部分提取方法，确保真实页面访问和数据完整性
+        渲染完整页面后按多种方法提取，静态页面中没有该部分数据时使用
         """
         if not guide_url:
             return {}
 
         print(f"    增强提取What You Need: {guide_url}")
 
-        try:
-            # 使用Playwright获取完整渲染的页面
-            from playwright.sync_api import sync_playwright
-
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
+        # 回放模式使用归档的渲染结果，不启动浏览器
+        if self._is_replaying():
+            html = self._load_rendered_html(guide_url)
+            if not html:
+                return {}
+            what_you_need = self._extract_what_you_need_from_soup(make_soup(html))
+            if what_you_need:
+                print(f"    成功提取到: {list(what_you_need.keys())}")
+            else:
+                print("    未找到What You Need数据")
+            return what_you_need
 
-                # 设置请求头确保英文内容 - 强制英文版本
-                page.set_extra_http_headers({
-                    'Accept-Language': 'en-US,en;q=1.0',  # 强制英文，提高优先级
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Cookie': 'locale=en'  # 添加英文locale cookie
-                })
+        try:
+            # 使用浏览器池获取完整渲染的页面（上下文已预置英文locale），多等待一段时间确保完全加载
+            self._record_fetch(guide_url)
+            self.rate_limiter.acquire(guide_url)
+            status, html_content = self._get_browser_pool().render(guide_url, settle_ms=5000)
+            self.rate_limiter.record(guide_url, status)
+            self._archive_rendered_html(guide_url, status, html_content)
+
+            # 解析HTML
+            soup = make_soup(html_content)
+
+            # 尝试多种方法提取"What You Need"数据
+            what_you_need = self._extract_what_you_need_from_soup(soup)
+
+            if what_you_need:
+                print(f"    成功提取到: {list(what_you_need.keys())}")
+                # 验证数据完整性
+                total_items = sum(len(items) if isinstance(items, list) else 1
+                                for items in what_you_need.values())
+                print(f"    总计项目数: {total_items}")
+            else:
+                print("    未找到What You Need数据")
 
-                try:
-                    # 导航到页面并等待完全加载
-                    page.goto(guide_url, wait_until='networkidle')
+            return what_you_need
 
-                    # 强制设置英文语言
-                    page.evaluate("""
-                        // 设置localStorage中的语言偏好
-                        localStorage.setItem('locale', 'en');
-                        localStorage.setItem('language', 'en');
-                        localStorage.setItem('lang', 'en');
+        except Exception as e:
+            print(f"    增强提取失败: {str(e)}")
+            return {}
 
-                        // 设置cookie
-                        document.cookie = 'locale=en; path=/; domain=.ifixit.com';
-                        document.cookie = 'language=en; path=/; domain=.ifixit.com';
-                    """)
+    def _extract_what_you_need_from_soup(self, soup):
+        """按准确度依次尝试多种方法，从已解析的页面中提取"What You Need"数据"""
+        # 方法1：从React组件的data-props中提取（最准确）
+        what_you_need = self._extract_from_react_props_enhanced(soup)
 
-                    page.wait_for_timeout(5000)  # 增加等待时间确保完全加载
+        # 方法2：如果React方法失败，尝试从页面的What You Need区域提取
+        if not what_you_need:
+            what_you_need = self._extract_from_what_you_need_section(soup)
 
-                    # 获取页面HTML
-                    html_content = page.content()
-                    
-                    # 解析HTML
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html_content, 'html.parser')
-
-                    # 尝试多种方法提取"What You Need"数据
-                    what_you_need = {}
-
-                    # 方法1：从React组件的data-props中提取（最准确）
-                    what_you_need = self._extract_from_react_props_enhanced(soup)
-
-                    # 方法2：如果React方法失败，尝试从页面的What You Need区域提取
-                    if not what_you_need:
-                        what_you_need = self._extract_from_what_you_need_section(soup)
-
-                    # 方法3：如果仍然失败，尝试从页面的产品链接提取
-                    if not what_you_need:
-                        what_you_need = self._extract_from_product_links(soup)
-
-                    # 方法4：最后尝试从页面文本中提取
-                    if not what_you_need:
-                        what_you_need = self._extract_from_page_text(soup)
-
-                    if what_you_need:
-                        print(f"    成功提取到: {list(what_you_need.keys())}")
-                        # 验证数据完整性
-                        total_items = sum(len(items) if isinstance(items, list) else 1
-                                        for items in what_you_need.values())
-                        print(f"    总计项目数: {total_items}")
-                    else:
-                        print(f"    未找到What You Need数据")
+        # 方法3：如果仍然失败，尝试从页面的产品链接提取
+        if not what_you_need:
+            what_you_need = self._extract_from_product_links(soup)
 
-                    return what_you_need
-                finally:
-                    # 确保浏览器关闭，即使发生异常
-                    browser.close()
+        # 方法4：最后尝试从页面文本中提取
+        if not what_you_need:
+            what_you_need = self._extract_from_page_text(soup)
 
-        except Exception as e:
-            print(f"    增强提取失败: {str(e)}")
-            return {}
+        return what_you_need
 
     def _extract_from_react_props_enhanced(self, soup):
         """从React组件的data-props中提取What you need数据（增强版）"""
@@ -4360,12 +5637,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     data_props = component.get('data-props')
                     if data_props:
                         try:
-                            import json
-                            import html
-
-                            # HTML解码并解析JSON
-                            decoded_props = html.unescape(data_props)
-                            props_data = json.loads(decoded_props)
+                            props_data = decode_props(data_props) or {}
 
                             # 提取productData
                             product_data = props_data.get('productData', {})
@@ -5161,10 +6433,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         except Exception:
             return False
 
-    def extract_guide_content(self, guide_url):
+    def extract_guide_content(self, guide_url, soup=None, html=None):
         """重写父类方法，使用简化的图片过滤逻辑"""
-        # 调用父类方法获取基本内容
-        guide_data = super().extract_guide_content(guide_url)
+        # 调用父类方法获取基本内容（传入已获取的页面时不再重复请求）
+        guide_data = super().extract_guide_content(guide_url, soup=soup, html=html)
 
         if not guide_data:
             return None
@@ -5226,321 +6498,336 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
         return text.strip()
 
-    async def crawl_combined_tree_async(self, start_url, category_name=None):
+    def crawl_combined_tree(self, start_url, category_name=None):
         """
-        异步整合爬取：构建树形结构并为每个节点提取详细内容
+        整合爬取：构建树形结构并为每个节点提取详细内容
         """
-        print(f"🚀 开始异步整合爬取: {start_url}")
-        print("=" * 60)
-
-        # 初始化异步HTTP客户端
-        await self._init_async_http_manager()
-
-        try:
-            # 设置目标URL
-            self.target_url = start_url
-
-            # 智能缓存预检查
-            if self.cache_manager and self.use_cache and not self.force_refresh:
-                print("🔍 执行智能缓存预检查...")
-                self._perform_cache_precheck(start_url, category_name)
-                self.cache_manager.display_cache_report()
+        print(f"🚀 开始爬取: {start_url}")
 
-            try:
-                # 第一步：使用 tree_crawler 逻辑构建基础树结构
-                print("📊 阶段 1/3: 构建基础树形结构...")
-                print("   正在分析页面结构和分类层次...")
-                base_tree = await self._crawl_tree_async(start_url, category_name)
+        # 设置目标URL
+        self.target_url = start_url
 
-                if not base_tree:
-                    print("❌ 无法构建基础树结构")
-                    return None
+        # 启动并发自动调优，收敛结果与代理方案一起记录
+        if self.use_proxy and self.proxy_manager:
+            proxy_plan = f"隧道代理池({self.proxy_manager.pool_size})"
+        else:
+            proxy_plan = "直连"
+        self.autotuner.start(f"{self.engine}引擎/{proxy_plan}")
 
-                print(f"✅ 基础树结构构建完成")
-                print("=" * 60)
+        # 第一步：构建基础树结构
+        print("📊 阶段 1/2: 构建树形结构...")
+        base_tree = self.tree_crawler.crawl_tree(start_url, category_name)
 
-                # 第二步：为树中的每个节点提取详细内容
-                print("📝 阶段 2/3: 为每个节点提取详细内容...")
-                print("   正在处理节点基本信息和元数据...")
-                enriched_tree = await self._enrich_tree_with_detailed_content_async(base_tree)
+        if not base_tree:
+            print("❌ 无法构建树结构")
+            return None
 
-                # 第三步：对于产品页面，深入爬取其指南和故障排除内容
-                print("🔍 阶段 3/3: 深入爬取产品页面的子内容...")
-                print("   正在提取指南和故障排除详细信息...")
-                final_tree = await self._deep_crawl_product_content_async(enriched_tree)
+        print(f"✅ 树结构构建完成")
 
-                return final_tree
-            except Exception as e:
-                self.logger.error(f"✗ 爬取过程中发生错误: {e}")
-                print(f"✗ 爬取过程中发生错误: {e}")
-                # 返回已经爬取的数据，避免完全失败
-                return None
+        # 第二步：逐步提取内容并保存到正确的目录结构
+        if self.engine == 'async':
+            print("📝 阶段 2/2: 异步提取内容并保存...")
+            final_tree = asyncio.run(self._process_tree_and_save_async(base_tree))
+        else:
+            print("📝 阶段 2/2: 提取内容并保存...")
+            final_tree = self._process_tree_and_save_incrementally(base_tree)
 
-        finally:
-            # 确保关闭异步HTTP客户端
-            await self._close_async_http_manager()
+        # 媒体文件在后台队列中下载，阶段结束前等待全部完成并回写
+        self.wait_for_media_downloads()
+        self.autotuner.stop()
 
-    async def _crawl_tree_async(self, start_url, category_name=None):
-        """异步版本的树形结构构建"""
-        # 这里可以调用现有的tree_crawler，因为它主要是数据处理
-        # 或者我们可以创建一个异步版本
-        return self.tree_crawler.crawl_tree(start_url, category_name)
-
-    async def _enrich_tree_with_detailed_content_async(self, tree):
-        """异步版本的树节点内容丰富化"""
-        # 使用异步方法处理每个节点
-        return await self._enrich_node_async(tree)
-
-    async def _enrich_node_async(self, node):
-        """异步处理单个节点的内容丰富化"""
-        if isinstance(node, dict):
-            # 如果节点有URL，异步获取详细内容
-            if 'url' in node and node['url']:
-                try:
-                    soup = await self.get_soup_async(node['url'])
-                    if soup:
-                        # 提取节点的详细信息
-                        node = await self._extract_node_details_async(node, soup)
-                except httpx.HTTPStatusError as e:
-                    if e.response and e.response.status_code == 404:
-                        self.logger.warning(f"页面不存在 {node.get('url', '')}: 404 Not Found")
-                        print(f"⚠️ 页面不存在: {node.get('url', '')}")
-                        # 标记节点为无效但继续处理
-                        node['valid'] = False
-                        node['error'] = "404 Not Found"
-                    else:
-                        self.logger.error(f"异步处理节点失败 {node.get('url', '')}: {e}")
-                except Exception as e:
-                    self.logger.error(f"异步处理节点失败 {node.get('url', '')}: {e}")
-                    # 标记节点但不中断处理
-                    node['error'] = str(e)
+        return final_tree
 
-            # 递归处理子节点
-            if 'children' in node and node['children']:
-                # 并发处理所有子节点
-                child_tasks = [self._enrich_node_async(child) for child in node['children']]
-                try:
-                    node['children'] = await asyncio.gather(*child_tasks, return_exceptions=True)
+    def _process_tree_and_save_incrementally(self, tree_data):
+        """逐步处理树结构并保存到正确的目录结构"""
+        if not tree_data:
+            return None
 
-                    # 过滤掉异常结果，但记录错误
-                    filtered_children = []
-                    for child in node['children']:
-                        if isinstance(child, Exception):
-                            self.logger.error(f"子节点处理失败: {child}")
-                        else:
-                            filtered_children.append(child)
-                    node['children'] = filtered_children
-                except Exception as e:
-                    self.logger.error(f"处理子节点时发生错误: {e}")
-                    # 保留现有子节点，不让整个处理失败
+        # 构建基础目录路径
+        base_path = self._build_base_path_from_url(self.target_url)
 
-        return node
+        # 内容线程池按上限创建，各节点的指南/故障排除任务在其中执行，并发度由自动调优器的工作线程闸门控制
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="content-worker") as executor:
+            self.content_executor = executor
+            try:
+                # 递归处理树结构，逐步保存每个节点
+                processed_tree = self._process_node_incrementally(tree_data, base_path, [])
+            finally:
+                self.content_executor = None
 
-    async def _extract_node_details_async(self, node, soup):
-        """异步提取节点详细信息"""
-        # 这里可以添加具体的节点信息提取逻辑
-        # 目前保持原有逻辑
-        return node
+        return processed_tree
 
-    async def _deep_crawl_product_content_async(self, tree):
-        """异步深入爬取产品页面内容"""
-        return await self._deep_crawl_node_async(tree)
+    def _build_base_path_from_url(self, url):
+        """从URL构建基础路径 - 修复版本"""
+        # 始终返回Device根目录，让树结构决定完整路径
+        return Path(self.storage_root) / "Device"
 
-    async def _deep_crawl_node_async(self, node):
-        """异步深入爬取单个节点的产品内容"""
-        if isinstance(node, dict):
-            # 如果是产品页面，提取指南和故障排除内容
-            if node.get('type') == 'product' and node.get('url'):
-                try:
-                    # 使用现有的异步并发处理方法
-                    guides_data, troubleshooting_data = await self._extract_product_content_async(node['url'])
+    def _process_node_incrementally(self, node, base_path, path_segments):
+        """递归处理节点，逐步保存内容 - 增强缓存检查"""
+        if not node or not isinstance(node, dict):
+            return node
 
-                    if guides_data:
-                        node['guides'] = guides_data
-                    if troubleshooting_data:
-                        node['troubleshooting'] = troubleshooting_data
+        node_name = node.get('name', 'Unknown')
+        node_url = node.get('url', '')
 
-                except Exception as e:
-                    self.logger.error(f"异步提取产品内容失败 {node['url']}: {e}")
+        # 构建当前节点的路径段和完整路径
+        current_segments, node_path = self._build_node_path(node, base_path, path_segments)
 
-            # 递归处理子节点
-            if 'children' in node and node['children']:
-                child_tasks = [self._deep_crawl_node_async(child) for child in node['children']]
-                node['children'] = await asyncio.gather(*child_tasks, return_exceptions=True)
+        # 检查是否需要处理当前节点
+        if node_url and not node_url in self.processed_nodes:
+            # 🔍 增强缓存检查 - 检查持久化缓存
+            if self._check_cache_validity(node_url, node_path):
+                self.stats["cache_hits"] += 1
+                if self.verbose:
+                    print(f"✅ 缓存命中，跳过处理: {' > '.join(current_segments)}")
+                else:
+                    print(f"   ✅ 跳过已缓存: {node_name}")
 
-                # 过滤掉异常结果
-                node['children'] = [child for child in node['children']
-                                  if not isinstance(child, Exception)]
+                # 从缓存加载数据
+                enriched_node = self._merge_cached_node_data(node, node_path)
 
-        return node
+                self.processed_nodes.add(node_url)
+            else:
+                # 缓存未命中，需要重新处理
+                if self.verbose:
+                    print(f"📦 处理: {' > '.join(current_segments)}")
 
-    async def _extract_product_content_async(self, product_url):
-        """异步提取产品页面的指南和故障排除内容"""
-        try:
-            soup = await self.get_soup_async(product_url)
-            if not soup:
-                return [], []
+                # 背压：媒体下载积压过多时先等待队列消化，再抓取新页面
+                self.media_queue.wait_for_capacity()
 
-            # 使用现有的内容提取逻辑
-            guides_data = []
-            troubleshooting_data = []
+                # 提取节点内容
+                enriched_node = self._extract_node_content(node)
 
-            # 查找指南和故障排除链接
-            guide_links = []
-            troubleshooting_links = []
+                # 如果有内容，立即保存
+                if self._has_content(enriched_node):
+                    self._save_node_immediately(enriched_node, node_path)
 
-            # 这里可以添加具体的链接提取逻辑
-            # 目前使用现有的方法作为参考
+                    # 添加到缓存索引
+                    self._add_saved_node_to_cache(enriched_node, node_url, node_path)
 
-            # 如果有链接，使用异步并发处理
-            if guide_links or troubleshooting_links:
-                tasks = []
-                for url in guide_links:
-                    tasks.append(('guide', url))
-                for url in troubleshooting_links:
-                    tasks.append(('troubleshooting', url))
+                self.processed_nodes.add(node_url)
+        else:
+            enriched_node = node
 
-                if tasks:
-                    guides_data, troubleshooting_data = await self._process_tasks_async(
-                        tasks, guides_data, troubleshooting_data)
+        # 递归处理子节点
+        if 'children' in enriched_node and enriched_node['children']:
+            for i, child in enumerate(enriched_node['children']):
+                enriched_node['children'][i] = self._process_node_incrementally(
+                    child, base_path, current_segments
+                )
 
-            return guides_data, troubleshooting_data
+        return enriched_node
 
-        except Exception as e:
-            self.logger.error(f"异步提取产品内容失败 {product_url}: {e}")
-            return [], []
+    def _build_node_path(self, node, base_path, path_segments):
+        """根据父路径段构建节点的路径段和完整目录路径"""
+        node_name = node.get('name', 'Unknown')
 
-    def crawl_combined_tree(self, start_url, category_name=None):
-        """
-        整合爬取：构建树形结构并为每个节点提取详细内容
-        """
-        print(f"🚀 开始爬取: {start_url}")
+        current_segments = path_segments.copy()
+        if node_name and node_name.lower() != 'device':
+            current_segments.append(node_name)
 
-        # 设置目标URL
-        self.target_url = start_url
+        node_path = base_path
+        for segment in current_segments:
+            safe_segment = self._clean_directory_name(segment)
+            node_path = node_path / safe_segment
 
-        # 第一步：构建基础树结构
-        print("📊 阶段 1/2: 构建树形结构...")
-        base_tree = self.tree_crawler.crawl_tree(start_url, category_name)
+        return current_segments, node_path
 
-        if not base_tree:
-            print("❌ 无法构建树结构")
-            return None
+    def _merge_cached_node_data(self, node, node_path):
+        """从缓存加载节点数据并合并到节点中（保留原始children结构）"""
+        try:
+            cached_node = self._load_cached_node_data(node_path)
+            if cached_node:
+                for key, value in cached_node.items():
+                    if key not in ['children']:
+                        node[key] = value
+        except Exception as e:
+            if self.verbose:
+                print(f"   ⚠️ 缓存加载失败: {e}")
+        return node
 
-        print(f"✅ 树结构构建完成")
+    def _add_saved_node_to_cache(self, enriched_node, node_url, node_path):
+        """将已保存的节点登记到缓存索引"""
+        if not self.cache_manager:
+            return
 
-        # 第二步：逐步提取内容并保存到正确的目录结构
-        print("📝 阶段 2/2: 提取内容并保存...")
-        final_tree = self._process_tree_and_save_incrementally(base_tree)
+        try:
+            # 统计内容
+            guides_count = len(enriched_node.get('guides', []))
+            troubleshooting_count = len(enriched_node.get('troubleshooting', []))
+            media_count = self._count_media_files_in_path(node_path)
 
-        return final_tree
+            self.cache_manager.add_to_cache(
+                node_url, node_path,
+                guides_count=guides_count,
+                troubleshooting_count=troubleshooting_count,
+                media_count=media_count
+            )
+        except Exception as e:
+            if self.verbose:
+                print(f"   ⚠️ 添加到缓存失败: {e}")
 
-    def _process_tree_and_save_incrementally(self, tree_data):
-        """逐步处理树结构并保存到正确的目录结构"""
+    async def _process_tree_and_save_async(self, tree_data):
+        """异步引擎：在同一个事件循环上处理整棵树的逐设备内容阶段"""
         if not tree_data:
             return None
 
-        # 构建基础目录路径
-        base_path = self._build_base_path_from_url(self.target_url)
-
-        # 递归处理树结构，逐步保存每个节点
-        processed_tree = self._process_node_incrementally(tree_data, base_path, [])
-
-        return processed_tree
+        # 初始化共享的异步HTTP客户端，其信号量是整个阶段唯一的并发预算
+        if not await self._init_async_http_manager():
+            print("❌ 异步HTTP客户端初始化失败，回退到线程模式")
+            return await asyncio.to_thread(self._process_tree_and_save_incrementally, tree_data)
 
-    def _build_base_path_from_url(self, url):
-        """从URL构建基础路径 - 修复版本"""
-        # 始终返回Device根目录，让树结构决定完整路径
-        return Path(self.storage_root) / "Device"
+        try:
+            print(f"   🔄 异步并发预算: {self.async_http_manager.max_connections} 个在途请求")
+            base_path = self._build_base_path_from_url(self.target_url)
+            return await self._process_node_async(tree_data, base_path, [])
+        finally:
+            await self._close_async_http_manager()
 
-    def _process_node_incrementally(self, node, base_path, path_segments):
-        """递归处理节点，逐步保存内容 - 增强缓存检查"""
+    async def _process_node_async(self, node, base_path, path_segments):
+        """异步递归处理节点：兄弟节点并发处理，保存路径与同步版本一致"""
         if not node or not isinstance(node, dict):
             return node
 
         node_name = node.get('name', 'Unknown')
         node_url = node.get('url', '')
+        current_segments, node_path = self._build_node_path(node, base_path, path_segments)
 
-        # 构建当前节点的路径段
-        current_segments = path_segments.copy()
-        if node_name and node_name.lower() != 'device':
-            current_segments.append(node_name)
-
-        # 构建当前节点的完整路径
-        node_path = base_path
-        for segment in current_segments:
-            safe_segment = self._clean_directory_name(segment)
-            node_path = node_path / safe_segment
+        enriched_node = node
+        if node_url and node_url not in self.processed_nodes:
+            # 先登记，避免并发的兄弟节点重复处理同一URL
+            self.processed_nodes.add(node_url)
 
-        # 检查是否需要处理当前节点
-        if node_url and not node_url in self.processed_nodes:
-            # 🔍 增强缓存检查 - 检查持久化缓存
-            if self._check_cache_validity(node_url, node_path):
+            # 缓存检查涉及文件系统遍历，放到工作线程执行
+            if await asyncio.to_thread(self._check_cache_validity, node_url, node_path):
                 self.stats["cache_hits"] += 1
                 if self.verbose:
                     print(f"✅ 缓存命中，跳过处理: {' > '.join(current_segments)}")
                 else:
                     print(f"   ✅ 跳过已缓存: {node_name}")
-
-                # 从缓存加载数据
-                try:
-                    cached_node = self._load_cached_node_data(node_path)
-                    if cached_node:
-                        # 更新节点数据，但保留原始children结构
-                        for key, value in cached_node.items():
-                            if key not in ['children']:
-                                node[key] = value
-                        enriched_node = node
-                    else:
-                        enriched_node = node
-                except Exception as e:
-                    if self.verbose:
-                        print(f"   ⚠️ 缓存加载失败: {e}")
-                    enriched_node = node
-
-                self.processed_nodes.add(node_url)
+                enriched_node = await asyncio.to_thread(self._merge_cached_node_data, node, node_path)
             else:
-                # 缓存未命中，需要重新处理
                 if self.verbose:
                     print(f"📦 处理: {' > '.join(current_segments)}")
 
-                # 提取节点内容
-                enriched_node = self._extract_node_content(node)
+                enriched_node = await self._extract_node_content_async(node)
 
-                # 如果有内容，立即保存
                 if self._has_content(enriched_node):
-                    self._save_node_immediately(enriched_node, node_path)
+                    await self._save_node_async(enriched_node, node_path)
+                    await asyncio.to_thread(self._add_saved_node_to_cache, enriched_node, node_url, node_path)
 
-                    # 添加到缓存索引
-                    if self.cache_manager:
-                        try:
-                            # 统计内容
-                            guides_count = len(enriched_node.get('guides', []))
-                            troubleshooting_count = len(enriched_node.get('troubleshooting', []))
-                            media_count = self._count_media_files_in_path(node_path)
-
-                            self.cache_manager.add_to_cache(
-                                node_url, node_path,
-                                guides_count=guides_count,
-                                troubleshooting_count=troubleshooting_count,
-                                media_count=media_count
-                            )
-                        except Exception as e:
-                            if self.verbose:
-                                print(f"   ⚠️ 添加到缓存失败: {e}")
+        # 并发处理子节点，gather保持原有顺序
+        children = enriched_node.get('children')
+        if children:
+            results = await asyncio.gather(
+                *[self._process_node_async(child, base_path, current_segments) for child in children],
+                return_exceptions=True
+            )
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"异步处理子节点失败 {children[i].get('url', '') if isinstance(children[i], dict) else ''}: {result}")
+                else:
+                    children[i] = result
 
-                self.processed_nodes.add(node_url)
-        else:
-            enriched_node = node
+        return enriched_node
 
-        # 递归处理子节点
-        if 'children' in enriched_node and enriched_node['children']:
-            for i, child in enumerate(enriched_node['children']):
-                enriched_node['children'][i] = self._process_node_incrementally(
-                    child, base_path, current_segments
-                )
+    async def _extract_node_content_async(self, node):
+        """异步提取节点的guide和troubleshooting完整内容，所有子页面并发获取"""
+        url = node.get('url', '')
+        if not url:
+            return node
 
-        return enriched_node
+        try:
+            # 设备页只需要指南和故障排除链接，使用链接扫描模式
+            soup = await self.get_link_soup_async(url)
+            if not soup:
+                return node
+
+            guides_basic = self.extract_guides_from_device_page(soup, url)
+            troubleshooting_basic = self.extract_troubleshooting_from_device_page(soup, url)
+
+            enriched_node = node.copy()
+
+            async def detail_or_basic(task_func, info):
+                # 详细提取失败时，至少保留基本信息
+                item_url = info.get('url', '')
+                if not item_url:
+                    return info
+                detailed = await task_func(item_url)
+                return detailed if detailed else info
+
+            guide_tasks = [detail_or_basic(self._process_guide_task_async, info) for info in guides_basic]
+            ts_tasks = [detail_or_basic(self._process_troubleshooting_task_async, info) for info in troubleshooting_basic]
+
+            results = await asyncio.gather(*guide_tasks, *ts_tasks)
+            if guides_basic:
+                enriched_node['guides'] = list(results[:len(guide_tasks)])
+            if troubleshooting_basic:
+                enriched_node['troubleshooting'] = list(results[len(guide_tasks):])
+                # 只把详细提取成功的故障排除记录到设备的反向索引
+                detailed_ts = [item for item, info in zip(enriched_node['troubleshooting'], troubleshooting_basic)
+                               if item is not info]
+                if detailed_ts:
+                    await asyncio.to_thread(self.troubleshooting_store.set_device, url, detailed_ts)
+
+            return enriched_node
+
+        except Exception as e:
+            self.logger.error(f"异步提取节点内容失败 {url}: {e}")
+            return node
+
+    async def _save_node_async(self, node, node_path):
+        """异步保存节点内容，媒体文件在同一事件循环上并发下载"""
+        try:
+            node_path.mkdir(parents=True, exist_ok=True)
+
+            info_data = {k: v for k, v in node.items()
+                        if k not in ['children', 'guides', 'troubleshooting']}
+            with open(node_path / "info.json", 'w', encoding='utf-8') as f:
+                safe_json_dump(info_data, f, ensure_ascii=False, indent=2)
+
+            save_tasks = []
+            for i, guide in enumerate(node.get('guides') or []):
+                save_tasks.append(self._save_content_item_async(
+                    guide, node_path / "guides" / f"guide_{i+1}", "guide.json"))
+            for i, ts in enumerate(node.get('troubleshooting') or []):
+                save_tasks.append(self._save_content_item_async(
+                    ts, node_path / "troubleshooting" / f"troubleshooting_{i+1}", "troubleshooting.json"))
+
+            if save_tasks:
+                await asyncio.gather(*save_tasks)
+
+            if self.verbose:
+                print(f"   ✅ 已保存到: {node_path}")
+
+        except Exception as e:
+            if self.verbose:
+                print(f"   ❌ 保存失败: {e}")
+
+    async def _save_content_item_async(self, item, item_dir, file_name):
+        """下载单个guide/troubleshooting的媒体文件后写入JSON
+
+        指南与线程引擎一样只在全局指南存储中保存一份，设备目录下的guide.json硬链接到规范副本；
+        所有JSON都先写临时文件再替换，不会通过已有的硬链接改写其他设备共享的副本
+        """
+        item_dir.mkdir(parents=True, exist_ok=True)
+        item_file = item_dir / file_name
+        self.traffic_meter.count_item(file_name.rsplit('.', 1)[0])
+
+        guide_id = GuideStore.guide_id_from_url(item.get('url')) if file_name == "guide.json" else None
+        if guide_id:
+            store_file = await asyncio.to_thread(self.guide_store.save, guide_id, item, item_file)
+            if store_file is None:
+                return
+            # 媒体下载到存储目录，完成后原子回写规范副本并重新链接所有设备目录
+            await self._process_media_urls_async(item, store_file.parent)
+            await asyncio.to_thread(atomic_json_write, store_file, item, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(self._complete_stored_guide, guide_id)
+            return
+
+        # 处理媒体文件
+        await self._process_media_urls_async(item, item_dir)
+        await asyncio.to_thread(atomic_json_write, item_file, item, ensure_ascii=False, indent=2)
 
     def _count_media_files_in_path(self, node_path):
         """统计指定路径下的媒体文件数量"""
@@ -5556,14 +6843,17 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             return 0
 
     def _extract_node_content(self, node):
-        """提取节点的详细内容，包括guide和troubleshooting的完整内容"""
+        """提取节点的详细内容，包括guide和troubleshooting的完整内容
+
+        各指南和故障排除页面提交到内容线程池并发处理，同时执行的任务数由自动调优器的工作线程闸门控制
+        """
         url = node.get('url', '')
         if not url:
             return node
 
         try:
-            # 简化版本：直接提取内容，不使用复杂缓存
-            soup = self.get_soup(url)
+            # 设备页只需要指南和故障排除链接，使用链接扫描模式
+            soup = self.get_link_soup(url)
             if not soup:
                 return node
 
@@ -5574,47 +6864,38 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             # 更新节点数据
             enriched_node = node.copy()
 
-            # 为每个guide提取详细内容
-            if guides_basic:
-                detailed_guides = []
-                for guide_info in guides_basic:
-                    guide_url = guide_info.get('url', '')
-                    if guide_url:
-                        if self.verbose:
-                            print(f"   📖 提取guide详细内容: {guide_info.get('title', 'Unknown')}")
-
-                        # 提取详细的guide内容
-                        detailed_guide = self.extract_guide_content(guide_url)
-                        if detailed_guide:
-                            detailed_guides.append(detailed_guide)
-                        else:
-                            # 如果详细提取失败，至少保留基本信息
-                            detailed_guides.append(guide_info)
-                    else:
-                        detailed_guides.append(guide_info)
-
-                enriched_node['guides'] = detailed_guides
+            def detail_or_basic(kind, info):
+                # 详细提取失败时，至少保留基本信息
+                item_url = info.get('url', '')
+                if not item_url:
+                    return info
+                if kind == 'guide':
+                    if self.verbose:
+                        print(f"   📖 提取guide详细内容: {info.get('title', 'Unknown')}")
+                    # 全局指南存储已有时直接复用，否则获取页面交给解析进程池（并发的相同指南只处理一次）
+                    detailed = self._run_tuned_task(self._process_guide_task, item_url)
+                else:
+                    if self.verbose:
+                        print(f"   🔧 提取troubleshooting详细内容: {info.get('title', 'Unknown')}")
+                    # 全局故障排除存储已有时直接复用（子型号不再重复抓取），否则抓取提取后写入存储
+                    detailed = self._run_tuned_task(self._process_troubleshooting_task, item_url)
+                return detailed if detailed else info
+
+            tasks = [('guide', info) for info in guides_basic] + [('troubleshooting', info) for info in troubleshooting_basic]
+            if self.content_executor and len(tasks) > 1:
+                results = list(self.content_executor.map(lambda task: detail_or_basic(*task), tasks))
+            else:
+                results = [detail_or_basic(*task) for task in tasks]
 
-            # 为每个troubleshooting提取详细内容
+            if guides_basic:
+                enriched_node['guides'] = results[:len(guides_basic)]
             if troubleshooting_basic:
-                detailed_troubleshooting = []
-                for ts_info in troubleshooting_basic:
-                    ts_url = ts_info.get('url', '')
-                    if ts_url:
-                        if self.verbose:
-                            print(f"   🔧 提取troubleshooting详细内容: {ts_info.get('title', 'Unknown')}")
-
-                        # 提取详细的troubleshooting内容
-                        detailed_ts = self.extract_troubleshooting_content(ts_url)
-                        if detailed_ts:
-                            detailed_troubleshooting.append(detailed_ts)
-                        else:
-                            # 如果详细提取失败，至少保留基本信息
-                            detailed_troubleshooting.append(ts_info)
-                    else:
-                        detailed_troubleshooting.append(ts_info)
-
-                enriched_node['troubleshooting'] = detailed_troubleshooting
+                enriched_node['troubleshooting'] = results[len(guides_basic):]
+                # 只把详细提取成功的故障排除记录到设备的反向索引
+                detailed_ts = [item for item, info in zip(enriched_node['troubleshooting'], troubleshooting_basic)
+                               if item is not info]
+                if detailed_ts:
+                    self.troubleshooting_store.set_device(url, detailed_ts)
 
             return enriched_node
 
@@ -5665,13 +6946,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             guide_dir = guides_dir / f"guide_{i+1}"
             guide_dir.mkdir(exist_ok=True)
 
-            # 处理媒体文件
-            self._process_media_urls(guide, guide_dir)
-
-            # 保存guide文件
-            guide_file = guide_dir / "guide.json"
-            with open(guide_file, 'w', encoding='utf-8') as f:
-                safe_json_dump(guide, f, ensure_ascii=False, indent=2)
+            # 保存guide文件，媒体文件由下载队列异步处理
+            self._save_item_with_media(guide, guide_dir, "guide.json")
 
     def _save_troubleshooting_to_directory(self, troubleshooting, base_path):
         """保存troubleshooting到目录"""
@@ -5682,13 +6958,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             ts_item_dir = ts_dir / f"troubleshooting_{i+1}"
             ts_item_dir.mkdir(exist_ok=True)
 
-            # 处理媒体文件
-            self._process_media_urls(ts, ts_item_dir)
-
-            # 保存troubleshooting文件
-            ts_file = ts_item_dir / "troubleshooting.json"
-            with open(ts_file, 'w', encoding='utf-8') as f:
-                safe_json_dump(ts, f, ensure_ascii=False, indent=2)
+            # 保存troubleshooting文件，媒体文件由下载队列异步处理
+            self._save_item_with_media(ts, ts_item_dir, "troubleshooting.json")
 
     def _perform_cache_precheck(self, start_url, category_name=None):
         """执行缓存预检查，分析哪些内容需要重新处理，并检测缺失的文件 - 通用版本"""
@@ -6119,7 +7390,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         self.processed_nodes.add(url)
         self.stats["cache_misses"] += 1
 
-        time.sleep(random.uniform(0.5, 1.0))
         soup = self.get_soup(url)
 
         # 确保所有节点都经过fix_node_data处理
@@ -6186,13 +7456,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     if ts_url:
                         tasks.append(('troubleshooting', ts_url))
 
-        # 使用线程池并发处理
-        if self.max_workers > 1 and len(tasks) > 1:
-            print(f"    🔄 启动并发处理 ({self.max_workers} 线程处理 {len(tasks)} 个任务)...")
-
         if len(tasks) > 0:
-            # 使用传统线程池作为后备方案
-            print(f"    🔄 启动线程池并发处理 ({self.max_workers} 线程处理 {len(tasks)} 个任务)...")
+            # 线程池按上限创建，同时执行的任务数由自动调优器的工作线程闸门控制
+            print(f"    🔄 启动线程池并发处理 (当前 {self.autotuner.workers.limit}/{self.max_workers} 线程处理 {len(tasks)} 个任务)...")
             with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
                 future_to_task = {}
                 completed_count = 0
@@ -6200,9 +7466,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
                 for i, (task_type, url) in enumerate(tasks):
                     if task_type == 'guide':
-                        future = executor.submit(self._process_guide_task_with_proxy, url, i)
+                        future = executor.submit(self._run_tuned_task, self._process_guide_task_with_proxy, url, i)
                     else:  # troubleshooting
-                        future = executor.submit(self._process_troubleshooting_task_with_proxy, url, i)
+                        future = executor.submit(self._run_tuned_task, self._process_troubleshooting_task_with_proxy, url, i)
                     future_to_task[future] = (task_type, url)
                     # 显示任务开始时间
                     current_time = time.strftime("%H:%M:%S", time.localtime())
@@ -6262,36 +7528,166 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
     def _process_guide_task(self, guide_url):
         """处理单个guide任务"""
         try:
-            guide_content = self.extract_guide_content(guide_url)
-            if guide_content:
-                guide_content['url'] = guide_url
-
-                # 确保"What You Need"部分被正确提取
-                if 'what_you_need' not in guide_content or not guide_content['what_you_need']:
-                    print(f"  重新尝试提取What You Need部分: {guide_url}")
-                    what_you_need = self.extract_what_you_need_enhanced(guide_url)
-                    if what_you_need:
-                        guide_content['what_you_need'] = what_you_need
-                        print(f"  成功提取What You Need: {list(what_you_need.keys())}")
-
-                return guide_content
+            stored = self._stored_guide(guide_url)
+            if stored is not None:
+                return stored
+            guide, shared = self.guide_flights.do(self._guide_flight_key(guide_url), self._crawl_guide, guide_url)
+            return copy.deepcopy(guide) if shared and guide else guide
         except Exception as e:
             self.logger.error(f"处理guide失败 {guide_url}: {e}")
             self._log_failed_url(guide_url, f"Guide处理失败: {str(e)}")
         return None
 
+    def _crawl_guide(self, guide_url):
+        if not self.is_allowed_by_robots(guide_url) or self.is_guide_processed(guide_url):
+            return None
+
+        # 当前线程只获取页面，解析和提取交给解析进程池
+        html = self.get_page_html(guide_url)
+        if not html:
+            return None
+
+        guide = self._run_extraction('guide', guide_url, html)
+        self.guide_store.remember(GuideStore.guide_id_from_url(guide_url), guide)
+        return guide
+
+    def _stored_guide(self, guide_url):
+        """全局指南存储中已有的指南（本次运行其他设备已提取，或之前运行已完整保存）直接复用，不再请求和提取"""
+        guide_id = GuideStore.guide_id_from_url(guide_url)
+        return self.guide_store.get(guide_id) if guide_id else None
+
+    @staticmethod
+    def _guide_flight_key(guide_url):
+        """同一指南的不同URL写法（标题段、语言参数）合并为同一个键"""
+        return GuideStore.guide_id_from_url(guide_url) or canonical_url(guide_url)
+
     def _process_troubleshooting_task(self, ts_url):
         """处理单个troubleshooting任务"""
         try:
-            ts_content = self.extract_troubleshooting_content(ts_url)
-            if ts_content:
-                ts_content['url'] = ts_url
-                return ts_content
+            stored = self.troubleshooting_store.get(ts_url)
+            if stored is not None:
+                return stored
+            ts_content, shared = self.troubleshooting_flights.do(
+                TroubleshootingStore.ts_id_from_url(ts_url), self._crawl_troubleshooting, ts_url)
+            return copy.deepcopy(ts_content) if shared and ts_content else ts_content
         except Exception as e:
             self.logger.error(f"处理troubleshooting失败 {ts_url}: {e}")
             self._log_failed_url(ts_url, f"Troubleshooting处理失败: {str(e)}")
         return None
 
+    def _crawl_troubleshooting(self, ts_url):
+        """抓取并提取故障排除页面，结果写入全局故障排除存储供其他设备复用"""
+        html = self.get_page_html(ts_url)
+        if not html:
+            return None
+
+        ts_content = self._run_extraction('troubleshooting', ts_url, html)
+        if ts_content:
+            self.troubleshooting_store.put(ts_url, ts_content)
+        return ts_content
+
+    def _extract_guide_from_page(self, guide_url, html):
+        """在已获取的页面上提取指南内容（解析进程池的工作进程与当前线程提取共用）"""
+        # 页面只解析一次，指南内容和What You Need共用同一个文档；原始HTML用于直接扫描组件数据
+        soup = make_soup(html)
+
+        # 静态页面中没有What You Need数据时，提取过程中会渲染一次页面补充（工作进程中交给主进程渲染）
+        guide_content = self.extract_guide_content(guide_url, soup=soup, html=html)
+        if guide_content:
+            guide_content['url'] = guide_url
+
+        return guide_content
+
+    def _extract_troubleshooting_from_page(self, ts_url, html):
+        """在已获取的页面上提取故障排除内容"""
+        ts_content = self.extract_troubleshooting_content(ts_url, html=html)
+        if ts_content:
+            ts_content['url'] = ts_url
+        return ts_content
+
+    def _extract_locally(self, kind, url, html):
+        if kind == 'guide':
+            return self._extract_guide_from_page(url, html)
+        return self._extract_troubleshooting_from_page(url, html)
+
+    def _claim_for_extraction(self, kind, url):
+        """交给进程池前在主进程登记指南已处理（工作进程的去重集合不会回传）"""
+        if kind == 'guide':
+            self.processed_guides.add(self._normalize_guide_url(self.ensure_english_url(url)))
+
+    def _reset_extraction_claim(self, kind, url):
+        if kind == 'guide':
+            self.processed_guides.discard(self._normalize_guide_url(self.ensure_english_url(url)))
+
+    @staticmethod
+    def _place_guide_fields(guide, anchor, fields, replace=()):
+        """把补充字段放回提取时的位置（紧跟anchor字段之后），replace中的旧字段先移除"""
+        placed = {}
+        for key, value in guide.items():
+            if key in replace or key in fields:
+                continue
+            placed[key] = value
+            if key == anchor:
+                placed.update(fields)
+        return placed
+
+    def _complete_deferred_lookups(self, kind, url, content, deferred):
+        """在主进程完成工作进程跳过的联网查询（指南API的时间难度、渲染页面的What You Need），
+        请求走当前线程的托管会话和浏览器池，受限速、代理健康、流量预算和归档统一管理"""
+        if kind != 'guide' or not content or not deferred:
+            return content
+
+        if 'time_difficulty' in deferred:
+            time_difficulty = self._time_difficulty_from_api(url)
+            if time_difficulty is None:
+                # 类型不应有时间和难度（teardown等），移除页面文本中匹配到的值
+                content = self._place_guide_fields(content, 'title', {}, replace=('time_required', 'difficulty'))
+            elif time_difficulty:
+                fields = {key: time_difficulty[key] for key in ('time_required', 'difficulty')
+                          if time_difficulty.get(key)}
+                content = self._place_guide_fields(content, 'title', fields,
+                                                   replace=('time_required', 'difficulty'))
+
+        if 'what_you_need' in deferred and not content.get('what_you_need'):
+            what_you_need = self._what_you_need_from_rendered_page(url)
+            if what_you_need:
+                content = self._place_guide_fields(content, 'introduction', {'what_you_need': what_you_need})
+
+        return content
+
+    def _run_extraction(self, kind, url, html):
+        """提取页面内容：启用进程池时交给工作进程，进程池不可用时回退到当前线程"""
+        if self.extraction_pool:
+            try:
+                self._claim_for_extraction(kind, url)
+                content, deferred = self.extraction_pool.run(kind, url, html)
+            except Exception as e:
+                self.logger.warning(f"解析进程池提取失败，回退到当前线程 {url}: {e}")
+                self._reset_extraction_claim(kind, url)
+            else:
+                return self._complete_deferred_lookups(kind, url, content, deferred)
+        return self._extract_locally(kind, url, html)
+
+    async def _run_extraction_async(self, kind, url, html):
+        """异步版本的_run_extraction，未启用进程池时在工作线程中提取"""
+        if self.extraction_pool:
+            try:
+                self._claim_for_extraction(kind, url)
+                content, deferred = await self.extraction_pool.run_async(kind, url, html)
+            except Exception as e:
+                self.logger.warning(f"解析进程池提取失败，回退到工作线程 {url}: {e}")
+                self._reset_extraction_claim(kind, url)
+            else:
+                if not deferred:
+                    return content
+                return await asyncio.to_thread(self._complete_deferred_lookups, kind, url, content, deferred)
+        return await asyncio.to_thread(self._extract_locally, kind, url, html)
+
+    def _run_tuned_task(self, func, *args):
+        """在自动调优器的工作线程闸门内执行任务"""
+        with self.autotuner.workers:
+            return func(*args)
+
     def _process_guide_task_with_proxy(self, guide_url, thread_id):
         """处理单个guide任务（带独立代理）"""
         try:
@@ -6302,19 +7698,11 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if not hasattr(thread_local, 'proxy_id'):
                 thread_local.proxy_id = thread_id
 
-            guide_content = self.extract_guide_content(guide_url)
-            if guide_content:
-                guide_content['url'] = guide_url
-
-                # 确保"What You Need"部分被正确提取
-                if 'what_you_need' not in guide_content or not guide_content['what_you_need']:
-                    print(f"  重新尝试提取What You Need部分: {guide_url}")
-                    what_you_need = self.extract_what_you_need_enhanced(guide_url)
-                    if what_you_need:
-                        guide_content['what_you_need'] = what_you_need
-                        print(f"  成功提取What You Need: {list(what_you_need.keys())}")
-
-                return guide_content
+            stored = self._stored_guide(guide_url)
+            if stored is not None:
+                return stored
+            guide, shared = self.guide_flights.do(self._guide_flight_key(guide_url), self._crawl_guide, guide_url)
+            return copy.deepcopy(guide) if shared and guide else guide
         except Exception as e:
             self.logger.error(f"处理guide失败 {guide_url}: {e}")
             self._log_failed_url(guide_url, f"Guide处理失败: {str(e)}")
@@ -6329,10 +7717,12 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             thread_local = threading.local()
             thread_local.proxy_id = thread_id
 
-            ts_content = self.extract_troubleshooting_content(ts_url)
-            if ts_content:
-                ts_content['url'] = ts_url
-                return ts_content
+            stored = self.troubleshooting_store.get(ts_url)
+            if stored is not None:
+                return stored
+            ts_content, shared = self.troubleshooting_flights.do(
+                TroubleshootingStore.ts_id_from_url(ts_url), self._crawl_troubleshooting, ts_url)
+            return copy.deepcopy(ts_content) if shared and ts_content else ts_content
         except Exception as e:
             self.logger.error(f"处理troubleshooting失败 {ts_url}: {e}")
             self._log_failed_url(ts_url, f"Troubleshooting处理失败: {str(e)}")
@@ -6382,21 +7772,16 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 url_hash = self.cache_manager.get_url_hash(url)
                 if url_hash in self.cache_manager.cache_index:
                     del self.cache_manager.cache_index[url_hash]
-                    self.cache_manager.save_cache_index()
                     print(f"    🗑️ 已从缓存索引中移除无效条目: {url}")
         except Exception as e:
             self.logger.error(f"标记缓存无效失败: {e}")
 
-    def _is_troubleshooting_cached(self, cache_key):
-        """检查troubleshooting是否已缓存"""
-        if not self.cache_manager:
-            return False
-        return self.cache_manager.is_troubleshooting_section_cached(cache_key, "")
-
     def _save_troubleshooting_cache(self, cache_key, device_url, troubleshooting_data):
-        """保存troubleshooting到缓存"""
+        """保存troubleshooting到全局故障排除存储（未启用缓存时也记录设备→故障排除ID，供保存阶段判断归属）"""
         if self.cache_manager:
             self.cache_manager.save_troubleshooting_cache(cache_key, device_url, troubleshooting_data)
+        elif troubleshooting_data and device_url:
+            self.troubleshooting_store.set_device(device_url, troubleshooting_data)
 
     def _print_performance_stats(self):
         """打印性能统计信息"""
@@ -6446,19 +7831,186 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             else:
                 print(f"   📏 大小限制: {self.max_video_size_mb}MB")
 
+        # 媒体下载队列统计
+        queue_stats = self.media_queue.get_stats()
+        if queue_stats['enqueued'] > 0:
+            print("📦 媒体下载队列:")
+            print(f"   📥 入队任务: {queue_stats['enqueued']} (完成 {queue_stats['completed']}, 失败 {queue_stats['failed']})")
+            print(f"   📏 当前深度: {queue_stats['depth']}/{queue_stats['max_size']}，峰值: {queue_stats['peak_depth']}")
+            if queue_stats['backpressure_waits'] > 0:
+                print(f"   🚦 背压等待: {queue_stats['backpressure_waits']} 次，共 {queue_stats['backpressure_seconds']:.1f}秒")
+
+        # 树构建链接扫描统计
+        tree_parse_stats = self.tree_crawler.parse_stats
+        if tree_parse_stats['link_scan'] + tree_parse_stats['full_parse'] > 0:
+            print("🔗 树构建解析:")
+            print(f"   ⚡ 链接扫描完成: {tree_parse_stats['link_scan']} 页，回退完整解析: {tree_parse_stats['full_parse']} 页")
+
+        # 解析进程池统计
+        if self.extraction_pool:
+            pool_stats = self.extraction_pool.get_stats()
+            if pool_stats['tasks'] > 0:
+                print("🧮 解析进程池:")
+                print(f"   ⚙️ 工作进程: {pool_stats['workers']} 个，提取页面 {pool_stats['tasks']} 个 (失败回退 {pool_stats['failures']})")
+                print(f"   ⏱️ 平均提取耗时: {pool_stats['avg_extract_seconds']:.2f}秒/页")
+
+        # 浏览器池统计
+        if self.browser_pool:
+            browser_stats = self.browser_pool.get_stats()
+            if browser_stats['renders'] > 0:
+                print("🌐 浏览器池:")
+                print(f"   📄 渲染页面: {browser_stats['renders']} (失败 {browser_stats['failures']})，平均 {browser_stats['avg_render_seconds']:.2f}秒/页")
+                print(f"   ♻️ 上下文: {browser_stats['contexts']} 个，创建 {browser_stats['contexts_created']} 次，回收 {browser_stats['contexts_recycled']} 次")
+                print(f"   🚫 拦截图片/字体/统计请求: {browser_stats['blocked_requests']}")
+
+        # 连接复用统计
+        session_stats = self.session_manager.get_stats()
+        if session_stats['requests'] > 0:
+            print("🔌 连接复用统计:")
+            print(f"   🧵 线程会话: 创建 {session_stats['sessions_created']} 个，因代理轮换重建 {session_stats['sessions_rebuilt']} 次")
+            print(f"   🆕 新建连接: {session_stats['new_connections']}")
+            print(f"   ♻️ 复用连接: {session_stats['reused_connections']}/{session_stats['requests']} ({session_stats['reuse_rate']:.1f}%)")
+
+        # 自适应限速统计
+        rate_stats = self.rate_limiter.get_stats()
+        if rate_stats:
+            print("🚦 自适应限速统计:")
+            for host, host_stats in sorted(rate_stats.items()):
+                print(f"   🌐 {host}: 当前 {host_stats['rate']:.1f} 请求/秒（峰值 {host_stats['peak_rate']:.1f}），"
+                      f"请求 {host_stats['requests']}，降速触发 {host_stats['backoffs']} 次，排队 {host_stats['waited_seconds']:.1f}秒")
+
+        # 并发自动调优统计
+        tuner = self.autotuner.get_summary()
+        print("🎛️ 并发自动调优:")
+        if not tuner['enabled']:
+            print(f"   ❌ 已禁用，固定使用上限 workers={tuner['max_workers']}, inflight={tuner['max_inflight']}, media={tuner['max_media']}")
+        else:
+            print(f"   🎯 收敛配置: workers={tuner['workers']}/{tuner['max_workers']}, "
+                  f"inflight={tuner['inflight']}/{tuner['max_inflight']}, media={tuner['media']}/{tuner['max_media']}")
+            print(f"   🌐 代理方案: {tuner['plan'] or '未知'}，目标错误率 < {tuner['target_error_rate']:.1%}，调整 {tuner['adjustments']} 次")
+            best = tuner['best']
+            if best:
+                print(f"   🏆 最佳观测: {best['throughput']:.2f} 请求/秒（p95 {best['p95']:.2f}s）于 "
+                      f"workers={best['workers']}, inflight={best['inflight']}, media={best['media']}")
+
+        # 原始响应归档统计
+        if self.response_archive:
+            archive_stats = self.response_archive.get_stats()
+            print("📼 响应归档统计:")
+            if self.response_archive.replay:
+                print(f"   ▶️ 回放命中: {archive_stats['replay_hits']}，未归档: {archive_stats['replay_misses']}")
+            else:
+                print(f"   💾 本次写入: {archive_stats['stored']} 条，"
+                      f"{archive_stats['stored_raw_bytes'] / 1024 / 1024:.1f}MB → {archive_stats['stored_compressed_bytes'] / 1024 / 1024:.1f}MB")
+            print(f"   📚 归档总量: {archive_stats.get('indexed_records', 0)} 条，"
+                  f"{archive_stats.get('segments', 0)} 个分段，{archive_stats.get('segment_bytes', 0) / 1024 / 1024:.1f}MB")
+
+        # 流量统计（实际传输的响应体字节数）
+        traffic_stats = self.traffic_meter.get_stats()
+        if traffic_stats['responses'] > 0:
+            print("📶 流量统计:")
+            budget_text = ""
+            if traffic_stats['budget_bytes']:
+                budget_text = (f" / 预算 {format_bytes(traffic_stats['budget_bytes'])}"
+                               f"（{TrafficMeter.PHASE_LABELS[traffic_stats['phase']]}）")
+            print(f"   📦 总流量: {format_bytes(traffic_stats['total_bytes'])}，响应 {traffic_stats['responses']} 个{budget_text}")
+            class_labels = {'html': 'HTML', 'json': 'JSON', 'image': '图片', 'video': '视频', 'other': '其他'}
+            for name, entry in sorted(traffic_stats['by_class'].items(), key=lambda item: item[1]['bytes'], reverse=True):
+                print(f"   📄 {class_labels[name]}: {format_bytes(entry['bytes'])} ({entry['responses']} 个响应)")
+            proxy_entries = sorted(traffic_stats['by_proxy'].items(), key=lambda item: item[1]['bytes'], reverse=True)
+            for key, entry in proxy_entries[:5]:
+                label = "直连/异步客户端" if key == DIRECT else f"代理#{key}"
+                print(f"   🌐 {label}: {format_bytes(entry['bytes'])} ({entry['responses']} 个响应)")
+            if len(proxy_entries) > 5:
+                print(f"   🌐 其余 {len(proxy_entries) - 5} 个代理: "
+                      f"{format_bytes(sum(entry['bytes'] for _, entry in proxy_entries[5:]))}")
+            if traffic_stats['bytes_per_guide'] is not None:
+                print(f"   📖 每个已保存指南: {format_bytes(traffic_stats['bytes_per_guide'])} "
+                      f"（共 {traffic_stats['items_saved'].get('guide', 0)} 个指南）")
+            if traffic_stats['media_skipped'] or traffic_stats['pages_skipped']:
+                print(f"   ⏭️ 预算限制跳过: 媒体 {traffic_stats['media_skipped']} 个，页面 {traffic_stats['pages_skipped']} 个")
+
+        # 页面抓取次数统计（理想情况下每个URL只抓取一次）
+        fetch_stats = self.get_fetch_stats()
+        if fetch_stats['unique_urls'] > 0:
+            print("📄 页面抓取统计:")
+            print(f"   🔗 唯一URL: {fetch_stats['unique_urls']}")
+            print(f"   📥 实际抓取: {fetch_stats['total_fetches']} (平均每URL {fetch_stats['fetches_per_url']:.2f} 次)")
+            repeated = fetch_stats['repeated_urls']
+            if repeated:
+                print(f"   ⚠️ 重复抓取的URL: {len(repeated)}")
+                for url, count in sorted(repeated.items(), key=lambda item: item[1], reverse=True)[:5]:
+                    print(f"      {count}x {url}")
+
+        # 运行期页面缓存统计
+        page_cache_stats = self.page_cache.get_stats()
+        if page_cache_stats['hits'] + page_cache_stats['misses'] > 0:
+            print("🗂️ 运行期页面缓存:")
+            print(f"   🎯 命中: {page_cache_stats['hits']}/{page_cache_stats['hits'] + page_cache_stats['misses']} "
+                  f"({page_cache_stats['hit_rate']:.1%})，节省页面 {format_bytes(page_cache_stats['bytes_saved'])}")
+            print(f"   📦 当前: {page_cache_stats['entries']} 页，{format_bytes(page_cache_stats['raw_bytes'])} → "
+                  f"{format_bytes(page_cache_stats['current_bytes'])}/{format_bytes(page_cache_stats['max_bytes'])}，"
+                  f"淘汰 {page_cache_stats['evictions']} 页")
+
+        # 并发请求合并统计
+        page_flight_stats = self.page_flights.get_stats()
+        media_flight_stats = self.media_flights.get_stats()
+        if page_flight_stats['shared'] or media_flight_stats['shared']:
+            print("🧷 并发请求合并:")
+            print(f"   📄 页面: 合并 {page_flight_stats['shared']} 次重复抓取（实际请求 {page_flight_stats['executed']}）")
+            print(f"   📁 媒体: 合并 {media_flight_stats['shared']} 次重复下载（实际下载 {media_flight_stats['executed']}）")
+
+        # 全局指南存储统计
+        guide_store_stats = self.guide_store.get_stats() if hasattr(self, 'guide_store') else {}
+        if guide_store_stats.get('indexed_guides'):
+            guide_flight_stats = self.guide_flights.get_stats()
+            print("📚 全局指南存储:")
+            print(f"   📋 索引: {guide_store_stats['indexed_guides']} 个指南（完整 {guide_store_stats['complete_guides']}），"
+                  f"本次保存 {guide_store_stats['saved_this_run']} 个，设备目录链接 {guide_store_stats['linked']} 次")
+            print(f"   ♻️  复用: 本次运行已提取 {guide_store_stats['memory_hits']} 次，已有副本 {guide_store_stats['store_hits']} 次，"
+                  f"合并并发提取 {guide_flight_stats['shared']} 次")
+            if guide_store_stats['copy_fallbacks']:
+                print(f"   📄 硬链接不可用改为复制: {guide_store_stats['copy_fallbacks']}")
+
+        # 全局故障排除存储统计
+        ts_store_stats = self.troubleshooting_store.get_stats() if hasattr(self, 'troubleshooting_store') else {}
+        if ts_store_stats.get('stored_items'):
+            ts_flight_stats = self.troubleshooting_flights.get_stats()
+            print("🔧 全局故障排除存储:")
+            print(f"   📋 索引: {ts_store_stats['stored_items']} 个页面，{ts_store_stats['indexed_devices']} 个设备共引用 "
+                  f"{ts_store_stats['device_references']} 次，本次新保存 {ts_store_stats['stored']} 个")
+            print(f"   ♻️  复用: 本次运行已提取 {ts_store_stats['memory_hits']} 次，已有数据 {ts_store_stats['store_hits']} 次，"
+                  f"合并并发提取 {ts_flight_stats['shared']} 次")
+
         # 性能优化统计
-        cache_size = len(getattr(self, '_file_exists_cache', {}))
-        if cache_size > 0:
+        media_store_stats = self.media_store.get_stats() if hasattr(self, 'media_store') else {}
+        if media_store_stats.get('indexed_urls'):
             print(f"⚡ 性能优化统计:")
-            print(f"   📋 文件缓存条目: {cache_size}")
+            print(f"   📋 媒体索引: {media_store_stats['indexed_urls']} 个URL → {media_store_stats['stored_blobs']} 个文件")
+            print(f"   🎯 索引命中: {media_store_stats['hits']} (未命中 {media_store_stats['misses']})")
+            print(f"   🧬 相同内容合并: {media_store_stats['duplicates_merged']}")
+            if media_store_stats['copy_fallbacks']:
+                print(f"   📄 硬链接不可用改为复制: {media_store_stats['copy_fallbacks']}")
             print(f"   🚀 异步下载优化: 已启用")
             print(f"   🔄 高并发下载: 已启用")
 
         # 检查代理切换次数
         if self.use_proxy and hasattr(self, 'proxy_manager') and self.proxy_manager:
             proxy_stats = self.proxy_manager.get_stats()
-            if proxy_stats and 'switches' in proxy_stats:
-                print(f"🔄 代理切换次数: {proxy_stats['switches']}")
+            if proxy_stats and proxy_stats['total_requests'] > 0:
+                print("🌐 代理池健康度:")
+                print(f"   ✅ 可用代理: {proxy_stats['active_proxies']}/{proxy_stats['pool_size']}，隔离中 {proxy_stats['quarantined_proxies']}，"
+                      f"累计隔离 {proxy_stats['quarantines']} 次，未归属失败 {proxy_stats['unattributed_failures']}")
+                latency_text = f"，平均延迟 {proxy_stats['avg_latency']:.2f}秒" if proxy_stats['avg_latency'] is not None else ""
+                print(f"   📶 请求 {proxy_stats['total_requests']}，成功率 {proxy_stats['success_rate']:.1%}{latency_text}")
+                print(f"   📦 响应流量: {format_bytes(proxy_stats['total_bytes'])}")
+                # 评分最低的代理，用于判断瓶颈是否在隧道代理方案
+                worst = sorted((d for d in proxy_stats['proxy_details'] if d['requests'] > 0), key=lambda d: d['score'])[:3]
+                for detail in worst:
+                    latency_text = f"{detail['latency_ewma']:.2f}秒" if detail['latency_ewma'] is not None else "-"
+                    state = "隔离中" if detail['quarantined'] else ("试用中" if detail['probation'] else "可用")
+                    print(f"   🔻 代理#{detail['id']}: 评分 {detail['score']:.2f}，成功率 {detail['success_rate']:.0%}，"
+                          f"延迟 {latency_text}，请求 {detail['requests']}，{state}")
 
         print("=" * 60)
         
@@ -6604,9 +8156,11 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
         return troubleshooting_links
 
-    def extract_troubleshooting_content(self, troubleshooting_url):
+    def extract_troubleshooting_content(self, troubleshooting_url, soup=None, html=None):
         """
         提取故障排除页面的详细内容 - 完全按照combined_crawler.py的逻辑
+
+        soup/html: 调用方已获取的页面，传入时不再重复请求
         """
         if not troubleshooting_url:
             return None
@@ -6624,10 +8178,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
         print(f"Crawling troubleshooting content: {troubleshooting_url}")
 
-        # 添加延迟避免过快请求
-        time.sleep(random.uniform(1, 2))
-
-        soup = self.get_soup(troubleshooting_url)
+        soup = self._resolve_soup(troubleshooting_url, soup, html)
         if not soup:
             return None
 
@@ -6884,17 +8435,10 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
         guide_links = [guide["url"] for guide in guides]
         print(f"   📖 找到 {len(guide_links)} 个指南")
 
-        # 检查是否应该处理troubleshooting
-        should_process_troubleshooting = (
-            not self._is_troubleshooting_processed_in_parent_path(url)
-        )
-
-        # 使用并发处理guides和troubleshooting
+        # 使用并发处理guides和troubleshooting（已抓过的故障排除页面从全局存储复用）
         print(f"   ⚙️  开始处理详细内容...")
-        
-        # 正常处理guides和troubleshooting
         guides_data, troubleshooting_data = self._process_content_concurrently(
-            guide_links, url, not should_process_troubleshooting, soup
+            guide_links, url, False, soup
         )
 
         if guides_data:
@@ -6986,7 +8530,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                                 print(f"    ⚠️ 页面应该有故障排除内容但缓存缺失，仅重新爬取故障排除部分")
                                 # 只重新爬取troubleshooting部分，不重新处理整个页面
                                 try:
-                                    soup = self.get_soup(url)
+                                    soup = self.get_link_soup(url)
                                     if soup:
                                         troubleshooting_links = self.extract_troubleshooting_from_device_page(soup, url)
                                         if troubleshooting_links:
@@ -6998,16 +8542,14 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                                                 else:
                                                     ts_url = ts_link
                                                 if ts_url:
-                                                    ts_content = self.extract_troubleshooting_content(ts_url)
+                                                    ts_content = self._process_troubleshooting_task(ts_url)
                                                     if ts_content:
-                                                        ts_content['url'] = ts_url
                                                         troubleshooting_data.append(ts_content)
 
                                             if troubleshooting_data:
                                                 cached_node['troubleshooting'] = troubleshooting_data
-                                                # 不在这里保存troubleshooting缓存，等待文件系统保存阶段
-                                                # troubleshooting_cache_key = f"{url}#troubleshooting"
-                                                # self._save_troubleshooting_cache(troubleshooting_cache_key, url, troubleshooting_data)
+                                                troubleshooting_cache_key = f"{url}#troubleshooting"
+                                                self._save_troubleshooting_cache(troubleshooting_cache_key, url, troubleshooting_data)
                                                 print(f"    ✅ 成功补充故障排除数据 ({len(troubleshooting_data)} 个)")
                                     return cached_node
                                 except Exception as e:
@@ -7053,11 +8595,8 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     guide_links = [guide["url"] for guide in guides]
                     print(f"   📖 找到 {len(guide_links)} 个指南")
 
-                    # 检查是否应该处理troubleshooting（基于新的逻辑）
-                    should_process_troubleshooting = (
-                        not skip_troubleshooting and
-                        not self._is_troubleshooting_processed_in_parent_path(url)
-                    )
+                    # 父类别已抓过的故障排除页面由全局故障排除存储复用，子型号不再整体跳过
+                    should_process_troubleshooting = not skip_troubleshooting
 
                     # 初始化变量
                     current_path = url.split('/Device/')[-1].split('?')[0].rstrip('/') if '/Device/' in url else ''
@@ -7073,16 +8612,11 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                             # 如果有缓存，直接使用缓存数据，不需要重新处理
                             print(f"   ✅ 发现troubleshooting缓存 ({len(cached_troubleshooting)} 个)，跳过重新处理")
                             should_process_troubleshooting = False
-                            # 标记当前路径已处理troubleshooting
-                            self.processed_troubleshooting_paths.add(current_path)
                         else:
                             # 如果没有缓存，检查当前页面是否有troubleshooting内容
                             troubleshooting_links = self.extract_troubleshooting_from_device_page(soup, url)
                             if troubleshooting_links:
-                                # 标记当前路径已处理troubleshooting
-                                self.processed_troubleshooting_paths.add(current_path)
-                                print(f"   ✅ 在路径 '{current_path}' 首次发现troubleshooting，开始处理...")
-                                print(f"   🔧 后续子路径将跳过troubleshooting处理")
+                                print(f"   ✅ 在路径 '{current_path}' 发现troubleshooting，开始处理...")
                             else:
                                 should_process_troubleshooting = False
 
@@ -7125,10 +8659,7 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                                     'title': subcat['title']
                                 }
 
-                                # 检查子类别是否应该跳过troubleshooting（基于父路径是否已处理）
-                                parent_processed_ts = current_path in self.processed_troubleshooting_paths if current_path else False
-                                should_skip_ts = self._should_skip_troubleshooting_for_subcategory(subcat_node, parent_processed_ts)
-                                processed_subcat = self.deep_crawl_product_content(subcat_node, skip_troubleshooting=should_skip_ts)
+                                processed_subcat = self.deep_crawl_product_content(subcat_node, skip_troubleshooting=skip_troubleshooting)
                                 if processed_subcat:
                                     subcategory_children.append(processed_subcat)
 
@@ -7149,40 +8680,20 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                 children_count = len(node['children'])
                 print(f"🔄 递归处理目标页面的 {children_count} 个子节点...")
 
-                # 检查当前节点是否已处理troubleshooting
-                current_url = node.get('url', '')
-                current_path = current_url.split('/Device/')[-1].split('?')[0].rstrip('/') if '/Device/' in current_url else ''
-                child_should_skip_troubleshooting = (
-                    skip_troubleshooting or
-                    (current_path and current_path in self.processed_troubleshooting_paths)
-                )
-
                 for i, child in enumerate(node['children']):
                     if children_count > 1:
                         print(f"   └─ [{i+1}/{children_count}] 处理目标页面的子节点: {child.get('name', 'Unknown')}")
-                    # 确保传递布尔值参数
-                    skip_ts = True if child_should_skip_troubleshooting else False
-                    node['children'][i] = self.deep_crawl_product_content(child, skip_ts)
+                    node['children'][i] = self.deep_crawl_product_content(child, bool(skip_troubleshooting))
 
         elif 'children' in node and node['children']:
             children_count = len(node['children'])
             if children_count > 0:
                 print(f"🔄 递归处理 {children_count} 个子节点...")
 
-            # 检查当前节点是否已处理troubleshooting
-            current_url = node.get('url', '')
-            current_path = current_url.split('/Device/')[-1].split('?')[0].rstrip('/') if '/Device/' in current_url else ''
-            child_should_skip_troubleshooting = (
-                skip_troubleshooting or
-                (current_path and current_path in self.processed_troubleshooting_paths)
-            )
-
             for i, child in enumerate(node['children']):
                 if children_count > 1:
                     print(f"   └─ [{i+1}/{children_count}] 处理子节点: {child.get('name', 'Unknown')}")
-                # 确保传递布尔值参数
-                skip_ts = True if child_should_skip_troubleshooting else False
-                node['children'][i] = self.deep_crawl_product_content(child, skip_ts)
+                node['children'][i] = self.deep_crawl_product_content(child, bool(skip_troubleshooting))
 
         return node
 
@@ -7651,164 +9162,16 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
 
     def _troubleshooting_belongs_to_current_page(self, troubleshooting_list, current_url):
-        """检查troubleshooting是否真的属于当前页面"""
+        """检查troubleshooting是否属于当前页面：故障排除存储的反向索引记录了该设备页面上的全部故障排除ID"""
         if not troubleshooting_list or not current_url:
             return False
 
-        # 提取当前页面的设备路径
-        if '/Device/' not in current_url:
-            return False
-
-        current_device_path = current_url.split('/Device/')[-1]
-        if '?' in current_device_path:
-            current_device_path = current_device_path.split('?')[0]
-        current_device_path = current_device_path.rstrip('/')
-
-        # 首先检查是否是具体的设备页面（包含具体型号信息）
-        if not self._is_specific_device_page(current_device_path):
-            return False
-
-        # 对于具体的设备页面，如果有 troubleshooting 数据，就认为属于当前页面
-        # 这是因为这些数据是从当前页面提取的，即使是通用的 troubleshooting
-        if troubleshooting_list:
-            return True
-
-        # 以下是原来的严格检查逻辑，作为备用
-        # 检查troubleshooting的URL是否与当前页面相关
-        for ts in troubleshooting_list:
-            ts_url = ts.get('url', '')
-            ts_title = ts.get('title', '')
-
-            if not ts_url and not ts_title:
-                continue
-
-            # 方法1: 检查troubleshooting URL是否包含当前设备路径
-            if ts_url and current_device_path in ts_url:
-                print(f"   ✅ Troubleshooting URL匹配当前设备路径")
-                return True
-
-            # 方法2: 检查troubleshooting标题是否包含当前设备信息
-            if ts_title:
-                # 从当前设备路径提取关键信息
-                device_keywords = self._extract_device_keywords(current_device_path)
-                title_lower = ts_title.lower()
-
-                # 检查关键词是否在标题中
-                matches = 0
-                for keyword in device_keywords:
-                    if keyword.lower() in title_lower:
-                        matches += 1
-
-                # 如果大部分关键词都匹配，认为属于当前页面
-                if matches >= len(device_keywords) * 0.6:  # 60%的关键词匹配
-                    print(f"   ✅ Troubleshooting标题匹配当前设备: {matches}/{len(device_keywords)} 关键词匹配")
-                    return True
-
-        print(f"   ❌ Troubleshooting不属于当前页面")
-        return False
-
-    def _is_specific_device_page(self, device_path):
-        """检查是否是具体的设备页面（包含具体型号信息）"""
-        if not device_path:
-            return False
-
-        # 通用类别页面（不是具体设备）
-        generic_categories = [
-            'Mac', 'Mac_Laptop', 'Mac_Desktop', 'Mac_Hardware',
-            'iPhone', 'iPad', 'iPod', 'Apple_Watch',
-            'MacBook', 'MacBook_Pro', 'MacBook_Air',
-            'iMac', 'Mac_Pro', 'Mac_mini'
-        ]
-
-        # 如果路径就是这些通用类别之一，不是具体设备
-        if device_path in generic_categories:
+        device_ids = set(self.troubleshooting_store.device_items(current_url))
+        if not device_ids:
             return False
-
-        # 检查是否包含具体的型号信息
-        specific_indicators = [
-            # 型号编号
-            'A1', 'A2', 'A3',  # Apple型号编号
-            'Models_', 'Model_',
-            # 具体规格
-            '13"', '15"', '17"', '21.5"', '27"',
-            'Unibody', 'Retina', 'Touch_Bar',
-            # 年份
-            '2020', '2021', '2022', '2023', '2024',
-            # 代数
-            '1st_Gen', '2nd_Gen', '3rd_Gen', '4th_Gen', '5th_Gen',
-            'Generation'
-        ]
-
-        # 检查是否包含具体指标
-        for indicator in specific_indicators:
-            if indicator in device_path:
-                return True
-
-        # 检查路径深度（具体设备通常路径更深）
-        path_depth = len(device_path.split('/'))
-        if path_depth >= 2:  # 至少两级深度，如 MacBook_Pro/MacBook_Pro_17"
-            return True
-
-        return False
-
-    def _extract_device_keywords(self, device_path):
-        """从设备路径提取关键词"""
-        if not device_path:
-            return []
-
-        keywords = []
-
-        # 分割路径
-        parts = device_path.replace('_', ' ').split('/')
-        for part in parts:
-            # 进一步分割每个部分
-            sub_parts = part.split()
-            keywords.extend(sub_parts)
-
-        # 清理和过滤关键词
-        filtered_keywords = []
-        for keyword in keywords:
-            # 移除特殊字符
-            clean_keyword = keyword.replace('"', '').replace("'", '').strip()
-            # 过滤掉太短的词和常见词
-            if len(clean_keyword) >= 2 and clean_keyword.lower() not in ['and', 'or', 'the', 'of', 'in']:
-                filtered_keywords.append(clean_keyword)
-
-        return filtered_keywords
-
-    def _is_troubleshooting_processed_in_parent_path(self, current_url):
-        """检查当前URL的父路径是否已经处理过troubleshooting"""
-        if not current_url or '/Device/' not in current_url:
-            return False
-
-        current_path = current_url.split('/Device/')[-1].split('?')[0].rstrip('/')
-
-        # 检查所有已处理的路径，看是否有父路径
-        for processed_path in self.processed_troubleshooting_paths:
-            if current_path.startswith(processed_path + '/') or current_path == processed_path:
-                return True
-        return False
-
-    def _should_skip_troubleshooting_for_subcategory(self, subcat_node, parent_processed_troubleshooting=False):
-        """判断子类别是否应该跳过troubleshooting提取"""
-        if not subcat_node:
-            return True
-
-        # 如果父级已经处理过troubleshooting，则跳过
-        if parent_processed_troubleshooting:
-            return True
-
-        url = subcat_node.get('url', '')
-        if not url or '/Device/' not in url:
-            return True
-
-        # 检查是否在父路径中已经处理过
-        if self._is_troubleshooting_processed_in_parent_path(url):
-            device_path = url.split('/Device/')[-1].split('?')[0].rstrip('/')
-            print(f"      ⏭️  跳过troubleshooting（已在父路径处理）: {device_path}")
-            return True
-
-        return False
+        ts_ids = {TroubleshootingStore.ts_id_from_url(ts.get('url', '')) for ts in troubleshooting_list
+                  if isinstance(ts, dict) and ts.get('url') and ts.get('title')}
+        return bool(ts_ids) and ts_ids <= device_ids
 
     def _find_matching_directory(self, parent_path, target_name):
         """在父目录中查找匹配的子目录"""
@@ -8290,6 +9653,9 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
             if self.verbose:
                 print(f"\n✅ 数据保存完成，跳过验证步骤")
 
+            # 等待保存过程中入队的媒体下载全部完成
+            self.wait_for_media_downloads()
+
             print(f"\n📁 整合结果已保存到本地文件夹: {root_dir}")
             return str(root_dir)
         except Exception as e:
@@ -8553,24 +9919,16 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     if not guide or not isinstance(guide, dict):
                         print(f"   ⚠️  跳过无效指南 #{i+1}: {type(guide)}")
                         continue
-                        
+
                     guide_data = guide.copy()
                     print(f"   📖 [{i+1}/{len(node_data['guides'])}] 保存指南: {guide_data.get('title', 'Unknown')[:50]}")
-                    
+
                     # 为每个guide创建单独的目录，媒体文件和guide文件在同一层级
                     guide_dir = guides_dir / f"guide_{i+1}"
                     guide_dir.mkdir(exist_ok=True)
 
-                    # 处理媒体文件，存储在guide目录下
-                    try:
-                        self._process_media_urls(guide_data, guide_dir)
-                    except Exception as media_error:
-                        print(f"   ⚠️  媒体文件处理失败: {media_error}")
-
-                    # 保存guide文件到guide目录
-                    guide_file = guide_dir / "guide.json"
-                    with open(guide_file, 'w', encoding='utf-8') as f:
-                        safe_json_dump(guide_data, f, ensure_ascii=False, indent=2)
+                    # 保存guide文件到guide目录，媒体文件由下载队列存储到guide目录下并回写路径
+                    guide_file = self._save_item_with_media(guide_data, guide_dir, "guide.json")
                     
                     guides_count += 1
                     print(f"   ✅ 指南保存成功: {guide_file}")
@@ -8592,24 +9950,16 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     if not ts or not isinstance(ts, dict):
                         print(f"   ⚠️  跳过无效故障排除 #{i+1}: {type(ts)}")
                         continue
-                        
+
                     ts_data = ts.copy()
                     print(f"   🔧 [{i+1}/{len(node_data['troubleshooting'])}] 保存故障排除: {ts_data.get('title', 'Unknown')[:50]}")
-                    
+
                     # 为每个troubleshooting创建单独的目录，媒体文件和ts文件在同一层级
                     ts_item_dir = ts_dir / f"troubleshooting_{i+1}"
                     ts_item_dir.mkdir(exist_ok=True)
 
-                    # 处理媒体文件，存储在troubleshooting目录下
-                    try:
-                        self._process_media_urls(ts_data, ts_item_dir)
-                    except Exception as media_error:
-                        print(f"   ⚠️  媒体文件处理失败: {media_error}")
-
-                    # 保存troubleshooting文件到troubleshooting目录
-                    ts_file = ts_item_dir / "troubleshooting.json"
-                    with open(ts_file, 'w', encoding='utf-8') as f:
-                        safe_json_dump(ts_data, f, ensure_ascii=False, indent=2)
+                    # 保存troubleshooting文件，媒体文件由下载队列存储到troubleshooting目录下并回写路径
+                    ts_file = self._save_item_with_media(ts_data, ts_item_dir, "troubleshooting.json")
                     
                     troubleshooting_count += 1
                     print(f"   ✅ 故障排除保存成功: {ts_file}")
@@ -8619,34 +9969,11 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
 
             print(f"   🔧 故障排除处理完成: {troubleshooting_count}/{len(node_data['troubleshooting'])} 成功")
 
-            # 在Troubleshooting目录创建后立即保存cache文件
-            # 修改逻辑：每个产品都应该有自己的缓存文件
-            if self.cache_manager:
-                try:
-                    current_url = node_data.get('url', '')
-                    troubleshooting_data = node_data.get('troubleshooting')
-                    from_cache = getattr(self, '_troubleshooting_from_cache', False)
-
-                    print(f"   🔍 缓存生成检查: URL={bool(current_url)}, 数据={bool(troubleshooting_data)}, 来自缓存={from_cache}")
-
-                    if current_url and troubleshooting_data:
-                        cache_file_path = node_dir / 'troubleshooting_cache.json'
-                        cache_exists = cache_file_path.exists()
-                        should_create_cache = not cache_exists or not from_cache
-
-                        print(f"   🔍 缓存决策: 文件存在={cache_exists}, 应创建={should_create_cache}")
-
-                        if should_create_cache:
-                            troubleshooting_cache_key = f"{current_url}#troubleshooting"
-                            self.cache_manager.save_troubleshooting_cache_after_directory_creation(
-                                troubleshooting_cache_key, current_url, troubleshooting_data, ts_dir)
-                            print(f"   💾 已生成troubleshooting_cache.json文件: {cache_file_path}")
-                        else:
-                            print(f"   📋 缓存文件已存在且数据来自缓存，跳过生成: {cache_file_path}")
-                    else:
-                        print(f"   ⚠️  跳过生成troubleshooting缓存: URL={bool(current_url)}, 数据={bool(troubleshooting_data)}")
-                except Exception as cache_error:
-                    print(f"   ⚠️  保存troubleshooting缓存失败，但不影响正常流程: {cache_error}")
+            # 记录设备→故障排除ID（数据来自缓存时反向索引中已有记录）
+            current_url = node_data.get('url', '')
+            if current_url and not getattr(self, '_troubleshooting_from_cache', False):
+                troubleshooting_cache_key = f"{current_url}#troubleshooting"
+                self._save_troubleshooting_cache(troubleshooting_cache_key, current_url, node_data['troubleshooting'])
 
         # 更新缓存索引
         try:
@@ -8907,20 +10234,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                         safe_json_dump(ts_data, f, ensure_ascii=False, indent=2)
 
                 print(f"   💾 保存了 {len(node_data['troubleshooting'])} 个troubleshooting到: {ts_dir}")
-
-                # 在Troubleshooting目录创建后立即保存cache文件
-                # 修改逻辑：每个产品都应该有自己的缓存文件
-                if self.cache_manager and current_url:
-                    cache_file_path = root_dir / 'troubleshooting_cache.json'
-                    should_create_cache = (
-                        not cache_file_path.exists() or
-                        not getattr(self, '_troubleshooting_from_cache', False)
-                    )
-
-                    if should_create_cache:
-                        troubleshooting_cache_key = f"{current_url}#troubleshooting"
-                        self.cache_manager.save_troubleshooting_cache_after_directory_creation(
-                            troubleshooting_cache_key, current_url, node_data['troubleshooting'], ts_dir)
             else:
                 print(f"   ⚠️  跳过保存troubleshooting，因为它们不属于当前页面: {current_url}")
 
@@ -8985,20 +10298,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     with open(ts_file, 'w', encoding='utf-8') as f:
                         safe_json_dump(ts_data, f, ensure_ascii=False, indent=2)
 
-                # 在Troubleshooting目录创建后立即保存cache文件
-                # 修改逻辑：每个产品都应该有自己的缓存文件
-                if self.cache_manager and current_url:
-                    cache_file_path = subcat_dir / 'troubleshooting_cache.json'
-                    should_create_cache = (
-                        not cache_file_path.exists() or
-                        not getattr(self, '_troubleshooting_from_cache', False)
-                    )
-
-                    if should_create_cache:
-                        troubleshooting_cache_key = f"{current_url}#troubleshooting"
-                        self.cache_manager.save_troubleshooting_cache_after_directory_creation(
-                            troubleshooting_cache_key, current_url, node_data['troubleshooting'], ts_dir)
-
                 print(f"   💾 保存了 {len(node_data['troubleshooting'])} 个troubleshooting到子类别: {subcat_dir}")
             else:
                 print(f"   ⚠️  跳过保存troubleshooting到子类别，因为它们不属于当前页面: {current_url}")
@@ -9077,20 +10376,6 @@ class CombinedIFixitCrawler(EnhancedIFixitCrawler):
                     with open(ts_file, 'w', encoding='utf-8') as f:
                         safe_json_dump(ts_data, f, ensure_ascii=False, indent=2)
 
-                # 在Troubleshooting目录创建后立即保存cache文件
-                # 修改逻辑：每个产品都应该有自己的缓存文件
-                if self.cache_manager and current_url:
-                    cache_file_path = node_dir / 'troubleshooting_cache.json'
-                    should_create_cache = (
-                        not cache_file_path.exists() or
-                        not getattr(self, '_troubleshooting_from_cache', False)
-                    )
-
-                    if should_create_cache:
-                        troubleshooting_cache_key = f"{current_url}#troubleshooting"
-                        self.cache_manager.save_troubleshooting_cache_after_directory_creation(
-                            troubleshooting_cache_key, current_url, node_data['troubleshooting'], ts_dir)
-
                 print(f"   💾 保存了 {len(node_data['troubleshooting'])} 个troubleshooting到节点: {node_dir}")
             else:
                 print(f"   ⚠️  跳过保存troubleshooting到节点，因为它们不属于当前页面: {current_url}")
@@ -9398,13 +10683,19 @@ def print_usage():
     print("  python auto_crawler.py https://www.ifixit.com/Device/Television")
     print("  python auto_crawler.py Television")
     print("\n🚀 性能调优选项:")
-    print("  --workers N            设置并发线程数（默认8，推荐8-16）")
-    print("  --max-connections N    设置最大连接数（默认80）")
+    print("  --workers N            并发线程数上限（默认16），实际线程数由自动调优决定")
+    print("  --max-connections N    在途请求数上限（默认为线程数的10倍）")
     print("  --max-retries N        设置最大重试次数（默认3）")
     print("  --timeout N            设置请求超时时间（秒，默认30）")
-    print("  --delay N              设置请求间隔（秒，默认0.5）")
-    print("  --burst-mode           启用爆发模式（最大性能，可能被限制）")
-    print("  --conservative         启用保守模式（降低并发，更稳定）")
+    print("  --delay N              起始请求间隔（秒，默认0.5），之后按站点响应自适应加减速")
+    print("  --burst-mode           自动调优从上限起步（默认从上限的一半起步）")
+    print("  --conservative         自动调优从下限附近起步，逐步向上探索")
+    print("  --target-error-rate N  自动调优的目标错误率上限（默认0.02，即2%）")
+    print("  --no-autotune          关闭自动调优，所有并发固定为上限")
+    print("  --engine NAME          抓取引擎：threads（默认，线程池）或 async（全程异步，在途请求数由--max-connections控制）")
+    print("  --tree-workers N       阶段1树构建时并发抓取的分类页数量（默认4，1为串行）")
+    print("  --parse-workers N      页面解析/提取进程数（默认CPU核数-1，最多8；0为在抓取线程内提取）")
+    print("  --parser NAME          HTML解析后端：html.parser（默认）、lxml（更快）或 html5lib")
     print("\n🌐 代理和网络选项:")
     print("  --no-proxy             关闭隧道代理（默认启用）")
     print("  --proxy-switch N       代理切换频率（请求数，默认1=每次切换）")
@@ -9412,7 +10703,11 @@ def print_usage():
     print("\n💾 缓存和数据选项:")
     print("  --no-cache             禁用缓存检查（默认启用）")
     print("  --force-refresh        强制重新爬取（忽略缓存）")
-    print("  --cache-ttl N          缓存配置参数（保留兼容性，实际为长期保存）")
+    print("  --verify-deep          缓存校验时完整解析所有JSON（默认只按节点清单比较文件大小和修改时间）")
+    print("  --cache-ttl N          缓存有效期（小时，默认24），过期后用ETag/Last-Modified条件请求校验，0为永不过期")
+    print("  --page-cache-mb N      运行期页面缓存上限（MB，按压缩后大小计，默认64，0为禁用），重复访问的页面不再请求")
+    print("  --archive              把页面/API原始响应归档到 archive/（WARC分段文件，供离线回放）")
+    print("  --replay               离线回放：所有页面从归档读取，不访问网络，重新提取全部JSON")
     print("\n🔄 断点续爬选项:")
     print("  --no-resume            禁用断点续爬功能（默认启用）")
     print("  --reset-progress       重置树构建进度（清除断点记录）")
@@ -9423,36 +10718,33 @@ def print_usage():
     print("  --download-videos      启用视频文件下载（默认禁用）")
     print("  --max-video-size N     设置视频文件大小限制（MB，默认50）")
     print("  --skip-images          跳过图片下载（仅保存URL）")
+    print("  --traffic-budget SIZE  流量预算（如 500MB、2GB）：用到80%跳过视频并把媒体并发降到1，95%停止媒体下载，用尽后停止抓取新页面")
     print("\n🔧 调试选项:")
     print("  --verbose              启用详细输出")
     print("  --debug                启用调试模式（更详细的日志）")
     print("  --stats                显示详细统计信息")
-    print("\n📊 预设配置:")
-    print("  --fast                 快速模式：--workers 12 --burst-mode")
-    print("  --stable               稳定模式：--workers 4 --conservative --delay 1")
-    print("  --enterprise           企业模式：--workers 16 --max-connections 160")
     print("\n示例:")
-    print("  # 默认高性能模式（8线程+代理池）")
+    print("  # 默认配置（自动调优并发 + 代理池）")
     print("  python auto_crawler.py iMac_M_Series")
     print("")
-    print("  # 快速模式（12线程+爆发模式）")
-    print("  python auto_crawler.py iMac_M_Series --fast")
+    print("  # 提高并发上限并从上限起步")
+    print("  python auto_crawler.py Television --workers 32 --burst-mode --download-videos")
     print("")
-    print("  # 企业级高并发模式")
-    print("  python auto_crawler.py Television --enterprise --download-videos")
-    print("")
-    print("  # 稳定模式（适合网络不稳定环境）")
-    print("  python auto_crawler.py iPhone --stable --verbose")
+    print("  # 网络不稳定时收紧目标错误率")
+    print("  python auto_crawler.py iPhone --target-error-rate 0.01 --verbose")
     print("")
     print("  # 自定义高性能配置")
     print("  python auto_crawler.py MacBook --workers 20 --max-connections 200 --delay 0.2")
     print("")
+    print("  # 异步引擎（单进程保持数百个在途请求）")
+    print("  python auto_crawler.py MacBook --engine async --max-connections 300")
+    print("")
     print("  # 断点续爬相关操作")
     print("  python auto_crawler.py Television --show-progress  # 查看进度")
     print("  python auto_crawler.py Television --reset-progress # 重置进度")
     print("  python auto_crawler.py Television                  # 自动从断点恢复")
     print("\n🎯 默认配置说明:")
-    print("- 🔥 高性能：默认8线程并发 + 隧道代理池")
+    print("- 🔥 高性能：运行时自动调优并发度（错误率<2%时吞吐最高）+ 隧道代理池")
     print("- 🌐 智能代理：HTTP隧道代理池，每次请求自动切换IP")
     print("- 💾 智能缓存：自动跳过已爬取的内容，长期保存到本地")
     print("- 🔄 断点续爬：自动记录树构建进度，支持中断恢复")
@@ -9480,33 +10772,18 @@ def main():
     use_proxy = '--no-proxy' not in args  # 默认启用代理
     use_cache = '--no-cache' not in args  # 默认启用缓存
     force_refresh = '--force-refresh' in args
+    verify_deep = '--verify-deep' in args
     skip_images = '--skip-images' in args
 
-    # 🎯 预设配置处理
-    if '--fast' in args:
-        # 快速模式：高并发 + 爆发模式
-        default_workers = 12
-        burst_mode = True
-        conservative_mode = False
-        default_delay = 0.3
-    elif '--stable' in args:
-        # 稳定模式：低并发 + 保守策略
-        default_workers = 4
-        burst_mode = False
-        conservative_mode = True
-        default_delay = 1.0
-    elif '--enterprise' in args:
-        # 企业模式：超高并发
-        default_workers = 16
-        burst_mode = True
-        conservative_mode = False
-        default_delay = 0.2
-    else:
-        # 默认高性能模式
-        default_workers = 8
-        burst_mode = '--burst-mode' in args
-        conservative_mode = '--conservative' in args
-        default_delay = 0.5
+    # 🎯 并发由自动调优器在运行时决定，--workers/--max-connections只是上限
+    default_workers = 16
+    default_delay = 0.5
+    burst_mode = '--burst-mode' in args
+    conservative_mode = '--conservative' in args
+    autotune = '--no-autotune' not in args
+    for preset in ('--fast', '--stable', '--enterprise'):
+        if preset in args:
+            print(f"提示: {preset} 预设已由自动并发调优取代，将按实测吞吐和错误率自动选择并发度")
 
     # 解析性能参数
     max_workers = default_workers
@@ -9548,6 +10825,16 @@ def main():
         except (ValueError, IndexError):
             print("警告: timeout参数无效，使用默认值30秒")
 
+    # 解析自动调优目标错误率
+    target_error_rate = 0.02
+    if '--target-error-rate' in args:
+        try:
+            rate_idx = args.index('--target-error-rate')
+            if rate_idx + 1 < len(args):
+                target_error_rate = float(args[rate_idx + 1])
+        except (ValueError, IndexError):
+            print("警告: target-error-rate参数无效，使用默认值0.02")
+
     # 解析请求间隔参数
     request_delay = default_delay
     if '--delay' in args:
@@ -9589,6 +10876,18 @@ def main():
         except (ValueError, IndexError):
             print("警告: max-video-size参数无效，使用默认值50MB")
 
+    # 解析流量预算参数（如 500MB、2GB，不带单位按MB计）
+    traffic_budget = None
+    if '--traffic-budget' in args:
+        try:
+            budget_idx = args.index('--traffic-budget')
+            if budget_idx + 1 < len(args):
+                traffic_budget = parse_byte_size(args[budget_idx + 1])
+            if traffic_budget is None:
+                print("警告: traffic-budget参数无效，不限制流量")
+        except (ValueError, IndexError):
+            print("警告: traffic-budget参数无效，不限制流量")
+
     # 🔄 解析断点续爬参数
     enable_resume = '--no-resume' not in args  # 默认启用断点续爬
     reset_progress = '--reset-progress' in args
@@ -9621,6 +10920,52 @@ def main():
         if '--progress-only' in args:
             return
 
+    # 解析抓取引擎
+    engine = 'threads'
+    if '--engine' in args:
+        try:
+            engine_idx = args.index('--engine')
+            if engine_idx + 1 < len(args):
+                engine = args[engine_idx + 1].lower()
+            if engine not in ('threads', 'async'):
+                print(f"警告: engine参数无效（{engine}），使用默认值threads")
+                engine = 'threads'
+        except (ValueError, IndexError):
+            print("警告: engine参数无效，使用默认值threads")
+
+    # 解析树构建并发参数
+    tree_workers = 4
+    if '--tree-workers' in args:
+        try:
+            tree_workers_idx = args.index('--tree-workers')
+            if tree_workers_idx + 1 < len(args):
+                tree_workers = max(1, int(args[tree_workers_idx + 1]))
+        except (ValueError, IndexError):
+            print("警告: tree-workers参数无效，使用默认值4")
+
+    # 解析提取进程数参数
+    parse_workers = default_parse_workers()
+    if '--parse-workers' in args:
+        try:
+            parse_workers_idx = args.index('--parse-workers')
+            if parse_workers_idx + 1 < len(args):
+                parse_workers = max(0, int(args[parse_workers_idx + 1]))
+        except (ValueError, IndexError):
+            print(f"警告: parse-workers参数无效，使用默认值{parse_workers}")
+
+    # 解析HTML解析后端参数
+    parser = DEFAULT_PARSER
+    if '--parser' in args:
+        try:
+            parser_idx = args.index('--parser')
+            if parser_idx + 1 < len(args):
+                parser = args[parser_idx + 1].lower()
+            if parser not in available_parsers():
+                print(f"警告: parser参数无效或未安装（{parser}），可用: {', '.join(available_parsers())}，使用默认值{DEFAULT_PARSER}")
+                parser = DEFAULT_PARSER
+        except (ValueError, IndexError):
+            print(f"警告: parser参数无效，使用默认值{DEFAULT_PARSER}")
+
     # 解析自定义User-Agent
     custom_user_agent = None
     if '--user-agent' in args:
@@ -9631,6 +10976,26 @@ def main():
         except (ValueError, IndexError):
             print("警告: user-agent参数无效")
 
+    # 解析运行期页面缓存大小
+    page_cache_mb = 64
+    if '--page-cache-mb' in args:
+        try:
+            cache_mb_idx = args.index('--page-cache-mb')
+            if cache_mb_idx + 1 < len(args):
+                page_cache_mb = max(0.0, float(args[cache_mb_idx + 1]))
+        except (ValueError, IndexError):
+            print("警告: page-cache-mb参数无效，使用默认值64MB")
+
+    # 📼 原始响应归档与离线回放
+    archive = '--archive' in args
+    replay = '--replay' in args
+    if replay:
+        # 回放完全离线：不使用代理、不下载媒体，并重新提取所有节点
+        use_proxy = False
+        skip_images = True
+        download_videos = False
+        force_refresh = True
+
     if not input_text:
         print_usage()
         return
@@ -9701,8 +11066,19 @@ def main():
         print(f"🎯 开始高性能爬取: {name}")
         print("=" * 80)
         print(f"🔥 性能配置:")
-        print(f"   并发线程数: {max_workers}")
+        print(f"   抓取引擎: {'⚡异步(asyncio+httpx)' if engine == 'async' else '🧵线程池(requests)'}")
+        if engine == 'async':
+            print(f"   在途请求上限: {max_connections}")
+        else:
+            print(f"   并发线程上限: {max_workers}")
         print(f"   最大连接数: {max_connections}")
+        if autotune:
+            print(f"   自动调优: ✅启用（目标错误率 < {target_error_rate:.1%}）")
+        else:
+            print("   自动调优: ❌禁用（固定使用上限）")
+        print(f"   树构建并发: {tree_workers}")
+        print(f"   解析进程: {parse_workers if parse_workers > 0 else '❌禁用（抓取线程内提取）'}")
+        print(f"   解析后端: {parser}")
         print(f"   请求间隔: {request_delay}秒")
         print(f"   超时时间: {timeout}秒")
         print(f"   最大重试: {max_retries}次")
@@ -9725,18 +11101,25 @@ def main():
         print(f"   智能缓存: {'✅启用' if use_cache else '❌禁用'}")
         if use_cache:
             print(f"   缓存策略: 长期保存到本地文件")
+        print(f"   页面缓存: {f'{page_cache_mb:g}MB（运行期压缩LRU）' if page_cache_mb > 0 else '❌禁用'}")
 
         print(f"📁 媒体处理:")
         print(f"   图片下载: {'❌跳过' if skip_images else '✅启用'}")
         print(f"   视频下载: {'✅启用' if download_videos else '❌禁用'}")
         if download_videos:
             print(f"   视频大小限制: {max_video_size_mb}MB")
+        print(f"   流量预算: {format_bytes(traffic_budget) if traffic_budget else '不限制（仅统计）'}")
 
         print(f"🔧 其他选项:")
         print(f"   详细输出: {'✅启用' if verbose else '❌禁用'}")
         print(f"   调试模式: {'✅启用' if debug_mode else '❌禁用'}")
         print(f"   统计信息: {'✅启用' if show_stats else '❌禁用'}")
         print(f"   强制刷新: {'✅启用' if force_refresh else '❌禁用'}")
+        print(f"   深度缓存校验: {'✅启用' if verify_deep else '❌禁用（节点清单快速校验）'}")
+        if replay:
+            print("   响应归档: 📼离线回放（不访问网络）")
+        else:
+            print(f"   响应归档: {'✅录制' if archive else '❌禁用'}")
 
         print("=" * 80)
         print("🚀 执行阶段:")
@@ -9766,7 +11149,18 @@ def main():
             skip_images=skip_images,
             debug_mode=debug_mode,
             show_stats=show_stats,
-            command_arg=input_text  # 传递命令行参数
+            command_arg=input_text,  # 传递命令行参数
+            engine=engine,
+            verify_deep=verify_deep,
+            tree_workers=tree_workers,
+            autotune=autotune,
+            target_error_rate=target_error_rate,
+            archive=archive,
+            replay=replay,
+            parse_workers=parse_workers,
+            parser=parser,
+            traffic_budget=traffic_budget,
+            page_cache_mb=page_cache_mb
         )
 
         # 记录开始时间
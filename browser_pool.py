@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Playwright浏览器池 - 整个运行期间只启动一个无头Chromium，保留少量长期存在的浏览器上下文
+上下文创建时一次性写入英文locale的cookie、localStorage和请求头，每次渲染只新开一个页面；
+纯HTML渲染时拦截图片、字体和统计脚本，上下文渲染一定页数后回收重建，避免内存持续增长。
+浏览器运行在独立线程的事件循环上，线程池任务（render）和异步任务（render_async）共用同一个池
+"""
+
+import time
+import atexit
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+# 渲染前写入localStorage的语言偏好（每个文档加载前执行，页面脚本读取时已生效）
+LOCALE_INIT_SCRIPT = """
+try {
+    localStorage.setItem('locale', 'en');
+    localStorage.setItem('language', 'en');
+    localStorage.setItem('lang', 'en');
+} catch (e) {}
+"""
+
+
+class BrowserPool:
+    """长期存在的Chromium浏览器 + 固定数量的可回收上下文"""
+
+    # 纯HTML渲染不需要的资源类型
+    BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+    # 统计和广告脚本（不影响页面内容，却会拖慢networkidle）
+    BLOCKED_HOSTS = (
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+        'facebook.net', 'facebook.com/tr', 'hotjar.com', 'segment.com', 'segment.io',
+        'sentry.io', 'newrelic.com', 'nr-data.net', 'clarity.ms', 'optimizely.com'
+    )
+
+    def __init__(self, contexts: int = 2, recycle_after: int = 50, block_resources: bool = True,
+                 user_agent: Optional[str] = None, accept_language: str = 'en-US,en;q=1.0',
+                 navigation_timeout: float = 30.0, logger: Optional[logging.Logger] = None):
+        """
+        初始化浏览器池（首次渲染时才启动浏览器）
+
+        Args:
+            contexts: 同时存在的浏览器上下文数（即最大并发渲染数）
+            recycle_after: 每个上下文渲染多少页后关闭重建
+            block_resources: 是否拦截图片、字体和统计脚本
+            navigation_timeout: 单次页面导航超时（秒）
+        """
+        self.contexts = max(1, contexts)
+        self.recycle_after = max(1, recycle_after)
+        self.block_resources = block_resources
+        self.user_agent = user_agent
+        self.accept_language = accept_language
+        self.navigation_timeout = navigation_timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._thread_lock = threading.Lock()
+
+        # 以下对象只在浏览器线程的事件循环上访问
+        self._playwright = None
+        self._browser = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._generation = 0
+
+        self.stats = {
+            'renders': 0,
+            'failures': 0,
+            'render_seconds': 0.0,
+            'browser_launches': 0,
+            'contexts_created': 0,
+            'contexts_recycled': 0,
+            'blocked_requests': 0
+        }
+
+    # ---- 浏览器线程 ----
+
+    def _start_thread(self) -> bool:
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return True
+            self._started.clear()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name="browser-pool", daemon=True)
+            self._thread.start()
+            # 未经过cleanup就退出（异常退出等）时也要关闭浏览器
+            atexit.register(self.close)
+        return self._started.wait(timeout=5)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            try:
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            except Exception:
+                pass
+            self._loop.close()
+
+    def _submit(self, coro):
+        if not self._start_thread():
+            coro.close()
+            raise RuntimeError("浏览器池事件循环启动失败")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ---- 以下协程在浏览器线程上执行 ----
+
+    async def _ensure_browser(self):
+        """启动浏览器并创建上下文；浏览器崩溃断开后重新启动"""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+
+            await self._close_browser()
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._generation += 1
+            self.stats['browser_launches'] += 1
+            self._slots = asyncio.Queue()
+            for _ in range(self.contexts):
+                await self._slots.put(await self._new_slot())
+            self.logger.info(f"浏览器池启动: {self.contexts} 个上下文，每个渲染 {self.recycle_after} 页后回收")
+
+    async def _new_slot(self) -> Dict[str, Any]:
+        """创建一个预置英文locale的浏览器上下文"""
+        options = {
+            'locale': 'en-US',
+            'extra_http_headers': {'Accept-Language': self.accept_language}
+        }
+        if self.user_agent:
+            options['user_agent'] = self.user_agent
+        context = await self._browser.new_context(**options)
+        context.set_default_navigation_timeout(self.navigation_timeout * 1000)
+        await context.add_cookies([
+            {'name': 'locale', 'value': 'en', 'domain': '.ifixit.com', 'path': '/'},
+            {'name': 'language', 'value': 'en', 'domain': '.ifixit.com', 'path': '/'}
+        ])
+        await context.add_init_script(LOCALE_INIT_SCRIPT)
+        if self.block_resources:
+            await context.route('**/*', self._route)
+        self.stats['contexts_created'] += 1
+        return {'context': context, 'pages': 0, 'generation': self._generation}
+
+    async def _route(self, route):
+        """拦截纯HTML渲染不需要的请求"""
+        request = route.request
+        if request.resource_type in self.BLOCKED_RESOURCE_TYPES or any(host in request.url for host in self.BLOCKED_HOSTS):
+            self.stats['blocked_requests'] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _release_slot(self, slot: Dict[str, Any]):
+        """归还上下文；达到回收页数或属于已重启的浏览器时关闭"""
+        stale = self._slots is None or slot['generation'] != self._generation
+        if stale or slot['pages'] >= self.recycle_after:
+            try:
+                await slot['context'].close()
+            except Exception:
+                pass
+            if stale:
+                return
+            self.stats['contexts_recycled'] += 1
+            try:
+                slot = await self._new_slot()
+            except Exception as e:
+                self.logger.warning(f"重建浏览器上下文失败: {e}")
+                return
+        await self._slots.put(slot)
+
+    async def _render(self, url: str, wait_until: str, settle_ms: int) -> Tuple[Optional[int], str]:
+        await self._ensure_browser()
+        # 上下文重建失败时可用上下文会减少，等待设上限避免调用方永久挂起
+        slot = await asyncio.wait_for(self._slots.get(), timeout=self.navigation_timeout)
+        page = None
+        try:
+            page = await slot['context'].new_page()
+            response = await page.goto(url, wait_until=wait_until)
+            if settle_ms:
+                await page.wait_for_timeout(settle_ms)
+            content = await page.content()
+            return (response.status if response else None), content
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            slot['pages'] += 1
+            await self._release_slot(slot)
+
+    async def _close_browser(self):
+        if self._slots is not None:
+            while not self._slots.empty():
+                try:
+                    await self._slots.get_nowait()['context'].close()
+                except Exception:
+                    pass
+            self._slots = None
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    # ---- 对外接口 ----
+
+    def _record(self, elapsed: Optional[float]):
+        self.stats['renders'] += 1
+        if elapsed is None:
+            self.stats['failures'] += 1
+        else:
+            self.stats['render_seconds'] += elapsed
+
+    def render(self, url: str, wait_until: str = 'networkidle', settle_ms: int = 0) -> Tuple[Optional[int], str]:
+        """同步渲染页面（任意线程可调用），返回 (状态码, 渲染后的HTML)，失败时抛出异常"""
+        start_time = time.monotonic()
+        future = self._submit(self._render(url, wait_until, settle_ms))
+        try:
+            result = future.result(timeout=self.navigation_timeout + settle_ms / 1000 + 30)
+        except Exception:
+            future.cancel()
+            self._record(None)
+            raise
+        self._record(time.monotonic() - start_time)
+        return result
+
+    async def render_async(self, url: str, wait_until: str = 'networkidle', settle_ms: int = 0) -> Tuple[Optional[int], str]:
+        """异步渲染页面，等待期间不阻塞调用方的事件循环"""
+        start_time = time.monotonic()
+        try:
+            result = await asyncio.wrap_future(self._submit(self._render(url, wait_until, settle_ms)))
+        except Exception:
+            self._record(None)
+            raise
+        self._record(time.monotonic() - start_time)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['contexts'] = self.contexts
+        stats['avg_render_seconds'] = stats['render_seconds'] / max(1, stats['renders'] - stats['failures'])
+        return stats
+
+    def close(self, timeout: float = 15):
+        """关闭所有上下文、浏览器和事件循环线程"""
+        with self._thread_lock:
+            thread, loop = self._thread, self._loop
+        if not (thread and thread.is_alive() and loop and loop.is_running()):
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(timeout=timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        with self._thread_lock:
+            self._thread = None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并发自动调优器 - 运行时根据实测页面吞吐（页面/秒）、p95延迟和错误/超时率调整并发度
+取代固定的 --fast/--stable/--enterprise 预设：--workers、--max-connections 只作为上限，
+控制器在上限内爬坡，寻找错误率低于目标（默认2%）时吞吐最高的工作线程数、在途请求数和媒体并发数
+"""
+
+import time
+import math
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+
+
+class AdjustableLimit:
+    """可在运行中调整上限的并发闸门（线程与任意事件循环共用，不绑定某个loop）"""
+
+    def __init__(self, limit: int, minimum: int = 1, maximum: Optional[int] = None):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else limit)
+        self._limit = min(self.maximum, max(self.minimum, limit))
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def set_limit(self, limit: int) -> int:
+        """调整上限（收缩时不打断已在执行的任务，只是暂不放行新任务）"""
+        with self._cond:
+            self._limit = min(self.maximum, max(self.minimum, int(limit)))
+            self._cond.notify_all()
+            return self._limit
+
+    def cap(self, maximum: int) -> int:
+        """运行中降低硬上限（如流量预算接近用尽时），之后调优器也不会再放大到该值以上"""
+        with self._cond:
+            self.maximum = max(self.minimum, min(self.maximum, int(maximum)))
+            self._limit = min(self._limit, self.maximum)
+            self._cond.notify_all()
+            return self._limit
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_use < self._limit:
+                self._in_use += 1
+                return True
+            return False
+
+    def acquire(self):
+        """同步获取名额（线程池任务使用）"""
+        with self._cond:
+            while self._in_use >= self._limit:
+                self._cond.wait(timeout=1.0)
+            self._in_use += 1
+
+    async def acquire_async(self, poll_interval: float = 0.02):
+        """异步获取名额，名额已满时让出事件循环轮询等待"""
+        while not self._try_acquire():
+            await asyncio.sleep(poll_interval)
+
+    def release(self):
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            self._cond.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class ConcurrencyAutotuner:
+    """按时间窗口统计请求结果并爬坡调整并发度的控制器"""
+
+    # 计为错误的HTTP状态码（与限速控制器的降速条件一致）
+    ERROR_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_workers: int, max_inflight: int, max_media: int,
+                 target_error_rate: float = 0.02, interval: float = 5.0, min_samples: int = 10,
+                 enabled: bool = True, start_fraction: float = 0.5,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化自动调优器
+
+        Args:
+            max_workers: 工作线程数上限（--workers）
+            max_inflight: 异步在途请求数上限（--max-connections）
+            max_media: 媒体下载并发上限
+            target_error_rate: 目标错误率上限，超过即收缩并发
+            interval: 调整周期（秒）
+            min_samples: 一个周期内至少需要的请求样本数，样本不足时不调整
+            enabled: False 时所有闸门固定在上限（等同旧的静态配置）
+            start_fraction: 起步并发占上限的比例（爆发模式1.0，保守模式0.25）
+        """
+        self.target_error_rate = target_error_rate
+        self.interval = interval
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.logger = logger or logging.getLogger(__name__)
+
+        # 从上限的一定比例起步，由控制器向上探索
+        def start(maximum):
+            return maximum if not enabled else max(1, math.ceil(maximum * start_fraction))
+
+        self.workers = AdjustableLimit(start(max_workers), 1, max_workers)
+        self.inflight = AdjustableLimit(start(max_inflight), 2, max_inflight)
+        self.media = AdjustableLimit(start(max_media), 1, max_media)
+
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window: Dict[str, Any] = self._empty_window()
+        self._last_action = None
+        self._last_throughput = 0.0
+        self._best: Dict[str, Any] = {}
+        self._history: List[Dict[str, Any]] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.plan = ''
+
+    @staticmethod
+    def _empty_window() -> Dict[str, Any]:
+        return {'requests': 0, 'successes': 0, 'errors': 0, 'timeouts': 0, 'pages': 0, 'latencies': []}
+
+    def observe(self, url: str, status_code: Optional[int] = None, error: Optional[BaseException] = None,
+                latency: Optional[float] = None):
+        """限速控制器的观察者回调：记录一次请求结果"""
+        with self._lock:
+            window = self._window
+            window['requests'] += 1
+            if error is not None:
+                window['errors'] += 1
+                if 'timeout' in type(error).__name__.lower():
+                    window['timeouts'] += 1
+            elif status_code in self.ERROR_STATUS:
+                window['errors'] += 1
+            else:
+                window['successes'] += 1
+            if latency is not None:
+                window['latencies'].append(latency)
+
+    def record_page(self):
+        """记录一个成功抓取的页面；吞吐按页面/秒计算，媒体和API请求只参与错误率和延迟统计"""
+        with self._lock:
+            self._window['pages'] += 1
+
+    def start(self, plan: str = ''):
+        """启动后台调整线程；plan 为代理方案描述，随收敛配置一起记录"""
+        self.plan = plan
+        if not self.enabled or self._thread:
+            return
+        self._stop_event.clear()
+        self._window_start = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="concurrency-autotuner", daemon=True)
+        self._thread.start()
+        self.logger.info(f"自动调优启动: {self._settings_text()} (目标错误率 < {self.target_error_rate:.1%}, 代理方案: {plan or '未知'})")
+
+    def stop(self):
+        """停止调整线程并记录最终收敛配置"""
+        if not self._thread:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+        self.logger.info(f"自动调优收敛配置: {self._settings_text()} (代理方案: {self.plan or '未知'})")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._adjust()
+            except Exception as e:
+                self.logger.debug(f"自动调优调整失败: {e}")
+
+    def _settings_text(self) -> str:
+        return (f"workers={self.workers.limit}/{self.workers.maximum}, "
+                f"inflight={self.inflight.limit}/{self.inflight.maximum}, "
+                f"media={self.media.limit}/{self.media.maximum}")
+
+    def _scale(self, factor: float):
+        for gate in (self.workers, self.inflight, self.media):
+            gate.set_limit(math.floor(gate.limit * factor))
+
+    def _step(self, direction: int):
+        self.workers.set_limit(self.workers.limit + direction)
+        self.inflight.set_limit(self.inflight.limit + direction * max(1, self.inflight.limit // 10))
+        self.media.set_limit(self.media.limit + direction)
+
+    def _adjust(self):
+        """一个周期的调整：错误超标收缩，吞吐下降回退，延迟飙升保持，否则继续加大并发"""
+        with self._lock:
+            window = self._window
+            self._window = self._empty_window()
+            now = time.monotonic()
+            elapsed = max(0.001, now - self._window_start)
+            self._window_start = now
+
+        if window['requests'] < self.min_samples:
+            return
+
+        throughput = window['pages'] / elapsed
+        error_rate = window['errors'] / window['requests']
+        latencies = sorted(window['latencies'])
+        p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+
+        if error_rate > self.target_error_rate:
+            action = 'decrease'
+            self._scale(0.75)
+        elif self._last_action == 'increase' and throughput < self._last_throughput * 0.95:
+            action = 'revert'
+            self._step(-1)
+        elif self._best.get('p95') and p95 > self._best['p95'] * 3:
+            action = 'hold'
+        else:
+            action = 'increase'
+            self._step(1)
+
+        if error_rate <= self.target_error_rate and throughput >= self._best.get('throughput', 0.0):
+            self._best = {
+                'throughput': throughput,
+                'p95': p95,
+                'workers': self.workers.limit,
+                'inflight': self.inflight.limit,
+                'media': self.media.limit
+            }
+
+        self._last_action = action
+        self._last_throughput = throughput
+        entry = {
+            'action': action,
+            'throughput': throughput,
+            'p95': p95,
+            'error_rate': error_rate,
+            'timeouts': window['timeouts'],
+            'workers': self.workers.limit,
+            'inflight': self.inflight.limit,
+            'media': self.media.limit
+        }
+        self._history.append(entry)
+        self.logger.info(
+            f"自动调优: {action} → {self._settings_text()} "
+            f"(吞吐 {throughput:.2f} 页面/秒, p95 {p95:.2f}s, 错误率 {error_rate:.1%}, 超时 {window['timeouts']})"
+        )
+
+    def get_summary(self) -> Dict[str, Any]:
+        """获取当前配置、最佳观测点和调整次数"""
+        return {
+            'enabled': self.enabled,
+            'plan': self.plan,
+            'target_error_rate': self.target_error_rate,
+            'workers': self.workers.limit,
+            'max_workers': self.workers.maximum,
+            'inflight': self.inflight.limit,
+            'max_inflight': self.inflight.maximum,
+            'media': self.media.limit,
+            'max_media': self.media.maximum,
+            'adjustments': len(self._history),
+            'best': dict(self._best)
+        }
@@ -1,10 +1,13 @@
 import requests
-from bs4 import BeautifulSoup
+from parser_backend import make_soup
 import json
-import time
 import os
-import random
 import re
+import urllib.parse
+import threading
+import functools
+from rate_controller import AdaptiveRateController, RateLimitedAdapter
+from response_archive import ArchivingAdapter
 
 class IFixitCrawler:
     def __init__(self, base_url="https://www.ifixit.com"):
@@ -16,16 +19,64 @@ class IFixitCrawler:
         self.results = []
         self.visited_urls = set()
         self.debug = False  # 默认关闭调试模式
-        
-    def get_soup(self, url):
-        """获取页面内容并解析为BeautifulSoup对象"""
+        self.thread_local = threading.local()  # 每个线程独立的持久会话
+        self.rate_limiter = AdaptiveRateController()  # 所有请求共用的按主机自适应限速
+        self.response_archive = None  # 原始响应归档（录制或回放），未启用时为None
+        self.traffic_meter = None  # 流量计量（按内容类别累计响应字节数），未启用时为None
+        self.page_cache = None  # 运行期页面缓存（压缩HTML的LRU），未启用时为None
+
+    def _get_session(self):
+        """获取当前线程的持久会话，复用TCP/TLS连接"""
+        session = getattr(self.thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter_kwargs = {}
+            if self.traffic_meter:
+                adapter_kwargs['result_callback'] = functools.partial(self.traffic_meter.observe_request, None)
+            if self.response_archive:
+                adapter = ArchivingAdapter(self.rate_limiter, self.response_archive, **adapter_kwargs)
+            else:
+                adapter = RateLimitedAdapter(self.rate_limiter, **adapter_kwargs)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.thread_local.session = session
+        return session
+
+    def _is_replaying(self):
+        """是否处于离线回放模式（所有页面从响应归档读取）"""
+        return bool(self.response_archive and self.response_archive.replay)
+
+    def _load_rendered_html(self, url):
+        """回放模式下读取归档的Playwright渲染结果，未归档时返回None"""
+        record = self.response_archive.lookup(url, variant='rendered') if self.response_archive else None
+        return record['body'].decode('utf-8', errors='replace') if record else None
+
+    def _archive_rendered_html(self, url, status, html):
+        """录制模式下保存Playwright渲染后的HTML"""
+        if self.response_archive and not self.response_archive.replay and html:
+            self.response_archive.store(url, status or 200, {'Content-Type': 'text/html; charset=utf-8'},
+                                        html.encode('utf-8'), variant='rendered')
+
+    def get_page_html(self, url):
+        """获取页面原始HTML文本，失败时返回None"""
+        if self.page_cache:
+            cached = self.page_cache.get(url)
+            if cached is not None:
+                return cached.decode('utf-8', errors='replace')
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._get_session().get(url, headers=self.headers)
             response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
+            if self.page_cache:
+                self.page_cache.put(url, response.content)
+            return response.text
         except Exception as e:
             print(f"获取页面时发生错误: {url}, 错误: {str(e)}")
             return None
+
+    def get_soup(self, url):
+        """获取页面内容并解析为BeautifulSoup对象"""
+        html = self.get_page_html(url)
+        return make_soup(html) if html is not None else None
     
     def print_debug(self, message):
         """打印调试信息"""
@@ -113,45 +164,20 @@ class IFixitCrawler:
                         next_section = parent.find_next_sibling()
                         if next_section:
                             # 查找所有链接
-                            links = next_section.find_all("a", href=True)
-                            for link in links:
-                                href = link.get("href")
-                                text = link.text.strip()
-                                if href and text and "/Device/" in href:
-                                    full_url = self.base_url + href if href.startswith("/") else href
-                                    # 确保URL被正确编码
-                                    import urllib.parse
-                                    # 先解码再重新编码，确保一致性
-                                    decoded_url = urllib.parse.unquote(full_url)
-                                    encoded_url = urllib.parse.quote(decoded_url, safe=':/?#[]@!$&\'()*+,;=')
-                                    # 强制转换为英文内容
-                                    english_text = self._force_english_content(text)
-                                    categories.append({
-                                        "name": english_text,
-                                        "url": encoded_url
-                                    })
+                            for link in next_section.find_all("a", href=True):
+                                category = self._category_from_link(link)
+                                if category:
+                                    categories.append(category)
             
             # 如果没有找到类别标题，尝试其他方法
             if not categories:
                 # 查找可能包含类别的区域
                 category_containers = soup.select("div.categories, div.category-grid, ul.browse-devices")
                 for container in category_containers:
-                    links = container.find_all("a", href=True)
-                    for link in links:
-                        href = link.get("href")
-                        text = link.text.strip()
-                        if href and text and "/Device/" in href:
-                            full_url = self.base_url + href if href.startswith("/") else href
-                            # 确保URL被正确编码
-                            import urllib.parse
-                            decoded_url = urllib.parse.unquote(full_url)
-                            encoded_url = urllib.parse.quote(decoded_url, safe=':/?#[]@!$&\'()*+,;=')
-                            # 强制转换为英文内容
-                            english_text = self._force_english_content(text)
-                            categories.append({
-                                "name": english_text,
-                                "url": encoded_url
-                            })
+                    for link in container.find_all("a", href=True):
+                        category = self._category_from_link(link)
+                        if category:
+                            categories.append(category)
             
             # 如果还是没有找到，尝试查找所有可能的设备链接
             if not categories:
@@ -171,7 +197,6 @@ class IFixitCrawler:
                             full_url = self.base_url + href if href.startswith("/") else href
 
                             # 确保URL被正确编码
-                            import urllib.parse
                             decoded_url = urllib.parse.unquote(full_url)
                             encoded_url = urllib.parse.quote(decoded_url, safe=':/?#[]@!$&\'()*+,;=')
 
@@ -200,14 +225,7 @@ class IFixitCrawler:
                 self.print_debug(f"全局搜索找到 {len(categories)} 个潜在类别")
             
             # 去重
-            unique_categories = []
-            urls = set()
-            for category in categories:
-                if category["url"] not in urls and not any(x in category["url"] for x in ["/Edit/", "/History/", "?revision", "/Answers/"]):
-                    urls.add(category["url"])
-                    unique_categories.append(category)
-            
-            categories = unique_categories
+            categories = self._dedupe_categories(categories)
             self.print_debug(f"找到 {len(categories)} 个类别")
             for category in categories:
                 self.print_debug(f"  - {category['name']}: {category['url']}")
@@ -217,6 +235,63 @@ class IFixitCrawler:
         
         return categories
         
+    def _category_from_link(self, link):
+        """把指向设备页的链接转换为类别（统一URL编码并强制英文名称），不是设备链接时返回None"""
+        href = link.get("href")
+        text = link.text.strip()
+        if not (href and text and "/Device/" in href):
+            return None
+        full_url = self.base_url + href if href.startswith("/") else href
+        # 先解码再重新编码，确保一致性
+        decoded_url = urllib.parse.unquote(full_url)
+        encoded_url = urllib.parse.quote(decoded_url, safe=':/?#[]@!$&\'()*+,;=')
+        return {
+            "name": self._force_english_content(text),
+            "url": encoded_url
+        }
+
+    @staticmethod
+    def _dedupe_categories(categories):
+        """按URL去重并排除编辑/历史/问答页面"""
+        unique_categories = []
+        urls = set()
+        for category in categories:
+            if category["url"] not in urls and not any(x in category["url"] for x in ["/Edit/", "/History/", "?revision", "/Answers/"]):
+                urls.add(category["url"])
+                unique_categories.append(category)
+        return unique_categories
+
+    def extract_categories_link_scan(self, soup, url):
+        """
+        链接扫描模式下提取子类别（soup由make_link_soup创建，只含链接、标题和类别区块）
+
+        只采信"N Categories"标题之后、下一个标题之前的设备链接和类别区块中的链接；
+        链接扫描文档缺少完整结构，不做全局链接搜索，找不到时返回空列表，由调用方回退到完整解析
+        """
+        categories = []
+        try:
+            for marker in soup.find_all(string=re.compile(r"\d+\s*(个类别|Categories)")):
+                for element in marker.parent.find_all_next(["a", "h1", "h2", "h3"]):
+                    if element.name != "a":
+                        break
+                    category = self._category_from_link(element)
+                    if category:
+                        categories.append(category)
+
+            if not categories:
+                for container in soup.select("div.categories, div.category-grid, ul.browse-devices"):
+                    for link in container.find_all("a", href=True):
+                        category = self._category_from_link(link)
+                        if category:
+                            categories.append(category)
+
+            categories = self._dedupe_categories(categories)
+        except Exception as e:
+            print(f"链接扫描提取类别时发生错误: {str(e)}")
+            return []
+
+        return categories
+
     def is_final_product_page(self, soup, url):
         """判断当前页面是否为最终产品页面（没有子类别的页面）"""
         # 检查是否有子类别
@@ -680,9 +755,6 @@ class IFixitCrawler:
         if breadcrumb is None:
             breadcrumb = []
         
-        # 防止过快请求，添加延迟
-        time.sleep(random.uniform(2, 4))
-        
         print(f"爬取: {url}")
         soup = self.get_soup(url)
         if not soup:
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面内嵌React组件数据（data-props）的扫描与映射
+iFixit页面把组件数据以HTML转义的JSON写在 data-name/data-props 属性中（如 GuideTopComponent），
+这里直接在原始HTML上顺序扫描这些属性，每个组件只解码一次，再映射为指南数据结构；
+映射不到的字段由调用方继续用DOM启发式提取
+"""
+
+import re
+import json
+import html
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_PROPS_ATTR = 'data-props='
+_NAME_PATTERN = re.compile(r'\sdata-name\s*=\s*(["\'])(.*?)\1', re.DOTALL)
+_YOUTUBE_PATTERN = re.compile(r'(?:youtube(?:-nocookie)?\.com/(?:embed/|watch\?v=)|youtu\.be/)([\w-]{11})')
+_BLOCK_END_PATTERN = re.compile(r'<br\s*/?>|</(?:p|li|div|h\d)>', re.IGNORECASE)
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+
+# 查找指南记录时的最大嵌套深度
+_MAX_DEPTH = 8
+
+
+def decode_props(raw: Optional[str]) -> Optional[Dict[str, Any]]:
+    """解码一个data-props属性值（HTML转义的JSON），不是JSON对象时返回None"""
+    if not raw:
+        return None
+    try:
+        data = json.loads(html.unescape(raw))
+    except (ValueError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def iter_component_props(markup) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """在原始HTML上顺序扫描所有 data-props 属性，逐个产出 (data-name, 解码后的props)，不构建DOM"""
+    if isinstance(markup, bytes):
+        markup = markup.decode('utf-8', errors='replace')
+    if not markup:
+        return
+
+    pos = 0
+    while True:
+        index = markup.find(_PROPS_ATTR, pos)
+        if index < 0:
+            return
+        value_start = index + len(_PROPS_ATTR)
+        pos = value_start
+
+        # 必须是标签内的属性（前面是空白且位于未闭合的标签中），跳过正文和脚本里的同名文本
+        tag_start = markup.rfind('<', 0, index)
+        if tag_start < 0 or not markup[index - 1].isspace() or '>' in markup[tag_start:index]:
+            continue
+        quote = markup[value_start:value_start + 1]
+        if quote not in ('"', "'"):
+            continue
+        value_end = markup.find(quote, value_start + 1)
+        if value_end < 0:
+            return
+        pos = value_end + 1
+
+        props = decode_props(markup[value_start + 1:value_end])
+        if props is None:
+            continue
+
+        # data-name 可能在 data-props 之前或之后
+        name_match = _NAME_PATTERN.search(markup, tag_start, index)
+        if not name_match:
+            tag_end = markup.find('>', value_end)
+            name_match = _NAME_PATTERN.search(markup, value_end, tag_end if tag_end >= 0 else len(markup))
+        yield (html.unescape(name_match.group(2)) if name_match else None), props
+
+
+def components_from_soup(soup) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """已有DOM时的等价扫描：产出页面中所有带 data-props 的元素"""
+    for element in soup.find_all(attrs={'data-props': True}):
+        props = decode_props(element.get('data-props'))
+        if props is not None:
+            yield element.get('data-name'), props
+
+
+def find_component_props(components: Iterable[Tuple[Optional[str], Dict[str, Any]]],
+                         name: str) -> Optional[Dict[str, Any]]:
+    """按组件名查找第一个组件的props"""
+    for component_name, props in components:
+        if component_name == name:
+            return props
+    return None
+
+
+def _is_guide_record(data: Dict[str, Any]) -> bool:
+    """判断是否为指南记录（与 /api/2.0/guides/{id} 同结构：steps列表中的步骤带lines或media）"""
+    steps = data.get('steps')
+    if not isinstance(steps, list) or not steps or not isinstance(steps[0], dict):
+        return False
+    return ('lines' in steps[0] or 'media' in steps[0]) and ('title' in data or 'guideid' in data or 'guideId' in data)
+
+
+def _find_record(data: Any, depth: int = 0) -> Optional[Dict[str, Any]]:
+    if depth > _MAX_DEPTH:
+        return None
+    if isinstance(data, dict):
+        if _is_guide_record(data):
+            return data
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for value in values:
+        if isinstance(value, (dict, list)):
+            record = _find_record(value, depth + 1)
+            if record is not None:
+                return record
+    return None
+
+
+def find_guide_record(components: Iterable[Tuple[Optional[str], Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """在所有组件props中查找指南记录"""
+    for _, props in components:
+        record = _find_record(props)
+        if record is not None:
+            return record
+    return None
+
+
+def html_to_text(fragment: Optional[str]) -> str:
+    """把组件中渲染好的HTML片段转成纯文本（块级元素结尾换行）"""
+    if not fragment:
+        return ''
+    text = _BLOCK_END_PATTERN.sub('\n', fragment)
+    text = html.unescape(_TAG_PATTERN.sub('', text))
+    return text.strip()
+
+
+def _clean_title(text: str) -> str:
+    text = _CJK_PATTERN.sub('', text or '')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _clean_content(text: str) -> str:
+    text = _CJK_PATTERN.sub('', text or '')
+    text = re.sub(r'\n\s*\n', '\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    return text.strip()
+
+
+def _first_text(data: Dict[str, Any], rendered_keys: Tuple[str, ...], raw_keys: Tuple[str, ...]) -> str:
+    for key in rendered_keys:
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            return html_to_text(value)
+    for key in raw_keys:
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ''
+
+
+def _absolute_url(url: str, base_url: str) -> str:
+    if url.startswith('//'):
+        return 'https:' + url
+    if url.startswith('/'):
+        return base_url + url
+    return url
+
+
+def _iter_strings(data: Any) -> Iterator[str]:
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from _iter_strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _iter_strings(value)
+
+
+def _map_step(step: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    """把一个步骤映射为 {title, content, images, videos}"""
+    lines = []
+    for line in step.get('lines') or []:
+        if isinstance(line, dict):
+            text = _first_text(line, ('text_rendered', 'textRendered'), ('text_raw', 'textRaw', 'text'))
+        else:
+            text = str(line).strip()
+        if text:
+            lines.append(text)
+
+    step_data = {
+        "title": _clean_title(step.get('title') or ''),
+        "content": _clean_content('\n'.join(lines)),
+        "images": [],
+        "videos": []
+    }
+
+    media = step.get('media') or {}
+    media_type = str(media.get('type', '')).lower() if isinstance(media, dict) else ''
+    media_items = media.get('data') if isinstance(media, dict) else None
+    if isinstance(media_items, dict):
+        media_items = [media_items]
+
+    if media_type == 'image':
+        seen_images = set()
+        for image in media_items or []:
+            if not isinstance(image, dict):
+                continue
+            image_url = image.get('medium') or image.get('standard') or image.get('original')
+            if isinstance(image_url, str) and image_url and image_url not in seen_images:
+                seen_images.add(image_url)
+                step_data["images"].append(_absolute_url(image_url, base_url))
+    elif media_type in ('video', 'embed'):
+        for value in _iter_strings(media_items):
+            for video_id in _YOUTUBE_PATTERN.findall(value):
+                video_url = f"https://www.youtube.com/watch?v={video_id}"
+                if video_url not in step_data["videos"]:
+                    step_data["videos"].append(video_url)
+
+    return step_data
+
+
+def map_guide_record(record: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    """把指南记录映射为指南数据结构中的 title/introduction/steps，只返回记录中真实存在的字段"""
+    guide_data: Dict[str, Any] = {}
+
+    title = _clean_title(record.get('title') or '')
+    if title:
+        guide_data["title"] = title
+
+    introduction = _first_text(record, ('introduction_rendered', 'introductionRendered'),
+                               ('introduction_raw', 'introductionRaw', 'introduction'))
+    if introduction:
+        introduction = re.sub(r'\n\s*\n', '\n\n', introduction)
+        guide_data["introduction"] = re.sub(r'[ \t]+', ' ', introduction)
+
+    steps: List[Dict[str, Any]] = []
+    seen_steps = set()
+    for step in record.get('steps') or []:
+        if not isinstance(step, dict):
+            continue
+        step_data = _map_step(step, base_url)
+        # 与DOM提取相同的去重和空步骤过滤
+        step_identifier = f"{step_data['title']}_{step_data['content'][:50]}"
+        if step_identifier in seen_steps:
+            continue
+        seen_steps.add(step_identifier)
+        if step_data["title"] or step_data["content"] or step_data["images"]:
+            steps.append(step_data)
+    if steps:
+        guide_data["steps"] = steps
+
+    return guide_data
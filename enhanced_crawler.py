@@ -1,12 +1,14 @@
-import requests
-from bs4 import BeautifulSoup
+from parser_backend import make_soup
+from embedded_props import (iter_component_props, components_from_soup, decode_props,
+                            find_component_props, find_guide_record, map_guide_record)
 import json
 import time
-import random
 import os
 import re
+import threading
 from urllib.parse import urljoin, urlparse
 from crawler import IFixitCrawler
+from browser_pool import BrowserPool
 
 class EnhancedIFixitCrawler(IFixitCrawler):
     def __init__(self, base_url="https://www.ifixit.com", verbose=False):
@@ -16,6 +18,14 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         self.troubleshooting_visited = set()  # 记录已访问的故障排除页面，避免重复
         self.processed_guides = set()  # 记录已处理的指南，避免重复
         self.verbose = verbose  # 控制详细输出
+        self.browser_pool = None  # Playwright浏览器池（首次渲染时创建）
+        self._browser_pool_lock = threading.Lock()
+        # 离线提取（解析进程池的工作进程）：提取中不访问网络，需要联网的补充查询记入deferred_lookups由主进程完成
+        self.offline_extraction = False
+        self.deferred_lookups = []
+        # 每个URL的实际抓取次数（含浏览器渲染），用于确认每个页面只请求一次
+        self.fetch_counts = {}
+        self._fetch_counts_lock = threading.Lock()
 
         # 强制使用英文，添加英文语言头
         self.headers.update({
@@ -23,6 +33,32 @@ class EnhancedIFixitCrawler(IFixitCrawler):
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
+    def _record_fetch(self, url):
+        """记录URL的抓取次数（按标准化后的URL统计）"""
+        with self._fetch_counts_lock:
+            self.fetch_counts[url] = self.fetch_counts.get(url, 0) + 1
+
+    def get_fetch_stats(self):
+        """获取每个唯一URL的抓取次数统计"""
+        with self._fetch_counts_lock:
+            counts = dict(self.fetch_counts)
+        total_fetches = sum(counts.values())
+        repeated = {url: count for url, count in counts.items() if count > 1}
+        return {
+            'unique_urls': len(counts),
+            'total_fetches': total_fetches,
+            'fetches_per_url': (total_fetches / len(counts)) if counts else 0.0,
+            'repeated_urls': repeated
+        }
+
+    def _get_browser_pool(self):
+        """获取共享的Playwright浏览器池，首次调用时创建（浏览器本身在首次渲染时才启动）"""
+        with self._browser_pool_lock:
+            if self.browser_pool is None:
+                self.browser_pool = BrowserPool(user_agent=self.headers.get('User-Agent'),
+                                                logger=getattr(self, 'logger', None))
+            return self.browser_pool
+
     def is_allowed_by_robots(self, url):
         """检查URL是否被robots.txt允许"""
         # 根据robots.txt规则检查
@@ -168,8 +204,26 @@ class EnhancedIFixitCrawler(IFixitCrawler):
             url += '?lang=en'
         return url
 
-    def extract_guide_content(self, guide_url):
-        """提取指南页面的详细内容"""
+    def _resolve_soup(self, url, soup=None, html=None):
+        """优先使用调用方已获取的soup或原始HTML，只有都没有时才发起请求"""
+        if soup is not None:
+            return soup
+        if html:
+            return make_soup(html)
+
+        # 请求频率由get_soup内的rate_limiter统一控制
+        return self.get_soup(url)
+
+    def is_guide_processed(self, guide_url):
+        """检查指南是否已处理，供调用方在获取页面前判断，避免无效请求"""
+        normalized_url = self._normalize_guide_url(self.ensure_english_url(guide_url))
+        return normalized_url in self.processed_guides
+
+    def extract_guide_content(self, guide_url, soup=None, html=None):
+        """提取指南页面的详细内容
+
+        soup/html: 调用方已获取的页面（解析后的soup或原始HTML），传入时不再重复请求
+        """
         if not self.is_allowed_by_robots(guide_url):
             if self.verbose:
                 print(f"跳过被robots.txt禁止的URL: {guide_url}")
@@ -191,10 +245,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         if self.verbose:
             print(f"Crawling guide content: {guide_url}")
 
-        # 添加延迟避免过快请求
-        time.sleep(random.uniform(1, 2))
-
-        soup = self.get_soup(guide_url)
+        soup = self._resolve_soup(guide_url, soup, html)
         if not soup:
             return None
 
@@ -207,261 +258,12 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         }
 
         try:
-            # 提取指南标题 - 确保英文
-            title_elem = soup.select_one("h1.guide-title, h1.title, h1")
-            if title_elem:
-                title_text = title_elem.get_text().strip()
-                # 移除中文字符，保持英文内容
-                title_text = re.sub(r'[\u4e00-\u9fff]+', '', title_text)
-                title_text = re.sub(r'\s+', ' ', title_text).strip()
-                guide_data["title"] = title_text
-
-            # 提取介绍内容 - 精确提取，避免包含步骤内容
-            intro_selectors = [
-                ".guide-introduction",
-                ".introduction",
-                ".guide-summary",
-                ".summary",
-                ".guide-description",
-                ".description",
-                ".guide-intro",
-                ".intro"
-            ]
-
-            # 方法1：尝试专门的介绍区域选择器
-            for selector in intro_selectors:
-                intro_elem = soup.select_one(selector)
-                if intro_elem:
-                    intro_text = intro_elem.get_text().strip()
-                    # 清理多余的空白字符，但保留段落分隔
-                    intro_text = re.sub(r'\n\s*\n', '\n\n', intro_text)
-                    intro_text = re.sub(r'[ \t]+', ' ', intro_text)
-                    if len(intro_text) > 20:
-                        guide_data["introduction"] = intro_text
-                        break
-
-            # 方法2：查找页面中明确标识为简介的内容
-            if not guide_data["introduction"]:
-                # 查找包含"Introduction"或"简介"标题的区域 (英文优先)
-                intro_headers = soup.find_all(string=lambda text: text and
-                    any(word in text for word in ["Introduction", "Overview", "About", "简介"]))
-
-                for header in intro_headers:
-                    # 找到简介标题后，获取其后的内容
-                    parent = header.parent
-                    if parent:
-                        intro_parts = []
-
-                        # 方法2a：查找同级或下级的段落
-                        next_elements = parent.find_next_siblings(['p', 'div'])
-                        for elem in next_elements:
-                            elem_text = elem.get_text().strip()
-                            # 如果遇到步骤内容或其他标题，停止
-                            if (any(stop_word in elem_text.lower() for stop_word in
-                                   ['step 1', 'what you need', 'tools', 'parts']) or
-                                elem.find(['h1', 'h2', 'h3', 'h4'])):
-                                break
-                            # 对于div元素，提取其中的所有段落
-                            if elem.name == 'div':
-                                # 查找div中的所有段落
-                                paragraphs = elem.find_all('p')
-                                if paragraphs:
-                                    for p in paragraphs:
-                                        p_text = p.get_text().strip()
-                                        if (p_text and len(p_text) > 20 and
-                                            not any(step_word in p_text.lower() for step_word in
-                                                   ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
-                                            intro_parts.append(p_text)
-                                else:
-                                    # 如果div中没有p标签，直接取div的文本
-                                    if (elem_text and len(elem_text) > 20 and
-                                        not any(step_word in elem_text.lower() for step_word in
-                                               ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
-                                        intro_parts.append(elem_text)
-                            else:
-                                # 对于p元素，直接提取文本
-                                if (elem_text and len(elem_text) > 20 and
-                                    not any(step_word in elem_text.lower() for step_word in
-                                           ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
-                                    intro_parts.append(elem_text)
-
-                        # 方法2b：如果没找到兄弟元素，查找父元素的下一个兄弟元素
-                        if not intro_parts:
-                            parent_next = parent.find_next_sibling()
-                            while parent_next:
-                                if parent_next.name in ['p', 'div']:
-                                    elem_text = parent_next.get_text().strip()
-                                    # 如果遇到步骤内容或其他标题，停止
-                                    if (any(stop_word in elem_text.lower() for stop_word in
-                                           ['step 1', 'what you need', 'tools', 'parts']) or
-                                        parent_next.find(['h1', 'h2', 'h3', 'h4'])):
-                                        break
-                                    if (elem_text and len(elem_text) > 20 and
-                                        not any(step_word in elem_text.lower() for step_word in
-                                               ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
-                                        intro_parts.append(elem_text)
-                                elif parent_next.name and parent_next.name.startswith('h'):
-                                    break
-                                parent_next = parent_next.find_next_sibling()
-
-                        if intro_parts:
-                            intro_text = '\n\n'.join(intro_parts)
-                            intro_text = re.sub(r'[ \t]+', ' ', intro_text)
-                            guide_data["introduction"] = intro_text
-                            break
-
-            # 方法2b：直接查找Introduction标题后的内容
-            if not guide_data["introduction"]:
-                intro_headers = soup.find_all(['h1', 'h2', 'h3'], string=lambda text: text and "Introduction" in text)
-                for header in intro_headers:
-                    # 查找下一个兄弟元素（可能是div或其他元素）
-                    next_elem = header.find_next_sibling()
-                    if next_elem:
-                        # 如果是div，提取其中的文本
-                        if next_elem.name == 'div':
-                            # 查找div中的段落
-                            paragraphs = next_elem.find_all('p')
-                            if paragraphs:
-                                intro_texts = []
-                                for p in paragraphs:
-                                    p_text = p.get_text().strip()
-                                    if p_text and len(p_text) > 10:
-                                        intro_texts.append(p_text)
-                                if intro_texts:
-                                    intro_text = '\n\n'.join(intro_texts)
-                                    guide_data["introduction"] = intro_text
-                                    break
-                            else:
-                                # 如果div中没有p标签，直接取div的文本
-                                div_text = next_elem.get_text().strip()
-                                if div_text and len(div_text) > 10:
-                                    guide_data["introduction"] = div_text
-                                    break
-                        # 如果直接是段落
-                        elif next_elem.name == 'p':
-                            p_text = next_elem.get_text().strip()
-                            if p_text and len(p_text) > 10:
-                                guide_data["introduction"] = p_text
-                                break
-
-            # 方法3：查找页面开头的描述性段落，但要避免步骤内容
-            if not guide_data["introduction"]:
-                # 查找页面中的段落，但要过滤掉步骤相关内容
-                all_paragraphs = soup.select("p")
-                intro_parts = []
-
-                for p in all_paragraphs[:15]:  # 检查前15个段落
-                    p_text = p.get_text().strip()
-
-                    # 如果遇到步骤内容，停止收集
-                    if any(stop_word in p_text.lower() for stop_word in
-                           ['step 1', 'what you need', 'tools', 'parts']):
-                        break
-
-                    # 检查是否是合适的简介内容 (英文关键词优先)
-                    if (p_text and 30 <= len(p_text) <= 500 and  # 长度适中，增加上限
-                        not any(skip_word in p_text.lower() for skip_word in [
-                            'step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips',
-                            'menu', 'navigation', 'login', 'register', 'cookie', 'privacy',
-                            'following', 'securing', 'mm', 'torx',  # 常见步骤用词
-                            '步骤'  # 中文步骤
-                        ]) and
-                        # 确保包含描述性词汇 (英文优先)
-                        any(desc_word in p_text.lower() for desc_word in [
-                            'guide', 'replace', 'repair', 'fix', 'problem', 'issue',
-                            'help', 'show', 'how to', 'this will', 'use this', 'tutorial',
-                            'connectivity', 'airport', 'wireless', 'display frame'
-                        ])):
-
-                        intro_text = re.sub(r'[ \t]+', ' ', p_text)
-                        intro_parts.append(intro_text)
-
-                        # 如果已经收集到足够的内容，继续查找相关段落
-                        if len(intro_parts) >= 2:
-                            break
-
-                if intro_parts:
-                    guide_data["introduction"] = '\n\n'.join(intro_parts)
-
-            # 提取步骤
-            steps = soup.select(".guide-step, .step")
-            processed_steps = set()  # 用于去重
-
-            for step in steps:
-                step_data = {
-                    "title": "",
-                    "content": "",
-                    "images": [],
-                    "videos": []
-                }
-
-                # 步骤标题 - 清理格式，确保英文
-                step_title = step.select_one(".step-title, h3, h4")
-                if step_title:
-                    title_text = step_title.get_text().strip()
-                    # 移除中文字符
-                    title_text = re.sub(r'[\u4e00-\u9fff]+', '', title_text)
-                    # 清理多余的空白字符和换行符
-                    title_text = re.sub(r'\s+', ' ', title_text).strip()
-                    step_data["title"] = title_text
-
-                # 步骤内容 - 清理格式，确保英文，支持自适应换行
-                step_content = step.select_one(".step-content, .step-text")
-                if step_content:
-                    content_text = step_content.get_text().strip()
-                    # 移除中文字符
-                    content_text = re.sub(r'[\u4e00-\u9fff]+', '', content_text)
-                    # 保留句子间的换行，但清理多余的空白字符
-                    content_text = re.sub(r'\n\s*\n', '\n', content_text)  # 合并多个换行为单个
-                    content_text = re.sub(r'[ \t]+', ' ', content_text)  # 清理空格和制表符
-                    content_text = content_text.strip()
-                    step_data["content"] = content_text
-
-                # 创建步骤唯一标识符用于去重
-                step_identifier = f"{step_data['title']}_{step_data['content'][:50]}"
-                if step_identifier in processed_steps:
-                    continue  # 跳过重复步骤
-                processed_steps.add(step_identifier)
-
-                # 步骤图片 - 只保留medium格式，去重
-                step_images = step.select("img")
-                seen_images = set()
-                for img in step_images:
-                    img_src = img.get("src") or img.get("data-src")
-                    if img_src:
-                        if img_src.startswith("//"):
-                            img_src = "https:" + img_src
-                        elif img_src.startswith("/"):
-                            img_src = self.base_url + img_src
-
-                        # 只保留medium格式的图片，去除其他格式
-                        if ".medium" in img_src:
-                            # 提取基础URL用于去重
-                            base_img_url = img_src.split('.medium')[0]
-                            if base_img_url not in seen_images:
-                                seen_images.add(base_img_url)
-                                step_data["images"].append(img_src)
-                        elif not any(suffix in img_src for suffix in [".200x150", ".standard", ".large", ".small"]):
-                            # 如果没有格式后缀，也包含进来
-                            if img_src not in seen_images:
-                                seen_images.add(img_src)
-                                step_data["images"].append(img_src)
-
-                # 步骤中的视频 - 去重
-                step_videos = step.select("[videoid], .video")
-                seen_videos = set()
-                for video in step_videos:
-                    video_id = video.get("videoid")
-                    if video_id and video_id not in seen_videos:
-                        seen_videos.add(video_id)
-                        video_url = f"https://www.youtube.com/watch?v={video_id}"
-                        step_data["videos"].append(video_url)
-
-                # 只添加有内容的步骤
-                if step_data["title"] or step_data["content"] or step_data["images"]:
-                    guide_data["steps"].append(step_data)
-
+            # 页面内嵌的React组件数据只解码一次，数据中已有的字段不再走DOM启发式
+            structured = self._extract_structured_guide(guide_url, soup, html)
 
+            guide_data["title"] = structured.get("title") or self._extract_title_from_dom(soup)
+            guide_data["introduction"] = structured.get("introduction") or self._extract_introduction_from_dom(soup)
+            guide_data["steps"] = structured.get("steps") or self._extract_steps_from_dom(soup)
 
             # 提取视频 - 去重，使用改进的视频提取方法
             videos = self.extract_all_videos_from_page(soup)
@@ -472,11 +274,13 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                     seen_video_urls.add(video_url)
                     guide_data["videos"].append(video)
 
-            # 提取时间和难度信息
-            time_difficulty = self.extract_time_and_difficulty(soup, guide_url)
+            # 提取时间和难度信息（组件数据中没有时才请求API或搜索页面文本）
+            time_difficulty = structured.get("time_difficulty")
+            if time_difficulty is None:
+                time_difficulty = self.extract_time_and_difficulty(soup, guide_url)
 
             # 提取What you need部分
-            what_you_need = self.extract_what_you_need(soup, guide_url)
+            what_you_need = structured.get("what_you_need") or self.extract_what_you_need(soup, guide_url)
 
             # 提取统计数据
             statistics = self.extract_page_statistics(soup)
@@ -534,6 +338,313 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"提取指南内容时发生错误: {str(e)}")
             return None
 
+    def _extract_structured_guide(self, guide_url, soup, html=None):
+        """从页面内嵌的React组件数据（data-props）提取指南字段
+
+        有原始HTML时直接顺序扫描，不遍历DOM；只返回组件数据中真实存在的字段，
+        其中 time_difficulty 为None（缺失）时由调用方回退到API和页面文本
+        """
+        structured = {}
+
+        try:
+            if html:
+                components = list(iter_component_props(html))
+            else:
+                components = list(components_from_soup(soup))
+            if not components:
+                return structured
+
+            record = find_guide_record(components)
+            if record:
+                structured.update(map_guide_record(record, self.base_url))
+
+                time_difficulty = self._time_difficulty_from_guide_data(record)
+                if time_difficulty is None or self._skip_time_and_difficulty(guide_url, structured.get("title")):
+                    structured["time_difficulty"] = {}
+                elif time_difficulty:
+                    structured["time_difficulty"] = time_difficulty
+
+            guide_top_props = find_component_props(components, 'GuideTopComponent')
+            if guide_top_props:
+                what_you_need = self._what_you_need_from_props(guide_top_props)
+                if what_you_need:
+                    structured["what_you_need"] = what_you_need
+
+            if self.verbose and structured:
+                print(f"从页面组件数据提取到字段: {list(structured.keys())}")
+
+        except Exception as e:
+            if self.verbose:
+                print(f"从页面组件数据提取指南时发生错误: {str(e)}")
+            return {}
+
+        return structured
+
+    def _extract_title_from_dom(self, soup):
+        """从DOM提取指南标题 - 确保英文"""
+        title_elem = soup.select_one("h1.guide-title, h1.title, h1")
+        if title_elem:
+            title_text = title_elem.get_text().strip()
+            # 移除中文字符，保持英文内容
+            title_text = re.sub(r'[\u4e00-\u9fff]+', '', title_text)
+            title_text = re.sub(r'\s+', ' ', title_text).strip()
+            return title_text
+        return ""
+
+    def _extract_introduction_from_dom(self, soup):
+        """从DOM提取介绍内容 - 精确提取，避免包含步骤内容"""
+        introduction = ""
+
+        intro_selectors = [
+            ".guide-introduction",
+            ".introduction",
+            ".guide-summary",
+            ".summary",
+            ".guide-description",
+            ".description",
+            ".guide-intro",
+            ".intro"
+        ]
+
+        # 方法1：尝试专门的介绍区域选择器
+        for selector in intro_selectors:
+            intro_elem = soup.select_one(selector)
+            if intro_elem:
+                intro_text = intro_elem.get_text().strip()
+                # 清理多余的空白字符，但保留段落分隔
+                intro_text = re.sub(r'\n\s*\n', '\n\n', intro_text)
+                intro_text = re.sub(r'[ \t]+', ' ', intro_text)
+                if len(intro_text) > 20:
+                    introduction = intro_text
+                    break
+
+        # 方法2：查找页面中明确标识为简介的内容
+        if not introduction:
+            # 查找包含"Introduction"或"简介"标题的区域 (英文优先)
+            intro_headers = soup.find_all(string=lambda text: text and
+                any(word in text for word in ["Introduction", "Overview", "About", "简介"]))
+
+            for header in intro_headers:
+                # 找到简介标题后，获取其后的内容
+                parent = header.parent
+                if parent:
+                    intro_parts = []
+
+                    # 方法2a：查找同级或下级的段落
+                    next_elements = parent.find_next_siblings(['p', 'div'])
+                    for elem in next_elements:
+                        elem_text = elem.get_text().strip()
+                        # 如果遇到步骤内容或其他标题，停止
+                        if (any(stop_word in elem_text.lower() for stop_word in
+                               ['step 1', 'what you need', 'tools', 'parts']) or
+                            elem.find(['h1', 'h2', 'h3', 'h4'])):
+                            break
+                        # 对于div元素，提取其中的所有段落
+                        if elem.name == 'div':
+                            # 查找div中的所有段落
+                            paragraphs = elem.find_all('p')
+                            if paragraphs:
+                                for p in paragraphs:
+                                    p_text = p.get_text().strip()
+                                    if (p_text and len(p_text) > 20 and
+                                        not any(step_word in p_text.lower() for step_word in
+                                               ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
+                                        intro_parts.append(p_text)
+                            else:
+                                # 如果div中没有p标签，直接取div的文本
+                                if (elem_text and len(elem_text) > 20 and
+                                    not any(step_word in elem_text.lower() for step_word in
+                                           ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
+                                    intro_parts.append(elem_text)
+                        else:
+                            # 对于p元素，直接提取文本
+                            if (elem_text and len(elem_text) > 20 and
+                                not any(step_word in elem_text.lower() for step_word in
+                                       ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
+                                intro_parts.append(elem_text)
+
+                    # 方法2b：如果没找到兄弟元素，查找父元素的下一个兄弟元素
+                    if not intro_parts:
+                        parent_next = parent.find_next_sibling()
+                        while parent_next:
+                            if parent_next.name in ['p', 'div']:
+                                elem_text = parent_next.get_text().strip()
+                                # 如果遇到步骤内容或其他标题，停止
+                                if (any(stop_word in elem_text.lower() for stop_word in
+                                       ['step 1', 'what you need', 'tools', 'parts']) or
+                                    parent_next.find(['h1', 'h2', 'h3', 'h4'])):
+                                    break
+                                if (elem_text and len(elem_text) > 20 and
+                                    not any(step_word in elem_text.lower() for step_word in
+                                           ['step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips', 'following', '步骤'])):
+                                    intro_parts.append(elem_text)
+                            elif parent_next.name and parent_next.name.startswith('h'):
+                                break
+                            parent_next = parent_next.find_next_sibling()
+
+                    if intro_parts:
+                        intro_text = '\n\n'.join(intro_parts)
+                        intro_text = re.sub(r'[ \t]+', ' ', intro_text)
+                        introduction = intro_text
+                        break
+
+        # 方法2b：直接查找Introduction标题后的内容
+        if not introduction:
+            intro_headers = soup.find_all(['h1', 'h2', 'h3'], string=lambda text: text and "Introduction" in text)
+            for header in intro_headers:
+                # 查找下一个兄弟元素（可能是div或其他元素）
+                next_elem = header.find_next_sibling()
+                if next_elem:
+                    # 如果是div，提取其中的文本
+                    if next_elem.name == 'div':
+                        # 查找div中的段落
+                        paragraphs = next_elem.find_all('p')
+                        if paragraphs:
+                            intro_texts = []
+                            for p in paragraphs:
+                                p_text = p.get_text().strip()
+                                if p_text and len(p_text) > 10:
+                                    intro_texts.append(p_text)
+                            if intro_texts:
+                                intro_text = '\n\n'.join(intro_texts)
+                                introduction = intro_text
+                                break
+                        else:
+                            # 如果div中没有p标签，直接取div的文本
+                            div_text = next_elem.get_text().strip()
+                            if div_text and len(div_text) > 10:
+                                introduction = div_text
+                                break
+                    # 如果直接是段落
+                    elif next_elem.name == 'p':
+                        p_text = next_elem.get_text().strip()
+                        if p_text and len(p_text) > 10:
+                            introduction = p_text
+                            break
+
+        # 方法3：查找页面开头的描述性段落，但要避免步骤内容
+        if not introduction:
+            # 查找页面中的段落，但要过滤掉步骤相关内容
+            all_paragraphs = soup.select("p")
+            intro_parts = []
+
+            for p in all_paragraphs[:15]:  # 检查前15个段落
+                p_text = p.get_text().strip()
+
+                # 如果遇到步骤内容，停止收集
+                if any(stop_word in p_text.lower() for stop_word in
+                       ['step 1', 'what you need', 'tools', 'parts']):
+                    break
+
+                # 检查是否是合适的简介内容 (英文关键词优先)
+                if (p_text and 30 <= len(p_text) <= 500 and  # 长度适中，增加上限
+                    not any(skip_word in p_text.lower() for skip_word in [
+                        'step 1', 'step 2', 'remove the', 'install the', 'screw', 'phillips',
+                        'menu', 'navigation', 'login', 'register', 'cookie', 'privacy',
+                        'following', 'securing', 'mm', 'torx',  # 常见步骤用词
+                        '步骤'  # 中文步骤
+                    ]) and
+                    # 确保包含描述性词汇 (英文优先)
+                    any(desc_word in p_text.lower() for desc_word in [
+                        'guide', 'replace', 'repair', 'fix', 'problem', 'issue',
+                        'help', 'show', 'how to', 'this will', 'use this', 'tutorial',
+                        'connectivity', 'airport', 'wireless', 'display frame'
+                    ])):
+
+                    intro_text = re.sub(r'[ \t]+', ' ', p_text)
+                    intro_parts.append(intro_text)
+
+                    # 如果已经收集到足够的内容，继续查找相关段落
+                    if len(intro_parts) >= 2:
+                        break
+
+            if intro_parts:
+                introduction = '\n\n'.join(intro_parts)
+
+        return introduction
+
+    def _extract_steps_from_dom(self, soup):
+        """从DOM提取步骤（标题、内容、图片、视频）"""
+        steps = []
+        step_elements = soup.select(".guide-step, .step")
+        processed_steps = set()  # 用于去重
+
+        for step in step_elements:
+            step_data = {
+                "title": "",
+                "content": "",
+                "images": [],
+                "videos": []
+            }
+
+            # 步骤标题 - 清理格式，确保英文
+            step_title = step.select_one(".step-title, h3, h4")
+            if step_title:
+                title_text = step_title.get_text().strip()
+                # 移除中文字符
+                title_text = re.sub(r'[\u4e00-\u9fff]+', '', title_text)
+                # 清理多余的空白字符和换行符
+                title_text = re.sub(r'\s+', ' ', title_text).strip()
+                step_data["title"] = title_text
+
+            # 步骤内容 - 清理格式，确保英文，支持自适应换行
+            step_content = step.select_one(".step-content, .step-text")
+            if step_content:
+                content_text = step_content.get_text().strip()
+                # 移除中文字符
+                content_text = re.sub(r'[\u4e00-\u9fff]+', '', content_text)
+                # 保留句子间的换行，但清理多余的空白字符
+                content_text = re.sub(r'\n\s*\n', '\n', content_text)  # 合并多个换行为单个
+                content_text = re.sub(r'[ \t]+', ' ', content_text)  # 清理空格和制表符
+                content_text = content_text.strip()
+                step_data["content"] = content_text
+
+            # 创建步骤唯一标识符用于去重
+            step_identifier = f"{step_data['title']}_{step_data['content'][:50]}"
+            if step_identifier in processed_steps:
+                continue  # 跳过重复步骤
+            processed_steps.add(step_identifier)
+
+            # 步骤图片 - 只保留medium格式，去重
+            step_images = step.select("img")
+            seen_images = set()
+            for img in step_images:
+                img_src = img.get("src") or img.get("data-src")
+                if img_src:
+                    if img_src.startswith("//"):
+                        img_src = "https:" + img_src
+                    elif img_src.startswith("/"):
+                        img_src = self.base_url + img_src
+
+                    # 只保留medium格式的图片，去除其他格式
+                    if ".medium" in img_src:
+                        # 提取基础URL用于去重
+                        base_img_url = img_src.split('.medium')[0]
+                        if base_img_url not in seen_images:
+                            seen_images.add(base_img_url)
+                            step_data["images"].append(img_src)
+                    elif not any(suffix in img_src for suffix in [".200x150", ".standard", ".large", ".small"]):
+                        # 如果没有格式后缀，也包含进来
+                        if img_src not in seen_images:
+                            seen_images.add(img_src)
+                            step_data["images"].append(img_src)
+
+            # 步骤中的视频 - 去重
+            step_videos = step.select("[videoid], .video")
+            seen_videos = set()
+            for video in step_videos:
+                video_id = video.get("videoid")
+                if video_id and video_id not in seen_videos:
+                    seen_videos.add(video_id)
+                    video_url = f"https://www.youtube.com/watch?v={video_id}"
+                    step_data["videos"].append(video_url)
+
+            # 只添加有内容的步骤
+            if step_data["title"] or step_data["content"] or step_data["images"]:
+                steps.append(step_data)
+
+        return steps
+
     def clean_product_name(self, text):
         """清理产品名称，移除价格、评分等无关信息"""
         if not text:
@@ -573,45 +684,15 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                     print(f"从React props提取到: {what_you_need}")
                 return what_you_need
 
-            # 如果React数据提取失败，使用Playwright获取完整页面
+            # 如果React数据提取失败，使用渲染后的完整页面（离线提取时交给主进程渲染）
             if guide_url:
-                try:
-                    from playwright.sync_api import sync_playwright
-
-                    with sync_playwright() as p:
-                        browser = p.chromium.launch(headless=True)
-                        page = browser.new_page()
-
-                        # 设置请求头
-                        page.set_extra_http_headers({
-                            'Accept-Language': 'en-US,en;q=0.9',
-                            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                        })
+                if self.offline_extraction:
+                    self.deferred_lookups.append('what_you_need')
+                    return what_you_need
 
-                        # 导航到页面并等待加载
-                        page.goto(guide_url, wait_until='networkidle')
-
-                        # 等待更长时间确保动态内容加载完成
-                        page.wait_for_timeout(5000)
-
-                        # 获取页面HTML
-                        html_content = page.content()
-                        browser.close()
-
-                        # 重新解析HTML并尝试提取React数据
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(html_content, 'html.parser')
-
-                        react_data = self._extract_from_react_props(soup)
-                        if react_data:
-                            what_you_need = react_data
-                            if self.verbose:
-                                print(f"从Playwright + React props提取到: {what_you_need}")
-                            return what_you_need
-
-                except Exception as e:
-                    if self.verbose:
-                        print(f"使用Playwright获取页面失败: {str(e)}")
+                react_data = self._what_you_need_from_rendered_page(guide_url)
+                if react_data:
+                    return react_data
 
             # 如果React数据提取失败，说明页面可能没有"What you need"部分
             if self.verbose:
@@ -650,54 +731,11 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                     print("未找到data-props属性")
                 return what_you_need
 
-            # 解析JSON数据
-            import json
-            import html
-
-            # HTML解码
-            decoded_props = html.unescape(data_props)
-            props_data = json.loads(decoded_props)
-
-            # 提取productData
-            product_data = props_data.get('productData', {})
-
-            # 提取Tools
-            tools = product_data.get('tools', [])
-            if tools:
-                tool_names = []
-                for tool in tools:
-                    name = tool.get('name', '').strip()
-                    if name:
-                        tool_names.append(name)
-
-                if tool_names:
-                    what_you_need['Tools'] = tool_names
+            props_data = decode_props(data_props)
+            if not props_data:
+                return what_you_need
 
-            # 提取Parts（独立的parts字段）
-            parts = product_data.get('parts', [])
-            if parts:
-                part_names = []
-                for part in parts:
-                    name = part.get('name', '').strip()
-                    if name:
-                        part_names.append(name)
-
-                if part_names:
-                    what_you_need['Parts'] = part_names
-
-            # 提取Fix Kits（从kits字段中筛选）
-            kits = product_data.get('kits', [])
-            if kits:
-                fix_kits = []
-                for kit in kits:
-                    name = kit.get('name', '').strip()
-                    if name:
-                        # 只有明确包含kit字样的才归类为Fix Kits
-                        if 'kit' in name.lower() or 'fix kit' in name.lower():
-                            fix_kits.append(name)
-
-                if fix_kits:
-                    what_you_need['Fix Kits'] = fix_kits
+            what_you_need = self._what_you_need_from_props(props_data)
 
             # 验证提取的数据是否合理（可选的质量检查）
             if what_you_need and self.verbose:
@@ -722,6 +760,54 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"从React props提取数据时发生错误: {str(e)}")
             return what_you_need
 
+    def _what_you_need_from_props(self, props_data):
+        """把组件props中的productData映射为What you need（Tools/Parts/Fix Kits）"""
+        what_you_need = {}
+
+        product_data = props_data.get('productData') or {}
+        if not isinstance(product_data, dict):
+            return what_you_need
+
+        # 提取Tools
+        tools = product_data.get('tools', [])
+        if tools:
+            tool_names = []
+            for tool in tools:
+                name = tool.get('name', '').strip()
+                if name:
+                    tool_names.append(name)
+
+            if tool_names:
+                what_you_need['Tools'] = tool_names
+
+        # 提取Parts（独立的parts字段）
+        parts = product_data.get('parts', [])
+        if parts:
+            part_names = []
+            for part in parts:
+                name = part.get('name', '').strip()
+                if name:
+                    part_names.append(name)
+
+            if part_names:
+                what_you_need['Parts'] = part_names
+
+        # 提取Fix Kits（从kits字段中筛选）
+        kits = product_data.get('kits', [])
+        if kits:
+            fix_kits = []
+            for kit in kits:
+                name = kit.get('name', '').strip()
+                if name:
+                    # 只有明确包含kit字样的才归类为Fix Kits
+                    if 'kit' in name.lower() or 'fix kit' in name.lower():
+                        fix_kits.append(name)
+
+            if fix_kits:
+                what_you_need['Fix Kits'] = fix_kits
+
+        return what_you_need
+
     def _extract_what_you_need_complete(self, section):
         """完整提取What you need部分的所有内容：Fix Kits、Parts、Tools"""
         result = {}
@@ -1691,92 +1777,152 @@ class EnhancedIFixitCrawler(IFixitCrawler):
 
         return parts
 
-    def extract_time_and_difficulty(self, soup, guide_url=None):
-        """从页面中提取真实的时间和难度信息，只有在页面真实存在时才提取"""
+    def _skip_time_and_difficulty(self, guide_url=None, title=None):
+        """Teardown、History、编辑页等不应该有时间和难度的页面返回True"""
+        if guide_url:
+            # 跳过Teardown页面 - 它们通常不需要时间和难度信息
+            if '/Teardown/' in guide_url:
+                return True
+
+            # 跳过History页面 - 它们是版本历史，不是实际的指南
+            if '/Guide/history/' in guide_url or 'history' in guide_url:
+                return True
+
+            # 跳过其他特殊页面类型
+            skip_patterns = [
+                '/Guide/new',
+                '/Guide/edit',
+                '/Guide/create',
+                'action=edit',
+                'action=create'
+            ]
+            if any(pattern in guide_url for pattern in skip_patterns):
+                return True
+
+        if title:
+            title_text = title.strip().lower()
+            skip_title_keywords = [
+                'teardown',
+                'guide history',
+                'version history',
+                'edit guide',
+                'create guide'
+            ]
+            if any(keyword in title_text for keyword in skip_title_keywords):
+                return True
+
+        return False
+
+    def _time_difficulty_from_guide_data(self, guide_data):
+        """从指南记录（API响应或页面组件数据）中提取有效的时间和难度，类型为teardown/history时返回None"""
+        time_difficulty = {}
+
+        guide_type = guide_data.get('type')
+        if isinstance(guide_type, str) and guide_type.lower() in ['teardown', 'history']:
+            return None
+
+        # 提取难度信息 - 只有在是有效难度值时才添加
+        difficulty = guide_data.get('difficulty')
+        if isinstance(difficulty, str) and difficulty.strip():
+            difficulty = difficulty.strip()
+            if difficulty.lower() in ['very easy', 'easy', 'moderate', 'difficult', 'hard', 'very difficult']:
+                time_difficulty["difficulty"] = self.standardize_difficulty(difficulty)
+
+        # 提取时间信息 - 只有在包含有效时间格式时才添加
+        time_fields = ['time_required', 'timeRequired', 'duration', 'time', 'estimate']
+        for field in time_fields:
+            time_value = guide_data.get(field)
+            if isinstance(time_value, str) and time_value.strip():
+                time_value = time_value.strip()
+                if re.search(r'\d+\s*(?:[-–]\s*\d+)?\s*(?:seconds?|secs?|minutes?|mins?|hours?|hrs?)', time_value, re.IGNORECASE) or time_value.lower() == 'no estimate':
+                    time_difficulty["time_required"] = time_value
+                    break
+
+        return time_difficulty
+
+    def _what_you_need_from_rendered_page(self, guide_url):
+        """渲染指南页面后从React props提取What you need，回放模式使用归档的渲染结果，不启动浏览器"""
+        if self._is_replaying():
+            html_content = self._load_rendered_html(guide_url)
+            return self._extract_from_react_props(make_soup(html_content)) if html_content else {}
+
+        try:
+            # 导航到页面，等待更长时间确保动态内容加载完成；渲染同样计入抓取次数
+            self._record_fetch(guide_url)
+            self.rate_limiter.acquire(guide_url)
+            status, html_content = self._get_browser_pool().render(guide_url, settle_ms=5000)
+            self.rate_limiter.record(guide_url, status)
+            self._archive_rendered_html(guide_url, status, html_content)
+
+            # 重新解析HTML并尝试提取React数据
+            react_data = self._extract_from_react_props(make_soup(html_content))
+            if react_data and self.verbose:
+                print(f"从Playwright + React props提取到: {react_data}")
+            return react_data
+
+        except Exception as e:
+            if self.verbose:
+                print(f"使用Playwright获取页面失败: {str(e)}")
+            return {}
+
+    def _time_difficulty_from_api(self, guide_url):
+        """通过iFixit API获取指南的时间和难度，类型为teardown/history时返回None，无数据或请求失败时返回空字典"""
+        # 从URL中提取guide ID
+        guide_id_match = re.search(r'/Guide/[^/]+/(\d+)', guide_url or '')
+        if not guide_id_match:
+            return {}
+
+        api_url = f"https://www.ifixit.com/api/2.0/guides/{guide_id_match.group(1)}"
+        try:
+            response = self._get_session().get(api_url, headers=self.headers, timeout=10)
+            if response.status_code == 200:
+                # 检查API数据中的类型，跳过不合适的类型
+                time_difficulty = self._time_difficulty_from_guide_data(response.json())
+                if time_difficulty and self.verbose:
+                    print(f"从API获取到时间和难度信息: {time_difficulty}")
+                return time_difficulty
+        except Exception as e:
+            if self.verbose:
+                print(f"API调用失败: {str(e)}")
+        return {}
+
+    def extract_time_and_difficulty(self, soup=None, guide_url=None, html=None):
+        """从页面中提取真实的时间和难度信息，只有在页面真实存在时才提取
+
+        soup/html: 已获取的页面，二者都未提供时才会根据guide_url请求页面
+        """
         time_difficulty = {}
 
         try:
             # 检查是否为Teardown、History或其他不应该有时间和难度的页面类型
-            if guide_url:
-                # 跳过Teardown页面 - 它们通常不需要时间和难度信息
-                if '/Teardown/' in guide_url:
-                    return {}
+            if self._skip_time_and_difficulty(guide_url):
+                return {}
 
-                # 跳过History页面 - 它们是版本历史，不是实际的指南
-                if '/Guide/history/' in guide_url or 'history' in guide_url:
+            # 页面类型确认需要提取后才获取文档
+            if soup is None:
+                if not html and not guide_url:
                     return {}
-
-                # 跳过其他特殊页面类型
-                skip_patterns = [
-                    '/Guide/new',
-                    '/Guide/edit',
-                    '/Guide/create',
-                    'action=edit',
-                    'action=create'
-                ]
-                if any(pattern in guide_url for pattern in skip_patterns):
+                soup = self._resolve_soup(guide_url, soup, html)
+                if not soup:
                     return {}
 
             # 检查页面标题，如果包含特定关键词则跳过
             title_elem = soup.select_one("h1")
-            if title_elem:
-                title_text = title_elem.get_text().strip().lower()
-                skip_title_keywords = [
-                    'teardown',
-                    'guide history',
-                    'version history',
-                    'edit guide',
-                    'create guide'
-                ]
-                if any(keyword in title_text for keyword in skip_title_keywords):
-                    return {}
+            if title_elem and self._skip_time_and_difficulty(title=title_elem.get_text()):
+                return {}
 
-            # 方法1：使用iFixit API获取准确的数据
+            # 方法1：使用iFixit API获取准确的数据（离线提取时由主进程查询后覆盖页面文本的结果）
             if guide_url:
-                # 从URL中提取guide ID
-                guide_id_match = re.search(r'/Guide/[^/]+/(\d+)', guide_url)
-                if guide_id_match:
-                    guide_id = guide_id_match.group(1)
-                    api_url = f"https://www.ifixit.com/api/2.0/guides/{guide_id}"
-
-                    try:
-                        import requests
-                        response = requests.get(api_url, headers=self.headers, timeout=10)
-                        if response.status_code == 200:
-                            api_data = response.json()
-
-                            # 检查API数据中的类型，跳过不合适的类型
-                            if 'type' in api_data:
-                                guide_type = api_data['type'].lower()
-                                if guide_type in ['teardown', 'history']:
-                                    return {}
-
-                            # 从API数据中提取难度信息 - 只有在有有效值时才添加
-                            if 'difficulty' in api_data and api_data['difficulty'] and api_data['difficulty'].strip():
-                                difficulty = api_data['difficulty'].strip()
-                                # 只有在是有效难度值时才添加
-                                if difficulty.lower() in ['very easy', 'easy', 'moderate', 'difficult', 'hard', 'very difficult']:
-                                    time_difficulty["difficulty"] = self.standardize_difficulty(difficulty)
-
-                            # 从API数据中提取时间信息 - 只有在有有效值时才添加
-                            time_fields = ['time_required', 'duration', 'time', 'estimate']
-                            for field in time_fields:
-                                if field in api_data and api_data[field] and api_data[field].strip():
-                                    time_value = api_data[field].strip()
-                                    # 只有在包含有效时间格式时才添加
-                                    if re.search(r'\d+\s*(?:[-–]\s*\d+)?\s*(?:seconds?|secs?|minutes?|mins?|hours?|hrs?)', time_value, re.IGNORECASE) or time_value.lower() == 'no estimate':
-                                        time_difficulty["time_required"] = time_value
-                                        break
-
-                            # 如果从API获取到有效数据，直接返回
-                            if time_difficulty:
-                                if self.verbose:
-                                    print(f"从API获取到时间和难度信息: {time_difficulty}")
-                                return time_difficulty
+                if self.offline_extraction:
+                    self.deferred_lookups.append('time_difficulty')
+                else:
+                    time_difficulty = self._time_difficulty_from_api(guide_url)
+                    if time_difficulty is None:
+                        return {}
 
-                    except Exception as e:
-                        if self.verbose:
-                            print(f"API调用失败: {str(e)}")
+                    # 如果从API获取到有效数据，直接返回
+                    if time_difficulty:
+                        return time_difficulty
 
             # 方法2：如果API失败，尝试从页面HTML中提取
             if not time_difficulty:
@@ -1935,8 +2081,11 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"提取统计数据时发生错误: {str(e)}")
             return {}
 
-    def extract_troubleshooting_content(self, troubleshooting_url):
-        """提取故障排除页面的详细内容 - 基于真实页面结构分析"""
+    def extract_troubleshooting_content(self, troubleshooting_url, soup=None, html=None):
+        """提取故障排除页面的详细内容 - 基于真实页面结构分析
+
+        soup/html: 调用方已获取的页面（解析后的soup或原始HTML），传入时不再重复请求
+        """
         if not self.is_allowed_by_robots(troubleshooting_url):
             if self.verbose:
                 print(f"跳过被robots.txt禁止的URL: {troubleshooting_url}")
@@ -1954,10 +2103,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         if self.verbose:
             print(f"Crawling troubleshooting content: {troubleshooting_url}")
 
-        # 添加延迟避免过快请求
-        time.sleep(random.uniform(1, 2))
-
-        soup = self.get_soup(troubleshooting_url)
+        soup = self._resolve_soup(troubleshooting_url, soup, html)
         if not soup:
             return None
 
@@ -2136,8 +2282,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"开始从section提取图片，section ID: {section.get('id', 'unknown')}")
 
             # 创建section副本并移除推广内容
-            from bs4 import BeautifulSoup
-            section_copy = BeautifulSoup(str(section), 'html.parser')
+            section_copy = make_soup(str(section))
             self.remove_promotional_content_from_section(section_copy)
 
             # 查找该section内的所有图片
@@ -2198,8 +2343,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"开始从section提取视频，section ID: {section.get('id', 'unknown')}")
 
             # 创建section副本并移除推广内容
-            from bs4 import BeautifulSoup
-            section_copy = BeautifulSoup(str(section), 'html.parser')
+            section_copy = make_soup(str(section))
             self.remove_promotional_content_from_section(section_copy)
 
             # 查找该section内的视频元素
@@ -3932,8 +4076,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
                 print(f"开始提取section内容，section ID: {section_element.get('id', 'unknown')}")
 
             # 创建section副本以避免修改原始内容
-            from bs4 import BeautifulSoup
-            section_copy = BeautifulSoup(str(section_element), 'html.parser')
+            section_copy = make_soup(str(section_element))
 
             # 首先移除所有商业推广和指南推荐框
             self.remove_promotional_content_from_section(section_copy)
@@ -4985,8 +5128,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
             if content_elements:
                 print(f"收集到 {len(content_elements)} 个内容元素")
                 # 创建一个临时容器包含所有后续内容
-                from bs4 import BeautifulSoup
-                temp_soup = BeautifulSoup('<div></div>', 'html.parser')
+                temp_soup = make_soup('<div></div>')
                 temp_container = temp_soup.div
 
                 for content in content_elements:
@@ -5008,8 +5150,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         print("开始排除Related Pages区域...")
 
         # 创建内容副本以避免修改原始内容
-        from bs4 import BeautifulSoup
-        content_copy = BeautifulSoup(str(content_section), 'html.parser')
+        content_copy = make_soup(str(content_section))
 
         # 查找Related Pages标题并移除其后的内容
         related_keywords = ["related pages", "related", "see also", "相关页面", "另请参阅"]
@@ -5224,8 +5365,7 @@ class EnhancedIFixitCrawler(IFixitCrawler):
         print("开始提取文本内容...")
 
         # 创建内容副本以避免修改原始内容
-        from bs4 import BeautifulSoup
-        content_copy = BeautifulSoup(str(content_section), 'html.parser')
+        content_copy = make_soup(str(content_section))
 
         # 首先移除商业推广框框
         content_copy = self.remove_commercial_boxes(content_copy)
@@ -6728,8 +6868,7 @@ def main():
             # 检查URL是否可访问
             print("检查产品页面是否存在...")
             try:
-                import requests
-                response = requests.get(device_url, headers=crawler.headers, timeout=10)
+                response = crawler._get_session().get(device_url, headers=crawler.headers, timeout=10)
                 if response.status_code == 404:
                     print(f"❌ 产品页面不存在: {device_url}")
                     print("请检查产品名是否正确，或使用完整URL")
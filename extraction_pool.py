@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析/提取进程池 - 把CPU密集的BeautifulSoup解析和指南/故障排除内容提取放到独立进程
+抓取线程和异步任务只负责I/O，拿到原始HTML后交给进程池，提取吞吐随CPU核数扩展，不再受GIL限制
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Any
+
+
+# 工作进程内的提取实例（每个进程一个，只做解析和提取：不访问网络，不创建会话、代理和存储）
+_worker_crawler = None
+
+
+def _init_worker(crawler_kwargs: Dict[str, Any]):
+    """工作进程初始化：创建只用于提取的轻量爬虫实例"""
+    global _worker_crawler
+    from auto_crawler import CombinedIFixitCrawler
+    _worker_crawler = CombinedIFixitCrawler.for_extraction(**crawler_kwargs)
+
+
+def _extract(kind: str, url: str, html: bytes):
+    """在工作进程中提取一个页面，返回 (提取结果, 需要主进程联网补充的查询, 耗时秒数)"""
+    start_time = time.monotonic()
+    crawler = _worker_crawler
+    # 去重由主进程负责，工作进程每个任务都从干净状态开始
+    crawler.processed_guides.clear()
+    crawler.troubleshooting_visited.clear()
+    crawler.deferred_lookups.clear()
+    if kind == 'guide':
+        result = crawler._extract_guide_from_page(url, html)
+    else:
+        result = crawler._extract_troubleshooting_from_page(url, html)
+    return result, list(crawler.deferred_lookups), time.monotonic() - start_time
+
+
+def default_parse_workers() -> int:
+    """默认工作进程数：保留一个核给抓取线程和事件循环，最多8个"""
+    return max(1, min(8, (os.cpu_count() or 2) - 1))
+
+
+class ExtractionPool:
+    """页面提取进程池（spawn方式启动，首次提交任务时才创建进程）"""
+
+    def __init__(self, workers: int, crawler_kwargs: Dict[str, Any], logger: Optional[logging.Logger] = None):
+        """
+        初始化提取进程池
+
+        Args:
+            workers: 工作进程数
+            crawler_kwargs: 工作进程内创建提取实例（CombinedIFixitCrawler.for_extraction）的参数（需可pickle）
+        """
+        self.workers = workers
+        self.crawler_kwargs = crawler_kwargs
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'tasks': 0,
+            'failures': 0,
+            'extract_seconds': 0.0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn：不继承父进程的线程、锁和事件循环，避免fork后死锁
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.crawler_kwargs,)
+                )
+                self.logger.info(f"解析进程池启动: {self.workers} 个工作进程")
+            return self._executor
+
+    def _record(self, elapsed: Optional[float]):
+        with self._lock:
+            self.stats['tasks'] += 1
+            if elapsed is None:
+                self.stats['failures'] += 1
+            else:
+                self.stats['extract_seconds'] += elapsed
+
+    def run(self, kind: str, url: str, html: bytes):
+        """同步提交并等待提取结果（线程池任务使用），返回 (提取结果, 延后的联网查询)，失败时抛出异常由调用方回退"""
+        try:
+            result, deferred, elapsed = self._get_executor().submit(_extract, kind, url, html).result()
+        except Exception:
+            self._record(None)
+            raise
+        self._record(elapsed)
+        return result, deferred
+
+    async def run_async(self, kind: str, url: str, html: bytes):
+        """异步提交并等待提取结果，等待期间不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        try:
+            result, deferred, elapsed = await loop.run_in_executor(self._get_executor(), _extract, kind, url, html)
+        except Exception:
+            self._record(None)
+            raise
+        self._record(elapsed)
+        return result, deferred
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['workers'] = self.workers
+        stats['avg_extract_seconds'] = stats['extract_seconds'] / max(1, stats['tasks'] - stats['failures'])
+        return stats
+
+    def shutdown(self):
+        """关闭工作进程"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            try:
+                executor.shutdown(wait=True, cancel_futures=True)
+            except Exception:
+                pass
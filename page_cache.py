@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行期页面缓存 - 按规范化URL在内存中保存zlib压缩后的页面HTML，按压缩后的总字节数（MB）限制大小的LRU
+获取类别名称、面包屑、故障排除补抓和缓存修复等路径会重复请求刚抓过的页面，命中时直接解压返回，不再发请求
+"""
+
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from response_archive import canonical_url
+
+
+class PageCache:
+    """压缩页面HTML的LRU缓存（线程安全，容量按MB计）"""
+
+    def __init__(self, max_mb: float = 64, compress_level: int = 1, logger: Optional[logging.Logger] = None):
+        """
+        初始化页面缓存
+
+        Args:
+            max_mb: 压缩后页面的总大小上限（MB），0表示禁用
+            compress_level: zlib压缩级别（1最快，HTML通常也能压缩到1/5左右）
+        """
+        self.max_bytes = max(0, int(max_mb * 1024 * 1024))
+        self.compress_level = compress_level
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._raw_sizes: Dict[str, int] = {}
+        self.current_bytes = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0  # 命中时免于重新下载的页面字节数（解压后）
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, url: str) -> Optional[bytes]:
+        """查找页面HTML，命中时返回解压后的bytes并移到LRU末尾"""
+        if not self.enabled or not url:
+            return None
+        key = canonical_url(url)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += self._raw_sizes[key]
+        try:
+            return zlib.decompress(compressed)
+        except zlib.error:
+            self.discard(url)
+            return None
+
+    def put(self, url: str, body):
+        """保存页面HTML（bytes或str），超出容量时淘汰最久未使用的页面"""
+        if not self.enabled or not url or not body:
+            return
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        compressed = zlib.compress(body, self.compress_level)
+        if len(compressed) > self.max_bytes:
+            return
+        key = canonical_url(url)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = compressed
+            self._raw_sizes[key] = len(body)
+            self.current_bytes += len(compressed)
+            self.stats['stores'] += 1
+            while self.current_bytes > self.max_bytes and self._entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._raw_sizes.pop(evicted_key, None)
+                self.current_bytes -= len(evicted)
+                self.stats['evictions'] += 1
+
+    def discard(self, url: str):
+        """移除页面（如解压失败）"""
+        key = canonical_url(url)
+        with self._lock:
+            compressed = self._entries.pop(key, None)
+            if compressed is not None:
+                self._raw_sizes.pop(key, None)
+                self.current_bytes -= len(compressed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率、节省字节数和当前占用"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['current_bytes'] = self.current_bytes
+            stats['raw_bytes'] = sum(self._raw_sizes.values())
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTML解析后端工厂 - 项目中所有BeautifulSoup文档都通过 make_soup 创建
+支持 html.parser（标准库，默认）、lxml（C实现，速度快数倍）和 html5lib（与浏览器一致，最慢）；
+切换后端前可用 parser_benchmark.py 在归档页面上确认提取结果与 html.parser 完全一致
+
+make_link_soup 是树构建和设备页链接提取使用的"链接扫描"模式：只为链接、标题、面包屑和类别区块建树，
+跳过React页面中其余的大量节点
+"""
+
+import logging
+from typing import Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+PARSER_BACKENDS: Tuple[str, ...] = ('html.parser', 'lxml', 'html5lib')
+DEFAULT_PARSER = 'html.parser'
+
+# 当前进程使用的解析后端（由 set_parser 设置，解析进程池的工作进程在初始化时同步）
+_current_parser = DEFAULT_PARSER
+
+
+def is_parser_available(name: str) -> bool:
+    """检查解析后端所需的依赖是否已安装"""
+    if name == 'html.parser':
+        return True
+    try:
+        if name == 'lxml':
+            import lxml.etree  # noqa: F401
+        elif name == 'html5lib':
+            import html5lib  # noqa: F401
+        else:
+            return False
+        return True
+    except ImportError:
+        return False
+
+
+def available_parsers() -> Tuple[str, ...]:
+    return tuple(name for name in PARSER_BACKENDS if is_parser_available(name))
+
+
+def set_parser(name: Optional[str], logger: Optional[logging.Logger] = None) -> str:
+    """设置当前进程的解析后端，未知或未安装时回退到 html.parser，返回实际使用的后端"""
+    global _current_parser
+    logger = logger or logging.getLogger(__name__)
+    name = (name or DEFAULT_PARSER).strip().lower()
+    if name not in PARSER_BACKENDS:
+        logger.warning(f"未知的解析后端 {name}，使用 {DEFAULT_PARSER}")
+        name = DEFAULT_PARSER
+    elif not is_parser_available(name):
+        logger.warning(f"解析后端 {name} 未安装，使用 {DEFAULT_PARSER}（pip install {name}）")
+        name = DEFAULT_PARSER
+    _current_parser = name
+    return name
+
+
+def get_parser() -> str:
+    return _current_parser
+
+
+def make_soup(markup, parser: Optional[str] = None, parse_only=None) -> BeautifulSoup:
+    """按当前（或指定的）解析后端创建BeautifulSoup文档"""
+    return BeautifulSoup(markup, parser or _current_parser, parse_only=parse_only)
+
+
+class LinkScanStrainer(SoupStrainer):
+    """链接扫描过滤器：只保留以链接、标题、面包屑和类别区块为根的子树（子树内部完整保留）"""
+
+    TAGS = {'a', 'title', 'h1', 'h2', 'h3', 'nav'}
+    CLASS_HINTS = ('breadcrumb', 'categor', 'browse-devices', 'device-title')
+
+    @classmethod
+    def keep(cls, name, attrs) -> bool:
+        if name in cls.TAGS:
+            return True
+        attrs = attrs or {}
+        if name == 'link':
+            return 'canonical' in str(attrs.get('rel', ''))
+        if attrs.get('id') == 'page-header-container':
+            return True
+        if 'BreadcrumbList' in str(attrs.get('itemtype', '')):
+            return True
+        css_class = attrs.get('class', '')
+        if not isinstance(css_class, str):
+            css_class = ' '.join(css_class)
+        css_class = css_class.lower()
+        return any(hint in css_class for hint in cls.CLASS_HINTS)
+
+    # bs4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self.keep(name, attrs)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+    # bs4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs=None):
+        return self.keep(markup_name, markup_attrs)
+
+
+def make_link_soup(markup, parser: Optional[str] = None) -> BeautifulSoup:
+    """链接扫描模式：按当前解析后端只为链接、标题、面包屑和类别区块建树"""
+    return make_soup(markup, parser, parse_only=LinkScanStrainer())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTML解析后端基准测试 - 在响应归档中保存的指南/设备/故障排除页面上逐一运行各解析后端，
+统计解析和提取耗时，并确认提取结果与 html.parser 完全一致
+
+使用前先用 --archive 录制一次爬取：
+    python auto_crawler.py iPad --archive
+    python parser_benchmark.py
+    python parser_benchmark.py --parsers html.parser,lxml --limit 200 --repeat 3
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+from pathlib import Path
+
+from parser_backend import DEFAULT_PARSER, available_parsers, set_parser, make_soup
+
+
+def classify_page(url):
+    """按URL判断页面类型，非指南/设备/故障排除页面返回None"""
+    if '/Troubleshooting/' in url:
+        return 'troubleshooting'
+    if '/Guide/' in url or '/Teardown/' in url:
+        return 'guide'
+    if '/Device/' in url:
+        return 'device'
+    return None
+
+
+def extract_page(crawler, kind, url, html):
+    """运行与爬虫相同的提取逻辑，返回可比较的JSON文本"""
+    if kind == 'guide':
+        crawler.processed_guides.clear()
+        result = crawler._extract_guide_from_page(url, html)
+    elif kind == 'troubleshooting':
+        result = crawler._extract_troubleshooting_from_page(url, html)
+    else:
+        soup = make_soup(html)
+        result = {
+            'guides': crawler.extract_guides_from_device_page(soup, url),
+            'troubleshooting': crawler.extract_troubleshooting_from_device_page(soup, url),
+            'categories': crawler.tree_crawler.extract_categories(soup, url)
+        }
+    return json.dumps(result, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def run_benchmark(parsers, limit=None, repeat=1):
+    # 回放模式：提取过程中的API请求也从归档返回，不访问网络
+    from auto_crawler import CombinedIFixitCrawler
+    crawler = CombinedIFixitCrawler(use_proxy=False, use_cache=False, replay=True, autotune=False,
+                                    enable_resume=False, parse_workers=0)
+    archive = crawler.response_archive
+
+    pages = []
+    for url in archive.list_urls():
+        kind = classify_page(url)
+        if kind:
+            record = archive.lookup(url)
+            if record and record['status'] == 200 and record['body']:
+                pages.append((kind, url, record['body']))
+        if limit and len(pages) >= limit:
+            break
+
+    if not pages:
+        print(f"❌ 响应归档中没有可用页面: {archive.archive_dir}")
+        print("💡 先用 python auto_crawler.py <设备> --archive 录制一次爬取")
+        crawler.cleanup()
+        return 1
+
+    counts = {}
+    for kind, _, _ in pages:
+        counts[kind] = counts.get(kind, 0) + 1
+    print(f"📄 基准页面: {len(pages)} 个 " + ", ".join(f"{kind} {count}" for kind, count in sorted(counts.items())))
+    print(f"🔁 每个后端重复 {repeat} 次\n")
+
+    baseline = {}
+    results = []
+    for parser in parsers:
+        set_parser(parser)
+        parse_seconds = 0.0
+        extract_seconds = 0.0
+        mismatches = []
+        for _ in range(repeat):
+            for kind, url, html in pages:
+                start_time = time.perf_counter()
+                make_soup(html)
+                parse_seconds += time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    try:
+                        output = extract_page(crawler, kind, url, html)
+                    except Exception as e:
+                        output = f"ERROR: {type(e).__name__}: {e}"
+                extract_seconds += time.perf_counter() - start_time
+
+                if parser == DEFAULT_PARSER:
+                    baseline.setdefault(url, output)
+                elif url in baseline and output != baseline[url] and url not in mismatches:
+                    mismatches.append(url)
+        results.append((parser, parse_seconds / repeat, extract_seconds / repeat, mismatches))
+
+    set_parser(DEFAULT_PARSER)
+    crawler.cleanup()
+
+    base_extract = results[0][2] or 1e-9
+    print(f"{'后端':<12} {'解析(秒)':>10} {'解析+提取(秒)':>14} {'相对html.parser':>16} {'结果不一致':>10}")
+    for parser, parse_s, extract_s, mismatches in results:
+        print(f"{parser:<12} {parse_s:>10.2f} {extract_s:>14.2f} {base_extract / max(extract_s, 1e-9):>15.2f}x {len(mismatches):>10}")
+
+    failed = False
+    for parser, _, _, mismatches in results:
+        if mismatches:
+            failed = True
+            print(f"\n⚠️ {parser} 与 {DEFAULT_PARSER} 的提取结果不一致的页面:")
+            for url in mismatches[:20]:
+                print(f"   - {url}")
+            if len(mismatches) > 20:
+                print(f"   ... 共 {len(mismatches)} 个")
+        elif parser != DEFAULT_PARSER:
+            print(f"\n✅ {parser} 的提取结果与 {DEFAULT_PARSER} 完全一致，可通过 --parser {parser} 启用")
+    return 1 if failed else 0
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0].lower() in ['--help', '-h', 'help']:
+        print(__doc__)
+        return 0
+
+    parsers = list(available_parsers())
+    if '--parsers' in args:
+        try:
+            requested = [p.strip().lower() for p in args[args.index('--parsers') + 1].split(',') if p.strip()]
+            missing = [p for p in requested if p not in parsers]
+            if missing:
+                print(f"警告: 解析后端不可用: {', '.join(missing)}（可用: {', '.join(parsers)}）")
+            parsers = [p for p in requested if p in parsers]
+        except IndexError:
+            print("警告: parsers参数无效，测试全部可用后端")
+    # html.parser 是比较基准，始终最先运行
+    parsers = [DEFAULT_PARSER] + [p for p in parsers if p != DEFAULT_PARSER]
+
+    limit = None
+    if '--limit' in args:
+        try:
+            limit = max(1, int(args[args.index('--limit') + 1]))
+        except (ValueError, IndexError):
+            print("警告: limit参数无效，使用全部页面")
+
+    repeat = 1
+    if '--repeat' in args:
+        try:
+            repeat = max(1, int(args[args.index('--repeat') + 1]))
+        except (ValueError, IndexError):
+            print("警告: repeat参数无效，使用默认值1")
+
+    print(f"📁 数据目录: {Path(os.getenv('IFIXIT_DATA_DIR', 'ifixit_data')).resolve()}")
+    print(f"🧪 测试后端: {', '.join(parsers)}")
+    return run_benchmark(parsers, limit=limit, repeat=repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+代理健康度评分 - 为代理池中的每个代理记录成功率EWMA、延迟EWMA和传输字节数
+按评分把代理分到少量权重桶中，选择时先按桶权重加权抽桶、再在桶内随机取，不需要每次排序整个代理池；
+连续失败或成功率过低的代理进入隔离区，到期后以试用状态回到池中，试用期间再失败则加倍隔离时间
+"""
+
+import time
+import heapq
+import random
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class _Bucket:
+    """支持O(1)加入、删除和随机选取的代理ID集合"""
+
+    def __init__(self):
+        self.items: List[int] = []
+        self.positions: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item: int):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item: int):
+        index = self.positions.pop(item, None)
+        if index is None:
+            return
+        last = self.items.pop()
+        if index < len(self.items):
+            self.items[index] = last
+            self.positions[last] = index
+
+    def choice(self) -> int:
+        return random.choice(self.items)
+
+
+class ProxyHealthTracker:
+    """代理健康度跟踪：评分分桶 + 加权选择 + 定时解除的隔离"""
+
+    # 评分阈值（从高到低）及对应桶的选择权重
+    BUCKET_THRESHOLDS = (0.6, 0.4, 0.2, 0.0)
+    BUCKET_WEIGHTS = (8, 4, 2, 1)
+
+    def __init__(self, proxy_ids, alpha: float = 0.2, latency_reference: float = 2.0,
+                 quarantine_after: int = 3, min_success_rate: float = 0.3, min_samples: int = 10,
+                 quarantine_base: float = 30.0, quarantine_max: float = 600.0, min_available: int = 2):
+        """
+        初始化代理健康度跟踪
+
+        Args:
+            proxy_ids: 代理ID列表
+            alpha: EWMA平滑系数
+            latency_reference: 延迟参考值（秒），延迟EWMA等于该值时评分减半
+            quarantine_after: 连续失败多少次后隔离
+            min_success_rate: 样本数达到min_samples后，成功率EWMA低于该值即隔离
+            quarantine_base: 首次隔离时长（秒），之后每次加倍，最长quarantine_max
+            min_available: 至少保留多少个不在隔离区的代理
+        """
+        self.alpha = alpha
+        self.latency_reference = latency_reference
+        self.quarantine_after = quarantine_after
+        self.min_success_rate = min_success_rate
+        self.min_samples = min_samples
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = quarantine_max
+        self.min_available = min_available
+
+        self._lock = threading.Lock()
+        self.quarantines = 0
+        self._init_entries(list(proxy_ids))
+
+    def _init_entries(self, proxy_ids):
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self._buckets = [_Bucket() for _ in self.BUCKET_WEIGHTS]
+        self._bucket_of: Dict[int, int] = {}
+        self._quarantine_heap: List = []
+        for proxy_id in proxy_ids:
+            self.entries[proxy_id] = {
+                'requests': 0,
+                'successes': 0,
+                'failures': 0,
+                'consecutive_failures': 0,
+                'success_ewma': 1.0,
+                'latency_ewma': None,
+                'bytes': 0,
+                'quarantined_until': 0.0,
+                'quarantine_count': 0,
+                'probation': False
+            }
+            self._place(proxy_id)
+
+    def reset(self):
+        """清空所有评分和隔离状态"""
+        with self._lock:
+            self.quarantines = 0
+            self._init_entries(list(self.entries.keys()))
+
+    # ---- 评分与分桶（调用方持有锁） ----
+
+    def _score(self, entry: Dict[str, Any]) -> float:
+        latency = entry['latency_ewma']
+        latency_factor = 1.0 if latency is None else 1.0 / (1.0 + latency / self.latency_reference)
+        return entry['success_ewma'] * latency_factor
+
+    def _bucket_index(self, entry: Dict[str, Any]) -> int:
+        score = self._score(entry)
+        for index, threshold in enumerate(self.BUCKET_THRESHOLDS):
+            if score >= threshold:
+                return index
+        return len(self.BUCKET_THRESHOLDS) - 1
+
+    def _place(self, proxy_id: int):
+        """按当前评分把代理移动到对应的桶"""
+        new_index = self._bucket_index(self.entries[proxy_id])
+        old_index = self._bucket_of.get(proxy_id)
+        if old_index == new_index:
+            return
+        if old_index is not None:
+            self._buckets[old_index].remove(proxy_id)
+        self._buckets[new_index].add(proxy_id)
+        self._bucket_of[proxy_id] = new_index
+
+    def _available_count(self) -> int:
+        return len(self._bucket_of)
+
+    def _quarantine(self, proxy_id: int, now: float):
+        entry = self.entries[proxy_id]
+        duration = min(self.quarantine_max, self.quarantine_base * (2 ** entry['quarantine_count']))
+        entry['quarantine_count'] += 1
+        entry['quarantined_until'] = now + duration
+        entry['probation'] = False
+        index = self._bucket_of.pop(proxy_id, None)
+        if index is not None:
+            self._buckets[index].remove(proxy_id)
+        heapq.heappush(self._quarantine_heap, (entry['quarantined_until'], proxy_id))
+        self.quarantines += 1
+
+    def _release_expired(self, now: float):
+        """隔离到期的代理以试用状态回到池中"""
+        while self._quarantine_heap and self._quarantine_heap[0][0] <= now:
+            _, proxy_id = heapq.heappop(self._quarantine_heap)
+            entry = self.entries[proxy_id]
+            entry['quarantined_until'] = 0.0
+            entry['probation'] = True
+            entry['consecutive_failures'] = 0
+            entry['success_ewma'] = max(entry['success_ewma'], 0.5)
+            self._place(proxy_id)
+
+    # ---- 对外接口 ----
+
+    def record(self, proxy_id: int, success: bool, latency: Optional[float] = None, bytes_count: int = 0):
+        """记录一次请求结果并更新评分，必要时隔离该代理"""
+        with self._lock:
+            entry = self.entries.get(proxy_id)
+            if entry is None:
+                return
+            now = time.monotonic()
+            entry['requests'] += 1
+            entry['bytes'] += max(0, bytes_count or 0)
+            entry['success_ewma'] = self.alpha * (1.0 if success else 0.0) + (1 - self.alpha) * entry['success_ewma']
+            if latency is not None:
+                previous = entry['latency_ewma']
+                entry['latency_ewma'] = latency if previous is None else self.alpha * latency + (1 - self.alpha) * previous
+
+            if success:
+                entry['successes'] += 1
+                entry['consecutive_failures'] = 0
+                if entry['probation']:
+                    entry['probation'] = False
+                if entry['success_ewma'] >= 0.8:
+                    entry['quarantine_count'] = 0
+            else:
+                entry['failures'] += 1
+                entry['consecutive_failures'] += 1
+
+            if entry['quarantined_until']:
+                return
+
+            unhealthy = (not success and entry['probation']) or \
+                entry['consecutive_failures'] >= self.quarantine_after or \
+                (entry['requests'] >= self.min_samples and entry['success_ewma'] < self.min_success_rate)
+            if unhealthy and self._available_count() > self.min_available:
+                self._quarantine(proxy_id, now)
+            else:
+                self._place(proxy_id)
+
+    def add_bytes(self, proxy_id: int, bytes_count: int):
+        """累计经由该代理传输的字节数（响应体读完后才知道实际大小，与请求结果分开记录）"""
+        with self._lock:
+            entry = self.entries.get(proxy_id)
+            if entry is not None:
+                entry['bytes'] += max(0, bytes_count or 0)
+
+    def is_available(self, proxy_id: int) -> bool:
+        """代理当前是否可用（不在隔离区）"""
+        with self._lock:
+            self._release_expired(time.monotonic())
+            return proxy_id in self._bucket_of
+
+    def select(self) -> Optional[int]:
+        """按桶权重加权选择一个可用代理，没有可用代理时返回None"""
+        with self._lock:
+            self._release_expired(time.monotonic())
+            total = sum(weight * len(bucket) for weight, bucket in zip(self.BUCKET_WEIGHTS, self._buckets))
+            if total <= 0:
+                return None
+            pick = random.uniform(0, total)
+            for weight, bucket in zip(self.BUCKET_WEIGHTS, self._buckets):
+                span = weight * len(bucket)
+                if span and pick <= span:
+                    return bucket.choice()
+                pick -= span
+            for bucket in reversed(self._buckets):
+                if len(bucket):
+                    return bucket.choice()
+            return None
+
+    def snapshot(self) -> Dict[int, Dict[str, Any]]:
+        """导出每个代理的评分、成功率、延迟、流量和隔离状态"""
+        with self._lock:
+            now = time.monotonic()
+            self._release_expired(now)
+            result = {}
+            for proxy_id, entry in self.entries.items():
+                result[proxy_id] = {
+                    'score': round(self._score(entry), 3),
+                    'requests': entry['requests'],
+                    'successes': entry['successes'],
+                    'failures': entry['failures'],
+                    'success_rate': round(entry['success_ewma'], 3),
+                    'latency_ewma': round(entry['latency_ewma'], 3) if entry['latency_ewma'] is not None else None,
+                    'bytes': entry['bytes'],
+                    'quarantined': proxy_id not in self._bucket_of,
+                    'quarantine_remaining': round(max(0.0, entry['quarantined_until'] - now), 1) if entry['quarantined_until'] else 0.0,
+                    'quarantine_count': entry['quarantine_count'],
+                    'probation': entry['probation']
+                }
+            return result
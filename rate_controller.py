@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自适应限速控制器 - 为iFixit主站和图片CDN统一控制请求频率
+按主机维护令牌桶，响应健康时逐步加速（加性增），遇到429/5xx/超时立即减速（乘性减），
+让爬虫稳定运行在站点能承受的最高速率，而不是在各处分散地固定sleep
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Callable
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class AdaptiveRateController:
+    """按主机的令牌桶 + AIMD 速率控制器（线程安全，同步/异步/Playwright共用）"""
+
+    # 触发减速的HTTP状态码
+    BACKOFF_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 20.0,
+                 media_initial_rate: float = 10.0, media_max_rate: float = 100.0,
+                 increase_step: float = 0.2, decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 2.0, logger: Optional[logging.Logger] = None):
+        """
+        初始化速率控制器
+
+        Args:
+            initial_rate: 页面主机的初始速率（请求/秒）
+            min_rate: 任意主机的最低速率
+            max_rate: 页面主机的最高速率
+            media_initial_rate: 图片CDN等媒体主机的初始速率
+            media_max_rate: 媒体主机的最高速率
+            increase_step: 每次成功响应增加的速率（除以当前速率，约每秒增加一个step）
+            decrease_factor: 遇到限流/服务端错误/超时时速率乘以的系数
+            decrease_cooldown: 两次减速之间的最短间隔，避免并发失败把速率一次压到底
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.media_initial_rate = media_initial_rate
+        self.media_max_rate = media_max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._observers: List[Callable[..., None]] = []
+
+    def add_observer(self, callback: Callable[..., None]):
+        """注册请求结果观察者（如并发自动调优器），每次record后以 (url, status_code, error, latency) 回调"""
+        self._observers.append(callback)
+
+    @staticmethod
+    def _host_of(url: str) -> str:
+        try:
+            return (urlparse(url).hostname or '').lower()
+        except Exception:
+            return ''
+
+    def _is_media_host(self, host: str) -> bool:
+        """图片/视频CDN主机（如 guide-images.cdn.ifixit.com）使用单独的速率上限"""
+        return 'cdn' in host or host.startswith(('guide-images.', 'images.', 'img.'))
+
+    def _state(self, host: str) -> Dict[str, Any]:
+        """获取主机状态（调用方需持有锁）"""
+        state = self._hosts.get(host)
+        if state is None:
+            is_media = self._is_media_host(host)
+            rate = self.media_initial_rate if is_media else self.initial_rate
+            state = {
+                'rate': rate,
+                'max_rate': self.media_max_rate if is_media else self.max_rate,
+                'next_time': 0.0,
+                'last_decrease': 0.0,
+                'requests': 0,
+                'successes': 0,
+                'backoffs': 0,
+                'waited_seconds': 0.0,
+                'peak_rate': rate
+            }
+            self._hosts[host] = state
+        return state
+
+    def _reserve(self, url: str) -> float:
+        """预约下一个请求时隙，返回需要等待的秒数"""
+        host = self._host_of(url)
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            slot = max(now, state['next_time'])
+            state['next_time'] = slot + 1.0 / state['rate']
+            state['requests'] += 1
+            wait = slot - now
+            state['waited_seconds'] += wait
+        return wait
+
+    def acquire(self, url: str):
+        """同步获取请求许可（线程池、requests、同步Playwright使用）"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """异步获取请求许可（httpx、异步Playwright使用），等待时不阻塞事件循环"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, url: str, status_code: Optional[int] = None, error: Optional[BaseException] = None,
+               retry_after: Optional[str] = None, latency: Optional[float] = None):
+        """记录请求结果：健康响应加性增速，429/5xx/超时乘性减速"""
+        host = self._host_of(url)
+        backoff = error is not None or (status_code in self.BACKOFF_STATUS)
+
+        for callback in self._observers:
+            try:
+                callback(url, status_code, error, latency)
+            except Exception:
+                pass
+
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if not backoff:
+                state['successes'] += 1
+                state['rate'] = min(state['max_rate'], state['rate'] + self.increase_step / state['rate'])
+                state['peak_rate'] = max(state['peak_rate'], state['rate'])
+                return
+
+            state['backoffs'] += 1
+            if now - state['last_decrease'] >= self.decrease_cooldown:
+                state['rate'] = max(self.min_rate, state['rate'] * self.decrease_factor)
+                state['last_decrease'] = now
+                reason = status_code if status_code is not None else type(error).__name__
+                self.logger.info(f"限速控制: {host} 降速至 {state['rate']:.2f} 请求/秒 ({reason})")
+
+            # 服务端明确要求等待时，整个主机暂停到指定时间
+            if retry_after:
+                try:
+                    state['next_time'] = max(state['next_time'], now + min(float(retry_after), 120.0))
+                except (TypeError, ValueError):
+                    pass
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取每个主机的当前速率和统计信息"""
+        with self._lock:
+            return {
+                host: {
+                    'rate': state['rate'],
+                    'peak_rate': state['peak_rate'],
+                    'requests': state['requests'],
+                    'successes': state['successes'],
+                    'backoffs': state['backoffs'],
+                    'waited_seconds': state['waited_seconds']
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests适配器：每次发送前向速率控制器申请许可，并把结果反馈给控制器"""
+
+    def __init__(self, rate_controller: AdaptiveRateController, *args,
+                 result_callback: Optional[Callable[..., None]] = None, **kwargs):
+        """result_callback: 可选的逐请求结果回调 (request, response=None, error=None, latency=None)，如代理健康度统计"""
+        self.rate_controller = rate_controller
+        self.result_callback = result_callback
+        super().__init__(*args, **kwargs)
+
+    def _notify(self, request, response=None, error=None, latency=None):
+        if self.result_callback is not None:
+            try:
+                self.result_callback(request, response=response, error=error, latency=latency)
+            except Exception:
+                pass  # 统计失败不影响请求
+
+    def send(self, request, **kwargs):
+        self.rate_controller.acquire(request.url)
+        start_time = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.exceptions.ProxyError as e:
+            # 代理故障与目标站点的承受能力无关，不影响速率
+            self._notify(request, error=e, latency=time.monotonic() - start_time)
+            raise
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            latency = time.monotonic() - start_time
+            self.rate_controller.record(request.url, error=e, latency=latency)
+            self._notify(request, error=e, latency=latency)
+            raise
+        latency = time.monotonic() - start_time
+        self.rate_controller.record(request.url, response.status_code,
+                                    retry_after=response.headers.get('Retry-After'),
+                                    latency=latency)
+        self._notify(request, response=response, latency=latency)
+        return response
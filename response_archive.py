@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+原始响应归档（WARC格式） - 按标准化URL保存压缩后的HTML/JSON响应、状态码、响应头和抓取时间
+每条记录是一个独立的gzip成员，追加写入分段文件（archive/segment-NNNNN.warc.gz），
+SQLite索引记录每条记录所在的分段、偏移和长度，可直接随机读取；
+--replay 模式下所有页面请求都从归档返回，不访问网络，修改提取逻辑后可离线重新生成全部JSON
+"""
+
+import re
+import gzip
+import uuid
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from rate_controller import RateLimitedAdapter
+
+
+def canonical_url(url: str) -> str:
+    """标准化URL：统一https和www主站、去掉fragment和lang参数、查询参数排序"""
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').lower()
+        # 语言子域名（zh.ifixit.com等）和裸域名统一为英文主站
+        if re.fullmatch(r'([a-z]{2}\.)?ifixit\.com', host):
+            host = 'www.ifixit.com'
+        if parts.port and parts.port not in (80, 443):
+            host = f"{host}:{parts.port}"
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != 'lang')
+        path = parts.path or '/'
+        if len(path) > 1:
+            path = path.rstrip('/')
+        return urlunsplit(('https', host, path, urlencode(query), ''))
+    except Exception:
+        return url
+
+
+def _reason_phrase(status: int) -> str:
+    try:
+        return HTTPStatus(status).phrase
+    except (TypeError, ValueError):
+        return ''
+
+
+class ArchiveMissError(requests.exceptions.ConnectionError):
+    """回放模式下请求的URL不在归档中（不会回退到网络请求）"""
+
+
+class ResponseArchive:
+    """分段追加写入、按偏移随机读取的原始响应归档"""
+
+    SEGMENT_PATTERN = "segment-{:05d}.warc.gz"
+    # 只归档页面和API响应，图片/视频由媒体存储负责
+    ARCHIVE_CONTENT_TYPES = ('html', 'json')
+    # 临时性错误不归档，回放时应体现真实页面
+    TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+    # 回放时重新计算的传输层响应头
+    SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+    def __init__(self, archive_dir, replay: bool = False, segment_max_bytes: int = 256 * 1024 * 1024,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化响应归档
+
+        Args:
+            archive_dir: 归档目录（分段文件和索引数据库）
+            replay: True时只读，所有请求从归档返回
+            segment_max_bytes: 单个分段文件的最大字节数，超过后切换到新分段
+        """
+        self.archive_dir = Path(archive_dir)
+        self.replay = replay
+        self.segment_max_bytes = segment_max_bytes
+        self.logger = logger or logging.getLogger(__name__)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.archive_dir / "archive_index.db"),
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                url TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                record_offset INTEGER NOT NULL,
+                record_length INTEGER NOT NULL,
+                status INTEGER,
+                fetched_at REAL,
+                raw_bytes INTEGER,
+                PRIMARY KEY (url, variant)
+            )
+        """)
+
+        self._segment_no = self._latest_segment()
+        self._segment_handle = None
+        self.stats = {
+            'stored': 0,
+            'stored_raw_bytes': 0,
+            'stored_compressed_bytes': 0,
+            'replay_hits': 0,
+            'replay_misses': 0
+        }
+
+    def _latest_segment(self) -> int:
+        numbers = []
+        for path in self.archive_dir.glob("segment-*.warc.gz"):
+            match = re.match(r'segment-(\d+)\.warc\.gz$', path.name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return max(numbers) if numbers else 1
+
+    def _segment_path(self, segment_no: int) -> Path:
+        return self.archive_dir / self.SEGMENT_PATTERN.format(segment_no)
+
+    def should_archive(self, status: Optional[int], content_type: Optional[str]) -> bool:
+        """判断响应是否需要归档（只归档HTML/JSON，跳过临时性错误）"""
+        if self.replay or status is None or status in self.TRANSIENT_STATUS:
+            return False
+        content_type = (content_type or '').lower()
+        return any(kind in content_type for kind in self.ARCHIVE_CONTENT_TYPES)
+
+    def _build_record(self, url: str, variant: str, status: int, headers: Dict[str, str],
+                      body: bytes, fetched_at: float) -> bytes:
+        """构建一条WARC response记录（HTTP块中的响应体为解压后的原文）"""
+        http_lines = [f"HTTP/1.1 {status} {_reason_phrase(status)}"]
+        for key, value in headers.items():
+            if key.lower() not in self.SKIPPED_HEADERS:
+                http_lines.append(f"{key}: {value}")
+        http_lines.append(f"Content-Length: {len(body)}")
+        http_block = ("\r\n".join(http_lines) + "\r\n\r\n").encode('utf-8', errors='replace') + body
+
+        warc_date = datetime.fromtimestamp(fetched_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        warc_headers = [
+            "WARC/1.1",
+            "WARC-Type: response",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {warc_date}",
+            f"WARC-Target-URI: {url}",
+            f"WARC-Crawler-Variant: {variant}",
+            "Content-Type: application/http; msgtype=response",
+            f"Content-Length: {len(http_block)}"
+        ]
+        return ("\r\n".join(warc_headers) + "\r\n\r\n").encode('utf-8') + http_block + b"\r\n\r\n"
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes, variant: str = 'raw'):
+        """追加一条记录并更新索引（同一URL的新记录覆盖旧索引，旧记录留在分段中）"""
+        if self.replay or body is None:
+            return
+        try:
+            key = canonical_url(url)
+            fetched_at = time.time()
+            record = gzip.compress(self._build_record(key, variant, status, dict(headers or {}), body, fetched_at))
+
+            with self._lock:
+                segment_path = self._segment_path(self._segment_no)
+                if segment_path.exists() and segment_path.stat().st_size + len(record) > self.segment_max_bytes:
+                    self._close_segment()
+                    self._segment_no += 1
+                    segment_path = self._segment_path(self._segment_no)
+                if self._segment_handle is None:
+                    self._segment_handle = open(segment_path, 'ab')
+                offset = self._segment_handle.tell()
+                self._segment_handle.write(record)
+                self._segment_handle.flush()
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO records (url, variant, segment, record_offset, record_length, status, fetched_at, raw_bytes) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, variant, self._segment_no, offset, len(record), status, fetched_at, len(body))
+                )
+                self.stats['stored'] += 1
+                self.stats['stored_raw_bytes'] += len(body)
+                self.stats['stored_compressed_bytes'] += len(record)
+        except Exception as e:
+            self.logger.warning(f"归档响应失败 {url}: {e}")
+
+    def lookup(self, url: str, variant: str = 'raw') -> Optional[Dict[str, Any]]:
+        """按URL随机读取一条记录，返回 status/headers/body/fetched_at，不存在时返回None"""
+        key = canonical_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, record_offset, record_length, status, fetched_at FROM records WHERE url = ? AND variant = ?",
+                (key, variant)
+            ).fetchone()
+        if row is None:
+            self.stats['replay_misses'] += 1
+            return None
+
+        segment, offset, length, status, fetched_at = row
+        try:
+            with open(self._segment_path(segment), 'rb') as f:
+                f.seek(offset)
+                data = gzip.decompress(f.read(length))
+
+            warc_end = data.index(b"\r\n\r\n")
+            warc_headers = self._parse_headers(data[:warc_end].decode('utf-8', errors='replace').split("\r\n")[1:])
+            http_block = data[warc_end + 4:warc_end + 4 + int(warc_headers.get('Content-Length', len(data)))]
+            http_end = http_block.index(b"\r\n\r\n")
+            http_lines = http_block[:http_end].decode('utf-8', errors='replace').split("\r\n")
+            self.stats['replay_hits'] += 1
+            return {
+                'url': key,
+                'status': status,
+                'headers': self._parse_headers(http_lines[1:]),
+                'body': http_block[http_end + 4:],
+                'fetched_at': fetched_at
+            }
+        except Exception as e:
+            self.logger.warning(f"读取归档记录失败 {key}: {e}")
+            self.stats['replay_misses'] += 1
+            return None
+
+    @staticmethod
+    def _parse_headers(lines) -> CaseInsensitiveDict:
+        headers = CaseInsensitiveDict()
+        for line in lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip()] = value.strip()
+        return headers
+
+    def to_requests_response(self, request) -> requests.Response:
+        """回放：把归档记录构造成requests响应，未归档时抛出ArchiveMissError"""
+        record = self.lookup(request.url)
+        if record is None:
+            raise ArchiveMissError(f"URL不在响应归档中: {request.url}", request=request)
+        response = requests.Response()
+        response.status_code = record['status']
+        response.headers = record['headers']
+        response._content = record['body']
+        response.url = request.url
+        response.request = request
+        response.reason = _reason_phrase(record['status'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def list_urls(self, variant: str = 'raw') -> List[str]:
+        """列出归档中某一类记录的全部URL（按URL排序）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM records WHERE variant = ? ORDER BY url", (variant,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取归档统计（本次运行写入/回放次数及归档总量）"""
+        stats = dict(self.stats)
+        try:
+            with self._lock:
+                total, raw_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0) FROM records"
+                ).fetchone()
+            stats['indexed_records'] = total
+            stats['indexed_raw_bytes'] = raw_bytes
+            stats['segments'] = len(list(self.archive_dir.glob("segment-*.warc.gz")))
+            stats['segment_bytes'] = sum(p.stat().st_size for p in self.archive_dir.glob("segment-*.warc.gz"))
+        except Exception:
+            pass
+        return stats
+
+    def _close_segment(self):
+        if self._segment_handle is not None:
+            try:
+                self._segment_handle.close()
+            except Exception:
+                pass
+            self._segment_handle = None
+
+    def close(self):
+        """关闭当前分段文件和索引连接"""
+        with self._lock:
+            self._close_segment()
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+class ArchivingAdapter(RateLimitedAdapter):
+    """requests适配器：回放模式直接返回归档响应；录制模式在限速发送后把页面响应写入归档"""
+
+    def __init__(self, rate_controller, archive: ResponseArchive, *args, **kwargs):
+        self.archive = archive
+        super().__init__(rate_controller, *args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if self.archive.replay:
+            # 回放模式不访问网络，也不占用限速配额
+            return self.archive.to_requests_response(request)
+
+        response = super().send(request, **kwargs)
+        if request.method == 'GET' and self.archive.should_archive(response.status_code,
+                                                                   response.headers.get('Content-Type')):
+            self.archive.store(request.url, response.status_code, response.headers, response.content)
+        return response
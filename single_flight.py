@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+并发请求合并（single-flight）- 同一个键（规范化URL）同一时刻只有一个调用者真正发出请求，
+其余线程或协程等待并共享第一个调用者的结果；线程池引擎和异步引擎共用同一个登记表，
+结果用 concurrent.futures.Future 传递，线程用 result() 等待，协程通过 wrap_future 等待而不阻塞事件循环
+"""
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """按键合并并发调用的登记表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Tuple[Future, int]] = {}
+        self.stats = {
+            'executed': 0,  # 真正执行的调用
+            'shared': 0     # 合并到已在执行的调用、没有重复请求的次数
+        }
+
+    def _join_or_lead(self, key: Hashable, owner=None):
+        """返回 (future, 是否为首个调用者)；owner为同步调用者的线程ID，同一线程重入时不等待自己"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and (owner is None or call[1] != owner):
+                self.stats['shared'] += 1
+                return call[0], False
+            future = Future()
+            if call is None:
+                self._calls[key] = (future, owner)
+            self.stats['executed'] += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call[0] is future:
+                del self._calls[key]
+        if future.done():
+            return
+        if isinstance(error, (asyncio.CancelledError, CancelledError)):
+            # 首个调用者被取消：等待方收到取消后重新竞争执行
+            future.cancel()
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _in_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def do(self, key: Hashable, fn, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        同步调用（线程池任务使用），返回 (结果, 是否共享了其他调用者的结果)
+        在事件循环线程中调用时不等待其他调用者（阻塞等待可能正等着同一个循环上的协程），直接执行
+        """
+        if self._in_event_loop():
+            with self._lock:
+                self.stats['executed'] += 1
+            return fn(*args, **kwargs), False
+
+        while True:
+            future, leader = self._join_or_lead(key, threading.get_ident())
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except CancelledError:
+                continue
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    async def do_async(self, key: Hashable, coro_fn, *args, **kwargs) -> Tuple[Any, bool]:
+        """异步调用，返回 (结果, 是否共享了其他调用者的结果)；等待方被取消时不影响首个调用者"""
+        while True:
+            future, leader = self._join_or_lead(key)
+            if leader:
+                break
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future)), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        try:
+            result = await coro_fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流量计量与预算 - 统计每个响应实际传输的字节数（压缩后的响应体），按内容类别（HTML/JSON/图片/视频）和代理分别累计
+requests路径在响应体被读取完时按底层连接已读字节数计数，httpx路径使用 num_bytes_downloaded；
+设置流量预算后，接近预算时先跳过视频、把媒体并发压到最低，再停止全部媒体下载，预算用尽后停止抓取新页面
+"""
+
+import re
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+CONTENT_CLASSES = ('html', 'json', 'image', 'video', 'other')
+DIRECT = 'direct'  # 未经过代理池的请求（如异步httpx客户端、未启用代理）
+
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.avif', '.bmp')
+_VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.webm', '.mkv', '.flv', '.m3u8', '.ts')
+_SIZE_PATTERN = re.compile(r'^\s*([\d.]+)\s*([kmgt]?i?b?)?\s*$', re.IGNORECASE)
+_SIZE_UNITS = {'': 1024 ** 2, 'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+def parse_byte_size(text) -> Optional[int]:
+    """解析流量大小：500MB、2GB、1.5G，不带单位时按MB计，无法解析时返回None"""
+    match = _SIZE_PATTERN.match(str(text or ''))
+    if not match:
+        return None
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return None
+    unit = (match.group(2) or '').lower()[:1]
+    size = int(value * _SIZE_UNITS.get(unit, 1024 ** 2))
+    return size if size > 0 else None
+
+
+def format_bytes(size) -> str:
+    """把字节数格式化为便于阅读的文本"""
+    size = float(size or 0)
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.2f}GB"
+
+
+def classify_content(url: Optional[str], content_type: Optional[str] = None) -> str:
+    """按Content-Type（缺失或不明确时按URL扩展名）判断内容类别"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type.startswith('image/'):
+        return 'image'
+    if content_type.startswith('video/'):
+        return 'video'
+    if 'json' in content_type:
+        return 'json'
+    if 'html' in content_type:
+        return 'html'
+
+    path = (url or '').split('?')[0].lower()
+    if path.endswith(_VIDEO_EXTENSIONS):
+        return 'video'
+    if path.endswith(_IMAGE_EXTENSIONS):
+        return 'image'
+    if '/api/' in path:
+        return 'json'
+    return 'other'
+
+
+class TrafficMeter:
+    """按内容类别和代理累计响应字节数，并按流量预算分阶段限制媒体和页面抓取"""
+
+    # 预算阶段：正常 → 限流（跳过视频、媒体并发压到1）→ 停止媒体 → 预算用尽（停止抓取新页面）
+    NORMAL = 'normal'
+    THROTTLE = 'throttle'
+    MEDIA_STOPPED = 'media_stopped'
+    EXHAUSTED = 'exhausted'
+    PHASES = (NORMAL, THROTTLE, MEDIA_STOPPED, EXHAUSTED)
+    PHASE_LABELS = {NORMAL: '正常', THROTTLE: '媒体限流', MEDIA_STOPPED: '媒体已停止', EXHAUSTED: '预算用尽'}
+
+    def __init__(self, budget_bytes: Optional[int] = None, throttle_at: float = 0.8, stop_media_at: float = 0.95,
+                 on_phase_change: Optional[Callable[[str], None]] = None,
+                 on_proxy_bytes: Optional[Callable[[Any, int], None]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初始化流量计量
+
+        Args:
+            budget_bytes: 本次运行的流量预算（字节），None表示不限制只计量
+            throttle_at: 用量达到预算的该比例时进入限流阶段
+            stop_media_at: 用量达到预算的该比例时停止全部媒体下载
+            on_phase_change: 预算阶段变化回调 (新阶段)
+            on_proxy_bytes: 经由代理的字节数回调 (proxy_id, 字节数)，用于代理健康度统计
+        """
+        self.budget_bytes = budget_bytes
+        self.throttle_at = throttle_at
+        self.stop_media_at = stop_media_at
+        self.on_phase_change = on_phase_change
+        self.on_proxy_bytes = on_proxy_bytes
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self.phase = self.NORMAL
+        self.total_bytes = 0
+        self.responses = 0
+        self.by_class: Dict[str, Dict[str, int]] = {name: {'bytes': 0, 'responses': 0} for name in CONTENT_CLASSES}
+        self.by_proxy: Dict[Any, Dict[str, int]] = {}
+        self.items_saved: Dict[str, int] = {}
+        self.media_skipped = 0
+        self.pages_skipped = 0
+
+    # ---- 计量 ----
+
+    def record(self, url: Optional[str], nbytes: int, content_type: Optional[str] = None, proxy_id=None):
+        """记录一个响应实际传输的字节数"""
+        nbytes = max(0, int(nbytes or 0))
+        content_class = classify_content(url, content_type)
+        proxy_key = DIRECT if proxy_id is None else proxy_id
+        with self._lock:
+            self.total_bytes += nbytes
+            self.responses += 1
+            self.by_class[content_class]['bytes'] += nbytes
+            self.by_class[content_class]['responses'] += 1
+            proxy_entry = self.by_proxy.setdefault(proxy_key, {'bytes': 0, 'responses': 0})
+            proxy_entry['bytes'] += nbytes
+            proxy_entry['responses'] += 1
+            new_phase = self._update_phase()
+
+        if proxy_id is not None and self.on_proxy_bytes is not None:
+            try:
+                self.on_proxy_bytes(proxy_id, nbytes)
+            except Exception:
+                pass
+        if new_phase is not None:
+            self._announce(new_phase)
+
+    def observe_request(self, proxy_id, request, response=None, error=None, latency=None):
+        """requests会话适配器的结果回调：响应体读取完（或连接中断）时按底层已读字节数计数"""
+        if response is None:
+            return
+        url = request.url if request is not None else response.url
+        content_type = response.headers.get('Content-Type')
+        raw = getattr(response, 'raw', None)
+        stream = getattr(raw, 'stream', None)
+        if stream is None or not hasattr(raw, 'tell'):
+            try:
+                nbytes = int(response.headers.get('Content-Length') or 0)
+            except (TypeError, ValueError):
+                nbytes = 0
+            self.record(url, nbytes, content_type, proxy_id)
+            return
+
+        def counted_stream(*args, **kwargs):
+            try:
+                yield from stream(*args, **kwargs)
+            finally:
+                try:
+                    nbytes = raw.tell()
+                except Exception:
+                    nbytes = 0
+                self.record(url, nbytes, content_type, proxy_id)
+
+        # requests读取响应体（content/iter_content）都经过raw.stream
+        raw.stream = counted_stream
+
+    def observe_httpx(self, url: str, response, proxy_id=None):
+        """httpx响应（非流式，返回时响应体已读完）的计数"""
+        if response is None:
+            return
+        nbytes = getattr(response, 'num_bytes_downloaded', None)
+        if nbytes is None:
+            nbytes = len(response.content or b'')
+        self.record(url, nbytes, response.headers.get('Content-Type'), proxy_id)
+
+    def count_item(self, kind: str):
+        """记录一个已保存的条目（guide、troubleshooting），用于计算每个条目的平均流量"""
+        with self._lock:
+            self.items_saved[kind] = self.items_saved.get(kind, 0) + 1
+
+    # ---- 预算 ----
+
+    def _update_phase(self) -> Optional[str]:
+        """按当前用量推进预算阶段（调用方持有锁），阶段变化时返回新阶段"""
+        if not self.budget_bytes:
+            return None
+        usage = self.total_bytes / self.budget_bytes
+        if usage >= 1.0:
+            phase = self.EXHAUSTED
+        elif usage >= self.stop_media_at:
+            phase = self.MEDIA_STOPPED
+        elif usage >= self.throttle_at:
+            phase = self.THROTTLE
+        else:
+            phase = self.NORMAL
+        # 阶段只前进不后退
+        if self.PHASES.index(phase) <= self.PHASES.index(self.phase):
+            return None
+        self.phase = phase
+        return phase
+
+    def _announce(self, phase: str):
+        messages = {
+            self.THROTTLE: "跳过视频下载，媒体并发降到最低",
+            self.MEDIA_STOPPED: "停止全部媒体下载，只保存页面数据",
+            self.EXHAUSTED: "停止抓取新页面"
+        }
+        self.logger.warning(f"流量已用 {format_bytes(self.total_bytes)}/{format_bytes(self.budget_bytes)}: {messages[phase]}")
+        if self.on_phase_change is not None:
+            try:
+                self.on_phase_change(phase)
+            except Exception:
+                pass
+
+    def allow_media(self, is_video: bool = False) -> bool:
+        """预算是否还允许下载该媒体文件（不允许时计入跳过数）"""
+        phase = self.phase
+        allowed = phase == self.NORMAL or (phase == self.THROTTLE and not is_video)
+        if not allowed:
+            with self._lock:
+                self.media_skipped += 1
+        return allowed
+
+    def allow_page(self) -> bool:
+        """预算是否还允许抓取新页面"""
+        if self.phase != self.EXHAUSTED:
+            return True
+        with self._lock:
+            self.pages_skipped += 1
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取流量统计（总量、按类别、按代理、每个保存条目的平均流量）"""
+        with self._lock:
+            guides = self.items_saved.get('guide', 0)
+            items = sum(self.items_saved.values())
+            return {
+                'total_bytes': self.total_bytes,
+                'responses': self.responses,
+                'budget_bytes': self.budget_bytes,
+                'phase': self.phase,
+                'by_class': {name: dict(entry) for name, entry in self.by_class.items() if entry['responses']},
+                'by_proxy': {key: dict(entry) for key, entry in self.by_proxy.items()},
+                'items_saved': dict(self.items_saved),
+                'bytes_per_guide': self.total_bytes / guides if guides else None,
+                'bytes_per_item': self.total_bytes / items if items else None,
+                'media_skipped': self.media_skipped,
+                'pages_skipped': self.pages_skipped
+            }
@@ -7,10 +7,12 @@
 """
 
 import os
+import copy
 import json
 import time
 import hashlib
 import logging
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Any
@@ -21,7 +23,8 @@ class TreeBuildingProgressManager:
     """树构建进度管理器 - 实现断点续爬功能"""
     
     def __init__(self, target_url: str, storage_root: str = None,
-                 logger: Optional[logging.Logger] = None, command_arg: str = None):
+                 logger: Optional[logging.Logger] = None, command_arg: str = None,
+                 compact_interval: int = 500):
         """
         初始化树构建进度管理器
 
@@ -30,6 +33,7 @@ class TreeBuildingProgressManager:
             storage_root: 存储根目录
             logger: 日志记录器
             command_arg: 命令行参数，用于生成更友好的文件名
+            compact_interval: 日志追加多少条状态变更后压缩为一次完整快照
         """
         self.command_arg = command_arg
         self.target_url = target_url
@@ -39,8 +43,14 @@ class TreeBuildingProgressManager:
         self.storage_root = Path(storage_root)
         self.logger = logger or logging.getLogger(__name__)
         
-        # 生成进度文件路径
+        # 生成进度文件路径：快照文件 + 追加式状态日志
         self.progress_file = self._get_progress_file_path()
+        self.journal_file = self.progress_file.with_suffix('.journal')
+        self.compact_interval = compact_interval
+        self._journal_lock = threading.RLock()
+        self._journal_handle = None
+        self._journal_seq = 0        # 最近一条日志的序号
+        self._journal_pending = 0    # 上次快照之后追加的日志条数
         
         # 进度状态
         self.progress_data = {
@@ -53,6 +63,7 @@ class TreeBuildingProgressManager:
             "processed_urls": set(),
             "current_processing": None,
             "failed_urls": set(),
+            "journal_seq": 0,  # 快照已包含的日志序号
             "statistics": {
                 "total_discovered": 0,
                 "total_processed": 0,
@@ -105,54 +116,161 @@ class TreeBuildingProgressManager:
         return self.storage_root / filename
     
     def load_progress(self) -> bool:
-        """加载现有进度"""
+        """加载现有进度：先读快照，再重放快照之后追加的状态日志"""
         try:
-            if not self.progress_file.exists():
+            if not self.progress_file.exists() and not self.journal_file.exists():
                 self.logger.info(f"进度文件不存在，将创建新的进度记录: {self.progress_file}")
                 return False
-                
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                saved_data = json.load(f)
-                
-            # 验证进度文件的有效性
-            if saved_data.get('target_url') != self.target_url:
-                self.logger.warning(f"进度文件目标URL不匹配，创建新的进度记录")
-                return False
-                
-            # 恢复进度数据
-            self.progress_data.update(saved_data)
-            
-            # 转换集合类型（JSON不支持set）
-            self.progress_data['processed_urls'] = set(saved_data.get('processed_urls', []))
-            self.progress_data['failed_urls'] = set(saved_data.get('failed_urls', []))
-            
-            self.logger.info(f"成功加载进度文件: {len(self.progress_data['processed_urls'])} 个已处理URL")
+
+            if self.progress_file.exists():
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    saved_data = json.load(f)
+
+                # 验证进度文件的有效性
+                if saved_data.get('target_url') != self.target_url:
+                    self.logger.warning("进度文件目标URL不匹配，创建新的进度记录")
+                    return False
+
+                # 恢复进度数据
+                self.progress_data.update(saved_data)
+
+                # 转换集合类型（JSON不支持set）
+                self.progress_data['processed_urls'] = set(saved_data.get('processed_urls', []))
+                self.progress_data['failed_urls'] = set(saved_data.get('failed_urls', []))
+
+            replayed = self._replay_journal()
+
+            self.logger.info(f"成功加载进度文件: {len(self.progress_data['processed_urls'])} 个已处理URL"
+                             f"（重放日志 {replayed} 条）")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"加载进度文件失败: {e}")
             return False
-    
+
+    def _replay_journal(self) -> int:
+        """重放快照之后的状态日志，返回重放的条数"""
+        self._journal_seq = self.progress_data.get('journal_seq', 0)
+        if not self.journal_file.exists():
+            return 0
+
+        replayed = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下写了一半的最后一行，忽略即可
+                    continue
+                seq = entry.get('seq', 0)
+                if seq <= self._journal_seq:
+                    continue
+                if entry.get('target_url', self.target_url) != self.target_url:
+                    continue
+                self._apply_transition(entry)
+                self._journal_seq = seq
+                replayed += 1
+
+        self._journal_pending = replayed
+        return replayed
+
+    def _apply_transition(self, entry: Dict[str, Any]):
+        """把一条状态变更应用到内存中的进度数据（记录日志和重放共用）"""
+        op = entry.get('op')
+        url = entry.get('url')
+        current = self.progress_data['current_processing']
+
+        if op == 'processing':
+            self.progress_data['current_processing'] = {
+                "url": url,
+                "parent_path": entry.get('parent_path', []),
+                "start_time": entry.get('time'),
+                "children_discovered": 0,
+                "children_processed": 0
+            }
+        elif op == 'discovered':
+            if current:
+                current['children_discovered'] = entry.get('count', 0)
+                self.progress_data['statistics']['total_discovered'] += entry.get('count', 0)
+        elif op in ('completed', 'failed'):
+            if op == 'completed':
+                self.progress_data['processed_urls'].add(url)
+                self.progress_data['statistics']['total_processed'] += 1
+            else:
+                self.progress_data['failed_urls'].add(url)
+                self.progress_data['statistics']['total_failed'] += 1
+
+            # 清除当前处理状态
+            if current and current['url'] == url:
+                self.progress_data['current_processing'] = None
+        elif op == 'clear_failed':
+            self.progress_data['failed_urls'].discard(url)
+            if self.progress_data['statistics']['total_failed'] > 0:
+                self.progress_data['statistics']['total_failed'] -= 1
+
+    def _record_transition(self, op: str, **fields):
+        """应用状态变更并追加一行日志（每个URL的写入量为常数），累积到阈值时压缩为快照"""
+        with self._journal_lock:
+            self._journal_seq += 1
+            entry = {"seq": self._journal_seq, "op": op, "time": datetime.now(timezone.utc).isoformat()}
+            entry.update(fields)
+            self._apply_transition(entry)
+
+            try:
+                if self._journal_handle is None:
+                    self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                    self._journal_handle = open(self.journal_file, 'a', encoding='utf-8')
+                self._journal_handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._journal_handle.flush()
+                self._journal_pending += 1
+            except Exception as e:
+                self.logger.error(f"追加进度日志失败: {e}")
+                return
+
+            if self._journal_pending >= self.compact_interval:
+                self.save_progress()
+
+    def _close_journal(self):
+        """关闭日志文件句柄"""
+        with self._journal_lock:
+            if self._journal_handle is not None:
+                try:
+                    self._journal_handle.close()
+                except Exception:
+                    pass
+                self._journal_handle = None
+
     def save_progress(self):
-        """保存当前进度"""
-        try:
-            # 确保目录存在
-            self.progress_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 准备保存数据（转换set为list）
-            save_data = self.progress_data.copy()
-            save_data['processed_urls'] = list(self.progress_data['processed_urls'])
-            save_data['failed_urls'] = list(self.progress_data['failed_urls'])
-            save_data['last_update'] = datetime.now(timezone.utc).isoformat()
-            
-            # 保存到文件
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
-                
-            self.logger.debug(f"进度已保存: {len(self.progress_data['processed_urls'])} 个已处理URL")
-            
-        except Exception as e:
-            self.logger.error(f"保存进度文件失败: {e}")
+        """保存完整进度快照，并截断已被快照包含的状态日志"""
+        with self._journal_lock:
+            try:
+                # 确保目录存在
+                self.progress_file.parent.mkdir(parents=True, exist_ok=True)
+
+                # 准备保存数据（转换set为list）；在锁内深拷贝，序列化的是快照而不是仍在增长的树
+                save_data = copy.deepcopy(self.progress_data)
+                save_data['processed_urls'] = list(self.progress_data['processed_urls'])
+                save_data['failed_urls'] = list(self.progress_data['failed_urls'])
+                save_data['last_update'] = datetime.now(timezone.utc).isoformat()
+                save_data['journal_seq'] = self._journal_seq
+
+                # 先写临时文件再替换，中断时旧快照仍然完整
+                tmp_file = self.progress_file.with_name(self.progress_file.name + '.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(save_data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.progress_file)
+                self.progress_data['journal_seq'] = self._journal_seq
+
+                # 快照已包含全部日志，截断日志；即使截断前中断，重放时也会按序号跳过
+                self._close_journal()
+                if self.journal_file.exists():
+                    self.journal_file.unlink()
+                self._journal_pending = 0
+
+                self.logger.debug(f"进度已保存: {len(self.progress_data['processed_urls'])} 个已处理URL")
+
+            except Exception as e:
+                self.logger.error(f"保存进度文件失败: {e}")
     
     def start_session(self):
         """开始新的构建会话"""
@@ -175,52 +293,27 @@ class TreeBuildingProgressManager:
     
     def mark_url_processing(self, url: str, parent_path: List[str] = None):
         """标记URL开始处理"""
-        self.progress_data['current_processing'] = {
-            "url": url,
-            "parent_path": parent_path or [],
-            "start_time": datetime.now(timezone.utc).isoformat(),
-            "children_discovered": 0,
-            "children_processed": 0
-        }
-
         self.logger.debug(f"开始处理URL: {url}")
 
-        # 保存当前处理状态
-        self.save_progress()
+        # 追加当前处理状态到日志
+        self._record_transition('processing', url=url, parent_path=parent_path or [])
         
     def mark_url_completed(self, url: str, children_count: int = 0):
         """标记URL处理完成"""
-        self.progress_data['processed_urls'].add(url)
-        self.progress_data['statistics']['total_processed'] += 1
-
-        # 清除当前处理状态
-        if (self.progress_data['current_processing'] and
-            self.progress_data['current_processing']['url'] == url):
-            self.progress_data['current_processing'] = None
-
         self.logger.debug(f"URL处理完成: {url} (子分类: {children_count})")
 
-        # 立即保存进度，确保数据不丢失
-        self.save_progress()
+        # 立即追加到日志，确保数据不丢失
+        self._record_transition('completed', url=url, children_count=children_count)
     
     def mark_url_failed(self, url: str, error: str = ""):
         """标记URL处理失败"""
-        self.progress_data['failed_urls'].add(url)
-        self.progress_data['statistics']['total_failed'] += 1
-        
-        # 清除当前处理状态
-        if (self.progress_data['current_processing'] and 
-            self.progress_data['current_processing']['url'] == url):
-            self.progress_data['current_processing'] = None
-            
         self.logger.warning(f"URL处理失败: {url} - {error}")
-        self.save_progress()
+        self._record_transition('failed', url=url, error=error)
     
     def update_children_discovered(self, count: int):
         """更新发现的子分类数量"""
         if self.progress_data['current_processing']:
-            self.progress_data['current_processing']['children_discovered'] = count
-            self.progress_data['statistics']['total_discovered'] += count
+            self._record_transition('discovered', count=count)
     
     def update_children_processed(self, count: int):
         """更新已处理的子分类数量"""
@@ -267,11 +360,15 @@ class TreeBuildingProgressManager:
         """重置进度（强制重新开始）"""
         self.logger.info("重置树构建进度")
         
-        # 备份当前进度文件
+        # 先把未压缩的日志合并进快照，再备份当前进度文件
+        if self.journal_file.exists():
+            self.save_progress()
         if self.progress_file.exists():
             backup_file = self.progress_file.with_suffix('.backup.json')
             self.progress_file.rename(backup_file)
             self.logger.info(f"已备份现有进度文件到: {backup_file}")
+        self._journal_seq = 0
+        self._journal_pending = 0
         
         # 重置进度数据
         self.progress_data = {
@@ -284,6 +381,7 @@ class TreeBuildingProgressManager:
             "processed_urls": set(),
             "current_processing": None,
             "failed_urls": set(),
+            "journal_seq": 0,
             "statistics": {
                 "total_discovered": 0,
                 "total_processed": 0,
@@ -320,6 +418,9 @@ class TreeBuildingProgressManager:
     def cleanup_progress_file(self):
         """清理进度文件（在成功完成后调用）"""
         try:
+            self._close_journal()
+            if self.journal_file.exists():
+                self.journal_file.unlink()
             if self.progress_file.exists():
                 self.progress_file.unlink()
                 self.logger.info("已清理进度文件")
@@ -352,9 +453,7 @@ class TreeBuildingProgressManager:
 
     def clear_failed_url(self, url: str):
         """清除失败URL标记（用于重试）"""
-        self.progress_data['failed_urls'].discard(url)
-        if self.progress_data['statistics']['total_failed'] > 0:
-            self.progress_data['statistics']['total_failed'] -= 1
+        self._record_transition('clear_failed', url=url)
 
 
 class TreeBuildingResumeHelper:
@@ -12,15 +12,17 @@
 import os
 import sys
 import json
-import time
-import random
 import re
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from crawler import IFixitCrawler
+from parser_backend import make_soup, make_link_soup
 from tree_building_progress import TreeBuildingProgressManager, TreeBuildingResumeHelper
 
 class TreeCrawler(IFixitCrawler):
-    def __init__(self, base_url="https://www.ifixit.com", enable_resume=True, logger=None, verbose=False):
+    def __init__(self, base_url="https://www.ifixit.com", enable_resume=True, logger=None, verbose=False,
+                 tree_workers=4):
         super().__init__(base_url)
         self.tree_data = {}  # 存储树形结构数据
         self.enable_resume = enable_resume
@@ -29,6 +31,14 @@ class TreeCrawler(IFixitCrawler):
         self.resume_helper = None
         self.verbose = verbose  # 添加verbose属性
 
+        # 并发树构建：同时抓取的分类页数量，请求频率由共享的rate_limiter控制
+        self.tree_workers = tree_workers
+        self._visited_lock = threading.Lock()
+        self._category_prefetch = {}  # 预取中的分类页：URL -> Future
+
+        # 链接扫描统计：只解析链接/面包屑/类别区块即可完成的页面数，以及回退到完整解析的页面数
+        self.parse_stats = {'link_scan': 0, 'full_parse': 0}
+
     def _extract_command_arg_from_url(self, url):
         """从URL中提取命令参数用于生成友好的文件名"""
         try:
@@ -86,14 +96,19 @@ class TreeCrawler(IFixitCrawler):
         if target_url == device_url:
             return [{"name": "Device", "url": device_url}]
         
-        # 从目标页面提取面包屑导航
-        target_soup = self.get_soup(target_url)
-        if not target_soup:
+        # 从目标页面提取面包屑导航（链接扫描模式只解析面包屑相关元素，找不到时完整解析）
+        html = self.get_page_html(target_url)
+        if html is None:
             print(f"无法获取页面内容: {target_url}")
             return [{"name": "Device", "url": device_url}]
         
         # 尝试从页面提取面包屑导航
-        breadcrumbs = self.extract_breadcrumbs_from_page(target_soup)
+        breadcrumbs = self.extract_breadcrumbs_from_page(make_link_soup(html))
+        if breadcrumbs:
+            self._count_parse('link_scan')
+        else:
+            self._count_parse('full_parse')
+            breadcrumbs = self.extract_breadcrumbs_from_page(make_soup(html))
         
         # 如果成功提取到面包屑导航
         if breadcrumbs and len(breadcrumbs) > 1:
@@ -225,13 +240,11 @@ class TreeCrawler(IFixitCrawler):
         在当前页面中查找指定类别的真实URL
         """
         try:
-            soup = self.get_soup(current_page_url)
+            # 提取当前页面的所有子类别
+            soup, categories, _ = self._get_category_page(current_page_url)
             if not soup:
                 return None
 
-            # 提取当前页面的所有子类别
-            categories = self.extract_categories(soup, current_page_url)
-
             # 智能匹配类别名称
             for category in categories:
                 if self._is_category_match(category["name"], category_name):
@@ -439,14 +452,11 @@ class TreeCrawler(IFixitCrawler):
         if current_url == target_url:
             return current_path
             
-        # 获取当前页面内容
-        soup = self.get_soup(current_url)
+        # 获取当前页面内容并提取所有子类别
+        soup, categories, _ = self._get_category_page(current_url)
         if not soup:
             return None
         
-        # 提取当前页面上的所有子类别
-        categories = self.extract_categories(soup, current_url)
-        
         # 过滤掉"创建指南"等非实际类别
         real_categories = [c for c in categories if not any(x in c["name"] or x in c["url"] for x in ["创建指南", "Guide/new"])]
         
@@ -838,8 +848,11 @@ class TreeCrawler(IFixitCrawler):
 
         check_node(tree)
 
-    def _continue_from_saved_tree_node(self, url, parent_node):
-        """从已保存的树结构中恢复子节点并继续遍历未处理的部分"""
+    def _continue_from_saved_tree_node(self, url, parent_node, frontier=None):
+        """从已保存的树结构中恢复子节点并继续遍历未处理的部分
+
+        传入frontier时，未处理的子节点加入该待处理列表，由调用方的并发队列统一抓取
+        """
         try:
             # 获取已保存的树结构
             saved_tree = self.progress_manager.get_tree_structure()
@@ -874,10 +887,13 @@ class TreeCrawler(IFixitCrawler):
                     child_url = child.get('url', '')
                     if child_url and not self.progress_manager.is_url_processed(child_url):
                         print(f"🔄 继续处理未完成的子节点: {child_url}")
-                        self._crawl_recursive_tree_with_resume(child_url, child)
+                        if frontier is not None:
+                            frontier.append((child_url, child))
+                        else:
+                            self._crawl_recursive_tree_with_resume(child_url, child)
                     elif child_url and self.progress_manager.is_url_processed(child_url):
                         # 即使子节点已处理，也要检查其子子节点
-                        self._continue_from_saved_tree_node(child_url, child)
+                        self._continue_from_saved_tree_node(child_url, child, frontier)
             else:
                 print(f"📋 节点 {url} 没有子节点需要恢复")
 
@@ -986,37 +1002,113 @@ class TreeCrawler(IFixitCrawler):
         return self._crawl_recursive_tree_with_resume(url, parent_node)
 
     def _crawl_recursive_tree_with_resume(self, url, parent_node):
-        """递归爬取树形结构 - 支持断点续爬"""
+        """爬取树形结构 - 支持断点续爬，分类页由多个线程提前抓取
+
+        节点的展开（去重认领、挂接子节点、记录进度）都在当前线程按深度优先先序进行，
+        同一分类被多个父分类链接时总是先序中的第一个父节点得到完整子树，
+        输出树与串行遍历一致，不随线程数和响应快慢变化；工作线程只预取接下来要展开的分类页。
+        节点在其全部子孙完成后才标记为完成，与原先深度优先遍历的断点记录语义相同。
+        """
+        def finish(record):
+            # 节点及其子孙都完成后，依次向上通知父节点
+            while record:
+                if record['finalize']:
+                    record['finalize']()
+                parent = record['parent']
+                if parent is None:
+                    return
+                parent['remaining'] -= 1
+                if parent['remaining'] > 0:
+                    return
+                record = parent
+
+        outer_prefetch, self._category_prefetch = self._category_prefetch, {}
+        prefetch_window = max(1, self.tree_workers) * 2
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.tree_workers),
+                                    thread_name_prefix="tree-builder") as executor:
+                stack = [(url, parent_node, None)]
+                while stack:
+                    self._prefetch_category_pages(executor, stack, prefetch_window)
+                    node_url, node, parent_record = stack.pop()
+                    try:
+                        children, finalize = self._expand_tree_node(node_url, node)
+                    except Exception as e:
+                        self.logger.warning(f"树节点处理异常: {e}")
+                        children, finalize = [], None
+
+                    record = {'finalize': finalize, 'parent': parent_record, 'remaining': len(children)}
+                    if not children:
+                        finish(record)
+                        continue
+                    # 逆序入栈，子节点按页面顺序依次展开
+                    for child_url, child_node in reversed(children):
+                        stack.append((child_url, child_node, record))
+
+                for future in self._category_prefetch.values():
+                    future.cancel()
+        finally:
+            self._category_prefetch = outer_prefetch
+
+    def _prefetch_category_pages(self, executor, stack, window):
+        """为栈顶（即接下来按先序展开）的若干节点提前抓取分类页，已认领或无需抓取的URL跳过"""
+        for node_url, _, _ in reversed(stack[-window:]):
+            if node_url in self._category_prefetch or node_url in self.visited_urls:
+                continue
+            if self.enable_resume and self.progress_manager and (
+                    self.progress_manager.should_skip_url_processing_only(node_url) or
+                    self.progress_manager.is_url_failed(node_url)):
+                continue
+            self._category_prefetch[node_url] = executor.submit(self._get_category_page, node_url)
+
+    def _take_category_page(self, url):
+        """取出预取的分类页结果，没有预取时在当前线程抓取"""
+        future = self._category_prefetch.pop(url, None)
+        return future.result() if future is not None else self._get_category_page(url)
+
+    def _claim_url(self, url):
+        """原子地标记URL为已访问，返回False表示已被其他任务处理"""
+        with self._visited_lock:
+            if url in self.visited_urls:
+                return False
+            self.visited_urls.add(url)
+            return True
+
+    def _expand_tree_node(self, url, parent_node):
+        """展开单个树节点（在树构建的驱动线程中按先序调用，分类页优先使用预取结果）
+
+        Returns:
+            (children, finalize)：children 为需要继续抓取的 (url, 节点) 列表，
+            finalize 在该节点的全部子孙完成后调用，用于记录完成状态；无需记录时为None
+        """
+        frontier = []
+
         # 检查是否应该跳过此URL的处理，但仍需要遍历其子节点
         if self.enable_resume and self.progress_manager:
             if self.progress_manager.should_skip_url_processing_only(url):
                 print(f"⏭️ 跳过已处理的URL，但继续遍历子节点: {url}")
-                # 从已保存的树结构中恢复子节点并继续遍历
-                self._continue_from_saved_tree_node(url, parent_node)
-                return
+                # 从已保存的树结构中恢复子节点，未处理的子节点加入待处理队列
+                self._continue_from_saved_tree_node(url, parent_node, frontier)
+                return frontier, None
             elif self.progress_manager.is_url_failed(url):
                 print(f"⚠️ 跳过失败的URL: {url}")
-                return
-
-        # 防止重复访问同一URL
-        if url in self.visited_urls:
-            return
+                return frontier, None
 
         # 跳过不应包含在树结构中的页面类型
         invalid_keywords = ["创建指南", "Guide/new", "翻译", "贡献者", "论坛问题", "其他贡献"]
         if any(keyword in url for keyword in invalid_keywords):
             print(f"跳过无效页面: {url}")
-            return
+            return frontier, None
+
+        # 防止重复访问同一URL
+        if not self._claim_url(url):
+            return frontier, None
 
         # 标记开始处理
         if self.enable_resume and self.progress_manager:
             parent_path = self._get_parent_path_from_tree(parent_node)
             self.progress_manager.mark_url_processing(url, parent_path)
 
-        self.visited_urls.add(url)
-        
-        # 防止过快请求，添加延迟
-        time.sleep(random.uniform(0.5, 1.0))
 
         # 构建当前位置的分类路径显示
         path_str = self._get_current_path(parent_node, self.tree_cache if hasattr(self, 'tree_cache') else None)
@@ -1027,15 +1119,13 @@ class TreeCrawler(IFixitCrawler):
         print(f"   父节点: {parent_node.get('name', 'Unknown')}")
 
         try:
-            soup = self.get_soup(url)
+            # 提取子类别（先链接扫描，找不到有效子类别时完整解析）
+            print("   🔍 开始提取子类别...")
+            soup, categories, link_scan = self._take_category_page(url)
             if not soup:
                 if self.enable_resume and self.progress_manager:
                     self.progress_manager.mark_url_failed(url, "无法获取页面内容")
-                return
-
-            # 提取子类别
-            print(f"   🔍 开始提取子类别...")
-            categories = self.extract_categories(soup, url)
+                return frontier, None
             print(f"   📊 原始类别数量: {len(categories)}")
 
             # 过滤掉不应包含在树结构中的类别
@@ -1116,8 +1206,8 @@ class TreeCrawler(IFixitCrawler):
                                             "url": full_url
                                         })
 
-            # 检查是否为最终产品页面
-            is_final_page = self.is_final_product_page(soup, url)
+            # 检查是否为最终产品页面（链接扫描已找到有效子类别的页面一定不是最终产品页面）
+            is_final_page = not link_scan and self.is_final_product_page(soup, url)
 
             # 如果是最终产品页面（没有子类别），则提取产品信息
             if is_final_page:
@@ -1229,13 +1319,13 @@ class TreeCrawler(IFixitCrawler):
                                 # 从已保存的树中恢复并继续遍历子节点
                                 # 确保即使从缓存恢复，也要完整处理所有子节点
                                 try:
-                                    self._continue_from_saved_tree_node(category["url"], child_node)
+                                    self._continue_from_saved_tree_node(category["url"], child_node, frontier)
                                     print(f"   ✅ 成功恢复子节点: '{clean_name}'")
                                 except Exception as e:
                                     print(f"   ❌ 恢复子节点失败: '{clean_name}' - {str(e)}")
                                     # 如果恢复失败，尝试重新爬取
                                     print(f"   🔄 尝试重新爬取: {category['url']}")
-                                    self._crawl_recursive_tree_with_resume(category["url"], child_node)
+                                    frontier.append((category["url"], child_node))
 
                                 processed_children += 1
                                 continue
@@ -1267,26 +1357,10 @@ class TreeCrawler(IFixitCrawler):
                         }
                         parent_node["children"].append(child_node)
 
-                        print(f"🌿 开始递归爬取类别: {path_str} > {clean_name}")
-
-                        # 递归爬取子类别，确保完整遍历
-                        try:
-                            self._crawl_recursive_tree_with_resume(category["url"], child_node)
-                            print(f"   ✅ 完成递归爬取: {clean_name}")
+                        print(f"🌿 加入待爬取队列: {path_str} > {clean_name}")
 
-                            # 验证子节点是否有内容
-                            child_count = len(child_node.get("children", []))
-                            if child_count > 0:
-                                print(f"   📊 {clean_name} 包含 {child_count} 个子节点")
-                            else:
-                                print(f"   📄 {clean_name} 是叶子节点")
-
-                        except Exception as e:
-                            print(f"   ⚠️ 递归爬取失败，继续处理其他节点: {clean_name} - {str(e)}")
-                            # 即使递归失败，也保持节点结构
-                            if "instruction_url" not in child_node:
-                                child_node["instruction_url"] = ""
-                            # 继续处理其他节点，不要停止整个流程
+                        # 子类别按深度优先先序展开（分类页由工作线程预取），节点已按顺序挂到父节点上
+                        frontier.append((category["url"], child_node))
 
                         processed_children += 1
 
@@ -1315,20 +1389,24 @@ class TreeCrawler(IFixitCrawler):
                             parent_node["instruction_url"] = ""
                         print(f"   ⚠️ 无法提取产品信息，保持原有节点结构")
 
-            # 标记URL处理完成
-            if self.enable_resume and self.progress_manager:
-                children_count = len(real_categories) if 'real_categories' in locals() else 0
-                self.progress_manager.mark_url_completed(url, children_count)
-
-            # 输出节点处理完成信息
-            node_type = "叶子节点" if is_final_page else f"分类节点({len(real_categories) if 'real_categories' in locals() else 0}个子类别)"
-            print(f"   ✅ 节点处理完成: {node_type}")
-            print(f"   📊 当前节点统计:")
-            print(f"      - 节点名称: {parent_node.get('name', 'Unknown')}")
-            print(f"      - 子节点数: {len(parent_node.get('children', []))}")
-            print(f"      - 是否有instruction_url: {'instruction_url' in parent_node}")
-            if 'real_categories' in locals() and real_categories:
-                print(f"      - 发现的子类别: {[c['name'] for c in real_categories]}")
+            children_count = len(real_categories)
+
+            def finalize():
+                # 标记URL处理完成（全部子孙完成后才调用，中断时父节点会被重新处理）
+                if self.enable_resume and self.progress_manager:
+                    self.progress_manager.mark_url_completed(url, children_count)
+
+                # 输出节点处理完成信息
+                node_type = "叶子节点" if is_final_page else f"分类节点({children_count}个子类别)"
+                print(f"   ✅ 节点处理完成: {node_type}")
+                print("   📊 当前节点统计:")
+                print(f"      - 节点名称: {parent_node.get('name', 'Unknown')}")
+                print(f"      - 子节点数: {len(parent_node.get('children', []))}")
+                print(f"      - 是否有instruction_url: {'instruction_url' in parent_node}")
+                if real_categories:
+                    print(f"      - 发现的子类别: {[c['name'] for c in real_categories]}")
+
+            return frontier, finalize
 
         except Exception as e:
             # 处理错误，但不要停止整个爬取流程
@@ -1337,6 +1415,34 @@ class TreeCrawler(IFixitCrawler):
             if self.enable_resume and self.progress_manager:
                 self.progress_manager.mark_url_failed(url, str(e))
             # 不要抛出异常，让爬虫继续处理其他节点
+            return frontier, None
+
+    def _count_parse(self, mode):
+        with self._visited_lock:
+            self.parse_stats[mode] += 1
+
+    def _get_category_page(self, url):
+        """
+        获取分类页并提取子类别：先用链接扫描模式只解析链接、面包屑和类别区块，
+        找不到有效的设备子类别时（多为最终产品页面）回退到完整解析
+
+        Returns:
+            (soup, categories, link_scan)：页面获取失败时soup为None；
+            link_scan为True时soup只包含链接扫描保留的元素
+        """
+        html = self.get_page_html(url)
+        if html is None:
+            return None, [], False
+
+        soup = make_link_soup(html)
+        categories = self.extract_categories_link_scan(soup, url)
+        if categories:
+            self._count_parse('link_scan')
+            return soup, categories, True
+
+        self._count_parse('full_parse')
+        soup = make_soup(html)
+        return soup, self.extract_categories(soup, url), False
 
     def _get_parent_path_from_tree(self, node):
         """从树节点获取父路径"""